@@ -57,6 +57,7 @@ class AutoTestApiProjectInfo(ScaffoldModel, MaintainMixin, TimestampMixin, State
     project_test_owners = fields.JSONField(default=list, null=True, description="应用测试负责人")
     project_testers = fields.JSONField(default=list, null=True, description="应用测试人员列表")
     project_current_month_env = fields.CharField(max_length=64, null=True, description="应用当前月版环境")
+    project_retention_days = fields.IntField(null=True, description="报告/明细保留天数(为空使用全局默认, 0:永久保留)")
     project_code = fields.CharField(max_length=64, default=unique_identify, unique=True, description="应用标识代码")
     state = fields.SmallIntField(default=0, index=True, description="状态(0:启用, 1:禁用)")
 
@@ -289,6 +290,10 @@ class AutoTestApiReportInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateM
     case_ed_time = fields.CharField(max_length=32, null=True, description="用例执行结束时间")
     case_elapsed = fields.CharField(max_length=16, null=True, description="用例执行消耗时间")
     case_state = fields.BooleanField(null=True, description="用例执行状态(True:成功, False:失败)")
+    # case_st_time/case_ed_time 为字符串，无法高效做范围查询；以下为对应的原生时间列，供检索与统计使用
+    case_st_at = fields.DatetimeField(null=True, index=True, description="用例执行开始时间(时间类型)")
+    case_ed_at = fields.DatetimeField(null=True, description="用例执行结束时间(时间类型)")
+    project_id = fields.BigIntField(null=True, description="用例所属应用ID(冗余, 便于按应用检索)")
 
     step_total = fields.IntField(default=0, ge=0, description="用例步骤数量(含所有子级步骤)")
     step_fail_count = fields.IntField(default=0, ge=0, description="用例步骤失败数量(含所有子级步骤)")
@@ -310,6 +315,10 @@ class AutoTestApiReportInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateM
             ("case_id", "state", "updated_time"),
             ("case_id", "case_state"),
             ("case_id", "created_user"),
+            ("case_id", "state", "case_st_at"),
+            ("project_id", "state", "case_st_at"),
+            ("project_id", "case_state", "case_st_at"),
+            ("state", "case_st_at"),
         )
         ordering = ["-updated_time"]
 
@@ -318,6 +327,42 @@ class AutoTestApiReportInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateM
         return self.report_code
 
 
+class AutoTestApiReportDailyInfo(ScaffoldModel, TimestampMixin):
+    """自动化测试报告日汇总模型（按 应用 + 用例 + 日期 预聚合），对应表 krun_autotest_api_report_daily。"""
+
+    project_id = fields.BigIntField(default=0, description="用例所属应用ID(0:未关联应用)")
+    case_id = fields.BigIntField(description="用例ID")
+    stat_date = fields.DateField(description="统计日期(按用例执行开始时间)")
+    run_count = fields.IntField(default=0, description="执行次数")
+    pass_count = fields.IntField(default=0, description="执行成功次数")
+    fail_count = fields.IntField(default=0, description="执行失败次数")
+    step_total = fields.IntField(default=0, description="步骤执行总数")
+    step_pass_count = fields.IntField(default=0, description="步骤执行成功数")
+    step_fail_count = fields.IntField(default=0, description="步骤执行失败数")
+    elapsed_total = fields.FloatField(default=0.0, description="执行总耗时(秒)")
+    elapsed_min = fields.FloatField(null=True, description="最短执行耗时(秒)")
+    elapsed_max = fields.FloatField(null=True, description="最长执行耗时(秒)")
+    # elapsed_hist 为固定分桶的耗时直方图(各桶计数列表)，用于合并后估算 P50/P90/P95/P99
+    elapsed_hist = fields.JSONField(default=list, description="执行耗时分桶直方图")
+
+    class Meta:
+        table = "krun_autotest_api_report_daily"
+        table_description = "自动化测试-报告日汇总表"
+        unique_together = (
+            ("project_id", "case_id", "stat_date"),
+        )
+        indexes = (
+            ("project_id", "stat_date"),
+            ("case_id", "stat_date"),
+            ("stat_date",),
+        )
+        ordering = ["-stat_date"]
+
+    def __str__(self):
+        """返回用例ID与统计日期。"""
+        return f"{self.case_id}@{self.stat_date}"
+
+
 class AutoTestApiDetailInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateModel, ReserveFields):
     """自动化测试步骤执行明细信息模型，对应表 krun_autotest_api_details。"""
 
@@ -339,6 +384,7 @@ class AutoTestApiDetailInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateM
     step_elapsed = fields.CharField(max_length=16, null=True, description="步骤执行消耗时间")
     step_exec_logger = fields.JSONField(null=True, description="步骤执行日志(字符串列表)")
     step_exec_except = fields.TextField(null=True, description="步骤错误描述")
+    step_attempts = fields.JSONField(null=True, description="请求尝试记录(HTTP/TCP/数据库步骤每次尝试的耗时、状态码、异常与是否重试)")
 
     # 请求相关（实际发出的请求）
     request_url = fields.CharField(max_length=2048, null=True, description="实际发出的请求地址")
@@ -376,8 +422,10 @@ class AutoTestApiDetailInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateM
     database_searched = fields.BooleanField(null=True, description="数据库请求查到即止开关(快照)")
     # 变量相关
     # session_variables、defined_variables 存储为List[Dict[str, Any]]格式，每个元素包含 key、value、desc 项
+    # 同一报告内按 variables_seq 顺序存储：关键帧为完整列表，其余为相对上一条明细的增量 {base, upsert, remove}
     session_variables = fields.JSONField(null=True, description="会话变量(所有步骤的执行结果持续累积)")
     defined_variables = fields.JSONField(null=True, description="定义变量(用户自定义、引用函数的结果)")
+    variables_seq = fields.IntField(null=True, description="变量快照序号(同一报告内按保存顺序递增)")
     # extract_variables 存储为List[Dict[str, Any]]格式，每个元素包含 name、scope、source、expr、index、extract_value、success、error 项
     extract_variables = fields.JSONField(null=True, description="提取变量(从请求控制器、上下文中提取、执行代码结果)")
     # assert_validators 存储为List[Dict[str, Any]]格式，每个元素包含 name、expr、operation、except_value、actual_value、success、error 项
@@ -400,6 +448,7 @@ class AutoTestApiDetailInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateM
             ("case_id", "report_code", "state", "step_st_time"),
             ("report_code", "step_st_time"),
             ("case_id", "report_code", "step_st_time"),
+            ("report_code", "variables_seq"),
         )
         ordering = ["-updated_time"]
 
@@ -408,6 +457,24 @@ class AutoTestApiDetailInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateM
         return self.step_code
 
 
+class AutoTestApiPayloadBlobInfo(ScaffoldModel, TimestampMixin):
+    """明细大字段 blob 引用模型（按 blob 摘要 + 报告记录引用关系），对应表 krun_autotest_api_payload_blob。"""
+
+    blob_digest = fields.CharField(max_length=64, description="blob 文件 sha256 摘要")
+    report_code = fields.CharField(max_length=64, index=True, description="引用该 blob 的报告标识代码")
+
+    class Meta:
+        table = "krun_autotest_api_payload_blob"
+        table_description = "自动化测试-明细大字段引用表"
+        unique_together = (
+            ("blob_digest", "report_code"),
+        )
+
+    def __str__(self):
+        """返回 blob 摘要与报告标识代码。"""
+        return f"{self.blob_digest}@{self.report_code}"
+
+
 class AutoTestApiTaskInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateModel, ReserveFields):
     """自动化测试任务信息模型，对应表 krun_autotest_api_task。"""
 
@@ -512,6 +579,35 @@ class AutoTestApiDataSourceInfo(ScaffoldModel, MaintainMixin, TimestampMixin, St
         return f"{self.data_source_code or ''}(case_id={self.case_id},step_code={self.step_code})"
 
 
+class AutoTestApiDatasetInfo(ScaffoldModel, TimestampMixin):
+    """
+    数据源场景明细模型（一个数据源 × 一个场景一行），对应表 krun_autotest_api_dataset。
+    AutoTestApiDataSourceInfo.dataset 仅作为导入/导出格式保留，执行时按场景读取本表单行，更新时只写变更的场景。
+    """
+    data_source_id = fields.BigIntField(description="数据源ID")
+    case_id = fields.BigIntField(description="用例ID")
+    step_id = fields.BigIntField(description="步骤ID")
+    step_code = fields.CharField(max_length=64, description="步骤标识代码")
+    dataset_name = fields.CharField(max_length=255, description="场景/数据集名称")
+    dataset_no = fields.IntField(default=0, description="场景序号(与导入文件中的场景列顺序一致)")
+    # 存储格式：{"head":..., "body":..., "assert":... }
+    dataset_data = fields.JSONField(description="场景数据")
+
+    class Meta:
+        table = "krun_autotest_api_dataset"
+        table_description = "自动化测试-数据源场景明细表"
+        unique_together = (
+            ("data_source_id", "dataset_name"),
+        )
+        indexes = (
+            ("case_id", "step_code"),
+        )
+        ordering = ["data_source_id", "dataset_no"]
+
+    def __str__(self):
+        return f"{self.dataset_name}(data_source_id={self.data_source_id})"
+
+
 class AutoTestApiDataCreateInfo(ScaffoldModel, MaintainMixin, TimestampMixin, StateModel, ReserveFields):
     case_id = fields.BigIntField(ge=1, index=True, description="用例ID")
     case_code = fields.CharField(max_length=64, description="用例标识代码")
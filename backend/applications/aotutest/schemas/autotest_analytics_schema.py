@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : autotest_analytics_schema
+@DateTime: 2026/5/11 14:20
+"""
+from datetime import date
+from typing import Optional, Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class AutoTestApiAnalyticsRange(BaseModel):
+    date_from: date = Field(..., description="统计日期-起(YYYY-MM-DD)")
+    date_to: date = Field(..., description="统计日期-止(YYYY-MM-DD)")
+
+    @model_validator(mode="after")
+    def check_date_range(self):
+        if self.date_from > self.date_to:
+            raise ValueError("统计日期-起(date_from)不能晚于统计日期-止(date_to)")
+        if (self.date_to - self.date_from).days > 366:
+            raise ValueError("统计日期范围不能超过366天")
+        return self
+
+
+class AutoTestApiAnalyticsTrendSelect(AutoTestApiAnalyticsRange):
+    project_id: Optional[int] = Field(None, description="应用ID(为空统计全部应用)")
+    case_id: Optional[int] = Field(None, description="用例ID(为空统计应用下全部用例)")
+
+
+class AutoTestApiAnalyticsLeaderboardSelect(AutoTestApiAnalyticsRange):
+    project_id: Optional[int] = Field(None, description="应用ID(为空统计全部应用)")
+    metric: Literal[
+        "run_count", "fail_count", "pass_ratio", "step_pass_ratio", "elapsed_avg", "elapsed_p95"
+    ] = Field(default="fail_count", description="排行指标")
+    ascending: bool = Field(default=False, description="是否升序排列")
+    min_runs: int = Field(default=1, ge=1, description="最少执行次数(过滤偶发执行的用例)")
+    limit: int = Field(default=10, ge=1, le=100, description="返回条数")
+
+
+class AutoTestApiAnalyticsRebuild(AutoTestApiAnalyticsRange):
+    project_id: Optional[int] = Field(None, description="应用ID(为空重建全部应用)")
@@ -18,6 +18,19 @@ from backend.enums import AutoTestStepType, HTTPMethod, AutoTestReqArgsType, Aut
 NON_DICT_TYPE: Type = Optional[Dict[str, Any]]
 NON_LIST_DICT_TYPE: Type = Optional[List[Dict[str, Any]]]
 
+# 变量快照关键帧间隔：同一报告内每隔 N 条明细保存一次完整变量快照，其余明细仅保存相对上一条明细的增量
+VARIABLES_KEYFRAME_INTERVAL: int = 20
+
+
+class StepVariablesDelta(BaseModel):
+    """变量快照增量：相对同一报告上一条明细(variables_seq = base)的变量变化。"""
+    base: int = Field(..., ge=0, description="基准明细的变量快照序号")
+    upsert: List[StepVariablesBase] = Field(default_factory=list, description="新增或值发生变化的变量(同key覆盖, 新key追加)")
+    remove: List[str] = Field(default_factory=list, description="已移除的变量key")
+
+
+VARIABLES_SNAPSHOT_TYPE: Type = Optional[Union[List[StepVariablesBase], StepVariablesDelta]]
+
 
 class DataBaseOperates(BaseModel):
     index: int = Field(..., ge=0, description="数据库操作序号")
@@ -73,12 +86,13 @@ class AutoTestApiDetailResBase(BaseModel):
 
 class AutoTestApiDetailVarBase(BaseModel):
     conditions: Optional[ConditionsBase] = Field(default=None, description="本次执行条件/循环判断条件")
-    session_variables: Optional[List[StepVariablesBase]] = Field(
-        default=None, description="会话变量(包含提取变量，以及前后code设置的变量), 项为 key/value/desc"
+    session_variables: VARIABLES_SNAPSHOT_TYPE = Field(
+        default=None, description="会话变量(包含提取变量，以及前后code设置的变量), 项为 key/value/desc; 或相对上一条明细的增量"
     )
-    defined_variables: Optional[List[StepVariablesBase]] = Field(
-        default=None, description="定义变量(自定义变量，如编写指定值或引用随机函数), 项为 key/value/desc"
+    defined_variables: VARIABLES_SNAPSHOT_TYPE = Field(
+        default=None, description="定义变量(自定义变量，如编写指定值或引用随机函数), 项为 key/value/desc; 或相对上一条明细的增量"
     )
+    variables_seq: Optional[int] = Field(default=None, ge=0, description="变量快照序号(同一报告内按保存顺序递增)")
     extract_variables: NON_LIST_DICT_TYPE = Field(
         default=None, description="提取结果(与步骤 extract 配置对应；使用 scope 表示 ALL/SOME)"
     )
@@ -86,6 +100,9 @@ class AutoTestApiDetailVarBase(BaseModel):
     database_operates: Optional[List[DataBaseOperates]] = Field(default=None, description="本次执行数据库操作明细快照(解析后的数据库请求操作列表)")
     step_exec_logger: Optional[List[str]] = Field(default=None, description="步骤执行日志(字符串列表)")
     step_exec_except: Optional[str] = Field(default=None, description="步骤错误描述")
+    step_attempts: Optional[List[Dict[str, Any]]] = Field(
+        default=None, description="请求尝试记录(HTTP/TCP/数据库步骤每次尝试的耗时、状态码、异常与是否重试)"
+    )
 
     @field_validator("step_exec_logger", mode="before")
     @classmethod
@@ -122,18 +139,28 @@ class AutoTestApiDetailVarBase(BaseModel):
                 v["conditions"] = None
                 executive_logger.append(f"字段[conditions]标准化失败, 已置空, 错误描述: {e}")
 
-        session_variables_value: Optional[List[StepVariablesBase]] = v.get("session_variables")
+        session_variables_value: Optional[Union[List[StepVariablesBase], StepVariablesDelta]] = v.get("session_variables")
         if session_variables_value:
             try:
-                v["session_variables"] = [item.model_dump() for item in session_variables_value]
+                if isinstance(session_variables_value, StepVariablesDelta):
+                    v["session_variables"] = session_variables_value.model_dump()
+                elif isinstance(session_variables_value, dict):
+                    v["session_variables"] = session_variables_value
+                else:
+                    v["session_variables"] = [item.model_dump() for item in session_variables_value]
             except Exception as e:
                 v["session_variables"] = None
                 executive_logger.append(f"字段[session_variables]标准化失败, 已置空, 错误描述: {e}")
 
-        defined_variables_value: Optional[List[StepVariablesBase]] = v.get("defined_variables")
+        defined_variables_value: Optional[Union[List[StepVariablesBase], StepVariablesDelta]] = v.get("defined_variables")
         if defined_variables_value:
             try:
-                v["defined_variables"] = [item.model_dump() for item in defined_variables_value]
+                if isinstance(defined_variables_value, StepVariablesDelta):
+                    v["defined_variables"] = defined_variables_value.model_dump()
+                elif isinstance(defined_variables_value, dict):
+                    v["defined_variables"] = defined_variables_value
+                else:
+                    v["defined_variables"] = [item.model_dump() for item in defined_variables_value]
             except Exception as e:
                 v["defined_variables"] = None
                 executive_logger.append(f"字段[defined_variables]标准化失败, 已置空, 错误描述: {e}")
@@ -226,6 +253,9 @@ class AutoTestApiDetailSelect(BaseModel):
     page: int = Field(default=1, ge=1, description="页码")
     page_size: int = Field(default=10, ge=10, description="每页数量")
     order: List[str] = Field(default=["step_st_time"], description="排序字段")
+    cursor_mode: bool = Field(default=False, description="是否使用游标分页(为 True 时忽略 page, 按 cursor 定位下一页)")
+    cursor: Optional[str] = Field(None, description="游标分页的游标(上一页返回的 next_cursor), 为空表示第一页")
+    with_total: bool = Field(default=False, description="游标分页时是否统计总数")
 
     case_id: Optional[int] = Field(None, description="用例ID")
     case_code: Optional[str] = Field(None, max_length=64, description="用例标识代码")
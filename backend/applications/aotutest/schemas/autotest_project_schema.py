@@ -23,6 +23,7 @@ class AutoTestApiProjectBase(BaseModel):
     project_test_owners: Optional[List[str]] = Field(None, description="应用测试负责人")
     project_testers: Optional[List[str]] = Field(None, description="应用测试人员列表")
     project_current_month_env: Optional[UpperStr] = Field(None, max_length=64, description="应用当前月版环境")
+    project_retention_days: Optional[int] = Field(None, ge=0, description="报告/明细保留天数(为空使用全局默认, 0:永久保留)")
 
 
 class AutoTestApiProjectCreate(AutoTestApiProjectBase):
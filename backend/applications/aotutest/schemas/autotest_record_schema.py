@@ -15,6 +15,9 @@ class AutoTestApiRecordSelect(BaseModel):
     page: int = Field(default=1, ge=1, description="页码")
     page_size: int = Field(default=10, ge=10, description="每页数量")
     order: List[str] = Field(default=["-celery_start_time", "-id"], description="排序字段")
+    cursor_mode: bool = Field(default=False, description="是否使用游标分页(为 True 时忽略 page, 按 cursor 定位下一页)")
+    cursor: Optional[str] = Field(None, description="游标分页的游标(上一页返回的 next_cursor), 为空表示第一页")
+    with_total: bool = Field(default=False, description="游标分页时是否统计总数")
 
     celery_id: Optional[str] = Field(None, max_length=255, description="调度ID")
     task_id: Optional[int] = Field(None, description="任务ID")
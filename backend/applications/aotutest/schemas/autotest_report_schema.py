@@ -53,9 +53,13 @@ class AutoTestApiReportSelect(BaseModel):
     page: int = Field(default=1, ge=1, description="页码")
     page_size: int = Field(default=10, ge=10, description="每页数量")
     order: List[str] = Field(default=["-updated_time"], description="排序字段")
+    cursor_mode: bool = Field(default=False, description="是否使用游标分页(为 True 时忽略 page, 按 cursor 定位下一页)")
+    cursor: Optional[str] = Field(None, description="游标分页的游标(上一页返回的 next_cursor), 为空表示第一页")
+    with_total: bool = Field(default=False, description="游标分页时是否统计总数")
 
     case_id: Optional[int] = Field(None, description="用例ID")
     case_code: Optional[str] = Field(None, description="用例标识代码")
+    project_id: Optional[int] = Field(None, description="用例所属应用ID")
     report_id: Optional[int] = Field(None, description="报告ID")
     report_code: Optional[str] = Field(None, description="报告标识代码")
     report_type: Optional[AutoTestReportType] = Field(None, description="报告类型")
@@ -68,6 +72,6 @@ class AutoTestApiReportSelect(BaseModel):
     step_pass_ratio: Optional[float] = Field(None, ge=0, description="用例步骤成功率(含所有子级步骤)")
     state: Optional[int] = Field(default=0, description="状态(0:启用, 1:禁用)")
 
-    # 执行时间范围（按用例执行开始时间 case_st_time 筛选，格式 YYYY-MM-DD 或 YYYY-MM-DD HH:mm:ss）
+    # 执行时间范围（按用例执行开始时间 case_st_at 筛选，格式 YYYY-MM-DD 或 YYYY-MM-DD HH:mm:ss）
     date_from: Optional[str] = Field(None, description="执行开始时间-起")
     date_to: Optional[str] = Field(None, description="执行开始时间-止")
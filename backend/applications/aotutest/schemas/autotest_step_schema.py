@@ -85,6 +85,19 @@ class StepAssertValidatorItem(BaseModel):
     except_value: Any = Field(default=None, description="期待值")
 
 
+class StepRetryPolicy(BaseModel):
+    """HTTP/TCP/数据库步骤的重试策略，未配置的项使用 STEP_RETRY_* 全局配置。"""
+
+    attempts: Optional[int] = Field(None, ge=1, le=10, description="总尝试次数(含首次)，1 表示不重试")
+    backoff: Optional[float] = Field(None, ge=0, le=60, description="首次重试前的退避秒数")
+    backoff_factor: Optional[float] = Field(None, ge=1, le=10, description="退避倍数")
+    max_backoff: Optional[float] = Field(None, ge=0, le=300, description="单次退避上限（秒）")
+    jitter: Optional[float] = Field(None, ge=0, le=1, description="抖动比例，实际退避在 [1-jitter, 1+jitter] 倍之间")
+    status_codes: Optional[List[int]] = Field(None, description="可重试的 HTTP 状态码")
+    exceptions: Optional[List[str]] = Field(None, description="可重试的异常类型名称（匹配异常链及其父类）")
+    non_idempotent: bool = Field(False, description="是否允许重试非幂等请求（POST/PATCH、写 SQL、TCP 报文）")
+
+
 class AutoTestApiStepReqBase(BaseModel):
     request_url: Optional[str] = Field(None, max_length=2048, description="请求地址")
     request_port: Optional[str] = Field(None, max_length=16, description="请求端口")
@@ -107,6 +120,10 @@ class AutoTestApiStepReqBase(BaseModel):
     tcp_read_timeout: Optional[float] = Field(None, ge=0, description="读写超时（秒）")
     tcp_max_response_bytes: Optional[int] = Field(None, ge=1, description="最大读取字节数")
     tcp_response_type: Optional[str] = Field(None, max_length=16, description="响应解析：json|xml|text|bytes")
+    # HTTP 步骤扩展（未配置时使用 HTTP_RESPONSE_MAX_SIZE）
+    http_max_response_bytes: Optional[int] = Field(None, ge=1, description="HTTP 响应体最大读取字节数")
+    # 重试策略（HTTP/TCP/数据库步骤）
+    retry_policy: Optional[StepRetryPolicy] = Field(None, description="瞬时故障重试策略")
 
 
 class AutoTestApiStepDbBase(BaseModel):
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : autotest_analytics_crud
+@DateTime: 2026/5/11 14:40
+"""
+import traceback
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
+
+from backend.applications.aotutest.models.autotest_model import (
+    AutoTestApiCaseInfo,
+    AutoTestApiReportDailyInfo,
+    AutoTestApiReportInfo,
+)
+from backend.applications.aotutest.schemas.autotest_analytics_schema import (
+    AutoTestApiAnalyticsTrendSelect,
+    AutoTestApiAnalyticsLeaderboardSelect,
+)
+from backend.applications.base.services.scaffold import ScaffoldCrud
+from backend.configure import LOGGER, GLOBAL_CONFIG
+
+# 执行耗时直方图分桶上界（秒），最后一个桶为超过 600 秒的溢出桶
+ELAPSED_BUCKETS: Tuple[float, ...] = (
+    0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 3, 5, 7.5, 10, 15, 20, 30, 60, 120, 300, 600,
+)
+COUNTER_FIELDS: Tuple[str, ...] = (
+    "run_count", "pass_count", "fail_count", "step_total", "step_pass_count", "step_fail_count",
+)
+
+
+class AutoTestApiAnalyticsCrud(ScaffoldCrud[AutoTestApiReportDailyInfo, BaseModel, BaseModel]):
+    """
+    报告日汇总的 CRUD 服务：报告落库时增量累加到 (应用, 用例, 日期) 汇总行，趋势/排行接口只读汇总表。
+    报告的手工修改与软删除不回写汇总，由定时重建按日期范围从原始报告重新计算。
+    """
+
+    def __init__(self):
+        """初始化 CRUD，绑定模型 AutoTestApiReportDailyInfo。"""
+        super().__init__(model=AutoTestApiReportDailyInfo)
+
+    @staticmethod
+    def empty_hist() -> List[int]:
+        """返回空的耗时直方图。"""
+        return [0] * (len(ELAPSED_BUCKETS) + 1)
+
+    @staticmethod
+    def report_elapsed(report: Dict[str, Any]) -> Optional[float]:
+        """
+        计算报告执行耗时（秒），优先使用 case_elapsed，缺失时按起止时间计算。
+
+        :param report: 报告字段字典。
+        :returns: 耗时秒数或 None。
+        """
+        try:
+            if report.get("case_elapsed") not in (None, ""):
+                return max(float(report["case_elapsed"]), 0.0)
+        except (TypeError, ValueError):
+            pass
+        if report.get("case_st_at") and report.get("case_ed_at"):
+            return max((report["case_ed_at"] - report["case_st_at"]).total_seconds(), 0.0)
+        return None
+
+    @classmethod
+    def accumulate(cls, row: Dict[str, Any], report: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将单条报告累加到汇总行（就地修改）。
+
+        :param row: 汇总行字段字典。
+        :param report: 报告字段字典。
+        :returns: 原汇总行字典。
+        """
+        row["run_count"] += 1
+        if report.get("case_state"):
+            row["pass_count"] += 1
+        else:
+            row["fail_count"] += 1
+        row["step_total"] += report.get("step_total") or 0
+        row["step_pass_count"] += report.get("step_pass_count") or 0
+        row["step_fail_count"] += report.get("step_fail_count") or 0
+        elapsed: Optional[float] = cls.report_elapsed(report)
+        if elapsed is not None:
+            row["elapsed_total"] += elapsed
+            row["elapsed_min"] = elapsed if row["elapsed_min"] is None else min(row["elapsed_min"], elapsed)
+            row["elapsed_max"] = elapsed if row["elapsed_max"] is None else max(row["elapsed_max"], elapsed)
+            hist: List[int] = row["elapsed_hist"] or cls.empty_hist()
+            hist[bisect_left(ELAPSED_BUCKETS, elapsed)] += 1
+            row["elapsed_hist"] = hist
+        return row
+
+    @classmethod
+    def merge(cls, target: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        合并两条汇总行（就地修改 target），用于按日期/用例/应用上卷。
+
+        :param target: 合并目标。
+        :param row: 待合并的汇总行。
+        :returns: 合并后的 target。
+        """
+        for field_name in COUNTER_FIELDS:
+            target[field_name] += row.get(field_name) or 0
+        target["elapsed_total"] += row.get("elapsed_total") or 0.0
+        for field_name, pick in (("elapsed_min", min), ("elapsed_max", max)):
+            if row.get(field_name) is not None:
+                current = target[field_name]
+                target[field_name] = row[field_name] if current is None else pick(current, row[field_name])
+        hist: List[int] = target["elapsed_hist"] or cls.empty_hist()
+        for index, count in enumerate(row.get("elapsed_hist") or []):
+            if index < len(hist):
+                hist[index] += count
+        target["elapsed_hist"] = hist
+        return target
+
+    @classmethod
+    def new_row(cls) -> Dict[str, Any]:
+        """返回空的汇总行字典。"""
+        row: Dict[str, Any] = {field_name: 0 for field_name in COUNTER_FIELDS}
+        row.update({"elapsed_total": 0.0, "elapsed_min": None, "elapsed_max": None, "elapsed_hist": cls.empty_hist()})
+        return row
+
+    @staticmethod
+    def estimate_percentile(hist: List[int], percentile: float, elapsed_min: Optional[float],
+                            elapsed_max: Optional[float]) -> Optional[float]:
+        """
+        按直方图估算耗时分位数（桶内线性插值，并以实际最小/最大值收敛边界）。
+
+        :param hist: 耗时直方图。
+        :param percentile: 分位数(0~1)。
+        :param elapsed_min: 最短耗时。
+        :param elapsed_max: 最长耗时。
+        :returns: 估算的分位耗时（秒），无数据时为 None。
+        """
+        total: int = sum(hist or [])
+        if not total:
+            return None
+        target: float = percentile * total
+        cumulative: int = 0
+        for index, count in enumerate(hist):
+            if not count:
+                continue
+            if cumulative + count >= target:
+                lower: float = ELAPSED_BUCKETS[index - 1] if index > 0 else 0.0
+                upper: float = ELAPSED_BUCKETS[index] if index < len(ELAPSED_BUCKETS) else (elapsed_max or lower)
+                if elapsed_min is not None:
+                    lower = max(lower, elapsed_min)
+                if elapsed_max is not None:
+                    upper = min(upper, elapsed_max)
+                upper = max(upper, lower)
+                return round(lower + (upper - lower) * (target - cumulative) / count, 3)
+            cumulative += count
+        return elapsed_max
+
+    @classmethod
+    def summarize(cls, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将汇总行转换为对外的统计指标。
+
+        :param row: 汇总行字段字典。
+        :returns: 统计指标字典。
+        """
+        run_count: int = row["run_count"]
+        hist: List[int] = row["elapsed_hist"] or []
+        timed_count: int = sum(hist)
+        return {
+            "run_count": run_count,
+            "pass_count": row["pass_count"],
+            "fail_count": row["fail_count"],
+            "pass_ratio": round(row["pass_count"] / run_count * 100, 2) if run_count else 0.0,
+            "step_total": row["step_total"],
+            "step_pass_count": row["step_pass_count"],
+            "step_fail_count": row["step_fail_count"],
+            "step_pass_ratio": round(row["step_pass_count"] / row["step_total"] * 100, 2) if row["step_total"] else 0.0,
+            "elapsed_avg": round(row["elapsed_total"] / timed_count, 3) if timed_count else None,
+            "elapsed_min": row["elapsed_min"],
+            "elapsed_max": row["elapsed_max"],
+            "elapsed_p50": cls.estimate_percentile(hist, 0.50, row["elapsed_min"], row["elapsed_max"]),
+            "elapsed_p90": cls.estimate_percentile(hist, 0.90, row["elapsed_min"], row["elapsed_max"]),
+            "elapsed_p95": cls.estimate_percentile(hist, 0.95, row["elapsed_min"], row["elapsed_max"]),
+            "elapsed_p99": cls.estimate_percentile(hist, 0.99, row["elapsed_min"], row["elapsed_max"]),
+        }
+
+    async def accumulate_report(self, report: AutoTestApiReportInfo) -> None:
+        """
+        报告落库后增量更新对应的日汇总行，失败只记录日志（定时重建会修正汇总）。
+
+        :param report: 已落库的报告实例（需包含 case_st_at）。
+        """
+        if not report.case_st_at:
+            return
+        report_dict: Dict[str, Any] = {
+            "case_state": report.case_state,
+            "case_elapsed": report.case_elapsed,
+            "case_st_at": report.case_st_at,
+            "case_ed_at": report.case_ed_at,
+            "step_total": report.step_total,
+            "step_pass_count": report.step_pass_count,
+            "step_fail_count": report.step_fail_count,
+        }
+        conditions: Dict[str, Any] = {
+            "project_id": report.project_id or 0,
+            "case_id": report.case_id,
+            "stat_date": report.case_st_at.date(),
+        }
+        try:
+            async with in_transaction():
+                instance = await self.model.filter(**conditions).select_for_update().first()
+                if not instance:
+                    try:
+                        instance = await self.model.create(**conditions, elapsed_hist=self.empty_hist())
+                    except IntegrityError:
+                        instance = await self.model.filter(**conditions).select_for_update().first()
+                row: Dict[str, Any] = {
+                    field_name: getattr(instance, field_name)
+                    for field_name in COUNTER_FIELDS + ("elapsed_total", "elapsed_min", "elapsed_max", "elapsed_hist")
+                }
+                self.accumulate(row, report_dict)
+                instance.update_from_dict(row)
+                await instance.save()
+        except Exception as e:
+            LOGGER.error(f"更新报告日汇总失败, report_code={report.report_code}, 错误描述: {e}\n{traceback.format_exc()}")
+
+    async def rebuild(self, date_from: date, date_to: date, project_id: Optional[int] = None, batch_size: int = 2000) -> int:
+        """
+        按日期范围从原始报告重新计算日汇总（覆盖已有汇总行），用于修正增量累加的偏差。
+
+        :param date_from: 统计日期-起。
+        :param date_to: 统计日期-止。
+        :param project_id: 应用ID，为空时重建全部应用。
+        :param batch_size: 每批读取的报告数量。
+        :returns: 重建后的汇总行数量。
+        """
+        search = Q(
+            state__not=1,
+            case_st_at__gte=datetime.combine(date_from, time.min),
+            case_st_at__lt=datetime.combine(date_to + timedelta(days=1), time.min),
+        )
+        if project_id is not None:
+            search &= Q(project_id=project_id) if project_id else Q(project_id=0) | Q(project_id__isnull=True)
+
+        rows: Dict[Tuple[int, int, date], Dict[str, Any]] = {}
+        last_id: int = 0
+        while True:
+            reports: List[Dict[str, Any]] = await AutoTestApiReportInfo.filter(search, id__gt=last_id).order_by("id").limit(
+                batch_size
+            ).values(
+                "id", "project_id", "case_id", "case_state", "case_elapsed", "case_st_at", "case_ed_at",
+                "step_total", "step_pass_count", "step_fail_count",
+            )
+            if not reports:
+                break
+            for report in reports:
+                key = (report["project_id"] or 0, report["case_id"], report["case_st_at"].date())
+                self.accumulate(rows.setdefault(key, self.new_row()), report)
+            last_id = reports[-1]["id"]
+
+        delete_search = Q(stat_date__gte=date_from, stat_date__lte=date_to)
+        if project_id is not None:
+            delete_search &= Q(project_id=project_id)
+        async with in_transaction():
+            await self.model.filter(delete_search).delete()
+            await self.model.bulk_create([
+                self.model(project_id=key[0], case_id=key[1], stat_date=key[2], **row)
+                for key, row in rows.items()
+            ], batch_size=500)
+        LOGGER.info(f"重建报告日汇总完成, 日期范围: {date_from}~{date_to}, 应用: {project_id}, 汇总行数量: {len(rows)}")
+        return len(rows)
+
+    async def _select_rows(self, date_from: date, date_to: date, project_id: Optional[int] = None,
+                           case_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按日期范围与应用/用例读取汇总行。"""
+        search = Q(stat_date__gte=date_from, stat_date__lte=date_to)
+        if project_id is not None:
+            search &= Q(project_id=project_id)
+        if case_id is not None:
+            search &= Q(case_id=case_id)
+        return await self.model.filter(search).values(
+            "project_id", "case_id", "stat_date", "elapsed_total", "elapsed_min", "elapsed_max", "elapsed_hist",
+            *COUNTER_FIELDS,
+        )
+
+    async def get_trend(self, select_in: AutoTestApiAnalyticsTrendSelect) -> List[Dict[str, Any]]:
+        """
+        查询按日趋势，日期范围内无执行的日期补零。
+
+        :param select_in: 趋势查询条件。
+        :returns: 按日期升序的统计指标列表。
+        """
+        daily: Dict[date, Dict[str, Any]] = {}
+        for row in await self._select_rows(select_in.date_from, select_in.date_to, select_in.project_id, select_in.case_id):
+            self.merge(daily.setdefault(row["stat_date"], self.new_row()), row)
+        trend: List[Dict[str, Any]] = []
+        current: date = select_in.date_from
+        while current <= select_in.date_to:
+            trend.append({"stat_date": current.strftime(GLOBAL_CONFIG.DATE_FORMAT), **self.summarize(daily.get(current) or self.new_row())})
+            current += timedelta(days=1)
+        return trend
+
+    async def get_leaderboard(self, select_in: AutoTestApiAnalyticsLeaderboardSelect) -> List[Dict[str, Any]]:
+        """
+        查询用例排行（按指定指标排序），附带用例名称。
+
+        :param select_in: 排行查询条件。
+        :returns: 用例统计指标列表。
+        """
+        by_case: Dict[int, Dict[str, Any]] = {}
+        for row in await self._select_rows(select_in.date_from, select_in.date_to, select_in.project_id):
+            self.merge(by_case.setdefault(row["case_id"], self.new_row()), row)
+        items: List[Dict[str, Any]] = [
+            {"case_id": case_id, **self.summarize(row)}
+            for case_id, row in by_case.items()
+            if row["run_count"] >= select_in.min_runs
+        ]
+        items = [item for item in items if item[select_in.metric] is not None]
+        items.sort(key=lambda item: item[select_in.metric], reverse=not select_in.ascending)
+        items = items[:select_in.limit]
+        if items:
+            case_names: Dict[int, str] = dict(
+                await AutoTestApiCaseInfo.filter(id__in=[item["case_id"] for item in items]).values_list("id", "case_name")
+            )
+            for item in items:
+                item["case_name"] = case_names.get(item["case_id"], "")
+        return items
+
+
+AUTOTEST_API_ANALYTICS_CRUD = AutoTestApiAnalyticsCrud()
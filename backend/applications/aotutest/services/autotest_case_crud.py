@@ -26,6 +26,7 @@ from backend.core.exceptions import (
     DataAlreadyExistsException,
 )
 from backend.enums import AutoTestCaseType
+from backend.services import invalidate_step_tree_cache
 
 
 class AutoTestApiCaseCrud(ScaffoldCrud[AutoTestApiCaseInfo, AutoTestApiCaseCreate, AutoTestApiCaseUpdate]):
@@ -35,6 +36,18 @@ class AutoTestApiCaseCrud(ScaffoldCrud[AutoTestApiCaseInfo, AutoTestApiCaseCreat
         """初始化 CRUD，绑定模型 AutoTestApiCaseInfo。"""
         super().__init__(model=AutoTestApiCaseInfo)
 
+    async def create(self, obj_in: Union[AutoTestApiCaseCreate, Dict]) -> AutoTestApiCaseInfo:
+        """新增用例并失效步骤树缓存（步骤树内嵌用例信息）。"""
+        instance = await super().create(obj_in)
+        await invalidate_step_tree_cache()
+        return instance
+
+    async def update(self, id: int, obj_in: Union[AutoTestApiCaseUpdate, Dict[str, Any]]) -> AutoTestApiCaseInfo:
+        """更新用例并失效步骤树缓存（步骤树内嵌用例信息）。"""
+        instance = await super().update(id=id, obj_in=obj_in)
+        await invalidate_step_tree_cache()
+        return instance
+
     async def get_by_id(self, case_id: int, on_error: bool = False) -> Optional[AutoTestApiCaseInfo]:
         """
         根据用例主键 ID 查询单条用例
@@ -241,6 +254,7 @@ class AutoTestApiCaseCrud(ScaffoldCrud[AutoTestApiCaseInfo, AutoTestApiCaseCreat
         # 业务层验证：检查用例是否拥有步骤
         await AutoTestApiStepInfo.filter(case_id=case_id, state__not=1).delete()
         await instance.delete()
+        await invalidate_step_tree_cache()
         return instance
 
     async def select_cases(self, search: Q, page: int, page_size: int, order: list) -> tuple:
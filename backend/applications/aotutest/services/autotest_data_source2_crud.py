@@ -8,7 +8,7 @@
 """
 import os
 import traceback
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 
 import aiofiles.os as aos
 from tortoise.exceptions import FieldError
@@ -17,15 +17,29 @@ from tortoise.expressions import Q
 from backend.applications.aotutest.models.autotest_model import AutoTestApiDataCreateInfo, AutoTestApiDataSourceInfo
 from backend.applications.aotutest.schemas.autotest_data_generate_schema import AutoTestApiDataCreateCreate, AutoTestApiDataCreateUpdate
 from backend.applications.aotutest.schemas.autotest_data_source_schema import AutoTestDataSourceCreate, AutoTestDataSourceUpdate
+from backend.applications.aotutest.services.autotest_data_source_crud import AUTOTEST_DATASET_CRUD
 from backend.applications.base.services.scaffold import ScaffoldCrud
 from backend.configure import LOGGER, PROJECT_CONFIG
 from backend.core.exceptions import DataAlreadyExistsException, NotFoundException, ParameterException
+from backend.services import invalidate_dataset_scenario_cache
 
 
 class AutoTestApiDataSourceCrud(ScaffoldCrud[AutoTestApiDataSourceInfo, AutoTestDataSourceCreate, AutoTestDataSourceUpdate]):
     def __init__(self):
         super().__init__(model=AutoTestApiDataSourceInfo)
 
+    async def create(self, obj_in: Union[AutoTestDataSourceCreate, Dict[str, Any]]) -> AutoTestApiDataSourceInfo:
+        instance = await super().create(obj_in)
+        await AUTOTEST_DATASET_CRUD.sync_datasets(instance, instance.dataset)
+        return instance
+
+    async def update(self, id: int, obj_in: Union[AutoTestDataSourceUpdate, Dict[str, Any]]) -> AutoTestApiDataSourceInfo:
+        instance = await super().update(id=id, obj_in=obj_in)
+        fields_set = obj_in.keys() if isinstance(obj_in, dict) else obj_in.model_fields_set
+        if "dataset" in fields_set:
+            await AUTOTEST_DATASET_CRUD.sync_datasets(instance, instance.dataset)
+        return instance
+
     async def get_by_code(self, step_code: str, on_error: bool = False) -> Optional[AutoTestApiDataSourceInfo]:
         if not step_code:
             error_message: str = "查询数据源信息失败, 参数(step_code)不允许为空"
@@ -122,6 +136,7 @@ class AutoTestApiDataSourceCrud(ScaffoldCrud[AutoTestApiDataSourceInfo, AutoTest
 
         instance.state = 1
         await instance.save()
+        await invalidate_dataset_scenario_cache()
         return instance
 
     async def select_data_source(self, search: Q, page: int, page_size: int, order: list) -> tuple:
@@ -138,28 +153,26 @@ class AutoTestApiDataSourceCrud(ScaffoldCrud[AutoTestApiDataSourceInfo, AutoTest
             LOGGER.error(error_message)
             raise ParameterException(message=error_message)
 
-        dataset_name: str = dataset_name.strip()
+        dataset_name: str = (dataset_name or "").strip()
         condition: Dict[str, Any] = {"case_id": case_id, "step_code": step_code}
         LOGGER.info(f"查询数据源信息条件(此时不判断dataset_name是否存在于dataset中)：{condition}")
+        if dataset_name:
+            # 指定场景时只读取该场景所在的一行，不加载整个 dataset
+            single_dataset = await AUTOTEST_DATASET_CRUD.get_scenario(
+                case_id=case_id, step_code=step_code, dataset_name=dataset_name
+            )
+            if not single_dataset:
+                error_message: str = f"查询数据源信息失败, 指定场景名称({dataset_name})下数据为空"
+                raise NotFoundException(message=error_message)
+            return {"dataset": single_dataset}
+
         source_instance: AutoTestApiDataSourceInfo = await self.model.filter(**condition, state__not=1).first()
         if not source_instance:
             error_message: str = f"查询数据源信息失败, 暂无满足({condition})查询条件的记录"
             LOGGER.error(error_message)
             raise NotFoundException(message=error_message)
 
-        source_dict: Dict[str, Any] = await source_instance.to_dict(include_fields=["dataset"])
-        if not dataset_name:
-            return source_dict
-
-        dataset: Dict[str, Any] = source_dict.get("dataset") or {}
-        if dataset:
-            single_dataset = dataset.get(dataset_name)
-            if not single_dataset:
-                error_message: str = f"查询数据源信息失败, 指定场景名称({dataset_name})下数据为空"
-                raise NotFoundException(message=error_message)
-            source_dict["dataset"] = single_dataset
-
-        return source_dict
+        return await source_instance.to_dict(include_fields=["dataset"])
 
 
 class AutoTestApiDataCreateCrud(
@@ -269,14 +282,44 @@ class AutoTestApiDataCreateCrud(
             raise ParameterException(message=error_message) from e
 
 
+async def remove_unreferenced_upload(
+        file_path: Optional[str],
+        exclude_source_ids: Optional[List[int]] = None,
+        exclude_create_ids: Optional[List[int]] = None,
+) -> bool:
+    """
+    删除不再被引用的上传文件：上传文件按内容寻址存储，同一文件可能被多条数据源/数据生成记录共用，
+    仅在两类记录中均不存在其他有效引用时才删除。
+
+    :param file_path: 上传文件路径。
+    :param exclude_source_ids: 不计入引用的数据源记录ID（调用方正在解除引用的记录）。
+    :param exclude_create_ids: 不计入引用的数据生成记录ID。
+    :return: 文件是否被删除。
+    """
+    if not file_path:
+        return False
+    source_query = AUTOTEST_API_DATA_SOURCE_CRUD.model.filter(file_path=file_path, state__not=1)
+    if exclude_source_ids:
+        source_query = source_query.exclude(id__in=exclude_source_ids)
+    create_query = AUTOTEST_API_DATA_CREATE_CRUD.model.filter(file_path=file_path, state__not=1)
+    if exclude_create_ids:
+        create_query = create_query.exclude(id__in=exclude_create_ids)
+    if await source_query.exists() or await create_query.exists():
+        return False
+    if not await aos.path.exists(file_path):
+        return False
+    await aos.remove(file_path)
+    return True
+
+
 async def delete_step_create(case_id, step_code_list):
     await AUTOTEST_API_DATA_SOURCE_CRUD.model.filter(step_code__in=step_code_list).update(state=1)
+    await invalidate_dataset_scenario_cache()
     await AUTOTEST_API_DATA_CREATE_CRUD.model.filter(step_code__in=step_code_list, state__not=1).update(state=1)
     instance_list = await AUTOTEST_API_DATA_SOURCE_CRUD.model.filter(step_code__in=step_code_list).all()
     for instance in instance_list:
         if not instance.file_hash.endswith("X"):
-            if await aos.path.exists(instance.file_hash):
-                await aos.remove(instance.file_hash)
+            await remove_unreferenced_upload(instance.file_path)
     LOGGER.warning(
         f"AUTOTEST_API_DATA_SOURCE_CRUD 删除更新后多余步骤: "
         f"步骤(case_id={case_id}, step_code__in={list(step_code_list)})已被清理"
@@ -287,8 +330,7 @@ async def delete_step_create(case_id, step_code_list):
             file_path = os.path.join(PROJECT_CONFIG.OUTPUT_UPLOAD_DIR, "autotest", str(case_id), step_info.file_name)
             if await aos.path.exists(file_path):
                 await aos.remove(file_path)
-            if await aos.path.exists(step_info.file_path):
-                await aos.remove(step_info.file_path)
+            await remove_unreferenced_upload(step_info.file_path)
     LOGGER.warning(
         f"AUTOTEST_API_DATA_CREATE_CRUD 删除更新后多余步骤: "
         f"步骤(case_id={case_id}, step_code__in={list(step_code_list)})已被清理"
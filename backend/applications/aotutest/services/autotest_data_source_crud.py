@@ -7,25 +7,28 @@
 @DateTime: 2026/3/6
 """
 import traceback
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Callable, Awaitable
 
+from pydantic import BaseModel
 from tortoise.exceptions import IntegrityError, FieldError, DoesNotExist
 from tortoise.expressions import Q
 from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
 
-from backend.applications.aotutest.models.autotest_model import AutoTestApiDataSourceInfo
+from backend.applications.aotutest.models.autotest_model import AutoTestApiDataSourceInfo, AutoTestApiDatasetInfo
 from backend.applications.aotutest.schemas.autotest_data_source_schema import (
     AutoTestDataSourceCreate,
     AutoTestDataSourceUpdate,
 )
 from backend.applications.base.services.scaffold import ScaffoldCrud
-from backend.configure import LOGGER
+from backend.configure import LOGGER, PROJECT_CONFIG
 from backend.core.exceptions import (
     ParameterException,
     NotFoundException,
     DataBaseStorageException,
     DataAlreadyExistsException,
 )
+from backend.services import KRUN_CACHE, CacheNamespace, invalidate_dataset_scenario_cache
 
 
 def make_cache_key(case_id: int, step_code: str) -> str:
@@ -39,11 +42,156 @@ def make_cache_key(case_id: int, step_code: str) -> str:
     return f"dataset_{case_id}_{step_code}"
 
 
+async def get_or_parse_dataset(parse_mode: str, file_hash: str, parser: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    按文件内容哈希缓存数据驱动文件的解析结果，重复上传内容相同的文件时直接复用，不再解析。
+
+    :param parse_mode: 解析方式（如 first_sheet、all_sheets），同一文件不同解析方式的结果分别缓存。
+    :param file_hash: 文件内容 sha256，为空时不走缓存。
+    :param parser: 无参异步解析函数，返回值需可 JSON 序列化。
+    :returns: 解析结果。
+    """
+    if not file_hash:
+        return await parser()
+    return await KRUN_CACHE.get_or_load(
+        CacheNamespace.DATASET_PARSED,
+        f"{parse_mode}:{file_hash}",
+        parser,
+        ttl=PROJECT_CONFIG.DATASET_PARSED_CACHE_TTL,
+    )
+
+
+class AutoTestDatasetCrud(ScaffoldCrud[AutoTestApiDatasetInfo, BaseModel, BaseModel]):
+    """数据源场景明细：每个场景一行，执行时按场景读取，数据源导入/更新时按场景增量同步。"""
+
+    def __init__(self):
+        super().__init__(model=AutoTestApiDatasetInfo)
+
+    async def sync_datasets(self, data_source: AutoTestApiDataSourceInfo, dataset: Optional[Dict[str, Any]]) -> None:
+        """
+        将数据源的 dataset 字典同步为场景明细行：新增场景插入、内容变化的场景更新、已移除的场景删除，未变化的场景不写库。
+
+        :param data_source: 数据源实例。
+        :param dataset: 形如 {场景名称: 场景数据} 的字典，为空时清空该数据源下全部场景。
+        """
+        dataset = dataset if isinstance(dataset, dict) else {}
+        existing: Dict[str, Dict[str, Any]] = {
+            row["dataset_name"]: row
+            for row in await self.model.filter(data_source_id=data_source.id).values(
+                "id", "dataset_name", "dataset_no", "dataset_data"
+            )
+        }
+        to_create: List[AutoTestApiDatasetInfo] = []
+        to_update: List[Dict[str, Any]] = []
+        changed_names: List[str] = []
+        for dataset_no, (dataset_name, dataset_data) in enumerate(dataset.items()):
+            row = existing.pop(dataset_name, None)
+            if row is None:
+                to_create.append(self.model(
+                    data_source_id=data_source.id,
+                    case_id=data_source.case_id,
+                    step_id=data_source.step_id,
+                    step_code=data_source.step_code,
+                    dataset_name=dataset_name,
+                    dataset_no=dataset_no,
+                    dataset_data=dataset_data,
+                ))
+                changed_names.append(dataset_name)
+            elif row["dataset_no"] != dataset_no or row["dataset_data"] != dataset_data:
+                to_update.append({"id": row["id"], "dataset_no": dataset_no, "dataset_data": dataset_data})
+                changed_names.append(dataset_name)
+        removed_ids: List[int] = [row["id"] for row in existing.values()]
+        changed_names.extend(existing.keys())
+        if not (to_create or to_update or removed_ids):
+            return
+
+        try:
+            async with in_transaction():
+                if removed_ids:
+                    await self.model.filter(id__in=removed_ids).delete()
+                for item in to_update:
+                    await self.model.filter(id=item.pop("id")).update(**item)
+                if to_create:
+                    await self.model.bulk_create(to_create)
+        except IntegrityError as e:
+            error_message: str = f"同步数据源场景明细异常, 数据源(id={data_source.id}), 违反约束规则: {e}"
+            LOGGER.error(f"{error_message}\n{traceback.format_exc()}")
+            raise DataBaseStorageException(message=error_message) from e
+        # 只失效发生变化的场景，未变化场景的缓存继续有效
+        cache_key: str = make_cache_key(data_source.case_id, data_source.step_code)
+        await KRUN_CACHE.delete(CacheNamespace.DATASET_SCENARIO, *[f"{cache_key}:{name}" for name in changed_names])
+        LOGGER.info(
+            f"同步数据源场景明细完成, 数据源(id={data_source.id}), "
+            f"新增: {len(to_create)}, 更新: {len(to_update)}, 删除: {len(removed_ids)}"
+        )
+
+    async def get_scenario(self, case_id: int, step_code: str, dataset_name: str) -> Optional[Dict[str, Any]]:
+        """
+        按用例、步骤、场景名称读取单个场景数据，优先读缓存（键为数据源 cache_key + 场景名称），未命中时只加载该场景所在的一行。
+        历史数据源尚无场景明细时，从 dataset 字段回填一次后再返回。
+
+        :param case_id: 用例主键。
+        :param step_code: 步骤标识代码。
+        :param dataset_name: 场景/数据集名称。
+        :returns: 场景字典；无数据时返回 None。
+        """
+        step_code = (step_code or "").strip()
+        dataset_name = (dataset_name or "").strip()
+        if not dataset_name:
+            return None
+
+        async def _load_scenario() -> Optional[Dict[str, Any]]:
+            return await self._load_scenario(case_id=case_id, step_code=step_code, dataset_name=dataset_name)
+
+        return await KRUN_CACHE.get_or_load(
+            CacheNamespace.DATASET_SCENARIO,
+            f"{make_cache_key(case_id, step_code)}:{dataset_name}",
+            _load_scenario,
+            ttl=PROJECT_CONFIG.DATASET_SCENARIO_CACHE_TTL,
+        )
+
+    async def _load_scenario(self, case_id: int, step_code: str, dataset_name: str) -> Optional[Dict[str, Any]]:
+        data_source_id: Optional[int] = await AutoTestApiDataSourceInfo.filter(
+            case_id=case_id, step_code=step_code, state__not=1
+        ).first().values_list("id", flat=True)
+        if not data_source_id:
+            return None
+
+        rows: List[Any] = await self.model.filter(
+            data_source_id=data_source_id, dataset_name=dataset_name
+        ).limit(1).values_list("dataset_data", flat=True)
+        if rows:
+            return rows[0]
+        if await self.model.filter(data_source_id=data_source_id).exists():
+            return None
+
+        data_source: Optional[AutoTestApiDataSourceInfo] = await AutoTestApiDataSourceInfo.get_or_none(id=data_source_id)
+        if not data_source or not isinstance(data_source.dataset, dict) or not data_source.dataset:
+            return None
+        await self.sync_datasets(data_source, data_source.dataset)
+        return data_source.dataset.get(dataset_name)
+
+
+AUTOTEST_DATASET_CRUD = AutoTestDatasetCrud()
+
+
 class AutoTestDataSourceCrud(ScaffoldCrud[AutoTestApiDataSourceInfo, AutoTestDataSourceCreate, AutoTestDataSourceUpdate]):
 
     def __init__(self):
         super().__init__(model=AutoTestApiDataSourceInfo)
 
+    async def create(self, obj_in: Union[AutoTestDataSourceCreate, Dict[str, Any]]) -> AutoTestApiDataSourceInfo:
+        instance = await super().create(obj_in)
+        await AUTOTEST_DATASET_CRUD.sync_datasets(instance, instance.dataset)
+        return instance
+
+    async def update(self, id: int, obj_in: Union[AutoTestDataSourceUpdate, Dict[str, Any]]) -> AutoTestApiDataSourceInfo:
+        instance = await super().update(id=id, obj_in=obj_in)
+        fields_set = obj_in.keys() if isinstance(obj_in, dict) else obj_in.model_fields_set
+        if "dataset" in fields_set:
+            await AUTOTEST_DATASET_CRUD.sync_datasets(instance, instance.dataset)
+        return instance
+
     async def get_by_id(self, data_source_id: int, on_error: bool = False) -> Optional[AutoTestApiDataSourceInfo]:
         """
         根据数据源主键 ID 查询单条记录（排除已软删 state=1）。
@@ -341,6 +489,7 @@ class AutoTestDataSourceCrud(ScaffoldCrud[AutoTestApiDataSourceInfo, AutoTestDat
 
         instance.state = 1
         await instance.save()
+        await invalidate_dataset_scenario_cache()
         return instance
 
     async def select_data_sources(self, search: Q, page: int, page_size: int, order: list) -> tuple:
@@ -383,16 +532,11 @@ class AutoTestDataSourceCrud(ScaffoldCrud[AutoTestApiDataSourceInfo, AutoTestDat
         :param dataset_name: 场景/数据集名称。
         :returns: 形如 {"head", "body", "assert_head", "assert_body"} 的场景字典（亦可能含旧字段 assert）；无数据时返回 None。
         """
-        if not (dataset_name or "").strip():
-            return None
-        record = await self.get_by_case_step(
+        return await AUTOTEST_DATASET_CRUD.get_scenario(
             case_id=case_id,
-            step_code=(step_code or "").strip(),
-            on_error=False,
+            step_code=step_code,
+            dataset_name=dataset_name,
         )
-        if not record or not isinstance(record.dataset, dict):
-            return None
-        return record.dataset.get((dataset_name or "").strip())
 
     async def create_data_sources_from_parsed(
             self,
@@ -9,17 +9,17 @@
 输出格式：{ "step_code"(sheet名): { "场景1": { "head": {...}, "body": {...}, "assert": {...} }, ... }, ... }
 xlsx 约定：无表头(header=None)；第 0 行第 2 列起为场景名；第 1 列为行标签（head/body/assert 及字段名）；Head/Body 行值为 KV 文本可解析。
 """
-import asyncio
+from __future__ import annotations
+
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Tuple, Union
-
-import pandas as pd
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union
 
-from backend.configure import LOGGER
+from backend.common import sync_to_process
+from backend.configure import LOGGER, PROJECT_CONFIG
 
-_executor = ThreadPoolExecutor(max_workers=4)
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def parse_kv_string(text: str) -> Dict[str, str]:
@@ -44,6 +44,7 @@ def parse_kv_string(text: str) -> Dict[str, str]:
 
 def _parse_sheet_fast(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
     """单 sheet 解析：首行第 2 列起为场景名，首列为 head/body/assert 及字段，返回 { 场景名: { head, body, assert } }。"""
+    import pandas as pd
     values = df.values
     if values.size == 0:
         return {}
@@ -109,12 +110,8 @@ def _parse_sheet_fast(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
     return result
 
 
-async def _parse_sheet_async(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(_executor, _parse_sheet_fast, df)
-
-
 def _cell_is_blank(value: Any) -> bool:
+    import pandas as pd
     if value is None:
         return True
     try:
@@ -129,6 +126,7 @@ def _cell_is_blank(value: Any) -> bool:
 
 def _dataframe_to_matrix(df: pd.DataFrame) -> Union[List[Any], object]:
     """将 DataFrame 转为二维矩阵（NaN/NaT 置为 None），剔除子项全为空白(None/NaN/空串)的行。"""
+    import pandas as pd
     if df is None or df.empty:
         return []
     safe_df = df.where(pd.notna(df), None)
@@ -136,17 +134,41 @@ def _dataframe_to_matrix(df: pd.DataFrame) -> Union[List[Any], object]:
     return [row for row in rows if not all(_cell_is_blank(c) for c in row)]
 
 
-async def _excel_to_json_async(file_path: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
-    """读 xlsx 全部 sheet(header=None)，异步解析每个 sheet，返回 { sheet_name: { 场景名: { head, body, assert } } }。"""
+# ---------------------------------------------------------------------------
+# 以下同步函数在进程池子进程中执行（读取 + 解析整本工作簿），只向父进程回传解析后的纯 Python 结构，
+# 避免在事件循环中执行 pd.read_excel 与逐单元格解析。
+# ---------------------------------------------------------------------------
+def read_xlsx_first_sheet(file_path: str) -> Tuple[Dict[str, Dict[str, Any]], List[str], List[List[Any]]]:
+    """读取并解析 xlsx 第一个 sheet，返回 (step_data, dataset_names, 规范化 matrix)。"""
+    import pandas as pd
+    df = pd.read_excel(file_path, sheet_name=0, header=None, engine="openpyxl")
+    if df.empty:
+        return {}, [], []
+    step_data = _parse_sheet_fast(df)
+    dataset_names = sorted(step_data.keys()) if step_data else []
+    return step_data, dataset_names, _dataframe_to_matrix(df)
+
+
+def read_xlsx_all_sheets(file_path: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """读取 xlsx 全部 sheet(header=None) 并逐个解析，返回 { sheet_name: { 场景名: { head, body, assert } } }。"""
+    import pandas as pd
     sheets = pd.read_excel(file_path, sheet_name=None, header=None, engine="openpyxl")
-    tasks = [
-        _parse_sheet_async(df)
-        for df in sheets.values()
+    return {
+        sheet_name: _parse_sheet_fast(df)
+        for sheet_name, df in sheets.items()
         if not df.empty
-    ]
-    results = await asyncio.gather(*tasks)
-    sheet_names = [k for k, v in sheets.items() if not v.empty]
-    return dict(zip(sheet_names, results))
+    }
+
+
+def parse_dataframe_matrix(matrix: List[List[Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[str], List[List[Any]]]:
+    """解析二维矩阵，返回 (step_data, dataset_names, 规范化 matrix)。"""
+    import pandas as pd
+    df = pd.DataFrame(matrix)
+    if df.empty:
+        return {}, [], []
+    step_data = _parse_sheet_fast(df)
+    dataset_names = sorted(step_data.keys()) if step_data else []
+    return step_data, dataset_names, _dataframe_to_matrix(df)
 
 
 async def parse_dataframe_matrix_async(matrix: List[List[Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[str], List[List[Any]]]:
@@ -159,18 +181,12 @@ async def parse_dataframe_matrix_async(matrix: List[List[Any]]) -> Tuple[Dict[st
         raise ValueError("dataframe 须为二维列表")
     if not matrix:
         return {}, [], []
-    df = pd.DataFrame(matrix)
-    if df.empty:
-        return {}, [], []
-    step_data = await _parse_sheet_async(df)
-    dataset_names = sorted(step_data.keys()) if step_data else []
-    norm_matrix = _dataframe_to_matrix(df)
-    return step_data, dataset_names, norm_matrix
+    return await sync_to_process(parse_dataframe_matrix, matrix, max_workers=PROJECT_CONFIG.PROCESS_POOL_MAX_WORKERS)
 
 
 async def parse_xlsx_first_sheet_async(file_path: str) -> Tuple[Dict[str, Dict[str, Any]], List[str], List[List[Any]]]:
     """
-    仅解析 xlsx 的第一个 sheet 页（单步骤数据集上传用）。
+    仅解析 xlsx 的第一个 sheet 页（单步骤数据集上传用），读取与解析在进程池中执行。
 
     :param file_path: xlsx 文件路径。
     :return: (step_data, dataset_names, dataframe)。step_data 为单 sheet 解析结果：
@@ -182,20 +198,16 @@ async def parse_xlsx_first_sheet_async(file_path: str) -> Tuple[Dict[str, Dict[s
     """
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"文件不存在: {file_path}")
-    # 只读第一个 sheet
-    df = pd.read_excel(file_path, sheet_name=0, header=None, engine="openpyxl")
-    if df.empty:
-        return {}, [], []
-    step_data = await _parse_sheet_async(df)
-    dataset_names = sorted(step_data.keys()) if step_data else []
-    dataframe = _dataframe_to_matrix(df)
+    step_data, dataset_names, dataframe = await sync_to_process(
+        read_xlsx_first_sheet, file_path, max_workers=PROJECT_CONFIG.PROCESS_POOL_MAX_WORKERS
+    )
     LOGGER.info(f"解析 xlsx 首 sheet 完成: {file_path}, dataset_names={dataset_names}")
     return step_data, dataset_names, dataframe
 
 
 async def parse_xlsx_to_parsed_data_async(file_path: str) -> Tuple[Dict[str, Any], List[str]]:
     """
-    解析 xlsx 全部 sheet 为约定结构并提取数据集名称列表（多步骤数据集上传用）。
+    解析 xlsx 全部 sheet 为约定结构并提取数据集名称列表（多步骤数据集上传用），读取与解析在进程池中执行。
 
     :param file_path: xlsx 文件路径。
     :return: (parsed_data, dataset_names)。parsed_data 结构：
@@ -207,7 +219,7 @@ async def parse_xlsx_to_parsed_data_async(file_path: str) -> Tuple[Dict[str, Any
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"文件不存在: {file_path}")
 
-    parsed_data = await _excel_to_json_async(file_path)
+    parsed_data = await sync_to_process(read_xlsx_all_sheets, file_path, max_workers=PROJECT_CONFIG.PROCESS_POOL_MAX_WORKERS)
     all_dataset_names: set = set()
     for sheet_data in parsed_data.values():
         all_dataset_names.update(sheet_data.keys())
@@ -6,17 +6,19 @@
 @Module  : autotest_detail_crud
 @DateTime: 2025/11/27 14:25
 """
+import asyncio
 import traceback
-from typing import Optional, Dict, Any, Union, List
+from typing import Optional, Dict, Any, Union, List, Iterable, Set
 
 from tortoise.exceptions import IntegrityError, FieldError
 from tortoise.expressions import Q
 from tortoise.queryset import QuerySet
 
-from backend.applications.aotutest.models.autotest_model import AutoTestApiDetailInfo
+from backend.applications.aotutest.models.autotest_model import AutoTestApiDetailInfo, AutoTestApiPayloadBlobInfo
 from backend.applications.aotutest.schemas.autotest_detail_schema import (
     AutoTestApiDetailCreate,
-    AutoTestApiDetailUpdate
+    AutoTestApiDetailUpdate,
+    VARIABLES_KEYFRAME_INTERVAL,
 )
 from backend.applications.aotutest.services.autotest_case_crud import AUTOTEST_API_CASE_CRUD
 from backend.applications.aotutest.services.autotest_report_crud import AUTOTEST_API_REPORT_CRUD
@@ -28,6 +30,12 @@ from backend.core.exceptions import (
     DataBaseStorageException,
     DataAlreadyExistsException,
 )
+from backend.services import PAYLOAD_STORE
+
+# 明细中可能很大的字段：超过阈值时压缩/卸载存储，读取单条明细时再还原
+PAYLOAD_JSON_FIELDS = ("response_body", "request_body", "step_exec_logger")
+PAYLOAD_TEXT_FIELDS = ("response_text", "request_text")
+PAYLOAD_FIELDS = PAYLOAD_JSON_FIELDS + PAYLOAD_TEXT_FIELDS
 
 
 class AutoTestApiDetailCrud(ScaffoldCrud[AutoTestApiDetailInfo, AutoTestApiDetailCreate, AutoTestApiDetailUpdate]):
@@ -145,6 +153,8 @@ class AutoTestApiDetailCrud(ScaffoldCrud[AutoTestApiDetailInfo, AutoTestApiDetai
             )
         try:
             report_dict = detail_in.model_dump(exclude_none=True, exclude_unset=True)
+            report_dict = await self.compress_payloads(report_dict)
+            await self.record_payload_blobs(detail_in.report_code, report_dict)
             instance = await self.create(report_dict)
             return instance
         except IntegrityError as e:
@@ -191,7 +201,8 @@ class AutoTestApiDetailCrud(ScaffoldCrud[AutoTestApiDetailInfo, AutoTestApiDetai
             LOGGER.error(error_message)
             raise ParameterException(message=error_message)
         if detail_id:
-            await self.get_by_id(detail_id=detail_id, on_error=True)
+            instance = await self.get_by_id(detail_id=detail_id, on_error=True)
+            report_code = instance.report_code
         else:
             instance = await self.get_by_conditions(
                 only_one=True,
@@ -205,6 +216,8 @@ class AutoTestApiDetailCrud(ScaffoldCrud[AutoTestApiDetailInfo, AutoTestApiDetai
                 exclude_unset=True,
                 exclude={"report_code", "step_code", "case_code", "case_id", "detail_id"}
             )
+            update_dict = await self.compress_payloads(update_dict)
+            await self.record_payload_blobs(report_code, update_dict)
             instance = await self.update(id=detail_id, obj_in=update_dict)
             return instance
         except IntegrityError as e:
@@ -253,18 +266,194 @@ class AutoTestApiDetailCrud(ScaffoldCrud[AutoTestApiDetailInfo, AutoTestApiDetai
         await instance.save()
         return instance
 
-    async def select_details(self, search: Q, page: int, page_size: int, order: list) -> tuple:
-        """分页查询明细列表。
+    @staticmethod
+    async def compress_payloads(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        入库前压缩明细大字段（响应体、请求体、执行日志），压缩与 blob 写盘放到线程中执行，避免阻塞事件循环。
+
+        :param data: 明细字段字典（model_dump 结果）。
+        :returns: 处理后的字段字典，超过阈值的字段替换为压缩信封。
+        """
+        if not PAYLOAD_STORE.enabled or not any(data.get(field_name) for field_name in PAYLOAD_FIELDS):
+            return data
+        return await asyncio.to_thread(
+            PAYLOAD_STORE.encode_fields, data, PAYLOAD_JSON_FIELDS, PAYLOAD_TEXT_FIELDS
+        )
+
+    @staticmethod
+    async def inflate_payloads(details: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        还原明细中被压缩/卸载的大字段（就地替换），未压缩的历史数据保持原样。
+
+        :param details: 明细序列化字典列表（to_dict 结果）。
+        :returns: 原列表（已就地还原）。
+        """
+        if not any(PAYLOAD_STORE.is_envelope(detail.get(field_name)) for detail in details for field_name in PAYLOAD_FIELDS):
+            return details
+
+        def _inflate() -> None:
+            for detail in details:
+                PAYLOAD_STORE.decode_fields(detail, PAYLOAD_FIELDS)
+
+        await asyncio.to_thread(_inflate)
+        return details
+
+    @staticmethod
+    def strip_payloads(details: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        将明细中压缩/卸载存储的大字段置为 None（就地替换），并在 payload_summary 中给出原始大小与摘要，
+        供列表查询跳过解压与 blob 读取，打开单条明细(/detail/get)时再按 id 查询还原。
+
+        :param details: 明细序列化字典列表（to_dict 结果）。
+        :returns: 原列表（已就地处理）。
+        """
+        for detail in details:
+            summary: Dict[str, Dict[str, Any]] = {}
+            for field_name in PAYLOAD_FIELDS:
+                envelope: Optional[Dict[str, Any]] = PAYLOAD_STORE.parse_envelope(detail.get(field_name))
+                if envelope is not None or PAYLOAD_STORE.is_envelope(detail.get(field_name)):
+                    detail[field_name] = None
+                    summary[field_name] = {"size": (envelope or {}).get("size"), "sha256": (envelope or {}).get("sha256")}
+            detail["payload_summary"] = summary or None
+        return details
+
+    @staticmethod
+    async def record_payload_blobs(report_code: str, data: Dict[str, Any]) -> None:
+        """
+        记录明细引用的大字段 blob（先于明细写入），物理删除报告后按引用表判断 blob 是否仍被使用。
+
+        :param report_code: 明细所属报告标识代码。
+        :param data: 已压缩的明细字段字典。
+        """
+        digests: Set[str] = PAYLOAD_STORE.blob_digests(data, PAYLOAD_FIELDS)
+        if not digests or not report_code:
+            return
+        await AutoTestApiPayloadBlobInfo.bulk_create(
+            [AutoTestApiPayloadBlobInfo(blob_digest=digest, report_code=report_code) for digest in digests],
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    async def purge_payload_blobs(digests: Iterable[str], modified_before: Optional[float] = None) -> int:
+        """
+        删除已无报告引用的大字段 blob 文件，供物理删除报告（及其引用记录）后回收磁盘。
+
+        blob 按内容寻址，可能被多个报告共用：整批摘要一次查询引用表，仍有任意报告引用时保留。
+
+        :param digests: 被删除明细引用过的 blob 摘要。
+        :param modified_before: 时间戳，清理开始后被重新写入引用的 blob 不删除。
+        :returns: 删除的 blob 数量。
+        """
+        digests = set(digests)
+        if not digests:
+            return 0
+        referenced: Set[str] = set(
+            await AutoTestApiPayloadBlobInfo.filter(blob_digest__in=digests).distinct().values_list("blob_digest", flat=True)
+        )
+        deleted: int = 0
+        for digest in digests - referenced:
+            if await asyncio.to_thread(PAYLOAD_STORE.delete_blob, digest, modified_before):
+                deleted += 1
+        return deleted
+
+    @staticmethod
+    def _replay_variables(state: Optional[Dict[str, Dict[str, Any]]], snapshot: Any) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        在上一条明细的变量状态上回放当前明细的变量快照。
+
+        :param state: 上一条明细还原后的变量状态(key -> 变量项)，链路缺失时为 None。
+        :param snapshot: 当前明细存储的变量快照：完整列表、增量字典 {base, upsert, remove} 或 None。
+        :returns: 当前明细还原后的变量状态。
+        """
+        if isinstance(snapshot, list):
+            return {str(item.get("key")): item for item in snapshot if isinstance(item, dict)}
+        if not isinstance(snapshot, dict):
+            return None if snapshot is None else state
+        replayed: Dict[str, Dict[str, Any]] = dict(state or {})
+        for key in snapshot.get("remove") or []:
+            replayed.pop(str(key), None)
+        for item in snapshot.get("upsert") or []:
+            if isinstance(item, dict):
+                replayed[str(item.get("key"))] = item
+        return replayed
+
+    async def reconstruct_variables(self, details: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        还原明细中按增量存储的 session_variables / defined_variables（就地替换为完整列表）。
+
+        明细按 variables_seq 在同一报告内组成增量链，每 VARIABLES_KEYFRAME_INTERVAL 条保存一次完整列表，
+        因此只需从所需序号向前取到最近的关键帧即可回放；历史数据(无 variables_seq)保持原样。
+
+        :param details: 明细序列化字典列表（to_dict 结果，需包含 report_code、variables_seq）。
+        :returns: 原列表（已就地还原）。
+        """
+        required_seqs: Dict[str, List[int]] = {}
+        for detail in details:
+            if isinstance(detail.get("session_variables"), dict) or isinstance(detail.get("defined_variables"), dict):
+                if detail.get("report_code") and detail.get("variables_seq") is not None:
+                    required_seqs.setdefault(detail["report_code"], []).append(int(detail["variables_seq"]))
+
+        restored: Dict[str, Dict[int, Dict[str, Optional[List[Dict[str, Any]]]]]] = {}
+        for report_code, seqs in required_seqs.items():
+            start_seq: int = min(seqs) // VARIABLES_KEYFRAME_INTERVAL * VARIABLES_KEYFRAME_INTERVAL
+            chain_rows: List[Dict[str, Any]] = await self.model.filter(
+                report_code=report_code,
+                variables_seq__gte=start_seq,
+                variables_seq__lte=max(seqs),
+            ).order_by("variables_seq").values("variables_seq", "session_variables", "defined_variables")
+            session_state: Optional[Dict[str, Dict[str, Any]]] = None
+            defined_state: Optional[Dict[str, Dict[str, Any]]] = None
+            report_restored: Dict[int, Dict[str, Optional[List[Dict[str, Any]]]]] = {}
+            for row in chain_rows:
+                session_state = self._replay_variables(session_state, row["session_variables"])
+                defined_state = self._replay_variables(defined_state, row["defined_variables"])
+                report_restored[row["variables_seq"]] = {
+                    "session_variables": list(session_state.values()) if session_state is not None else None,
+                    "defined_variables": list(defined_state.values()) if defined_state is not None else None,
+                }
+            restored[report_code] = report_restored
+
+        for detail in details:
+            report_restored = restored.get(detail.get("report_code"))
+            if not report_restored:
+                continue
+            snapshot = report_restored.get(detail.get("variables_seq"))
+            if not snapshot:
+                continue
+            for field_name in ("session_variables", "defined_variables"):
+                if isinstance(detail.get(field_name), dict):
+                    detail[field_name] = snapshot[field_name]
+        return details
+
+    async def select_details(
+            self,
+            search: Q,
+            page: int,
+            page_size: int,
+            order: list,
+            cursor_mode: bool = False,
+            cursor: Optional[str] = None,
+            with_total: bool = False,
+    ) -> tuple:
+        """分页查询明细列表，支持偏移分页与游标分页。
 
         :param search: Tortoise Q 查询条件。
-        :param page: 页码。
+        :param page: 页码（游标分页时忽略）。
         :param page_size: 每页条数。
         :param order: 排序字段列表。
-        :returns: 由 (总条数, 当前页记录列表) 组成的元组。
-        :raises ParameterException: 查询条件非法导致 FieldError 时。
+        :param cursor_mode: 是否使用游标分页。
+        :param cursor: 游标分页的游标，为空表示第一页。
+        :param with_total: 游标分页时是否统计总数。
+        :returns: 由 (总条数, 当前页记录列表, 下一页游标) 组成的元组；偏移分页时下一页游标为 None，游标分页未统计时总条数为 None。
+        :raises ParameterException: 查询条件非法导致 FieldError 或游标非法时。
         """
         try:
-            return await self.list(page=page, page_size=page_size, search=search, order=order)
+            if cursor_mode or cursor:
+                return await self.list_by_cursor(
+                    page_size=page_size, search=search, order=order, cursor=cursor, with_count=with_total
+                )
+            total, instances = await self.list(page=page, page_size=page_size, search=search, order=order)
+            return total, instances, None
         except FieldError as e:
             error_message: str = f"查询明细信息异常, 错误描述: {e}"
             LOGGER.error(f"{error_message}\n{traceback.format_exc()}")
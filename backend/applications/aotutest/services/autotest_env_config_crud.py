@@ -6,6 +6,8 @@
 @Module  : autotest_config_crud
 @DateTime: 2026/4/16 10:51
 """
+import hashlib
+import hmac
 import traceback
 from typing import Optional, Dict, Any, List, Union, Tuple
 
@@ -13,7 +15,7 @@ from tortoise.exceptions import IntegrityError, FieldError, DoesNotExist
 from tortoise.expressions import Q
 from tortoise.queryset import QuerySet
 
-from backend.applications.aotutest.models.autotest_model import AutoTestApiEnvConfigInfo
+from backend.applications.aotutest.models.autotest_model import AutoTestApiEnvConfigInfo, AutoTestApiEnvEnumInfo
 from backend.applications.aotutest.schemas.autotest_env_config_schema import (
     AutoTestApiConfigCreate,
     AutoTestApiConfigUpdate,
@@ -22,7 +24,7 @@ from backend.applications.aotutest.schemas.autotest_env_config_schema import (
 from backend.applications.aotutest.services.autotest_env_crud import AUTOTEST_API_ENV_ENUM_CRUD
 from backend.applications.aotutest.services.autotest_project_crud import AUTOTEST_API_PROJECT_CRUD
 from backend.applications.base.services.scaffold import ScaffoldCrud
-from backend.configure import LOGGER
+from backend.configure import LOGGER, PROJECT_CONFIG
 from backend.core.exceptions import (
     NotFoundException,
     ParameterException,
@@ -30,6 +32,7 @@ from backend.core.exceptions import (
     DataAlreadyExistsException,
 )
 from backend.enums import AutoTestConfigNodeType
+from backend.services import KRUN_CACHE, CacheNamespace, invalidate_env_config_cache
 
 
 class AutoTestApiEnvConfigCrud(ScaffoldCrud[AutoTestApiEnvConfigInfo, AutoTestApiConfigCreate, AutoTestApiConfigUpdate]):
@@ -38,6 +41,18 @@ class AutoTestApiEnvConfigCrud(ScaffoldCrud[AutoTestApiEnvConfigInfo, AutoTestAp
         super().__init__(model=AutoTestApiEnvConfigInfo)
         self.required_fields = ["config_host", "config_port", "config_username", "config_password"]
 
+    async def create(self, obj_in: Union[AutoTestApiConfigCreate, Dict]) -> AutoTestApiEnvConfigInfo:
+        """新增配置并失效环境配置缓存。"""
+        instance = await super().create(obj_in)
+        await invalidate_env_config_cache()
+        return instance
+
+    async def update(self, id: int, obj_in: Union[AutoTestApiConfigUpdate, Dict[str, Any]]) -> AutoTestApiEnvConfigInfo:
+        """更新配置并失效环境配置缓存。"""
+        instance = await super().update(id=id, obj_in=obj_in)
+        await invalidate_env_config_cache()
+        return instance
+
     async def get_by_id(self, config_id: int, on_error: bool = False, is_active: bool = True) -> Optional[AutoTestApiEnvConfigInfo]:
         """
         根据配置主键 ID 查询
@@ -277,6 +292,7 @@ class AutoTestApiEnvConfigCrud(ScaffoldCrud[AutoTestApiEnvConfigInfo, AutoTestAp
 
         instance.state = 1
         await instance.save()
+        await invalidate_env_config_cache()
         return instance
 
     async def delete_configs(self, config_in: AutoTestApiConfigDelete) -> int:
@@ -293,6 +309,8 @@ class AutoTestApiEnvConfigCrud(ScaffoldCrud[AutoTestApiEnvConfigInfo, AutoTestAp
             count = await self.model.filter(config_code__in=config_codes).update(state=1)
         else:
             count = 0
+        if count:
+            await invalidate_env_config_cache()
         return count
 
     async def select_config(self, search: Q, page: int, page_size: int, order: list) -> tuple:
@@ -312,6 +330,150 @@ class AutoTestApiEnvConfigCrud(ScaffoldCrud[AutoTestApiEnvConfigInfo, AutoTestAp
             LOGGER.error(f"{error_message}\n{traceback.format_exc()}")
             raise ParameterException(message=error_message) from e
 
+    async def get_env_id_by_name(self, env_name: str) -> Optional[int]:
+        """
+        根据环境名称（忽略大小写）查询环境ID（带缓存），环境枚举变更时失效。
+
+        :param env_name: 环境名称。
+        :returns: 环境ID或 None。
+        """
+        env_name_clean: str = (env_name or "").strip()
+        if not env_name_clean:
+            return None
+
+        async def _load_env_id() -> Optional[int]:
+            env_id = await AutoTestApiEnvEnumInfo.filter(
+                env_name__iexact=env_name_clean,
+                state__not=1
+            ).first().values_list("id", flat=True)
+            return env_id
+
+        return await KRUN_CACHE.get_or_load(CacheNamespace.ENV_CONFIG, f"env_name:{env_name_clean.lower()}", _load_env_id)
+
+    async def get_env_config_map(self, project_id: int, env_id: int) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        查询(应用, 环境)下全部未删除配置并按类型分组（带缓存），供执行引擎、调试接口、数据库连接池解析执行配置，
+        结构：config_type(api|database|file) -> config_name(小写) -> 配置字段字典；环境配置变更时失效。
+        缓存中不保存密码明文，只保存密码指纹(config_password_fingerprint)用于判断配置是否变更，密码在建立连接时按 id 查询。
+
+        :param project_id: 应用ID。
+        :param env_id: 环境ID。
+        :returns: 分组后的配置字典。
+        """
+
+        async def _load_env_config_map() -> Dict[str, Dict[str, Dict[str, Any]]]:
+            config_map: Dict[str, Dict[str, Dict[str, Any]]] = {
+                config_type: {} for config_type in AutoTestConfigNodeType.get_values()
+            }
+            config_rows: List[Dict[str, Any]] = await self.model.filter(
+                project_id=project_id,
+                env_id=env_id,
+                state__not=1,
+            ).order_by("id").values(
+                "id", "config_name", "config_type", "config_host", "config_port",
+                "database_name", "database_type", "config_username", "config_password",
+                "config_group", "config_params", "config_kwargs", "config_header", "is_authorization",
+            )
+            for row in config_rows:
+                row["config_password_fingerprint"] = self.password_fingerprint(row.pop("config_password", None))
+                config_type = row["config_type"]
+                config_type = config_type.value if hasattr(config_type, "value") else str(config_type)
+                database_type = row["database_type"]
+                row["config_type"] = config_type
+                row["database_type"] = database_type.value if hasattr(database_type, "value") else database_type
+                config_map.setdefault(config_type, {}).setdefault(str(row["config_name"]).strip().lower(), row)
+            return config_map
+
+        return await KRUN_CACHE.get_or_load(CacheNamespace.ENV_CONFIG, f"{project_id}:{env_id}", _load_env_config_map)
+
+    @staticmethod
+    def password_fingerprint(password: Optional[str]) -> Optional[str]:
+        """
+        计算密码指纹（以鉴权密钥做 HMAC-SHA256），用于缓存中比对密码是否变更，无法还原出密码明文。
+
+        :param password: 密码明文。
+        :returns: 十六进制指纹；密码为空时返回 None。
+        """
+        if not password:
+            return None
+        return hmac.new(
+            str(PROJECT_CONFIG.AUTH_SECRET_KEY).encode("utf-8"), str(password).encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+
+    async def resolve_config(
+            self,
+            project_id: int,
+            config_type: str,
+            config_name: str,
+            env_id: Optional[int] = None,
+            env_name: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        按(应用, 环境, 配置类型, 配置名称)解析单条配置（走缓存），环境可传 env_id 或 env_name。
+
+        :param project_id: 应用ID。
+        :param config_type: 配置类型(api|database|file)。
+        :param config_name: 配置名称（忽略大小写）。
+        :param env_id: 环境ID，与 env_name 二选一。
+        :param env_name: 环境名称（忽略大小写），与 env_id 二选一。
+        :returns: 配置字段字典或 None。
+        """
+        if not env_id:
+            env_id = await self.get_env_id_by_name(env_name=env_name)
+        if not project_id or not env_id or not config_name:
+            return None
+        config_type = config_type.value if hasattr(config_type, "value") else str(config_type)
+        config_map = await self.get_env_config_map(project_id=int(project_id), env_id=int(env_id))
+        return config_map.get(config_type, {}).get(str(config_name).strip().lower())
+
+    async def resolve_db_config(
+            self,
+            app_id: Any,
+            env: str,
+            config_name: str,
+            db_name: str,
+            with_password: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        解析数据库连接参数（走缓存），返回结构与 DBConnPoolFromConfig 建池所需一致，作为连接池的配置解析器。
+        默认只返回密码指纹供连接池比对配置，建池时传 with_password=True 按配置 id 从库中读取密码。
+
+        :param app_id: 应用ID。
+        :param env: 环境名称（忽略大小写）。
+        :param config_name: 配置名称（忽略大小写）。
+        :param db_name: 数据库名称（忽略大小写）。
+        :param with_password: 是否查询密码明文。
+        :returns: {host, port, username, password_fingerprint, database_name, db_type[, password]} 或 None。
+        """
+        try:
+            project_id = int(str(app_id).strip())
+        except (TypeError, ValueError):
+            return None
+        config = await self.resolve_config(
+            project_id=project_id,
+            config_type=AutoTestConfigNodeType.DB.value,
+            config_name=config_name,
+            env_name=env,
+        )
+        if not config or str(config.get("database_name") or "").strip().lower() != str(db_name or "").strip().lower():
+            return None
+        try:
+            port = int(str(config.get("config_port") or "3306").strip())
+        except (TypeError, ValueError):
+            port = 3306
+        db_config: Dict[str, Any] = {
+            "host": config.get("config_host"),
+            "port": port,
+            "username": config.get("config_username"),
+            "password_fingerprint": config.get("config_password_fingerprint"),
+            "database_name": config.get("database_name"),
+            "db_type": str(config.get("database_type") or "mysql").lower(),
+        }
+        if with_password:
+            password: Optional[str] = await self.model.filter(id=config["id"]).first().values_list("config_password", flat=True)
+            db_config["password"] = password or ""
+        return db_config
+
     async def query_classified_by_project_ids(self, project_ids: List[int]) -> Dict[int, Dict[int, Dict[str, Dict[str, Dict[str, str]]]]]:
         """
         按应用 ID 列表查询未删除的环境配置，嵌套为：
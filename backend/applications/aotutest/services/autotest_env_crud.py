@@ -27,6 +27,7 @@ from backend.core.exceptions import (
     DataBaseStorageException,
 )
 from backend.enums import AutoTestConfigNodeType
+from backend.services import invalidate_env_config_cache
 
 
 async def resolve_env_api_base_host_port(project_id: int, env_name: str) -> Tuple[str, Optional[str]]:
@@ -74,6 +75,18 @@ class AutoTestApiEnvEnumCrud(ScaffoldCrud[AutoTestApiEnvEnumInfo, AutoTestApiEnv
         """初始化 CRUD，绑定模型 AutoTestApiEnvEnumInfo。"""
         super().__init__(model=AutoTestApiEnvEnumInfo)
 
+    async def create(self, obj_in: Union[AutoTestApiEnvCreate, Dict]) -> AutoTestApiEnvEnumInfo:
+        """新增环境并失效环境配置缓存。"""
+        instance = await super().create(obj_in)
+        await invalidate_env_config_cache()
+        return instance
+
+    async def update(self, id: int, obj_in: Union[AutoTestApiEnvUpdate, Dict[str, Any]]) -> AutoTestApiEnvEnumInfo:
+        """更新环境并失效环境配置缓存（环境名称参与执行配置解析）。"""
+        instance = await super().update(id=id, obj_in=obj_in)
+        await invalidate_env_config_cache()
+        return instance
+
     async def get_by_id(self, env_id: int, on_error: bool = False) -> Optional[AutoTestApiEnvEnumInfo]:
         """
         根据环境枚举主键查询
@@ -253,6 +266,7 @@ class AutoTestApiEnvEnumCrud(ScaffoldCrud[AutoTestApiEnvEnumInfo, AutoTestApiEnv
 
         instance.state = 1
         await instance.save()
+        await invalidate_env_config_cache()
         return instance
 
     async def delete_envs(self, env_in: AutoTestApiEnvDelete) -> int:
@@ -269,6 +283,8 @@ class AutoTestApiEnvEnumCrud(ScaffoldCrud[AutoTestApiEnvEnumInfo, AutoTestApiEnv
             count = await self.model.filter(env_code__in=env_codes).update(state=1)
         else:
             count = 0
+        if count:
+            await invalidate_env_config_cache()
         return count
 
     async def select_envs(self, search: Q, page: int, page_size: int, order: list) -> tuple:
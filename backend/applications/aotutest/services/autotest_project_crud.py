@@ -29,6 +29,7 @@ from backend.core.exceptions import (
     DataBaseStorageException,
     DataAlreadyExistsException,
 )
+from backend.services import KRUN_CACHE, CacheNamespace
 
 
 class AutoTestApiProjectCrud(ScaffoldCrud[AutoTestApiProjectInfo, AutoTestApiProjectCreate, AutoTestApiProjectUpdate]):
@@ -138,6 +139,26 @@ class AutoTestApiProjectCrud(ScaffoldCrud[AutoTestApiProjectInfo, AutoTestApiPro
             raise NotFoundException(message=error_message)
         return instances
 
+    async def get_id_by_name(self, project_name: str) -> Optional[int]:
+        """
+        根据项目名称查询项目ID（带缓存），供执行引擎等高频路径使用，项目增删改时失效。
+
+        :param project_name: 项目名称。
+        :returns: 项目ID或 None。
+        :raises ParameterException: 当 project_name 为空时。
+        """
+
+        async def _load_project_id() -> Optional[int]:
+            instance = await self.get_by_name(project_name=project_name, on_error=False)
+            return instance.id if instance else None
+
+        return await KRUN_CACHE.get_or_load(CacheNamespace.PROJECT, project_name, _load_project_id)
+
+    @staticmethod
+    async def invalidate_cache() -> None:
+        """项目信息变更后失效项目缓存。"""
+        await KRUN_CACHE.invalidate_namespace(CacheNamespace.PROJECT)
+
     async def create_project(self, project_in: AutoTestApiProjectCreate) -> AutoTestApiProjectInfo:
         """创建项目，校验项目名称全局唯一。
 
@@ -162,6 +183,7 @@ class AutoTestApiProjectCrud(ScaffoldCrud[AutoTestApiProjectInfo, AutoTestApiPro
         if not existing_project:
             try:
                 instance: AutoTestApiProjectInfo = await self.create(obj_in=project_dict)
+                await self.invalidate_cache()
                 return instance
             except IntegrityError as e:
                 error_message: str = f"新增应用信息异常, 违反约束规则: {e}"
@@ -171,6 +193,7 @@ class AutoTestApiProjectCrud(ScaffoldCrud[AutoTestApiProjectInfo, AutoTestApiPro
         try:
             project_dict["state"] = 0
             instance: AutoTestApiProjectInfo = await self.update(id=existing_project.id, obj_in=project_dict)
+            await self.invalidate_cache()
             return instance
         except (DoesNotExist, IntegrityError) as e:
             error_message: str = f"新增(更新)应用信息异常, 违反约束规则或空指针异常: {e}"
@@ -215,6 +238,7 @@ class AutoTestApiProjectCrud(ScaffoldCrud[AutoTestApiProjectInfo, AutoTestApiPro
 
         try:
             instance = await self.update(id=project_id, obj_in=update_dict)
+            await self.invalidate_cache()
             return instance
         except IntegrityError as e:
             error_message: str = f"更新应用信息异常, 违反约束规则: {e}"
@@ -269,6 +293,7 @@ class AutoTestApiProjectCrud(ScaffoldCrud[AutoTestApiProjectInfo, AutoTestApiPro
 
         instance.state = 1
         await instance.save()
+        await self.invalidate_cache()
         return instance
 
     async def delete_projects(self, project_in: AutoTestApiProjectDelete) -> int:
@@ -285,6 +310,8 @@ class AutoTestApiProjectCrud(ScaffoldCrud[AutoTestApiProjectInfo, AutoTestApiPro
             count = await self.model.filter(project_code__in=project_codes).update(state=1)
         else:
             count = 0
+        if count:
+            await self.invalidate_cache()
         return count
 
     async def select_projects(self, search: Q, page: int, page_size: int, order: list) -> tuple:
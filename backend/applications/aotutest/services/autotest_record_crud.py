@@ -8,7 +8,7 @@
 """
 import traceback
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from pydantic import BaseModel
 from tortoise.exceptions import FieldError
@@ -85,8 +85,8 @@ class AutoTestApiTaskRecordCrud(
         """分页按条件查询任务执行记录，支持 celery_id、task_id、时间范围等筛选。
 
         :param record_in: 查询条件 schema（AutoTestApiRecordSelect），含分页与排序。
-        :returns: (总条数, 当前页记录列表) 元组。
-        :raises ParameterException: 查询条件非法导致 FieldError 时。
+        :returns: (总条数, 当前页记录列表, 下一页游标) 元组；偏移分页时下一页游标为 None。
+        :raises ParameterException: 查询条件非法导致 FieldError 或游标非法时。
         """
         try:
             q = Q()
@@ -127,13 +127,23 @@ class AutoTestApiTaskRecordCrud(
                 except ValueError:
                     pass
 
+            order: List[str] = record_in.order or ["-celery_start_time", "-id"]
+            if record_in.cursor_mode or record_in.cursor:
+                total, instances, next_cursor = await self.list_by_cursor(
+                    page_size=record_in.page_size,
+                    search=q,
+                    order=order,
+                    cursor=record_in.cursor,
+                    with_count=record_in.with_total,
+                )
+                return total, list(instances), next_cursor
             total, instances = await self.list(
                 page=record_in.page,
                 page_size=record_in.page_size,
                 search=q,
-                order=record_in.order or ["-celery_start_time", "-id"],
+                order=order,
             )
-            return total, list(instances)
+            return total, list(instances), None
         except FieldError as e:
             error_message: str = f"查询任务执行记录异常, 错误描述: {e}"
             LOGGER.error(f"{error_message}\n{traceback.format_exc()}")
@@ -7,7 +7,8 @@
 @DateTime: 2025/11/27 09:34
 """
 import traceback
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, List
 
 from tortoise.exceptions import IntegrityError, FieldError
 from tortoise.expressions import Q
@@ -19,6 +20,7 @@ from backend.applications.aotutest.schemas.autotest_report_schema import (
     AutoTestApiReportCreate,
     AutoTestApiReportUpdate
 )
+from backend.applications.aotutest.services.autotest_analytics_crud import AUTOTEST_API_ANALYTICS_CRUD
 from backend.applications.aotutest.services.autotest_case_crud import AUTOTEST_API_CASE_CRUD
 from backend.applications.base.services.scaffold import ScaffoldCrud
 from backend.configure import LOGGER
@@ -28,6 +30,9 @@ from backend.core.exceptions import (
     DataBaseStorageException,
 )
 
+# 用例执行时间字符串可能出现的格式（引擎写入带微秒，历史/手工数据可能不带）
+CASE_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
 
 class AutoTestApiReportCrud(ScaffoldCrud[AutoTestApiReportInfo, AutoTestApiReportCreate, AutoTestApiReportUpdate]):
     """自动化测试报告的 CRUD 服务，负责报告的增删改查；删除报告会同步软删除关联明细。"""
@@ -114,10 +119,11 @@ class AutoTestApiReportCrud(ScaffoldCrud[AutoTestApiReportInfo, AutoTestApiRepor
             raise NotFoundException(message=error_message)
         return instances
 
-    async def create_report(self, report_in: AutoTestApiReportCreate) -> AutoTestApiReportInfo:
+    async def create_report(self, report_in: AutoTestApiReportCreate, *, accumulate: bool = True) -> AutoTestApiReportInfo:
         """创建报告，校验用例存在性。
 
         :param report_in: 报告创建 schema。
+        :param accumulate: 是否立即累加到日汇总；在外层事务中创建时传 False，由调用方提交事务后再累加，避免汇总行锁跨事务持有。
         :returns: 创建后的报告实例。
         :raises NotFoundException: 用例不存在时。
         :raises DataBaseStorageException: 违反数据库约束时。
@@ -126,7 +132,7 @@ class AutoTestApiReportCrud(ScaffoldCrud[AutoTestApiReportInfo, AutoTestApiRepor
         case_code: str = report_in.case_code
 
         # 业务层验证：检查用例是否存在
-        await AUTOTEST_API_CASE_CRUD.get_by_conditions(
+        case_instance = await AUTOTEST_API_CASE_CRUD.get_by_conditions(
             only_one=True,
             on_error=True,
             conditions={"id": case_id, "case_code": case_code}
@@ -134,12 +140,17 @@ class AutoTestApiReportCrud(ScaffoldCrud[AutoTestApiReportInfo, AutoTestApiRepor
 
         try:
             report_dict = report_in.dict(exclude_none=True, exclude_unset=True)
+            report_dict["project_id"] = case_instance.case_project
+            self.fill_time_columns(report_dict)
             instance = await self.create(report_dict)
-            return instance
         except IntegrityError as e:
             error_message: str = f"新增报告信息异常, 违反约束规则: {e}"
             LOGGER.error(f"{error_message}\n{traceback.format_exc()}")
             raise DataBaseStorageException(message=error_message) from e
+        # 报告落库即为执行完成，增量累加到日汇总（趋势/排行接口读取汇总表）
+        if accumulate:
+            await AUTOTEST_API_ANALYTICS_CRUD.accumulate_report(instance)
+        return instance
 
     async def update_report(self, report_in: AutoTestApiReportUpdate) -> AutoTestApiReportInfo:
         """更新报告，支持按 report_id 或 report_code 定位。
@@ -165,6 +176,7 @@ class AutoTestApiReportCrud(ScaffoldCrud[AutoTestApiReportInfo, AutoTestApiRepor
                 exclude_unset=True,
                 exclude={"report_id", "report_code"}
             )
+            self.fill_time_columns(update_dict)
             instance = await self.update(id=report_id, obj_in=update_dict)
             return instance
         except IntegrityError as e:
@@ -201,18 +213,108 @@ class AutoTestApiReportCrud(ScaffoldCrud[AutoTestApiReportInfo, AutoTestApiRepor
         await instance.save()
         return instance
 
-    async def select_reports(self, search: Q, page: int, page_size: int, order: list) -> tuple:
-        """分页查询报告列表。
+    @staticmethod
+    def parse_case_time(value: Optional[str]) -> Optional[datetime]:
+        """
+        将用例执行时间字符串解析为 datetime，无法解析时返回 None。
+
+        :param value: 时间字符串，支持 CASE_TIME_FORMATS 中的格式。
+        :returns: datetime 或 None。
+        """
+        if not value or not isinstance(value, str):
+            return None
+        value = value.strip()
+        for time_format in CASE_TIME_FORMATS:
+            try:
+                return datetime.strptime(value, time_format)
+            except ValueError:
+                continue
+        return None
+
+    @classmethod
+    def fill_time_columns(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        按 case_st_time/case_ed_time 同步填充原生时间列 case_st_at/case_ed_at（就地修改）。
+
+        :param data: 报告字段字典。
+        :returns: 原字典。
+        """
+        if data.get("case_st_time"):
+            data["case_st_at"] = cls.parse_case_time(data["case_st_time"])
+        if data.get("case_ed_time"):
+            data["case_ed_at"] = cls.parse_case_time(data["case_ed_time"])
+        return data
+
+    async def backfill_time_columns(self, batch_size: int = 1000) -> int:
+        """
+        回填历史报告的 case_st_at/case_ed_at/project_id，按主键游标分批处理，可重复执行。
+
+        无法解析的开始时间以报告创建时间兜底，用例未关联应用（或已删除）时应用ID记为 0，
+        保证处理过的报告不再命中回填条件，回填在首次启动后收敛。
+
+        :param batch_size: 每批处理的报告数量。
+        :returns: 回填的报告数量。
+        """
+        last_id: int = 0
+        backfilled: int = 0
+        while True:
+            instances: List[AutoTestApiReportInfo] = await self.model.filter(
+                Q(case_st_at__isnull=True, case_st_time__isnull=False) | Q(project_id__isnull=True),
+                id__gt=last_id,
+            ).order_by("id").limit(batch_size)
+            if not instances:
+                break
+            case_projects: Dict[int, Optional[int]] = dict(
+                await AUTOTEST_API_CASE_CRUD.model.filter(
+                    id__in={instance.case_id for instance in instances}
+                ).values_list("id", "case_project")
+            )
+            for instance in instances:
+                instance.case_st_at = self.parse_case_time(instance.case_st_time) or instance.created_time
+                instance.case_ed_at = self.parse_case_time(instance.case_ed_time)
+                if instance.project_id is None:
+                    instance.project_id = case_projects.get(instance.case_id) or 0
+            await self.model.bulk_update(instances, fields=["case_st_at", "case_ed_at", "project_id"])
+            backfilled += len(instances)
+            last_id = instances[-1].id
+        if backfilled:
+            LOGGER.info(f"回填报告时间列完成, 共处理报告数量: {backfilled}")
+        return backfilled
+
+    async def select_reports(
+            self,
+            search: Q,
+            page: int,
+            page_size: int,
+            order: list,
+            cursor_mode: bool = False,
+            cursor: Optional[str] = None,
+            with_total: bool = False,
+            values_fields: Optional[List[str]] = None,
+    ) -> tuple:
+        """分页查询报告列表，支持偏移分页与游标分页。
 
         :param search: Tortoise Q 查询条件。
-        :param page: 页码。
+        :param page: 页码（游标分页时忽略）。
         :param page_size: 每页条数。
         :param order: 排序字段列表。
-        :returns: 由 (总条数, 当前页记录列表) 组成的元组。
-        :raises ParameterException: 查询条件非法导致 FieldError 时。
+        :param cursor_mode: 是否使用游标分页。
+        :param cursor: 游标分页的游标，为空表示第一页。
+        :param with_total: 游标分页时是否统计总数。
+        :param values_fields: 投影字段列表，指定时只查询这些列并返回字典列表。
+        :returns: 由 (总条数, 当前页记录列表, 下一页游标) 组成的元组；偏移分页时下一页游标为 None，游标分页未统计时总条数为 None。
+        :raises ParameterException: 查询条件非法导致 FieldError 或游标非法时。
         """
         try:
-            return await self.list(page=page, page_size=page_size, search=search, order=order)
+            if cursor_mode or cursor:
+                return await self.list_by_cursor(
+                    page_size=page_size, search=search, order=order, cursor=cursor, with_count=with_total,
+                    values_fields=values_fields,
+                )
+            total, instances = await self.list(
+                page=page, page_size=page_size, search=search, order=order, values_fields=values_fields
+            )
+            return total, instances, None
         except FieldError as e:
             error_message: str = f"查询报告信息异常, 错误描述: {e}"
             LOGGER.error(f"{error_message}\n{traceback.format_exc()}")
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : autotest_report_export_service
+@DateTime: 2026/5/14 10:20
+"""
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from tortoise.expressions import Q
+
+from backend.applications.aotutest.models.autotest_model import AutoTestApiDetailInfo, AutoTestApiReportInfo
+from backend.applications.aotutest.services.autotest_case_crud import AUTOTEST_API_CASE_CRUD
+from backend.applications.aotutest.services.autotest_detail_crud import AUTOTEST_API_DETAIL_CRUD
+from backend.applications.aotutest.services.autotest_report_crud import AUTOTEST_API_REPORT_CRUD
+from backend.common.excel.openpyxl_utils import OpenpyxlUtils
+from backend.configure import LOGGER, PROJECT_CONFIG
+from backend.services import BackgroundJob
+
+# 导出列：(字段名, 表头)；明细只导出概要列，请求/响应体等大字段请在报告详情中查看
+REPORT_EXPORT_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("report_code", "报告标识代码"),
+    ("case_id", "用例ID"),
+    ("case_name", "用例名称"),
+    ("case_code", "用例标识代码"),
+    ("report_type", "报告类型"),
+    ("case_state", "执行结果"),
+    ("case_st_time", "开始时间"),
+    ("case_ed_time", "结束时间"),
+    ("case_elapsed", "执行耗时"),
+    ("step_total", "步骤数量"),
+    ("step_pass_count", "成功步骤数"),
+    ("step_fail_count", "失败步骤数"),
+    ("step_pass_ratio", "步骤成功率"),
+    ("batch_code", "批次标识代码"),
+    ("task_code", "任务标识代码"),
+    ("created_user", "执行人员"),
+)
+DETAIL_EXPORT_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("report_code", "报告标识代码"),
+    ("case_code", "用例标识代码"),
+    ("step_no", "步骤序号"),
+    ("step_name", "步骤名称"),
+    ("step_code", "步骤标识代码"),
+    ("step_type", "步骤类型"),
+    ("step_state", "执行结果"),
+    ("dataset_name", "数据集名称"),
+    ("num_cycles", "循环次数"),
+    ("step_st_time", "开始时间"),
+    ("step_ed_time", "结束时间"),
+    ("step_elapsed", "执行耗时"),
+    ("request_method", "请求方法"),
+    ("request_url", "请求地址"),
+    ("response_elapsed", "响应耗时"),
+    ("step_exec_except", "错误描述"),
+)
+STATE_TEXT = {True: "成功", False: "失败", None: ""}
+
+
+class AutoTestReportExportService:
+    """
+    报告导出服务：按游标分页从库中逐页读取报告及其明细，写入只写模式（流式）的 xlsx 文件，
+    内存中只保留当前页数据，单元格写入与文件保存放到线程中执行，不阻塞事件循环。
+    """
+
+    def __init__(
+            self,
+            page_size: int = PROJECT_CONFIG.REPORT_EXPORT_PAGE_SIZE,
+            export_dir: str = os.path.join(PROJECT_CONFIG.OUTPUT_XLSX_DIR, "report"),
+            file_ttl_hours: int = PROJECT_CONFIG.REPORT_EXPORT_FILE_TTL_HOURS,
+    ):
+        """
+        :param page_size: 每页读取的报告/明细数量。
+        :param export_dir: 导出文件目录。
+        :param file_ttl_hours: 导出文件保留小时数，小于等于 0 表示不清理。
+        """
+        self.page_size = page_size
+        self.export_dir = export_dir
+        self.file_ttl_hours = file_ttl_hours
+
+    def cleanup_expired_files(self) -> int:
+        """
+        删除导出目录中超过保留时长的导出文件（同步导出与后台导出统一按保留时长清理）。
+
+        :returns: 删除的文件数量。
+        """
+        if self.file_ttl_hours <= 0 or not os.path.isdir(self.export_dir):
+            return 0
+        expire_before: float = time.time() - self.file_ttl_hours * 3600
+        removed: int = 0
+        with os.scandir(self.export_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.name.endswith(".xlsx") and entry.stat().st_mtime < expire_before:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError as e:
+                    LOGGER.warning(f"清理过期导出文件失败, 文件: {entry.path}, 错误描述: {e}")
+        if removed:
+            LOGGER.info(f"清理过期导出文件完成, 删除文件数量: {removed}")
+        return removed
+
+    @staticmethod
+    def _report_rows(reports: List[Dict[str, Any]], case_name_map: Dict[int, str]) -> List[list]:
+        rows: List[list] = []
+        for report in AutoTestApiReportInfo.serialize(reports, include_fields=[field for field, _ in REPORT_EXPORT_COLUMNS if field != "case_name"]):
+            report["case_name"] = case_name_map.get(report["case_id"], "")
+            report["case_state"] = STATE_TEXT.get(report["case_state"], report["case_state"])
+            rows.append([report.get(field) for field, _ in REPORT_EXPORT_COLUMNS])
+        return rows
+
+    @staticmethod
+    def _detail_rows(details: List[Dict[str, Any]]) -> List[list]:
+        rows: List[list] = []
+        for detail in AutoTestApiDetailInfo.serialize(details, include_fields=[field for field, _ in DETAIL_EXPORT_COLUMNS]):
+            detail["step_state"] = STATE_TEXT.get(detail["step_state"], detail["step_state"])
+            rows.append([detail.get(field) for field, _ in DETAIL_EXPORT_COLUMNS])
+        return rows
+
+    async def _export_details(self, sheet_object, report_codes: List[str]) -> int:
+        """按游标分页导出一页报告对应的全部明细，返回写入行数。"""
+        count: int = 0
+        cursor: Optional[str] = None
+        while True:
+            _, details, cursor = await AUTOTEST_API_DETAIL_CRUD.list_by_cursor(
+                page_size=self.page_size,
+                search=Q(report_code__in=report_codes, state__not=1),
+                order=["id"],
+                cursor=cursor,
+                values_fields=[field for field, _ in DETAIL_EXPORT_COLUMNS],
+            )
+            if details:
+                count += await asyncio.to_thread(OpenpyxlUtils.append_stream_rows, sheet_object, self._detail_rows(details))
+            if not cursor:
+                return count
+
+    async def export_reports(
+            self,
+            search: Q,
+            order: Optional[List[str]] = None,
+            with_details: bool = True,
+            job: Optional[BackgroundJob] = None,
+    ) -> Dict[str, Any]:
+        """
+        按条件导出报告（及明细）为 xlsx 文件。
+
+        :param search: 报告查询条件。
+        :param order: 报告排序字段列表。
+        :param with_details: 是否同时导出明细（写入"明细"sheet 页）。
+        :param job: 后台任务句柄，不为空时按页上报进度。
+        :returns: {"file_name", "file_path", "download_path", "report_count", "detail_count"}，download_path 为相对 OUTPUT_DIR 的路径。
+        """
+        os.makedirs(self.export_dir, exist_ok=True)
+        await asyncio.to_thread(self.cleanup_expired_files)
+        file_name: str = f"report_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}.xlsx"
+        file_path: str = os.path.join(self.export_dir, file_name)
+        excel_utils = OpenpyxlUtils(file_path)
+        excel_object = excel_utils.create_stream_excel()
+        report_sheet = excel_utils.create_stream_sheet(excel_object, "报告", [title for _, title in REPORT_EXPORT_COLUMNS])
+        detail_sheet = excel_utils.create_stream_sheet(excel_object, "明细", [title for _, title in DETAIL_EXPORT_COLUMNS]) if with_details else None
+
+        report_count: int = 0
+        detail_count: int = 0
+        cursor: Optional[str] = None
+        total: Optional[int] = await AUTOTEST_API_REPORT_CRUD.model.filter(search).count() if job else None
+        while True:
+            _, reports, cursor = await AUTOTEST_API_REPORT_CRUD.list_by_cursor(
+                page_size=self.page_size,
+                search=search,
+                order=order,
+                cursor=cursor,
+                values_fields=[field for field, _ in REPORT_EXPORT_COLUMNS if field != "case_name"],
+            )
+            if reports:
+                case_ids = list({report["case_id"] for report in reports})
+                case_name_map: Dict[int, str] = dict(
+                    await AUTOTEST_API_CASE_CRUD.model.filter(id__in=case_ids).values_list("id", "case_name")
+                )
+                report_count += await asyncio.to_thread(
+                    OpenpyxlUtils.append_stream_rows, report_sheet, self._report_rows(reports, case_name_map)
+                )
+                if detail_sheet is not None:
+                    detail_count += await self._export_details(detail_sheet, [report["report_code"] for report in reports])
+                if job and total:
+                    await job.update(90 * report_count // total, f"已导出 {report_count}/{total} 条报告")
+            if not cursor:
+                break
+
+        if job:
+            await job.update(95, "正在保存导出文件")
+        await asyncio.to_thread(excel_utils.save_excel, excel_object)
+        LOGGER.info(f"导出报告完成, 报告数量: {report_count}, 明细数量: {detail_count}, 文件: {file_path}")
+        return {
+            "file_name": file_name,
+            "file_path": file_path,
+            "download_path": os.path.relpath(file_path, PROJECT_CONFIG.OUTPUT_DIR),
+            "report_count": report_count,
+            "detail_count": detail_count,
+        }
+
+
+AUTOTEST_REPORT_EXPORT_SERVICE = AutoTestReportExportService()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : autotest_retention_service
+@DateTime: 2026/5/9 09:30
+"""
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import traceback
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Set
+
+from tortoise.transactions import in_transaction
+
+from backend.applications.aotutest.models.autotest_model import (
+    AutoTestApiCaseInfo,
+    AutoTestApiDetailInfo,
+    AutoTestApiPayloadBlobInfo,
+    AutoTestApiProjectInfo,
+    AutoTestApiReportInfo,
+)
+from backend.applications.aotutest.services.autotest_detail_crud import AUTOTEST_API_DETAIL_CRUD, PAYLOAD_FIELDS
+from backend.configure import LOGGER, PROJECT_CONFIG
+from backend.services import PAYLOAD_STORE
+
+# 用例未关联到任何应用（或应用已物理删除）时归入的分组
+UNASSIGNED_PROJECT_ID = 0
+
+
+class AutoTestRetentionService:
+    """
+    报告/明细保留服务：按应用配置的保留天数，将过期报告连同明细归档为 jsonl.gz 文件后从库中物理删除。
+
+    报告表与明细表的联合唯一键不包含时间列，无法直接使用 MySQL 分区，
+    因此采用「按批归档 + 按批删除」的滚动方式控制表规模与索引深度。
+    """
+
+    def __init__(
+            self,
+            default_days: int = PROJECT_CONFIG.RETENTION_DEFAULT_DAYS,
+            batch_size: int = PROJECT_CONFIG.RETENTION_BATCH_SIZE,
+            archive_enabled: bool = PROJECT_CONFIG.RETENTION_ARCHIVE_ENABLED,
+            archive_dir: str = PROJECT_CONFIG.RETENTION_ARCHIVE_DIR,
+    ):
+        """
+        :param default_days: 应用未配置保留天数时使用的默认值，0 表示永久保留。
+        :param batch_size: 每批处理的报告数量。
+        :param archive_enabled: 删除前是否归档到文件。
+        :param archive_dir: 归档文件根目录。
+        """
+        self.default_days = default_days
+        self.batch_size = batch_size
+        self.archive_enabled = archive_enabled
+        self.archive_dir = archive_dir
+
+    async def get_retention_groups(self) -> Dict[int, Dict[str, Any]]:
+        """
+        按应用汇总保留天数与用例ID集合。
+
+        :returns: {project_id: {"days": 保留天数, "case_ids": [用例ID, ...]}}，未关联应用的用例归入 UNASSIGNED_PROJECT_ID。
+        """
+        projects: List[Dict[str, Any]] = await AutoTestApiProjectInfo.all().values("id", "project_retention_days")
+        retention_days: Dict[int, int] = {
+            project["id"]: self.default_days if project["project_retention_days"] is None else project["project_retention_days"]
+            for project in projects
+        }
+        groups: Dict[int, Dict[str, Any]] = {}
+        cases: List[Dict[str, Any]] = await AutoTestApiCaseInfo.all().values("id", "case_project")
+        for case in cases:
+            project_id: int = case["case_project"] if case["case_project"] in retention_days else UNASSIGNED_PROJECT_ID
+            group = groups.setdefault(project_id, {
+                "days": retention_days.get(project_id, self.default_days),
+                "case_ids": [],
+            })
+            group["case_ids"].append(case["id"])
+        return groups
+
+    def _archive_path(self, project_id: int, reports: List[Dict[str, Any]]) -> str:
+        """
+        归档文件路径：{archive_dir}/{project_id}/{首个报告创建日期YYYYMMDD}/reports_{首个报告ID}_{末个报告ID}.jsonl.gz。
+        路径只由本批报告决定，删除失败后重试同一批报告会覆盖原文件而不是重复归档。
+        """
+        first, last = reports[0], reports[-1]
+        created_time = first.get("created_time")
+        return os.path.join(
+            self.archive_dir,
+            str(project_id),
+            created_time.strftime("%Y%m%d") if isinstance(created_time, datetime) else "unknown",
+            f"reports_{first['id']}_{last['id']}.jsonl.gz",
+        )
+
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        """归档序列化兜底：枚举取值，其余（时间等）转字符串。"""
+        if isinstance(value, Enum):
+            return value.value
+        return str(value)
+
+    @classmethod
+    def _write_archive(cls, path: str, reports: List[Dict[str, Any]], details: List[Dict[str, Any]]) -> None:
+        """
+        写入一批归档数据，每行一个报告及其明细；先写临时文件再原子替换，同一批报告重复归档时覆盖原文件。
+        明细中压缩/卸载存储的大字段会先还原，保证归档文件自包含。
+        """
+        details_by_report: Dict[str, List[Dict[str, Any]]] = {}
+        for detail in details:
+            PAYLOAD_STORE.decode_fields(detail, PAYLOAD_FIELDS)
+            details_by_report.setdefault(detail["report_code"], []).append(detail)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, mode="wt", encoding="utf-8") as f:
+                for report in reports:
+                    line = {"report": report, "details": details_by_report.get(report["report_code"], [])}
+                    f.write(json.dumps(line, ensure_ascii=False, default=cls._json_default) + "\n")
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    async def purge_group(self, project_id: int, case_ids: List[int], days: int, run_time: datetime) -> Dict[str, Any]:
+        """
+        归档并删除单个应用下超过保留天数的报告与明细。
+
+        :param project_id: 应用ID（UNASSIGNED_PROJECT_ID 表示未关联应用）。
+        :param case_ids: 该应用下的用例ID列表。
+        :param days: 保留天数，0 表示永久保留。
+        :param run_time: 本次执行时间，用于计算截止时间与 blob 回收的时间基准。
+        :returns: 处理结果统计。
+        """
+        result: Dict[str, Any] = {"project_id": project_id, "days": days, "reports": 0, "details": 0, "blobs": 0, "archives": []}
+        if days <= 0 or not case_ids:
+            return result
+        cutoff: datetime = run_time - timedelta(days=days)
+
+        while True:
+            reports: List[Dict[str, Any]] = await AutoTestApiReportInfo.filter(
+                case_id__in=case_ids,
+                created_time__lt=cutoff,
+            ).order_by("id").limit(self.batch_size).values()
+            if not reports:
+                break
+            report_ids: List[int] = [report["id"] for report in reports]
+            report_codes: List[str] = [report["report_code"] for report in reports]
+            details_query = AutoTestApiDetailInfo.filter(report_code__in=report_codes).order_by("id")
+            details: List[Dict[str, Any]] = await (
+                details_query.values() if self.archive_enabled else details_query.values(*PAYLOAD_FIELDS)
+            )
+            # 删除前记录明细引用的 blob，删除后回收不再被任何报告引用的文件
+            blob_digests: Set[str] = set()
+            for detail in details:
+                blob_digests |= PAYLOAD_STORE.blob_digests(detail, PAYLOAD_FIELDS)
+            if self.archive_enabled:
+                # 变量按增量链存储，归档前还原为完整列表，删除后归档文件仍可独立读取
+                await AUTOTEST_API_DETAIL_CRUD.reconstruct_variables(details)
+                archive_path: str = self._archive_path(project_id, reports)
+                await asyncio.to_thread(self._write_archive, archive_path, reports, details)
+                result["archives"].append(archive_path)
+            async with in_transaction():
+                result["details"] += await AutoTestApiDetailInfo.filter(report_code__in=report_codes).delete()
+                result["reports"] += await AutoTestApiReportInfo.filter(id__in=report_ids).delete()
+                await AutoTestApiPayloadBlobInfo.filter(report_code__in=report_codes).delete()
+            if blob_digests:
+                result["blobs"] += await AUTOTEST_API_DETAIL_CRUD.purge_payload_blobs(blob_digests, run_time.timestamp())
+            if len(reports) < self.batch_size:
+                break
+        return result
+
+    async def purge_expired(self) -> List[Dict[str, Any]]:
+        """
+        按应用逐个归档并删除过期的报告与明细，单个应用失败不影响其它应用。
+
+        :returns: 各应用的处理结果统计列表。
+        """
+        run_time: datetime = datetime.now()
+        results: List[Dict[str, Any]] = []
+        groups = await self.get_retention_groups()
+        for project_id, group in groups.items():
+            try:
+                result = await self.purge_group(project_id, group["case_ids"], group["days"], run_time)
+            except Exception as e:
+                LOGGER.error(f"归档过期报告失败, project_id={project_id}, 错误描述: {e}\n{traceback.format_exc()}")
+                result = {"project_id": project_id, "days": group["days"], "error": str(e)}
+            if result.get("reports") or result.get("error"):
+                LOGGER.info(f"归档过期报告完成: {result}")
+            results.append(result)
+        return results
+
+
+AUTOTEST_RETENTION_SERVICE = AutoTestRetentionService()
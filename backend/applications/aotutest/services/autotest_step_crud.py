@@ -32,6 +32,7 @@ from backend.applications.aotutest.schemas.autotest_step_schema import (
     step_tree_item_from_storage,
     step_variables_list_from_storage,
 )
+from backend.applications.aotutest.services.autotest_analytics_crud import AUTOTEST_API_ANALYTICS_CRUD
 from backend.applications.aotutest.services.autotest_case_crud import AUTOTEST_API_CASE_CRUD
 from backend.applications.aotutest.services.autotest_detail_crud import AUTOTEST_API_DETAIL_CRUD
 from backend.applications.aotutest.services.autotest_report_crud import AUTOTEST_API_REPORT_CRUD
@@ -46,6 +47,7 @@ from backend.core.exceptions import (
     DataAlreadyExistsException,
 )
 from backend.enums import AutoTestCaseType, AutoTestStepType, AutoTestReportType
+from backend.services import KRUN_CACHE, CacheNamespace, invalidate_step_tree_cache
 
 
 class AutoTestApiStepCrud(ScaffoldCrud[AutoTestApiStepInfo, AutoTestApiStepCreate, AutoTestApiStepUpdate]):
@@ -55,6 +57,18 @@ class AutoTestApiStepCrud(ScaffoldCrud[AutoTestApiStepInfo, AutoTestApiStepCreat
         """初始化 CRUD，绑定模型 AutoTestApiStepInfo。"""
         super().__init__(model=AutoTestApiStepInfo)
 
+    async def create(self, obj_in: Union[AutoTestApiStepCreate, Dict]) -> AutoTestApiStepInfo:
+        """新增步骤并失效步骤树缓存。"""
+        instance = await super().create(obj_in)
+        await invalidate_step_tree_cache()
+        return instance
+
+    async def update(self, id: int, obj_in: Union[AutoTestApiStepUpdate, Dict[str, Any]]) -> AutoTestApiStepInfo:
+        """更新步骤并失效步骤树缓存。"""
+        instance = await super().update(id=id, obj_in=obj_in)
+        await invalidate_step_tree_cache()
+        return instance
+
     async def get_by_id(self, step_id: int, on_error: bool = False, is_active: bool = True) -> Optional[AutoTestApiStepInfo]:
         """
         根据步骤主键 ID 查询单条步骤
@@ -164,6 +178,23 @@ class AutoTestApiStepCrud(ScaffoldCrud[AutoTestApiStepInfo, AutoTestApiStepCreat
             case_instance = await AUTOTEST_API_CASE_CRUD.get_by_code(case_code=case_code, on_error=True)
             case_id: int = case_instance.id
 
+        # 步骤树按 case_id 缓存（JSON 结构），用例/步骤任意变更时整体失效
+        async def _load_step_tree() -> Dict[str, Any]:
+            load_result = await self._build_case_step_tree(case_instance=case_instance)
+            return load_result.model_dump(mode="json")
+
+        cached_tree: Dict[str, Any] = await KRUN_CACHE.get_or_load(CacheNamespace.STEP_TREE, case_id, _load_step_tree)
+        return AutoTestCaseStepTreeLoadResult.model_validate(cached_tree)
+
+    async def _build_case_step_tree(self, case_instance: AutoTestApiCaseInfo) -> AutoTestCaseStepTreeLoadResult:
+        """
+        从数据库递归构建用例的步骤树（不经过缓存）。
+
+        :param case_instance: 用例实例。
+        :returns: ``AutoTestCaseStepTreeLoadResult``。
+        """
+        case_id: int = case_instance.id
+
         # 获取所有根步骤（没有父步骤的步骤）
         root_steps: List = await self.model.filter(
             case_id=case_id,
@@ -625,6 +656,7 @@ class AutoTestApiStepCrud(ScaffoldCrud[AutoTestApiStepInfo, AutoTestApiStepCreat
         # 软删除
         instance.state = 1
         await instance.save()
+        await invalidate_step_tree_cache()
         return instance
 
     async def delete_steps_recursive(
@@ -704,6 +736,8 @@ class AutoTestApiStepCrud(ScaffoldCrud[AutoTestApiStepInfo, AutoTestApiStepCreat
                     if (step.id, step.step_code) not in exclude_step:
                         deleted_count += await delete_step_and_children(step_instance=step)
 
+        if deleted_count:
+            await invalidate_step_tree_cache()
         return deleted_count
 
     async def select_steps(self, search: Q, page: int, page_size: int, order: list) -> tuple:
@@ -1094,7 +1128,7 @@ class AutoTestApiStepCrud(ScaffoldCrud[AutoTestApiStepInfo, AutoTestApiStepCreat
         if defer_create_report is not None:
             try:
                 async with in_transaction():
-                    report_instance = await AUTOTEST_API_REPORT_CRUD.create_report(report_in=defer_create_report)
+                    report_instance = await AUTOTEST_API_REPORT_CRUD.create_report(report_in=defer_create_report, accumulate=False)
                     for detail_create in (pending_create_details or []):
                         detail_schema = detail_create.model_copy(update={"report_code": report_instance.report_code})
                         await AUTOTEST_API_DETAIL_CRUD.create_detail(detail_in=detail_schema)
@@ -1105,6 +1139,8 @@ class AutoTestApiStepCrud(ScaffoldCrud[AutoTestApiStepInfo, AutoTestApiStepCreat
                         case_state=case_state,
                         case_last_time=case_last_time,
                     ))
+                # 事务提交后再累加日汇总，汇总行锁不跨明细写入持有
+                await AUTOTEST_API_ANALYTICS_CRUD.accumulate_report(report_instance)
             except Exception as e:
                 LOGGER.error(f"执行或调试步骤树(运行模式)时发生未知异常，错误描述: {e}\n{traceback.format_exc()}")
 
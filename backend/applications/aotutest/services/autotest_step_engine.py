@@ -3,6 +3,7 @@ from __future__ import annotations
 import ast
 import asyncio
 import builtins as _builtins_module
+import hashlib
 import json
 import random
 import re
@@ -13,7 +14,7 @@ import types
 from contextlib import AsyncExitStack
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Tuple
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Protocol, Tuple
 from urllib.parse import quote, unquote
 
 import httpx
@@ -21,21 +22,28 @@ from aiomysql import Pool
 
 from backend.applications.aotutest.models.autotest_model import AutoTestApiCaseInfo
 from backend.applications.aotutest.models.autotest_model import unique_identify
-from backend.applications.aotutest.schemas.autotest_detail_schema import AutoTestApiDetailCreate
+from backend.applications.aotutest.schemas.autotest_detail_schema import (
+    AutoTestApiDetailCreate,
+    StepVariablesDelta,
+    VARIABLES_KEYFRAME_INTERVAL,
+)
 from backend.applications.aotutest.schemas.autotest_report_schema import AutoTestApiReportCreate
 from backend.applications.aotutest.schemas.autotest_step_schema import (
     AutoTestStepTreeUpdateItem,
     ConditionsBase,
     DataBaseOperates,
     StepAssertValidatorItem,
+    StepRetryPolicy,
     StepVariablesBase,
     StepsExecuteConfigBase,
     prepare_step_tree_item_for_execution,
 )
+from backend.applications.aotutest.services.autotest_env_config_crud import AUTOTEST_API_ENV_CONFIG_CRUD
 from backend.applications.aotutest.services.autotest_project_crud import AUTOTEST_API_PROJECT_CRUD
 from backend.applications.aotutest.services.autotest_tool_service import AutoTestToolService
 from backend.common import AioTcpClient, TcpFrameMode
 from backend.common.database.database_connection_pool import get_app_database_pool, DBConnPoolFromConfig
+from backend.configure import PROJECT_CONFIG
 from backend.core.exceptions import (
     NotFoundException,
     ParameterException,
@@ -69,6 +77,11 @@ _USER_CODE_EXTRA_BUILTINS: Dict[str, Any] = {
     "json": json,
 }
 _USER_CODE_ALLOWED_IMPORT_ROOTS = frozenset(_USER_CODE_EXTRA_BUILTINS.keys())
+# 变量提取/断言中不依赖响应体的数据源；其余数据源（response json/xml/text）需要读取完整响应体
+_HTTP_BODY_FREE_SOURCES = frozenset({"response headers", "response cookies", "session_variables", "变量池"})
+# 重试幂等保护：已发出的请求仅重试幂等 HTTP 方法与只读 SQL，其余需在 retry_policy.non_idempotent 中显式开启
+_HTTP_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+_RE_READONLY_SQL = re.compile(r"^\s*(select|show|desc|describe|explain|with)\b", re.IGNORECASE)
 _builtin_import = _builtins_module.__import__
 
 
@@ -127,6 +140,7 @@ class StepExecutionResult:
     :ivar dataset_snapshot: 数据驱动替换用的数据集快照
     :ivar extract_variables: 变量提取结果列表
     :ivar assert_validators: 断言结果列表
+    :ivar attempts: 请求尝试记录列表（HTTP/TCP/数据库步骤按重试策略发送时记录每次尝试）
     :ivar children: 子步骤执行结果列表
     """
     case_id: Optional[int]
@@ -146,6 +160,7 @@ class StepExecutionResult:
     dataset_snapshot: Optional[Dict[str, Any]] = None
     extract_variables: List[Dict[str, Any]] = field(default_factory=list)
     assert_validators: List[Dict[str, Any]] = field(default_factory=list)
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
     children: List["StepExecutionResult"] = field(default_factory=list)
 
     def append_child(self, child: "StepExecutionResult") -> None:
@@ -157,18 +172,69 @@ class StepExecutionResult:
         self.children.append(child)
 
 
+@dataclass
+class HttpResponseCapture:
+    """
+    流式读取的 HTTP 响应：response 已关闭且不缓冲响应体，响应体按读取上限保存在 content 中
+
+    :ivar response: 响应对象，用于获取状态码、响应头、Cookie 与耗时
+    :ivar content: 已读取的响应体字节，超过读取上限时为截断后的前缀
+    :ivar size: 已读取的响应体字节数
+    :ivar sha256: 已读取响应体的 sha256 摘要
+    :ivar truncated: 响应体是否超过读取上限而中断读取
+    """
+    response: httpx.Response
+    content: bytes
+    size: int
+    sha256: str
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        """
+        按响应字符集解码已读取的响应体
+        :return: 响应文本
+        """
+        return self.content.decode(self.response.encoding or "utf-8", errors="replace")
+
+    def preview(self, limit: int) -> str:
+        """
+        生成响应预览：未超过 limit 字节时返回完整文本，否则只保留前 limit 字节并附带大小与摘要
+        :param limit: 预览最大字节数
+        :return: 预览文本
+        """
+        if self.size <= limit and not self.truncated:
+            return self.text
+        preview_text: str = self.content[:limit].decode(self.response.encoding or "utf-8", errors="ignore")
+        read_state: str = "已超过读取上限, 中断读取" if self.truncated else "已完整读取"
+        return (
+            f"{preview_text}\n"
+            f"...(响应体{read_state}, 读取字节: {self.size}, sha256: {self.sha256}, 仅保留前 {limit} 字节)"
+        )
+
+
 class HttpClientProtocol(Protocol):
     """
     HTTP 客户端协议，便于依赖注入和单元测试。
     """
 
-    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    def build_request(self, method: str, url: str, **kwargs: Any) -> httpx.Request:
         """
-        发起 HTTP 请求（由httpx.AsyncClient实现）
+        构建 HTTP 请求（由httpx.AsyncClient实现）
 
         :param method: HTTP 方法
         :param url: 请求 URL
         :param kwargs: 传给 httpx 的额外参数（headers、json 等）
+        :return: 请求对象
+        """
+        ...
+
+    async def send(self, request: httpx.Request, *, stream: bool = False) -> httpx.Response:
+        """
+        发送 HTTP 请求（由httpx.AsyncClient实现），stream=True 时不读取响应体
+
+        :param request: 请求对象
+        :param stream: 是否流式读取响应体
         :return: 响应对象
         """
         ...
@@ -218,6 +284,9 @@ class StepExecutionContext:
         self.defined_variables: List[StepVariablesBase] = field(default_factory=list)
         self.session_variables: List[StepVariablesBase] = field(default_factory=list)
         self.session_variables = self.resolve_placeholders(initial_variables) or []
+        # 明细变量快照增量编码：variables_seq 为最近一条明细的快照序号，_variables_snapshots 为其变量快照
+        self.variables_seq: int = -1
+        self._variables_snapshots: Dict[str, Dict[str, Dict[str, Any]]] = {}
         self.timeout: float = 30.0
         self.connect: float = 10.0
 
@@ -309,6 +378,44 @@ class StepExecutionContext:
             "session_variables": AutoTestToolService.list_to_dict(self.session_variables),
         }
 
+    def encode_variables_snapshot(self) -> Tuple[int, Any, Any]:
+        """
+        生成当前步骤明细的变量快照：每隔 VARIABLES_KEYFRAME_INTERVAL 条保存完整列表(关键帧)，
+        其余仅保存相对上一条明细的增量(StepVariablesDelta)，读取时由明细服务按 variables_seq 回放还原。
+        :return: (variables_seq, session_variables 快照, defined_variables 快照)
+        """
+        self.variables_seq += 1
+        is_keyframe: bool = self.variables_seq % VARIABLES_KEYFRAME_INTERVAL == 0
+        session_snapshot = self._encode_variables_scope("session_variables", self.session_variables, is_keyframe)
+        defined_snapshot = self._encode_variables_scope("defined_variables", self.defined_variables, is_keyframe)
+        return self.variables_seq, session_snapshot, defined_snapshot
+
+    def reset_variables_snapshot(self) -> None:
+        """明细落库失败时调用：清空上一条快照，下一条明细强制保存完整列表，避免增量链断裂。"""
+        self._variables_snapshots = {}
+
+    def _encode_variables_scope(
+            self, scope: str, variables: List[StepVariablesBase], is_keyframe: bool
+    ) -> Any:
+        """
+        计算单个作用域的变量快照：关键帧、无上一条快照、存在重复 key 或变量顺序无法由增量回放还原时保存完整列表。
+        """
+        variables = [item for item in (variables or []) if isinstance(item, StepVariablesBase)]
+        current: Dict[str, Dict[str, Any]] = {str(item.key): item.model_dump() for item in variables}
+        previous: Optional[Dict[str, Dict[str, Any]]] = self._variables_snapshots.get(scope)
+        self._variables_snapshots[scope] = current
+        if is_keyframe or previous is None or len(current) != len(variables):
+            return variables
+        # 回放规则：保留的旧 key 保持原顺序，新 key 依次追加；顺序不一致时退化为完整列表
+        replay_keys: List[str] = [key for key in previous if key in current] + [key for key in current if key not in previous]
+        if replay_keys != list(current.keys()):
+            return variables
+        return StepVariablesDelta(
+            base=self.variables_seq - 1,
+            upsert=[item for item in variables if previous.get(str(item.key)) != current[str(item.key)]],
+            remove=[key for key in previous if key not in current],
+        )
+
     def update_variables(
             self, variables: List[StepVariablesBase], *, scope: str = "defined_variables"
     ) -> None:
@@ -404,9 +511,10 @@ class StepExecutionContext:
             json_data: Optional[Any] = None,
             files: Optional[Any] = None,
             timeout: Optional[float] = None,
-    ) -> httpx.Response:
+            max_response_size: Optional[int] = None,
+    ) -> HttpResponseCapture:
         """
-        使用上下文 HTTP 客户端发起请求，记录日志
+        使用上下文 HTTP 客户端发起请求，流式读取响应体（超过读取上限即中断，不整体缓冲），记录日志
         :param method: HTTP 方法（如 GET、POST）
         :param url: 请求 URL
         :param headers: 请求头字典
@@ -415,7 +523,8 @@ class StepExecutionContext:
         :param json_data: JSON 请求体
         :param files: 上传文件
         :param timeout: 超时秒数，None 使用上下文默认
-        :return: 响应对象
+        :param max_response_size: 响应体最大读取字节数，None 使用 HTTP_RESPONSE_MAX_SIZE
+        :return: 响应读取结果
         """
         try:
             client = self.http_client
@@ -440,16 +549,21 @@ class StepExecutionContext:
                     if encoded_headers:
                         # 把编码后的 headers 放回 kwargs
                         kwargs["headers"] = encoded_headers
-                response = await client.request(method, url, **kwargs)
+                response = await client.send(client.build_request(method, url, **kwargs), stream=True)
+                try:
+                    capture = await self._read_response_body(response, max_response_size or PROJECT_CONFIG.HTTP_RESPONSE_MAX_SIZE)
+                finally:
+                    await response.aclose()
                 self.log(
                     f"【HTTP请求】请求成功: \n\t"
                     f"状态描述: {response.reason_phrase}\n\t"
                     f"状态代码: {response.status_code}\n\t"
                     f"响应字符: {response.encoding}\n\t"
                     f"响应版本: {response.http_version}\n\t"
+                    f"响应大小: {capture.size} 字节{'(超过读取上限, 已中断读取)' if capture.truncated else ''}\n\t"
                     f"响应耗时: {response.elapsed.total_seconds():.3f}s"
                 )
-                return response
+                return capture
             except httpx.InvalidURL as e:
                 error_message: str = (
                     f"【HTTP请求】请求无效: \n\t"
@@ -500,6 +614,34 @@ class StepExecutionContext:
             self.log(str(e))
             raise StepExecutionError(str(e)) from e
 
+    @staticmethod
+    async def _read_response_body(response: httpx.Response, max_size: int) -> HttpResponseCapture:
+        """
+        按块读取响应体（已按 Content-Encoding 解压），累计超过 max_size 字节时停止读取，边读边计算摘要
+        :param response: 以 stream=True 发送得到的响应对象
+        :param max_size: 最大读取字节数
+        :return: 响应读取结果
+        """
+        buffer: bytearray = bytearray()
+        digest = hashlib.sha256()
+        truncated: bool = False
+        async for chunk in response.aiter_bytes():
+            remaining: int = max_size - len(buffer)
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                truncated = True
+            buffer.extend(chunk)
+            digest.update(chunk)
+            if truncated:
+                break
+        return HttpResponseCapture(
+            response=response,
+            content=bytes(buffer),
+            size=len(buffer),
+            sha256=digest.hexdigest(),
+            truncated=truncated,
+        )
+
     def run_python_code(
             self, code: str, *, namespace: Optional[Dict[str, Any]] = None, step_result: Optional[StepExecutionResult] = None
     ) -> Dict[str, Any]:
@@ -989,6 +1131,137 @@ class BaseStepExecutor:
                 return None
         return None
 
+    async def resolve_api_execute_config(self) -> Optional[StepsExecuteConfigBase]:
+        """
+        获取 HTTP/TCP 步骤的执行配置：主机与端口按(应用, 环境, 配置名称)从环境配置缓存解析，
+        执行请求中携带的主机与端口仅在未找到环境配置时使用
+        :return: 执行环境配置；未配置时返回None
+        """
+        execute_config: Optional[StepsExecuteConfigBase] = self.get_execute_config()
+        project_id: Optional[int] = self.step.request_project_id
+        if not execute_config or execute_config.config_type != AutoTestConfigNodeType.API or not project_id:
+            return execute_config
+        env_config: Optional[Dict[str, Any]] = await AUTOTEST_API_ENV_CONFIG_CRUD.resolve_config(
+            project_id=project_id,
+            config_type=AutoTestConfigNodeType.API.value,
+            config_name=execute_config.config_name,
+            env_name=execute_config.env_name,
+        )
+        if not env_config:
+            self.context.log(
+                f"未找到环境配置(project_id={project_id}, env_name={execute_config.env_name}, "
+                f"config_name={execute_config.config_name}), 使用执行配置中的主机与端口",
+                step_code=self.step_code,
+            )
+            return execute_config
+        return execute_config.model_copy(update={
+            "config_host": str(env_config.get("config_host") or "").strip().rstrip("/"),
+            "config_port": str(env_config.get("config_port") or "").strip(),
+        })
+
+    def get_retry_policy(self) -> StepRetryPolicy:
+        """
+        合并步骤 retry_policy 与 STEP_RETRY_* 全局配置，返回各项均有值的重试策略
+        :return: 重试策略
+        """
+        policy: StepRetryPolicy = self.step.retry_policy or StepRetryPolicy()
+        # 全局配置不受步骤字段的取值范围约束，跳过校验
+        return StepRetryPolicy.model_construct(
+            attempts=policy.attempts or PROJECT_CONFIG.STEP_RETRY_ATTEMPTS,
+            backoff=PROJECT_CONFIG.STEP_RETRY_BACKOFF if policy.backoff is None else policy.backoff,
+            backoff_factor=policy.backoff_factor or PROJECT_CONFIG.STEP_RETRY_BACKOFF_FACTOR,
+            max_backoff=PROJECT_CONFIG.STEP_RETRY_MAX_BACKOFF if policy.max_backoff is None else policy.max_backoff,
+            jitter=PROJECT_CONFIG.STEP_RETRY_JITTER if policy.jitter is None else policy.jitter,
+            status_codes=PROJECT_CONFIG.STEP_RETRY_STATUS_CODES if policy.status_codes is None else policy.status_codes,
+            exceptions=PROJECT_CONFIG.STEP_RETRY_EXCEPTIONS if policy.exceptions is None else policy.exceptions,
+            non_idempotent=policy.non_idempotent,
+        )
+
+    @staticmethod
+    def _match_exception(exception: BaseException, names: Iterable[str], include_bases: bool = True) -> Optional[str]:
+        """
+        沿异常链（__cause__/__context__）查找类型名称在 names 中的异常，兼容被业务异常包装后的底层异常
+        :param exception: 捕获到的异常
+        :param names: 异常类型名称集合
+        :param include_bases: 是否同时匹配父类名称；为 False 时只匹配异常自身类型
+        :return: 命中的异常类型名称；未命中返回 None
+        """
+        names = set(names)
+        seen: set = set()
+        current: Optional[BaseException] = exception
+        while current is not None and id(current) not in seen:
+            seen.add(id(current))
+            exception_classes = type(current).__mro__ if include_bases else (type(current),)
+            for exception_cls in exception_classes:
+                if exception_cls.__name__ in names:
+                    return exception_cls.__name__
+            current = current.__cause__ or current.__context__
+        return None
+
+    async def run_with_retry(
+            self,
+            operation: Callable[[], Awaitable[Any]],
+            result: StepExecutionResult,
+            *,
+            label: str,
+            idempotent: bool,
+            unsent_exceptions: Iterable[str] = (),
+            retry_status: Optional[Callable[[Any], Optional[int]]] = None,
+    ) -> Any:
+        """
+        按重试策略执行请求操作，遇到可重试的异常或状态码时指数退避加抖动后重试（asyncio.sleep，不阻塞事件循环），
+        每次尝试记录到 result.attempts 与步骤日志
+
+        :param operation: 无参异步函数，每次尝试调用一次
+        :param result: 本步执行结果，写入尝试记录
+        :param label: 日志前缀，如: 【HTTP请求】
+        :param idempotent: 请求是否幂等；非幂等请求只在未发出（命中 unsent_exceptions）时重试，除非策略开启 non_idempotent
+        :param unsent_exceptions: 表示请求未发出的异常类型名称（如连接失败，只匹配自身类型），此类异常总是允许重试
+        :param retry_status: 从返回值中取 HTTP 状态码的函数，状态码命中 status_codes 时重试
+        :return: 最后一次尝试的返回值
+        """
+        policy: StepRetryPolicy = self.get_retry_policy()
+        attempts: int = max(policy.attempts, 1)
+        resend_allowed: bool = idempotent or policy.non_idempotent
+        for attempt in range(1, attempts + 1):
+            attempt_record: Dict[str, Any] = {"attempt": attempt, "retry": False}
+            result.attempts.append(attempt_record)
+            attempt_start: float = time.perf_counter()
+            try:
+                value = await operation()
+            except Exception as e:
+                attempt_record["elapsed"] = round(time.perf_counter() - attempt_start, 6)
+                attempt_record["error"] = f"{type(e).__name__}: {e}"
+                matched: Optional[str] = self._match_exception(e, policy.exceptions)
+                unsent: bool = self._match_exception(e, unsent_exceptions, include_bases=False) is not None
+                if attempt >= attempts or not matched or not (resend_allowed or unsent):
+                    raise
+                reason: str = f"异常类型: {matched}"
+            else:
+                attempt_record["elapsed"] = round(time.perf_counter() - attempt_start, 6)
+                status_code: Optional[int] = retry_status(value) if retry_status else None
+                if status_code is not None:
+                    attempt_record["status_code"] = status_code
+                if (
+                        attempt >= attempts
+                        or status_code is None
+                        or status_code not in policy.status_codes
+                        or not resend_allowed
+                ):
+                    return value
+                reason = f"状态代码: {status_code}"
+
+            attempt_record["retry"] = True
+            delay: float = min(policy.max_backoff, policy.backoff * policy.backoff_factor ** (attempt - 1))
+            delay = round(max(0.0, delay * (1 + random.uniform(-policy.jitter, policy.jitter))), 3)
+            self.context.log(
+                f"{label}第{attempt}次尝试失败, {delay}秒后重试: \n\t"
+                f"{reason}\n\t"
+                f"剩余次数: {attempts - attempt}",
+                step_code=self.step_code,
+            )
+            await asyncio.sleep(delay)
+
     async def execute(self) -> StepExecutionResult:
         """
         执行当前步骤：注入 defined_variables、调用 _execute、合并 extract_variables、可选保存明细
@@ -1107,8 +1380,8 @@ class BaseStepExecutor:
                     response_body = None
 
         extract_variables: List[Dict[str, Any]] = result.extract_variables
-        defined_variables: List[StepVariablesBase] = self.context.defined_variables
-        session_variables: List[StepVariablesBase] = self.context.session_variables
+        # 变量快照按报告内顺序做增量编码，避免每步/每轮循环重复存储完整变量池
+        variables_seq, session_variables, defined_variables = self.context.encode_variables_snapshot()
         dataset_name: Optional[str] = result.dataset_name
         dataset_snapshot: Optional[Dict[str, Any]] = result.dataset_snapshot
         have_data_driven: bool = dataset_snapshot is not None
@@ -1131,6 +1404,7 @@ class BaseStepExecutor:
             step_elapsed=step_elapsed,
             step_exec_logger=step_exec_logger,
             step_exec_except=result.error,
+            step_attempts=result.attempts or None,
             num_cycles=num_cycles,
             # 请求相关
             request_url=actual_request.get("request_url"),
@@ -1171,6 +1445,7 @@ class BaseStepExecutor:
             # 变量相关
             session_variables=session_variables,
             defined_variables=defined_variables,
+            variables_seq=variables_seq,
             extract_variables=extract_variables,
             assert_validators=result.assert_validators or None
         )
@@ -1178,7 +1453,11 @@ class BaseStepExecutor:
             self.context.pending_details.append(detail_create)
             return
         from backend.applications.aotutest.services.autotest_detail_crud import AUTOTEST_API_DETAIL_CRUD
-        await AUTOTEST_API_DETAIL_CRUD.create_detail(detail_create)
+        try:
+            await AUTOTEST_API_DETAIL_CRUD.create_detail(detail_create)
+        except Exception:
+            self.context.reset_variables_snapshot()
+            raise
 
     async def _execute(self, result: StepExecutionResult) -> None:
         """
@@ -2162,11 +2441,12 @@ class TcpStepExecutor(BaseStepExecutor):
             env_name: Optional[str] = None
             request_url = (self.step.request_url or "").strip()
             request_port = self.step.request_port
-            current_step_config: Optional[StepsExecuteConfigBase] = self.get_execute_config()
+            current_step_config: Optional[StepsExecuteConfigBase] = await self.resolve_api_execute_config()
             if current_step_config:
                 config_type: AutoTestConfigNodeType = current_step_config.config_type
                 if current_step_config and config_type == AutoTestConfigNodeType.API:
-                    request_url: str = current_step_config.config_host
+                    # 与 TCP 调试一致：API 环境配置的主机可能带有协议前缀，TCP 连接只使用主机名
+                    request_url: str = current_step_config.config_host.replace("http://", "").replace("https://", "")
                     request_port: str = current_step_config.config_port
                     self.step.request_config_name = current_step_config.config_name
                     env_name = current_step_config.env_name
@@ -2266,55 +2546,64 @@ class TcpStepExecutor(BaseStepExecutor):
             connect_td = _to_timedelta(connect_timeout)
             read_td = _to_timedelta(read_timeout)
 
-            start = time.perf_counter()
-            async with AioTcpClient(
-                    timeout=read_td or timedelta(seconds=30),
-                    connect_timeout=connect_td,
-                    length_field_size=int(length_field_size),
-                    max_response_bytes=int(max_response_bytes),
-            ) as client:
-                utils = await client.tcp(
-                    request_url,
-                    int(request_port),
-                    payload,
-                    frame_mode=frame_mode,
-                    encoding=encoding,
-                    connect_timeout=connect_td,
-                    read_timeout=read_td,
-                )
-                try:
-                    if response_type == "json":
-                        body_any = await utils.json_resp()
-                        resp_text = json.dumps(body_any, ensure_ascii=False)
-                        response_json = body_any if isinstance(body_any, (dict, list)) else None
-                        resp_bytes = resp_text.encode(encoding, errors="ignore")
-                    elif response_type == "xml":
-                        resp_text = await utils.xml_resp() or ""
-                        resp_bytes = resp_text.encode(encoding, errors="ignore")
-                        response_json = None
-                    elif response_type == "bytes":
+            async def _exchange() -> Tuple[str, Any, Any, float]:
+                start = time.perf_counter()
+                async with AioTcpClient(
+                        timeout=read_td or timedelta(seconds=30),
+                        connect_timeout=connect_td,
+                        length_field_size=int(length_field_size),
+                        max_response_bytes=int(max_response_bytes),
+                ) as client:
+                    utils = await client.tcp(
+                        request_url,
+                        int(request_port),
+                        payload,
+                        frame_mode=frame_mode,
+                        encoding=encoding,
+                        connect_timeout=connect_td,
+                        read_timeout=read_td,
+                    )
+                    try:
+                        if response_type == "json":
+                            body_any = await utils.json_resp()
+                            resp_text = json.dumps(body_any, ensure_ascii=False)
+                            response_json = body_any if isinstance(body_any, (dict, list)) else None
+                            resp_bytes = resp_text.encode(encoding, errors="ignore")
+                        elif response_type == "xml":
+                            resp_text = await utils.xml_resp() or ""
+                            resp_bytes = resp_text.encode(encoding, errors="ignore")
+                            response_json = None
+                        elif response_type == "bytes":
+                            resp_bytes = await utils.bytes_resp()
+                            try:
+                                resp_text = resp_bytes.decode(encoding, errors="ignore")
+                            except Exception:
+                                resp_text = ""
+                            response_json = None
+                        else:  # text
+                            resp_text = await utils.text_resp()
+                            resp_bytes = resp_text.encode(encoding, errors="ignore")
+                            try:
+                                response_json = json.loads(resp_text) if resp_text and resp_text.strip().startswith(("{", "[")) else None
+                            except Exception:
+                                response_json = None
+                    except Exception:
                         resp_bytes = await utils.bytes_resp()
-                        try:
-                            resp_text = resp_bytes.decode(encoding, errors="ignore")
-                        except Exception:
-                            resp_text = ""
-                        response_json = None
-                    else:  # text
-                        resp_text = await utils.text_resp()
-                        resp_bytes = resp_text.encode(encoding, errors="ignore")
+                        resp_text = resp_bytes.decode(encoding, errors="ignore")
                         try:
                             response_json = json.loads(resp_text) if resp_text and resp_text.strip().startswith(("{", "[")) else None
                         except Exception:
                             response_json = None
-                except Exception:
-                    resp_bytes = await utils.bytes_resp()
-                    resp_text = resp_bytes.decode(encoding, errors="ignore")
-                    try:
-                        response_json = json.loads(resp_text) if resp_text and resp_text.strip().startswith(("{", "[")) else None
-                    except Exception:
-                        response_json = None
-
-            elapsed = round(time.perf_counter() - start, 6)
+                return resp_text, resp_bytes, response_json, round(time.perf_counter() - start, 6)
+
+            # TCP 报文是否幂等无法判断：连接被拒绝或主机解析失败时报文未发出，总是可以重试；其余异常需开启 non_idempotent
+            resp_text, resp_bytes, response_json, elapsed = await self.run_with_retry(
+                _exchange,
+                result,
+                label="【TCP请求】",
+                idempotent=False,
+                unsent_exceptions=("ConnectionRefusedError", "gaierror"),
+            )
             result.response = {
                 "response_text": resp_text,
                 "response_elapsed": str(elapsed),
@@ -2481,10 +2770,9 @@ class DataBaseStepExecutor(BaseStepExecutor):
                         step_code=self.step_code
                     )
                     if not operate_project_id and operate_project_name.strip():
-                        project_instance = await AUTOTEST_API_PROJECT_CRUD.get_by_name(operate_project_name.strip(), on_error=False)
-                        if not project_instance:
+                        operate_project_id = await AUTOTEST_API_PROJECT_CRUD.get_id_by_name(operate_project_name.strip())
+                        if not operate_project_id:
                             raise StepExecutionError(f"【数据库请求】{operate_no}：应用(project_name={operate_project_name!r})不存在")
-                        operate_project_id = project_instance.id
                     if not operate_project_id:
                         raise StepExecutionError(f"【数据库请求】{operate_no}：参数[project_id]不能为空")
                     if not operate_config_name:
@@ -2496,16 +2784,26 @@ class DataBaseStepExecutor(BaseStepExecutor):
                     if not operate_variable_name:
                         raise StepExecutionError(f"【数据库请求】{operate_no}：参数[variable_name]不能为空")
 
-                    database_pool: Pool = await pool_manager.get_or_create_pool(
-                        app_id=str(operate_project_id),
-                        env=str(env_name).strip(),
-                        config_name=operate_config_name,
-                        db_name=operate_database_name
-                    )
-                    expr_executive_result: Dict[str, Any] = await pool_manager.execute_sql(
-                        pool=database_pool,
-                        sql=operate_sql_expr,
-                        is_dict=True
+                    async def _execute_sql() -> Dict[str, Any]:
+                        database_pool: Pool = await pool_manager.get_or_create_pool(
+                            app_id=str(operate_project_id),
+                            env=str(env_name).strip(),
+                            config_name=operate_config_name,
+                            db_name=operate_database_name
+                        )
+                        return await pool_manager.execute_sql(
+                            pool=database_pool,
+                            sql=operate_sql_expr,
+                            is_dict=True
+                        )
+
+                    # 连接池创建失败时 SQL 未执行，总是可以重试；已执行的 SQL 仅重试只读语句
+                    expr_executive_result: Dict[str, Any] = await self.run_with_retry(
+                        _execute_sql,
+                        result,
+                        label=f"【数据库请求】{operate_no}: ",
+                        idempotent=bool(_RE_READONLY_SQL.match(operate_sql_expr)),
+                        unsent_exceptions=("ConnectionError",),
                     )
                     sql_count: Optional[int] = None
                     sql_data: Optional[List[Dict[str, Any]]] = None
@@ -2695,6 +2993,20 @@ class HttpStepExecutor(BaseStepExecutor):
     参数化驱动仅在此执行器内处理：按 dataset_name + case_id/step_code 查 AutoTestApiDataSourceInfo 取数。
     """
 
+    def _response_body_required(self, step_struct: Optional[Dict[str, Any]]) -> bool:
+        """
+        判断变量提取、断言或数据驱动断言是否引用响应体；不引用时只读取并保存响应预览
+        :param step_struct: 数据驱动结构（含 assert_body）
+        :return: 是否需要完整响应体
+        """
+        if step_struct and step_struct.get("assert_body"):
+            return True
+        for item in list(self.step.extract_variables or []) + list(self.step.assert_validators or []):
+            source = item.get("source") if isinstance(item, dict) else getattr(item, "source", None)
+            if str(source or "").strip().lower() not in _HTTP_BODY_FREE_SOURCES:
+                return True
+        return False
+
     async def _execute(self, result: StepExecutionResult) -> None:
         """
         拼装 URL 与报文，发送 HTTP 请求并完成变量提取与断言
@@ -2706,7 +3018,7 @@ class HttpStepExecutor(BaseStepExecutor):
             # 获取当前步骤的执行配置并处理请求URL
             request_url: str = (self.step.request_url or "").strip().lstrip("/")
             request_method: HTTPMethod = self.step.request_method
-            current_step_config: Optional[StepsExecuteConfigBase] = self.get_execute_config()
+            current_step_config: Optional[StepsExecuteConfigBase] = await self.resolve_api_execute_config()
             env_name: Optional[str] = None
             if current_step_config:
                 if current_step_config.config_type == AutoTestConfigNodeType.API:
@@ -2838,15 +3150,30 @@ class HttpStepExecutor(BaseStepExecutor):
                 "request_body": json_payload,
                 "request_text": request_text,
             }
-            response: httpx.Response = await self.context.send_http_request(
-                request_method,
-                request_url,
-                headers=request_header,
-                params=request_params,
-                data=data_payload,
-                json_data=json_payload,
-                files=file_payload,
+            # 响应体只在变量提取/断言需要时完整读取（明细按大字段规则压缩或写入 blob），否则只读取预览，避免大响应占满内存
+            max_response_size: int = self.step.http_max_response_bytes or PROJECT_CONFIG.HTTP_RESPONSE_MAX_SIZE
+            preview_size: int = PROJECT_CONFIG.HTTP_RESPONSE_PREVIEW_SIZE
+            body_required: bool = self._response_body_required(step_struct)
+            # 连接未建立时请求未发出，任何方法都可以重试；已发出的请求仅重试幂等方法
+            capture: HttpResponseCapture = await self.run_with_retry(
+                lambda: self.context.send_http_request(
+                    request_method,
+                    request_url,
+                    headers=request_header,
+                    params=request_params,
+                    data=data_payload,
+                    json_data=json_payload,
+                    files=file_payload,
+                    max_response_size=max_response_size if body_required else min(max_response_size, preview_size + 1),
+                ),
+                result,
+                label="【HTTP请求】",
+                idempotent=str(request_method.value).upper() in _HTTP_IDEMPOTENT_METHODS,
+                unsent_exceptions=("ConnectError", "ConnectTimeout", "PoolTimeout"),
+                retry_status=lambda value: value.response.status_code,
             )
+            response: httpx.Response = capture.response
+            response_json: Optional[Any] = None
             try:
                 cookies: Dict[str, Any] = {}
                 if response.cookies:
@@ -2856,7 +3183,7 @@ class HttpStepExecutor(BaseStepExecutor):
                     "response_code": response.status_code,
                     "response_message": response.reason_phrase,
                     "response_header": {k: unquote(v) for k, v in dict(response.headers).items()},
-                    "response_text": response.text,
+                    "response_text": capture.text if body_required and not capture.truncated else capture.preview(preview_size),
                     "response_cookie": cookies,
                     "response_elapsed": str(response.elapsed.total_seconds()),
                 }
@@ -2864,13 +3191,21 @@ class HttpStepExecutor(BaseStepExecutor):
                 raise StepExecutionError(f"【HTTP请求】响应对象缺少必要属性, 错误详情: {e}") from e
             except Exception as e:
                 raise StepExecutionError(f"【HTTP请求】在提取响应状态码、内容、headers、cookies时失败, 错误详情: {e}") from e
-            try:
-                response_json = response.json()
-            except (ValueError, json.JSONDecodeError):
-                response_json = None
-            except Exception as e:
-                self.context.log(f"【HTTP请求】响应JSON解析失败: {e}, 将使用文本响应", step_code=self.step_code)
-                response_json = None
+            if body_required:
+                if capture.truncated:
+                    raise StepExecutionError(
+                        f"【HTTP请求】响应体超过读取上限({max_response_size}字节), 无法基于响应体完成变量提取与断言, "
+                        f"可通过步骤参数[http_max_response_bytes]调整上限"
+                    )
+                try:
+                    response_json = json.loads(result.response["response_text"])
+                    # 已解析的 JSON 直接写入明细，避免落库时再次解析响应文本
+                    result.response["response_body"] = response_json
+                except (ValueError, TypeError):
+                    response_json = None
+                except Exception as e:
+                    self.context.log(f"【HTTP请求】响应JSON解析失败: {e}, 将使用文本响应", step_code=self.step_code)
+                    response_json = None
 
             session_lookup_map: Dict[str, Any] = AutoTestToolService.list_to_dict(self.context.defined_variables)
             session_lookup_map.update(AutoTestToolService.list_to_dict(self.context.session_variables))
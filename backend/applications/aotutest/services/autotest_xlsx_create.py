@@ -12,16 +12,16 @@ import random
 import string
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Union
-
-import numpy as np
-import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from backend.applications.aotutest.services.autotest_data_source2_crud import AUTOTEST_API_DATA_CREATE_CRUD
 # =============================
 # 数据模型
 # =============================
 from backend.applications.aotutest.schemas.autotest_data_generate_schema import AutoTestApiDataCreateUpdate
+from backend.common import sync_to_process
+from backend.configure import PROJECT_CONFIG
+from backend.services import BackgroundJob
 
 
 @dataclass
@@ -34,12 +34,32 @@ class Field:
     enum: Optional[str]
 
 
+@dataclass
+class GeneratedCase:
+    """生成的测试场景：只记录被修改的字段与值，其余字段沿用基础报文，避免每个场景复制整份报文。"""
+    case_name: str
+    en_name: Optional[str] = None
+    value: Any = None
+
+
 # =============================
 # Excel读取
 # =============================
 
+def _cell_text(row: Tuple[Any, ...], index: int) -> str:
+    if index >= len(row) or row[index] is None:
+        return ""
+    return str(row[index]).strip()
+
+
 def read_excel_template(file_path: str) -> List[Field]:
-    df = pd.read_excel(file_path, sheet_name=0, header=None)
+    from openpyxl import load_workbook
+    # 只读模式按行流式读取单元格值，不构建 DataFrame
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows: List[Tuple[Any, ...]] = [tuple(row) for row in wb.worksheets[0].iter_rows(values_only=True)]
+    finally:
+        wb.close()
 
     header_row = None
     header_filed = ["英文名称", "中文名称", "数据类型", "长度", "是否必输", "枚举值"]
@@ -47,8 +67,8 @@ def read_excel_template(file_path: str) -> List[Field]:
     output_row = None
     header_all = []
 
-    for i, row in df.iterrows():
-        row_values = [str(v).strip() for v in row.values]
+    for i, row in enumerate(rows):
+        row_values = [_cell_text(row, j) for j in range(len(row))]
 
         if "英文名称" in row_values and header_row is None:
             header_row = i
@@ -68,39 +88,35 @@ def read_excel_template(file_path: str) -> List[Field]:
         raise ValueError("未找到【输入】标识行")
 
     headers = []
-    for v in df.iloc[header_row].values:
-        if pd.isna(v):
+    for v in rows[header_row]:
+        if v is None:
             break
         headers.append(str(v).strip())
 
     start = input_row + 1
-    end = output_row if output_row else len(df)
+    end = output_row if output_row else len(rows)
 
-    data_df = df.iloc[start:end, :len(headers)].copy()
-    data_df.columns = headers
+    column_index: Dict[str, int] = {}
+    for i, name in enumerate(headers):
+        column_index.setdefault(name, i)
 
     fields: List[Field] = []
 
-    for _, row in data_df.iterrows():
+    for row in rows[start:end]:
+        values = {name: _cell_text(row, i) for name, i in column_index.items()}
 
-        cn_name = str(row.get("中文名称", "")).strip()
-        en_name = str(row.get("英文名称", "")).strip()
-        data_type = str(row.get("数据类型", "")).strip()
-        length = str(row.get("长度", "")).strip()
-        required = str(row.get("是否必输", "")).strip()
-        enum = str(row.get("枚举值", "")).strip()
-
-        if not en_name or en_name == "nan":
+        en_name = values.get("英文名称", "")
+        if not en_name:
             continue
 
         fields.append(
             Field(
-                cn_name=cn_name,
+                cn_name=values.get("中文名称", ""),
                 en_name=en_name,
-                data_type=data_type,
-                length=None if length in ["", "nan"] else length,
-                required=None if required in ["", "nan"] else required,
-                enum=None if enum in ["", "nan"] else enum,
+                data_type=values.get("数据类型", ""),
+                length=values.get("长度") or None,
+                required=values.get("是否必输") or None,
+                enum=values.get("枚举值") or None,
             )
         )
 
@@ -180,7 +196,6 @@ def generate_length_invalid(field: Field, rule: str):
     else:
         if ',' not in s:
             return None, None
-        print(field.cn_name)
         float_length = int(s.split(',')[1].strip())
         invalid_len = float_length + 1
         value = "9." + "9" * invalid_len
@@ -221,12 +236,34 @@ def generate_decimal_invalid(field: Field, decimal_flag: str):
     return value
 
 
-def generate_cases_np(fields: List[Field], selected_rules: List[str], base_json: Dict[str, Any]):
+# =============================
+# 规则引擎
+# =============================
+
+# 规则组 -> 实际生成规则（顺序与页面勾选的规则组展开顺序一致）
+RULE_EXPANSIONS: Dict[str, List[str]] = {
+    "length": ["length_int", "length_float"],
+    "decimal": ["decimal_nine", "decimal_nine_max", "decimal_nine_min", "decimal_zero", "decimal_zero_min", "decimal_zero_max"],
+    "required": ["required_", "required_null"],
+}
+
+
+def expand_rules(rules: List[str]) -> List[str]:
+    """展开规则组：保留原规则列表，依次追加 length/decimal/required 规则组对应的实际规则。"""
+    expanded = list(rules)
+    for group, group_rules in RULE_EXPANSIONS.items():
+        if group in rules:
+            expanded.extend(group_rules)
+    return expanded
+
+
+def flatten_base_json(base_json: Dict[str, Any]) -> Dict[str, Any]:
+    """取报文 Body（如有）并展开一层嵌套：对象字段展开为 a.b，对象数组字段取首个元素展开为 a[0].b。"""
     if "body" in base_json.keys() or "Body" in base_json.keys():
         base_json = base_json.get("body", base_json.get("Body"))
     base_json_neo = {}
     for k, v in base_json.items():
-        if isinstance(v, list) and isinstance(v[0], dict):
+        if isinstance(v, list) and v and isinstance(v[0], dict):
             for a, b in v[0].items():
                 base_json_neo[f"{k}[0].{a}"] = b
         elif isinstance(v, dict):
@@ -234,108 +271,117 @@ def generate_cases_np(fields: List[Field], selected_rules: List[str], base_json:
                 base_json_neo[f"{k}.{a}"] = b
         else:
             base_json_neo[k] = v
-
-    base_array = np.array([base_json_neo for _ in range(len(fields) * len(selected_rules))], dtype=object)
-    idx = 1
-    row = base_json_neo.copy()
-    row["case_name"] = "正交易场景"
-    base_array[0] = row
+    return base_json_neo
+
+
+def generate_field_cases(field: Field, rules: List[str]) -> List[GeneratedCase]:
+    """对单个字段依次应用规则，返回该字段生成的场景（每个场景只修改该字段）。"""
+    cases: List[GeneratedCase] = []
+    rule_flag = True
+    for rule in rules:
+        if rule in ("required_", "required_null"):
+            if not field.required:
+                if rule_flag:
+                    cases.append(GeneratedCase(f"【{field.cn_name}】【{field.en_name}】接口文档的是否必输项为空，请检查"))
+                    rule_flag = False
+            elif is_required(field.required):
+                value, config_val = ("", "空") if rule == "required_" else ("null", "null")
+                cases.append(GeneratedCase(f"【{field.cn_name}】【{field.en_name}】必输项校验，生成{config_val}值", field.en_name, value))
+        elif rule in ("length_int", "length_float"):
+            value, config_len = generate_length_invalid(field, rule)
+            config_val = "整数" if rule == "length_int" else "小数"
+            if value:
+                cases.append(GeneratedCase(
+                    f"【{field.cn_name}】【{field.en_name}】长度校验，配置{config_val}长度{config_len}，生成长度{config_len + 1}",
+                    field.en_name, value,
+                ))
+        elif rule in RULE_EXPANSIONS["decimal"]:
+            value = generate_decimal_invalid(field, rule)
+            if value:
+                cases.append(GeneratedCase(
+                    f"【{field.cn_name}】【{field.en_name}】边界值校验校验，配置长度{field.length}，生成值{value}",
+                    field.en_name, value,
+                ))
+        elif rule == "enum":
+            if field.enum:
+                try:
+                    length = int(field.length)
+                except Exception:
+                    raise ValueError(f"{field.cn_name}枚举值长度异常")
+                invalid = random_enum_invalid(field.enum, length)
+                cases.append(GeneratedCase(
+                    f"【{field.cn_name}】【{field.en_name}】枚举值校验，配置枚举值为[{field.enum}]，生成枚举值{invalid}",
+                    field.en_name, invalid,
+                ))
+            elif not field.length:
+                cases.append(GeneratedCase(f"【{field.cn_name}】【{field.en_name}】接口文档的长度项和枚举值项均为空，请检查"))
+    return cases
+
+
+def generate_cases(fields: List[Field], rules: List[str]) -> List[GeneratedCase]:
+    """生成全部场景：首个为正交易场景，其后按字段顺序、规则顺序生成（父字段 list/array 不参与）。"""
+    cases: List[GeneratedCase] = [GeneratedCase("正交易场景")]
     for field in fields:
-        dtype = (field.data_type or "").lower()
-        if dtype in ["list", "array"]:
+        if (field.data_type or "").lower() in ["list", "array"]:
             continue
-        rule_flag = True
-        for rule in selected_rules:
-            row = base_json_neo.copy()
-            if rule in ("required_", "required_null"):
-                if not field.required:
-                    if rule_flag:
-                        row["case_name"] = f"【{field.cn_name}】【{field.en_name}】接口文档的是否必输项为空，请检查"
-                        rule_flag = False
-                else:
-                    if is_required(field.required):
-                        if rule == "required_":
-                            row[field.en_name] = ""
-                            config_val = "空"
-                        else:
-                            row[field.en_name] = "null"
-                            config_val = "null"
-                        row["case_name"] = f"【{field.cn_name}】【{field.en_name}】必输项校验，生成{config_val}值"
-            elif rule in ("length_int", "length_float"):
-                value, config_len = generate_length_invalid(field, rule)
-                config_val = "整数" if rule == "length_int" else "小数"
-                if value:
-                    row[field.en_name] = value
-                    row[
-                        "case_name"] = f"【{field.cn_name}】【{field.en_name}】长度校验，配置{config_val}长度{config_len}，生成长度{config_len + 1}"
-            elif rule in ("decimal_nine", "decimal_nine_max", "decimal_nine_min", "decimal_zero", "decimal_zero_min",
-                          "decimal_zero_max"):
-                value = generate_decimal_invalid(field, rule)
-                if value:
-                    row[field.en_name] = value
-                    row["case_name"] = f"【{field.cn_name}】【{field.en_name}】边界值校验校验，配置长度{field.length}，生成值{value}"
-            elif rule == "enum":
-                if field.enum:
-                    try:
-                        length = int(field.length)
-                    except Exception:
-                        raise ValueError(f"{field.cn_name}枚举值长度异常")
-                    invalid = random_enum_invalid(field.enum, length)
-                    row[field.en_name] = invalid
-                    row["case_name"] = f"【{field.cn_name}】【{field.en_name}】枚举值校验，配置枚举值为[{field.enum}]，生成枚举值{invalid}"
-                else:
-                    if not field.length:
-                        row["case_name"] = f"【{field.cn_name}】【{field.en_name}】接口文档的长度项和枚举值项均为空，请检查"
-            else:
-                continue
-            if row.get("case_name"):
-                base_array[idx] = row
-                idx += 1
-    return base_array[:idx].tolist()
+        cases.extend(generate_field_cases(field, rules))
+    return cases
 
 
 # =============================
 # Excel导出
 # =============================
 
-def export_excel(cases: List[Dict[str, Any]], fields: List[Field], output_file: str):
-    # 父字段(list/array)不作为导出行
-    export_fields = [f for f in fields if (f.data_type or "").lower() not in ["list", "array"]]
-
-    columns = ["case_name"] + [f.en_name for f in export_fields]
-
-    df = pd.DataFrame(cases)
-
-    for col in columns:
-        if col not in df.columns:
-            df[col] = ""
-
-    df = df[columns]
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
 
-    # 以case_name作为列标题进行转置
-    df.set_index("case_name", inplace=True)
 
-    df = df.T
+def export_cases_xlsx(cases: List[GeneratedCase], fields: List[Field], base_values: Dict[str, Any], output_file: str):
+    """
+    流式写出（write-only）：第一行为场景名称，第二行为 Body 标识，其后每个字段一行，每个场景一列。
 
-    # 第一列作为字段名
-    df.index.name = ""
+    每行先填充基础报文值，再覆盖修改该字段的场景列，内存占用只与单行宽度相关。
+    """
+    from openpyxl import Workbook
+    # 父字段(list/array)不作为导出行
+    export_fields = [f for f in fields if (f.data_type or "").lower() not in ["list", "array"]]
 
-    df = df.reset_index()
+    overrides: Dict[str, Dict[int, Any]] = {}
+    for col, case in enumerate(cases, start=1):
+        if case.en_name is not None:
+            overrides.setdefault(case.en_name, {})[col] = case.value
 
-    # 插入 Body 行（表头第二行第一列）
-    # body_row = {col: "" for col in df.columns}
-    # body_row[""] = "Body"
-    # df = pd.concat([pd.DataFrame([body_row]), df], ignore_index=True)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append([""] + [case.case_name for case in cases])
+    ws.append(["Body"] + [None] * len(cases))
+    for field in export_fields:
+        row = [field.en_name] + [_export_value(base_values.get(field.en_name))] * len(cases)
+        for col, value in overrides.get(field.en_name, {}).items():
+            row[col] = _export_value(value)
+        ws.append(row)
+    wb.save(output_file)
 
-    body_row = pd.Series([None] * len(df.columns), index=df.columns)
-    body_row.iloc[0] = "Body"
-    df = pd.concat([body_row.to_frame().T, df], ignore_index=True)
 
-    df.to_excel(output_file, index=False)
+def build_test_data_file(input_excel: str, output_excel: str, rules: List[str], base_json: Dict[str, Any]) -> int:
+    """读取接口文档模板、生成场景并导出 xlsx（在进程池子进程中执行），返回生成的场景数量。"""
+    fields = read_excel_template(input_excel)
+    cases = generate_cases(fields, expand_rules(rules))
+    export_cases_xlsx(cases, fields, flatten_base_json(base_json), output_excel)
+    return len(cases)
 
 
 async def generate_test_data(input_excel: str, output_excel: str, rules: List[str], json_message: Union[str, dict],
-                             create_id: int):
+                             create_id: int, job: Optional[BackgroundJob] = None) -> Dict[str, Any]:
+    """
+    根据接口文档模板生成测试数据文件，并回写生成记录状态（1：生成中，2：失败，3：成功）。
+
+    :param job: 后台任务句柄，不为空时上报进度。
+    :return: 生成结果摘要。
+    :raises Exception: 生成失败时记录失败状态后抛出原异常。
+    """
     await AUTOTEST_API_DATA_CREATE_CRUD.update_data_create(
         data_in=(
             AutoTestApiDataCreateUpdate(
@@ -344,25 +390,17 @@ async def generate_test_data(input_excel: str, output_excel: str, rules: List[st
             )
         )
     )
-    if "length" in rules:
-        append_rules = ["length_int", "length_float"]
-        rules.extend(append_rules)
-    if "decimal" in rules:
-        append_rules = ["decimal_nine", "decimal_nine_max", "decimal_nine_min", "decimal_zero", "decimal_zero_min",
-                        "decimal_zero_max", ]
-        rules.extend(append_rules)
-    if "required" in rules:
-        append_rules = ["required_", "required_null"]
-        rules.extend(append_rules)
+    if job:
+        await job.update(10, "正在生成测试数据")
     try:
-        fields = read_excel_template(input_excel)
         if isinstance(json_message, dict):
             base_json = json_message
         else:
             base_json = json.loads(json_message)
-        cases = generate_cases_np(fields, rules, base_json)
-        export_excel(cases, fields, output_excel)
-        # print("成功")
+        case_count = await sync_to_process(
+            build_test_data_file, input_excel, output_excel, rules, base_json,
+            max_workers=PROJECT_CONFIG.PROCESS_POOL_MAX_WORKERS,
+        )
         await AUTOTEST_API_DATA_CREATE_CRUD.update_data_create(
             data_in=(
                 AutoTestApiDataCreateUpdate(
@@ -373,7 +411,6 @@ async def generate_test_data(input_excel: str, output_excel: str, rules: List[st
             )
         )
     except Exception as e:
-        #     print(e)
         await AUTOTEST_API_DATA_CREATE_CRUD.update_data_create(
             data_in=(
                 AutoTestApiDataCreateUpdate(
@@ -383,6 +420,8 @@ async def generate_test_data(input_excel: str, output_excel: str, rules: List[st
                 )
             )
         )
+        raise
+    return {"create_id": create_id, "case_count": case_count}
 
 
 if __name__ == "__main__":
@@ -6,15 +6,17 @@
 @Module  : autotest_xlsx_engine
 @DateTime: 2026/4/10 15:31
 """
-import asyncio
+from __future__ import annotations
+
 import re
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
-from openpyxl import Workbook, load_workbook
+from backend.common import sync_to_process
+from backend.configure import PROJECT_CONFIG
 
-executor = ThreadPoolExecutor(max_workers=2)
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def validate_excel_structure(sheets: dict):
@@ -148,6 +150,7 @@ def parse_kv_string(text, requests_body_key):
 
 
 def parse_sheet_fast(df: pd.DataFrame, sheet_name, requests_body_key):
+    import pandas as pd
     values = df.values
 
     scene_names = values[0, 1:]
@@ -242,11 +245,6 @@ def parse_sheet_fast(df: pd.DataFrame, sheet_name, requests_body_key):
     return result, errors
 
 
-async def parse_sheet_async(df, sheet_name, requests_body_key):
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(executor, parse_sheet_fast, df, sheet_name, requests_body_key)
-
-
 # async def save_case_sheet(save_neo_name: Path, save_file_name: Path, sheet_name: str):
 #     df = pd.read_excel(save_file_name, sheet_name=0)
 #     if save_neo_name.is_file():
@@ -256,8 +254,10 @@ async def parse_sheet_async(df, sheet_name, requests_body_key):
 #         with pd.ExcelWriter(str(save_neo_name), engine="openpyxl", mode="w") as writer:
 #             df.to_excel(writer, sheet_name=sheet_name, index=False)
 #     return
-async def save_case_sheet(save_neo_name: Path, save_file_name: Path, sheet_name: str):
-    source_wb = load_workbook(save_file_name)
+def copy_case_sheet(save_neo_name: Path, save_file_name: Path, sheet_name: str):
+    from openpyxl import Workbook, load_workbook
+    # 源文件只读流式遍历，不构建完整的单元格对象模型
+    source_wb = load_workbook(save_file_name, read_only=True)
     source_ws = source_wb[source_wb.sheetnames[0]]
     if save_neo_name.is_file():
         target_wb = load_workbook(save_neo_name)
@@ -270,9 +270,18 @@ async def save_case_sheet(save_neo_name: Path, save_file_name: Path, sheet_name:
     target_ws = target_wb.create_sheet(sheet_name)
     for row in source_ws.values:
         target_ws.append(row)
+    source_wb.close()
     target_wb.save(save_neo_name)
 
 
+async def save_case_sheet(save_neo_name: Path, save_file_name: Path, sheet_name: str):
+    """将上传文件的首个 sheet 合并进用例汇总文件（在进程池中执行）。"""
+    await sync_to_process(
+        copy_case_sheet, save_neo_name, save_file_name, sheet_name,
+        max_workers=PROJECT_CONFIG.PROCESS_POOL_MAX_WORKERS,
+    )
+
+
 async def save_upload_file(upload_file, destination: Path):
     with destination.open("wb") as buffer:
         while True:
@@ -283,7 +292,8 @@ async def save_upload_file(upload_file, destination: Path):
     return
 
 
-async def xlsx_to_json_async(file_path: str, requests_body_key: dict, first_sheet_only: bool = False):
+def xlsx_to_json(file_path: str, requests_body_key: dict, first_sheet_only: bool = False):
+    import pandas as pd
     if first_sheet_only:
         df = pd.read_excel(file_path, sheet_name=0, header=None)
         sheets = {"sheet1": df}
@@ -292,19 +302,13 @@ async def xlsx_to_json_async(file_path: str, requests_body_key: dict, first_shee
     validate_result = validate_excel_structure(sheets)
     if not validate_result["valid"]:
         return validate_result
-    tasks = [
-        parse_sheet_async(df, sheet_name, requests_body_key)
-        for sheet_name, df in sheets.items()
-        if not df.empty
-    ]
 
-    # for sheet_name, df in sheets.items():
-    #     tasks.append(parse_sheet_async(df))
-
-    results = await asyncio.gather(*tasks)
     final_data = {}
     all_error = []
-    for (sheet_name, _), (data, errors) in zip(sheets.items(), results):
+    for sheet_name, df in sheets.items():
+        if df.empty:
+            continue
+        data, errors = parse_sheet_fast(df, sheet_name, requests_body_key)
         final_data[sheet_name] = data
         all_error.extend(errors)
     if all_error:
@@ -318,6 +322,14 @@ async def xlsx_to_json_async(file_path: str, requests_body_key: dict, first_shee
     }
 
 
+async def xlsx_to_json_async(file_path: str, requests_body_key: dict, first_sheet_only: bool = False):
+    """读取并解析 xlsx（在进程池中执行，不阻塞事件循环），返回 {valid, data} 或 {valid, error(s)}。"""
+    return await sync_to_process(
+        xlsx_to_json, file_path, requests_body_key, first_sheet_only,
+        max_workers=PROJECT_CONFIG.PROCESS_POOL_MAX_WORKERS,
+    )
+
+
 if __name__ == "__main__":
     # import time
     pass
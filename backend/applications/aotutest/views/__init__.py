@@ -11,6 +11,7 @@ from fastapi import APIRouter
 from .autotest_case_view import autotest_case
 from .autotest_step_view import autotest_step
 from .autotest_report_view import autotest_report
+from .autotest_analytics_view import autotest_analytics
 from .autotest_detail_view import autotest_detail
 from .autotest_project_view import autotest_project
 from .autotest_env_view import autotest_env
@@ -27,6 +28,7 @@ autotest.include_router(autotest_case, prefix="/case", tags=["用例相关"])
 autotest.include_router(autotest_step, prefix="/step", tags=["步骤相关"])
 autotest.include_router(autotest_report, prefix="/report", tags=["报告相关"])
 autotest.include_router(autotest_detail, prefix="/detail", tags=["明细相关"])
+autotest.include_router(autotest_analytics, prefix="/analytics", tags=["报告统计相关"])
 autotest.include_router(autotest_project, prefix="/project", tags=["应用相关"])
 autotest.include_router(autotest_env, prefix="/env", tags=["环境枚举相关"])
 autotest.include_router(autotest_env_config, prefix="/config", tags=["环境配置相关"])
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : autotest_analytics_view
+@DateTime: 2026/5/11 15:30
+"""
+import traceback
+
+from fastapi import APIRouter, Body
+
+from backend.applications.aotutest.schemas.autotest_analytics_schema import (
+    AutoTestApiAnalyticsTrendSelect,
+    AutoTestApiAnalyticsLeaderboardSelect,
+    AutoTestApiAnalyticsRebuild,
+)
+from backend.applications.aotutest.services.autotest_analytics_crud import AUTOTEST_API_ANALYTICS_CRUD
+from backend.configure import LOGGER
+from backend.core.responses import SuccessResponse, FailureResponse
+
+autotest_analytics = APIRouter()
+
+
+@autotest_analytics.post("/trend", summary="API自动化测试-报告按日趋势")
+async def get_report_trend(
+        select_in: AutoTestApiAnalyticsTrendSelect = Body(..., description="查询条件")
+):
+    try:
+        data = await AUTOTEST_API_ANALYTICS_CRUD.get_trend(select_in)
+        return SuccessResponse(message="查询成功", data=data, total=len(data))
+    except Exception as e:
+        LOGGER.error(f"查询报告趋势失败，异常描述: {e}\n{traceback.format_exc()}")
+        return FailureResponse(message=f"查询失败, 异常描述: {str(e)}")
+
+
+@autotest_analytics.post("/leaderboard", summary="API自动化测试-用例排行")
+async def get_case_leaderboard(
+        select_in: AutoTestApiAnalyticsLeaderboardSelect = Body(..., description="查询条件")
+):
+    try:
+        data = await AUTOTEST_API_ANALYTICS_CRUD.get_leaderboard(select_in)
+        return SuccessResponse(message="查询成功", data=data, total=len(data))
+    except Exception as e:
+        LOGGER.error(f"查询用例排行失败，异常描述: {e}\n{traceback.format_exc()}")
+        return FailureResponse(message=f"查询失败, 异常描述: {str(e)}")
+
+
+@autotest_analytics.post("/rebuild", summary="API自动化测试-重建报告日汇总")
+async def rebuild_report_rollups(
+        rebuild_in: AutoTestApiAnalyticsRebuild = Body(..., description="重建范围")
+):
+    try:
+        count = await AUTOTEST_API_ANALYTICS_CRUD.rebuild(
+            date_from=rebuild_in.date_from,
+            date_to=rebuild_in.date_to,
+            project_id=rebuild_in.project_id,
+        )
+        return SuccessResponse(message="重建成功", data={"rows": count}, total=count)
+    except Exception as e:
+        LOGGER.error(f"重建报告日汇总失败，异常描述: {e}\n{traceback.format_exc()}")
+        return FailureResponse(message=f"重建失败, 异常描述: {str(e)}")
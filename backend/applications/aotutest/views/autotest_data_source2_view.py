@@ -6,32 +6,34 @@
 @Module  : autotest_data_source2_view
 @DateTime: 2026/4/10 15:35
 """
-import hashlib
 import json
 import os.path
 import shutil
 import traceback
-import uuid
 from datetime import date, datetime
 from pathlib import Path
 from typing import List
 from urllib.parse import quote
 
-import aiofiles.os as aos
 from fastapi import APIRouter, File, Form
 from fastapi import UploadFile
-from starlette.responses import StreamingResponse
+from starlette.requests import Request
 
 from backend.applications.aotutest.models.autotest_model import AutoTestApiStepInfo
 from backend.applications.aotutest.schemas.autotest_data_generate_schema import AutoTestApiDataCreateCreate
 from backend.applications.aotutest.schemas.autotest_data_source_schema import AutoTestDataSourceCreate
 from backend.applications.aotutest.schemas.autotest_step_schema import AutoTestApiStepUpdate
-from backend.applications.aotutest.services.autotest_data_source2_crud import AUTOTEST_API_DATA_CREATE_CRUD, AUTOTEST_API_DATA_SOURCE_CRUD
+from backend.applications.aotutest.services.autotest_data_source2_crud import (
+    AUTOTEST_API_DATA_CREATE_CRUD,
+    AUTOTEST_API_DATA_SOURCE_CRUD,
+    remove_unreferenced_upload,
+)
 from backend.applications.aotutest.services.autotest_step_crud import AUTOTEST_API_STEP_CRUD
 from backend.applications.aotutest.services.autotest_xlsx_engine import save_case_sheet, xlsx_to_json_async
 from backend.configure import LOGGER
 from backend.configure import PROJECT_CONFIG
 from backend.core.responses import FailureResponse, SuccessResponse
+from backend.services import BackgroundJob, submit_background_job
 from backend.services.file_transfer import FileTransfer
 
 autotest_data_source2 = APIRouter()
@@ -44,18 +46,6 @@ async def replace_json_key(json_str, json_key_mapping):
     return new_json_str
 
 
-async def calc_file_hash(file: UploadFile, case_id, step_id, chunk_size: int = 8192):
-    sha256 = hashlib.sha256()
-    while True:
-        chunk = await file.read(chunk_size)
-        if not chunk:
-            break
-        sha256.update(chunk)
-    await file.seek(0)
-
-    return sha256.hexdigest() + f"_{case_id}_{step_id}"
-
-
 @autotest_data_source2.post(path="/upload_step", summary="步骤数据源上传")
 async def upload_file_step(
         case_id: int = Form(..., title="案例ID"),
@@ -67,7 +57,15 @@ async def upload_file_step(
 ):
     if not file.filename.endswith(".xlsx"):
         return FailureResponse(message=f"仅支持xlsx格式文件")
-    file_hash = await calc_file_hash(file, case_id, step_id)
+    # 按内容寻址保存，写入时同步计算文件哈希，重复上传的文件不会重复占用磁盘
+    save_state, save_file_name, file_digest = await FileTransfer.save_upload_file_object(
+        upload_file=file,
+        check_filetype=False,
+        check_filesize=False,
+    )
+    if not save_state:
+        return FailureResponse(message=f"交易失败，文件保存失败: {save_file_name}")
+    file_hash = f"{file_digest}_{case_id}_{step_id}"
     instance_hash = await AUTOTEST_API_DATA_SOURCE_CRUD.get_by_hash(file_hash=file_hash)
     instance_code = await AUTOTEST_API_DATA_SOURCE_CRUD.get_by_code(step_code=step_code)
     if not instance_hash:
@@ -75,15 +73,6 @@ async def upload_file_step(
         if not os.path.isdir(save_path):
             os.makedirs(save_path, exist_ok=True)
         save_neo_name = os.path.join(save_path, f"{case_code}.xlsx")
-        save_state, save_file_name = await FileTransfer.save_upload_file_chunks(
-            upload_file=file,
-            destination=save_path,
-            check_filetype=False,
-            check_filesize=False,
-            add_left_identifier=str(uuid.uuid4())
-        )
-        if not save_state:
-            return FailureResponse(message=f"交易失败，文件保存失败: {save_file_name}")
         await save_case_sheet(Path(save_neo_name), Path(save_file_name), step_name)
         try:
             step_info: AutoTestApiStepInfo = await AutoTestApiStepInfo.filter(
@@ -126,8 +115,7 @@ async def upload_file_step(
                 if instance_code:
                     if not instance_code.file_hash.endswith("X"):
                         # os.remove(instance_code.file_path)
-                        if await aos.path.exists(instance_code.file_hash):
-                            await aos.remove(instance_code.file_path)
+                        await remove_unreferenced_upload(instance_code.file_path)
 
                 return SuccessResponse(message="交易成功", data=data)
             else:
@@ -148,7 +136,15 @@ async def upload_file_steps(
     steps_data = json.loads(case_info)
     case_id = steps_data.get("case").get("case_id")
     case_code = steps_data.get("case").get("case_code")
-    file_hash = await calc_file_hash(file, case_id, "X")
+    # 按内容寻址保存，写入时同步计算文件哈希，重复上传的文件不会重复占用磁盘
+    save_state, save_file_name, file_digest = await FileTransfer.save_upload_file_object(
+        upload_file=file,
+        check_filetype=False,
+        check_filesize=False,
+    )
+    if not save_state:
+        return FailureResponse(message=f"交易失败，文件保存失败: {save_file_name}")
+    file_hash = f"{file_digest}_{case_id}_X"
     instance_hash = await AUTOTEST_API_DATA_SOURCE_CRUD.get_by_hash(file_hash=file_hash)
     try:
         if not instance_hash:
@@ -156,18 +152,7 @@ async def upload_file_steps(
             if not os.path.isdir(save_path):
                 os.makedirs(save_path, exist_ok=True)
             save_neo_name = os.path.join(save_path, f"{case_code}.xlsx")
-            save_state, save_file_name = await FileTransfer.save_upload_file_chunks(
-                upload_file=file,
-                destination=save_path,
-                check_filetype=False,
-                check_filesize=False,
-                add_left_identifier=str(uuid.uuid4())
-            )
-            if not save_state:
-                return FailureResponse(message=f"交易失败，文件保存失败: {save_file_name}")
             shutil.copyfile(save_file_name, save_neo_name)
-        else:
-            save_file_name = instance_hash.file_path
         steps_info: List[AutoTestApiStepInfo] = await AutoTestApiStepInfo.filter(case_id=case_id, state__not=1).all()
         requests_body_key = {}
         for step_info in steps_info:
@@ -233,6 +218,7 @@ async def query_case_name(
 
 @autotest_data_source2.post(path="/download_step", summary="步骤数据源下载")
 async def download_file_step(
+        request: Request,
         step_code: str = Form(..., title="步骤CODE"),
         step_name: str = Form(..., title="步骤名称"),
         case_name: str = Form(..., title="脚本名称")
@@ -245,9 +231,9 @@ async def download_file_step(
         return FailureResponse(message="步骤对应文件不存在")
     today_str = date.today().strftime("%Y%m%d")
     file_name = quote(f"{step_name}_{case_name}_{today_str}.xlsx".encode('utf-8'))
-    return StreamingResponse(
-        content=FileTransfer.iter_download_file_chunks(download_file=download_path),
-        media_type="application/octet-stream",
+    return FileTransfer.download_file_response(
+        request=request,
+        download_file=download_path,
         headers={
             "fileName": file_name,
             "Content-Disposition": f"attachment; filename*=utf-8''{file_name}"
@@ -257,6 +243,7 @@ async def download_file_step(
 
 @autotest_data_source2.post(path="/download_case", summary="案例数据源下载")
 async def download_file_step(
+        request: Request,
         case_id: int = Form(..., title="案例ID"),
         case_code: str = Form(..., title="案例CODE"),
         case_name: str = Form(..., title="脚本名称")
@@ -266,9 +253,9 @@ async def download_file_step(
         return FailureResponse(message="案例对应文件不存在")
     today_str = date.today().strftime("%Y%m%d")
     file_name = quote(f"{case_name}_{today_str}.xlsx".encode('utf-8'))
-    return StreamingResponse(
-        content=FileTransfer.iter_download_file_chunks(download_file=file_path),
-        media_type="application/octet-stream",
+    return FileTransfer.download_file_response(
+        request=request,
+        download_file=file_path,
         headers={
             "fileName": file_name,
             "Content-Disposition": f"attachment; filename*=utf-8''{file_name}"
@@ -278,6 +265,7 @@ async def download_file_step(
 
 @autotest_data_source2.post(path="/template", summary="测试模板下载")
 async def download_file_temple(
+        request: Request,
         file_type: str = Form(..., title="模板类型")
 ):
     temple_type = {
@@ -290,9 +278,9 @@ async def download_file_temple(
     if not os.path.isfile(file_path):
         return FailureResponse(message="模板对应文件不存在")
     file_name = quote(temple_type.get(file_type).encode('utf-8'))
-    return StreamingResponse(
-        content=FileTransfer.iter_download_file_chunks(download_file=file_path),
-        media_type="application/octet-stream",
+    return FileTransfer.download_file_response(
+        request=request,
+        download_file=file_path,
         headers={
             "fileName": file_name,
             "Content-Disposition": f"attachment; filename*=utf-8''{file_name}"
@@ -315,7 +303,15 @@ async def upload_file_create(
         2: "enum",
         3: "decimal",
     }
-    file_hash = await calc_file_hash(file, case_id, f"{rules_list}_{step_id}")
+    # 按内容寻址保存，写入时同步计算文件哈希，重复上传的文件不会重复占用磁盘
+    save_state, save_file_name, file_digest = await FileTransfer.save_upload_file_object(
+        upload_file=file,
+        check_filetype=False,
+        check_filesize=False,
+    )
+    if not save_state:
+        return FailureResponse(message=f"交易失败，文件保存失败: {save_file_name}")
+    file_hash = f"{file_digest}_{case_id}_{rules_list}_{step_id}"
     try:
         instance_hash = await AUTOTEST_API_DATA_CREATE_CRUD.get_by_hash(file_hash=file_hash)
         if instance_hash:
@@ -330,16 +326,6 @@ async def upload_file_create(
         save_path = os.path.join(PROJECT_CONFIG.OUTPUT_UPLOAD_DIR, str(case_id))
         if not os.path.isdir(save_path):
             os.makedirs(save_path, exist_ok=True)
-        save_state, save_file_name = await FileTransfer.save_upload_file_chunks(
-            upload_file=file,
-            destination=save_path,
-            check_filetype=False,
-            check_filesize=False,
-            add_left_identifier=str(uuid.uuid4())
-        )
-
-        if not save_state:
-            return FailureResponse(message=f"交易失败，文件保存失败: {save_file_name}")
         today_str = datetime.now().strftime("%Y%m%d%H%M%S")
         # 步骤名称 - 任务提交时间yyyymmdd
         output_excel = os.path.join(save_path, f"{step_name}-{today_str}.xlsx")
@@ -355,22 +341,29 @@ async def upload_file_create(
             )
         )
         rules = [rules_dict.get(i) for i in list(map(int, rules_list.split(",")))]
-        # from celery_scheduler.tasks.task_create_data import task_create_autotest_data
-        # task_create_autotest_data.delay(save_file_name, output_excel, rules, base_message, instance_create.id)
+        # 生成在后台任务中执行（读模板/生成/导出投递到进程池），接口立即返回，
+        # 前端通过 /query_create 的生成状态或 /base/job/get 的任务进度获取结果
         from backend.applications.aotutest.services.autotest_xlsx_create import generate_test_data
-        await generate_test_data(
-            input_excel=save_file_name,
-            output_excel=output_excel,
-            rules=rules,
-            json_message=base_message,
-            create_id=instance_create.id)
-        return SuccessResponse(message="交易成功，任务已提交")
+
+        async def runner(job: BackgroundJob):
+            return await generate_test_data(
+                input_excel=save_file_name,
+                output_excel=output_excel,
+                rules=rules,
+                json_message=base_message,
+                create_id=instance_create.id,
+                job=job,
+            )
+
+        job = await submit_background_job(job_type="api_data_generate", runner=runner)
+        return SuccessResponse(message="交易成功，任务已提交", data=job.to_dict())
     except Exception as e:
         return FailureResponse(message=f"交易异常，{e}")
 
 
 @autotest_data_source2.post(path="/download_api_data", summary="接口数据下载")
 async def download_file_create(
+        request: Request,
         create_code: str = Form(..., title="创建CODE"),
 ):
     instance_hash = await AUTOTEST_API_DATA_CREATE_CRUD.get_by_code(create_code=create_code)
@@ -384,9 +377,9 @@ async def download_file_create(
     if not os.path.isfile(file_path):
         return FailureResponse(message="对应文件不存在")
     file_name = quote(file_name.encode('utf-8'))
-    return StreamingResponse(
-        content=FileTransfer.iter_download_file_chunks(download_file=file_path),
-        media_type="application/octet-stream",
+    return FileTransfer.download_file_response(
+        request=request,
+        download_file=file_path,
         headers={
             "fileName": file_name,
             "Content-Disposition": f"attachment; filename*=utf-8''{file_name}"
@@ -455,7 +448,7 @@ async def delete_file_create(
         instance.file_hash = ""
         await instance.save()
         # os.remove(instance.file_path)
-        await aos.remove(instance.file_path)
+        await remove_unreferenced_upload(instance.file_path, exclude_source_ids=[instance.id])
     return SuccessResponse(message="删除成功", data=data)
 
 # @autotest_data_source2.post(path="/autotest/delete-source-create", summary="测试步骤删除同步数据源上传记录删除")
@@ -6,7 +6,6 @@
 @Module  : autotest_data_source_view.py
 @DateTime: 2026/3/6
 """
-import hashlib
 import io
 import os.path
 import traceback
@@ -14,8 +13,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from urllib.parse import quote
 
-import pandas as pd
-from fastapi import APIRouter, UploadFile, File, Form, Body, Query
+from fastapi import APIRouter, UploadFile, File, Form, Body, Query, Request
 from starlette.responses import StreamingResponse
 from tortoise.expressions import Q
 
@@ -26,9 +24,8 @@ from backend.applications.aotutest.schemas.autotest_data_source_schema import (
     AutoTestDataSourceSelect,
 )
 from backend.applications.aotutest.services.autotest_case_crud import AUTOTEST_API_CASE_CRUD
-from backend.applications.aotutest.services.autotest_data_source_crud import AUTOTEST_DATA_SOURCE_CRUD
+from backend.applications.aotutest.services.autotest_data_source_crud import AUTOTEST_DATA_SOURCE_CRUD, get_or_parse_dataset
 from backend.applications.aotutest.services.autotest_data_source_parser import (
-    _dataframe_to_matrix,
     parse_dataframe_matrix_async,
     parse_xlsx_first_sheet_async,
     parse_xlsx_to_parsed_data_async,
@@ -52,7 +49,7 @@ from backend.core.responses import (
     NotFoundResponse,
 )
 from backend.enums import AutoTestStepType
-from backend.services import CTX_USER_ID
+from backend.services import CTX_USER_ID, BackgroundJob, submit_background_job
 
 autotest_data_source = APIRouter()
 
@@ -325,6 +322,7 @@ async def export_data_source_xlsx(
         step_code: str = Query(..., description="步骤标识代码"),
 ):
     """从数据库 dataframe 字段导出 xlsx（不依赖前端当前表格状态）。"""
+    import pandas as pd
     try:
         instance = await AUTOTEST_DATA_SOURCE_CRUD.get_by_case_step(
             case_id=case_id,
@@ -382,8 +380,8 @@ async def get_dataset_scenario_info(
 
 
 @autotest_data_source.get("/import_template_xlsx", summary="API自动化测试-下载HTTP步骤数据集导入模板xlsx")
-async def download_http_step_dataset_import_template():
-    """分发仓库内置于 output/template 的 xlsx；流式读取，不加 UTF-8 BOM，避免损坏二进制格式。"""
+async def download_http_step_dataset_import_template(request: Request):
+    """分发仓库内置于 output/template 的 xlsx；以文件响应发送，支持断点续传与 ETag 协商缓存。"""
     filepath = os.path.normpath(os.path.join(PROJECT_CONFIG.OUTPUT_DIR, "template", "测试用例HTTP请求步骤数据源模板.xlsx"))
     if not filepath.startswith(PROJECT_CONFIG.OUTPUT_DIR) or not os.path.isfile(filepath):
         return NotFoundResponse(message="导入模板文件不存在，请确认已部署 output/template 下模板文件")
@@ -392,19 +390,174 @@ async def download_http_step_dataset_import_template():
     headers = {
         "Content-Disposition": f"attachment; filename*=UTF-8''{quoted_name}"
     }
-    return StreamingResponse(
-        FileTransfer.iter_download_file_chunks(download_file=filepath, add_bom=False),
+    return FileTransfer.download_file_response(
+        request=request,
+        download_file=filepath,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers=headers,
     )
 
 
+async def _import_single_step_dataset(
+        job: Optional[BackgroundJob],
+        case_id: int,
+        step_id: int,
+        step_code: str,
+        file_name: str,
+        file_path: str,
+        file_hash: str,
+        file_desc: Optional[str],
+) -> AutoTestApiDataSourceInfo:
+    """
+    解析单步骤数据驱动文件（进程池中执行）并创建/更新数据源。
+
+    :param job: 后台任务句柄，不为空时上报进度。
+    :raises FileNotFoundError: 文件不存在。
+    :raises ValueError: 解析失败或解析结果为空。
+    :raises NotFoundException: 用例不存在。
+    """
+    async def _parse_first_sheet() -> Dict[str, Any]:
+        parsed_data, parsed_names, parsed_dataframe = await parse_xlsx_first_sheet_async(file_path)
+        return {"dataset": parsed_data, "dataset_names": parsed_names, "dataframe": parsed_dataframe}
+
+    if job:
+        await job.update(20, "正在解析数据驱动文件")
+    try:
+        # 内容相同的文件直接复用缓存的解析结果
+        parsed: Dict[str, Any] = await get_or_parse_dataset("first_sheet", file_hash, _parse_first_sheet)
+    except ValueError as e:
+        raise ValueError(f"解析失败: {str(e)}")
+    step_data, dataset_names, dataframe = parsed["dataset"], parsed["dataset_names"], parsed["dataframe"]
+    if not step_data:
+        raise ValueError("解析结果为空（第 1 个 sheet 无有效数据）")
+
+    if job:
+        await job.update(70, f"解析完成，共 {len(dataset_names)} 个数据集，正在保存数据源")
+    case_instance = await AUTOTEST_API_CASE_CRUD.get_by_id(case_id=case_id, on_error=True)
+    user_id = CTX_USER_ID.get(0)
+    created_user = str(user_id) if user_id else None
+    instance = await AUTOTEST_DATA_SOURCE_CRUD.create_data_sources_from_parsed(
+        case_id=case_id,
+        case_code=case_instance.case_code,
+        step_id=step_id,
+        step_code=step_code,
+        file_name=file_name or None,
+        file_path=file_path,
+        file_hash=file_hash or None,
+        file_desc=(file_desc or "")[:2048].strip() or None,
+        parsed_data=step_data,
+        dataset_names=dataset_names,
+        dataframe=dataframe,
+        created_user=created_user,
+    )
+    await _sync_step_data_source_meta(
+        case_id=case_id,
+        step_code=step_code,
+        file_name=file_name,
+        file_desc=file_desc,
+    )
+    return instance
+
+
+async def _import_batch_step_datasets(
+        job: Optional[BackgroundJob],
+        case_id: int,
+        case_code: str,
+        root_steps: List[Dict[str, Any]],
+        file_name: str,
+        file_path: str,
+        file_hash: str,
+        file_desc: Optional[str],
+) -> List[AutoTestApiDataSourceInfo]:
+    """
+    解析多步骤数据驱动文件（进程池中执行），按 sheet 顺序对应根步骤创建/更新数据源；单个 sheet 保存失败只记录日志。
+
+    :param job: 后台任务句柄，不为空时按 sheet 上报进度。
+    :raises FileNotFoundError: 文件不存在。
+    :raises ValueError: 解析失败或解析结果为空。
+    """
+    async def _parse_all_sheets() -> Dict[str, Any]:
+        parsed_data, _ = await parse_xlsx_to_parsed_data_async(file_path)
+        return parsed_data
+
+    if job:
+        await job.update(20, "正在解析数据驱动文件")
+    try:
+        # 内容相同的文件直接复用缓存的解析结果
+        full_parsed = await get_or_parse_dataset("all_sheets", file_hash, _parse_all_sheets)
+    except ValueError as e:
+        raise ValueError(f"解析失败: {str(e)}")
+    if not full_parsed:
+        raise ValueError("解析结果为空")
+
+    sheet_names = list(full_parsed.keys())
+    user_id = CTX_USER_ID.get(0)
+    created_user = str(user_id) if user_id else None
+    created: List[AutoTestApiDataSourceInfo] = []
+    for i, sheet_name in enumerate(sheet_names):
+        if job:
+            await job.update(60 + 40 * i // len(sheet_names), f"正在保存第 {i + 1}/{len(sheet_names)} 个 sheet 数据源")
+        step_data = full_parsed[sheet_name]
+        if not isinstance(step_data, dict):
+            continue
+        # 超出根步骤数量的 sheet 没有对应步骤，无法落库
+        if i >= len(root_steps) or not root_steps[i].get("step_id"):
+            LOGGER.warning(f"多步骤数据集上传跳过：未获取到 step_id，sheet_name={sheet_name}")
+            continue
+        step_id = root_steps[i].get("step_id")
+        step_code = (root_steps[i].get("step_code") or "").strip()
+        dataset_names = sorted(step_data.keys()) if step_data else []
+        try:
+            instance = await AUTOTEST_DATA_SOURCE_CRUD.create_data_sources_from_parsed(
+                case_id=case_id,
+                case_code=case_code or "",
+                step_id=int(step_id),
+                step_code=step_code,
+                file_name=file_name or None,
+                file_path=file_path,
+                file_hash=file_hash or None,
+                file_desc=(file_desc or "")[:2048].strip() or None,
+                parsed_data=step_data,
+                dataset_names=dataset_names,
+                dataframe=[],
+                created_user=created_user,
+            )
+            created.append(instance)
+            await _sync_step_data_source_meta(
+                case_id=case_id,
+                step_code=step_code,
+                file_name=file_name,
+                file_desc=file_desc,
+            )
+        except (NotFoundException, ParameterException) as e:
+            LOGGER.error(f"数据源保存失败 step_code={step_code}: {e.message}")
+        except (DataAlreadyExistsException, DataBaseStorageException) as e:
+            LOGGER.error(f"数据源保存失败 step_code={step_code}: {e.message}")
+        except Exception as e:
+            LOGGER.error(f"数据源保存失败 step_code={step_code}: {e}\n{traceback.format_exc()}")
+    if not created:
+        raise ValueError("未成功创建任何数据源记录")
+    return created
+
+
+def _summarize_data_source(instance: AutoTestApiDataSourceInfo) -> Dict[str, Any]:
+    """后台任务结果只保留数据源摘要（数据集明细可能很大，由前端按 data_source_id 再查询）。"""
+    return {
+        "data_source_id": instance.id,
+        "case_id": instance.case_id,
+        "step_id": instance.step_id,
+        "step_code": instance.step_code,
+        "dataset_names": instance.dataset_names,
+    }
+
+
 @autotest_data_source.post("/single_step_dataset_upload", summary="参数化驱动-单步骤数据集上传")
 async def single_step_dataset_upload(
         case_id: int = Form(..., description="用例ID"),
         step_id: str = Form(..., description="步骤ID"),
         step_code: str = Form(..., description="步骤标识代码"),
         file_desc: Optional[str] = Form(None, description="数据驱动文件描述"),
+        background: bool = Form(False, description="是否后台解析(为 True 时立即返回后台任务ID, 通过 /base/job/get 查询进度)"),
         file: UploadFile = File(..., description="单步骤数据驱动文件(仅支持.xlsx后缀, 单步骤模式仅读取第1个sheet页)"),
 ):
     if not file.filename.endswith(".xlsx"):
@@ -424,15 +577,12 @@ async def single_step_dataset_upload(
     if step_instance.step_type != AutoTestStepType.HTTP.value:
         return ParameterResponse(message="仅支持对HTTP请求步骤上传数据驱动文件")
 
-    destination = os.path.join(PROJECT_CONFIG.OUTPUT_UPLOAD_DIR, "autotest", str(case_id))
-    ok, path_or_error = await FileTransfer.save_upload_file_chunks(
+    # 按内容寻址保存，写入时同步计算文件哈希，内容相同的文件只保留一份
+    ok, path_or_error, file_hash = await FileTransfer.save_upload_file_object(
         upload_file=file,
-        destination=destination,
-        add_timestamp=False,
         check_filename=True,
         check_filetype=True,
         check_filesize=True,
-        add_left_identifier=step_code,
         upload_file_size="tiny",
     )
     if not ok:
@@ -441,42 +591,29 @@ async def single_step_dataset_upload(
     file_path = path_or_error
     file_name = (getattr(file, "filename", None) or "").strip()[:255]
 
-    file_hash = ""
-    try:
-        with open(file_path, "rb") as f:
-            file_hash = hashlib.sha256(f.read()).hexdigest()
-        file_hash = (file_hash or "")[:255]
-    except Exception as e:
-        LOGGER.warning(f"计算文件哈希失败: {e}")
+    import_kwargs: Dict[str, Any] = dict(
+        case_id=case_id,
+        step_id=int(step_id),
+        step_code=step_code,
+        file_name=file_name,
+        file_path=file_path,
+        file_hash=file_hash,
+        file_desc=file_desc,
+    )
+    if background:
+        async def runner(job: BackgroundJob) -> Dict[str, Any]:
+            instance = await _import_single_step_dataset(job=job, **import_kwargs)
+            return _summarize_data_source(instance)
+
+        job = await submit_background_job(job_type="single_step_dataset_upload", runner=runner)
+        return SuccessResponse(message="数据驱动文件已上传，正在后台解析", data=job.to_dict(), total=1)
 
     try:
-        step_data, dataset_names, dataframe = await parse_xlsx_first_sheet_async(file_path)
+        instance = await _import_single_step_dataset(job=None, **import_kwargs)
     except FileNotFoundError as e:
         return FailureResponse(message=str(e))
     except ValueError as e:
-        return BadReqResponse(message=f"解析失败: {str(e)}")
-
-    if not step_data:
-        return BadReqResponse(message="解析结果为空（第 1 个 sheet 无有效数据）")
-
-    try:
-        case_instance = await AUTOTEST_API_CASE_CRUD.get_by_id(case_id=case_id, on_error=True)
-        user_id = CTX_USER_ID.get(0)
-        created_user = str(user_id) if user_id else None
-        instance = await AUTOTEST_DATA_SOURCE_CRUD.create_data_sources_from_parsed(
-            case_id=case_id,
-            case_code=case_instance.case_code,
-            step_id=int(step_id),
-            step_code=step_code,
-            file_name=file_name or None,
-            file_path=file_path,
-            file_hash=file_hash or None,
-            file_desc=(file_desc or "")[:2048].strip() or None,
-            parsed_data=step_data,
-            dataset_names=dataset_names,
-            dataframe=dataframe,
-            created_user=created_user,
-        )
+        return BadReqResponse(message=str(e))
     except (NotFoundException, ParameterException) as e:
         return ParameterResponse(message=str(e.message))
     except (DataAlreadyExistsException, DataBaseStorageException) as e:
@@ -485,13 +622,6 @@ async def single_step_dataset_upload(
         LOGGER.error(f"数据源保存失败: {e}\n{traceback.format_exc()}")
         return FailureResponse(message=str(e))
 
-    await _sync_step_data_source_meta(
-        case_id=case_id,
-        step_code=step_code,
-        file_name=file_name,
-        file_desc=file_desc,
-    )
-
     data = await _serialize_data_source(instance)
     return SuccessResponse(message="单步骤数据集上传成功，已创建数据源并同步缓存", data=data, total=1)
 
@@ -500,6 +630,7 @@ async def single_step_dataset_upload(
 async def batch_step_dataset_upload(
         case_id: int = Form(..., description="用例ID"),
         file_desc: Optional[str] = Form(None, description="数据驱动文件场景描述"),
+        background: bool = Form(False, description="是否后台解析(为 True 时立即返回后台任务ID, 通过 /base/job/get 查询进度)"),
         file: UploadFile = File(..., description="xlsx 文件（所有 sheet 均为数据集，按 sheet 顺序对应根步骤）"),
 ):
     if not case_id:
@@ -527,11 +658,9 @@ async def batch_step_dataset_upload(
             LOGGER.error(f"查询用例失败: {e}\n{traceback.format_exc()}")
             return FailureResponse(message=str(e))
 
-    destination = f"{case_id}/batch"
-    ok, path_or_error = await FileTransfer.save_upload_file_chunks(
+    # 按内容寻址保存，写入时同步计算文件哈希，内容相同的文件只保留一份
+    ok, path_or_error, file_hash = await FileTransfer.save_upload_file_object(
         upload_file=file,
-        destination=destination,
-        add_timestamp=True,
         check_filename=True,
         check_filetype=True,
         check_filesize=True,
@@ -543,82 +672,31 @@ async def batch_step_dataset_upload(
     file_path = path_or_error
     file_name = (getattr(file, "filename", None) or "").strip()[:255]
 
-    file_hash = ""
-    try:
-        with open(file_path, "rb") as f:
-            file_hash = hashlib.sha256(f.read()).hexdigest()
-        file_hash = (file_hash or "")[:255]
-    except Exception as e:
-        LOGGER.warning(f"计算文件哈希失败: {e}")
+    import_kwargs: Dict[str, Any] = dict(
+        case_id=case_id,
+        case_code=case_code,
+        root_steps=root_steps,
+        file_name=file_name,
+        file_path=file_path,
+        file_hash=file_hash,
+        file_desc=file_desc,
+    )
+    if background:
+        async def runner(job: BackgroundJob) -> List[Dict[str, Any]]:
+            instances = await _import_batch_step_datasets(job=job, **import_kwargs)
+            return [_summarize_data_source(instance) for instance in instances]
+
+        job = await submit_background_job(job_type="batch_step_dataset_upload", runner=runner)
+        return SuccessResponse(message="数据驱动文件已上传，正在后台解析", data=job.to_dict(), total=1)
 
     try:
-        full_parsed, _ = await parse_xlsx_to_parsed_data_async(file_path)
+        instances = await _import_batch_step_datasets(job=None, **import_kwargs)
     except FileNotFoundError as e:
         return FailureResponse(message=str(e))
     except ValueError as e:
-        return BadReqResponse(message=f"解析失败: {str(e)}")
-
-    if not full_parsed:
-        return BadReqResponse(message="解析结果为空")
-
-    sheet_names = list(full_parsed.keys())
-    user_id = CTX_USER_ID.get(0)
-    created_user = str(user_id) if user_id else None
-    created: List[Dict[str, Any]] = []
-    for i, sheet_name in enumerate(sheet_names):
-        step_data = full_parsed[sheet_name]
-        if not isinstance(step_data, dict):
-            continue
-        dataset_names = sorted(step_data.keys()) if step_data else []
-        dataframe = []
-        if i < len(root_steps):
-            step_id = root_steps[i].get("step_id")
-            step_code = (root_steps[i].get("step_code") or "").strip()
-        else:
-            step_id = None
-            step_code = str(sheet_name).strip()[:64] if sheet_name else f"sheet_{i}"
-
-            try:
-                df = pd.read_excel(file_path, sheet_name=i, header=None, engine="openpyxl")
-                if not df.empty:
-                    dataframe = _dataframe_to_matrix(df)
-            except Exception as e:
-                LOGGER.warning(f"读取 sheet 原始二维矩阵失败(sheet_index={i}, step_code={step_code}): {e}")
-
-        try:
-            if not step_id:
-                LOGGER.warning(f"多步骤数据集上传跳过：未获取到 step_id，step_code={step_code}")
-                continue
-            instance = await AUTOTEST_DATA_SOURCE_CRUD.create_data_sources_from_parsed(
-                case_id=case_id,
-                case_code=case_code or "",
-                step_id=int(step_id),
-                step_code=step_code,
-                file_name=file_name or None,
-                file_path=file_path,
-                file_hash=file_hash or None,
-                file_desc=(file_desc or "")[:2048].strip() or None,
-                parsed_data=step_data,
-                dataset_names=dataset_names,
-                dataframe=dataframe,
-                created_user=created_user,
-            )
-            created.append(await _serialize_data_source(instance))
-            await _sync_step_data_source_meta(
-                case_id=case_id,
-                step_code=step_code,
-                file_name=file_name,
-                file_desc=file_desc,
-            )
-        except (NotFoundException, ParameterException) as e:
-            LOGGER.error(f"数据源保存失败 step_code={step_code}: {e.message}")
-        except (DataAlreadyExistsException, DataBaseStorageException) as e:
-            LOGGER.error(f"数据源保存失败 step_code={step_code}: {e.message}")
-        except Exception as e:
-            LOGGER.error(f"数据源保存失败 step_code={step_code}: {e}\n{traceback.format_exc()}")
+        return BadReqResponse(message=str(e))
 
-    if not created:
-        return BadReqResponse(message="未成功创建任何数据源记录")
+    created: List[Dict[str, Any]] = [await _serialize_data_source(instance) for instance in instances]
     return SuccessResponse(
         message=f"多步骤数据集上传成功，共 {len(created)} 条数据源",
         data=created,
@@ -51,6 +51,7 @@ async def create_step_detail(
             },
             replace_fields={"id": "detail_id"}
         )
+        await AUTOTEST_API_DETAIL_CRUD.inflate_payloads([data])
         LOGGER.info(f"新增明细成功, 结果明细: {data}")
         return SuccessResponse(message="新增成功", data=data, total=1)
     except (NotFoundException, ParameterException) as e:
@@ -83,6 +84,7 @@ async def delete_report(
             },
             replace_fields={"id": "detail_id"}
         )
+        await AUTOTEST_API_DETAIL_CRUD.inflate_payloads([data])
         LOGGER.info(f"按id或code删除明细成功, 结果明细: {data}")
         return SuccessResponse(message="删除成功", data=data, total=1)
     except (NotFoundException, ParameterException) as e:
@@ -107,6 +109,7 @@ async def update_report(
             },
             replace_fields={"id": "detail_id"}
         )
+        await AUTOTEST_API_DETAIL_CRUD.inflate_payloads([data])
         LOGGER.info(f"按id或code更新明细成功, 结果明细: {data}")
         return SuccessResponse(message="更新成功", data=data, total=1)
     except (NotFoundException, ParameterException) as e:
@@ -142,6 +145,8 @@ async def get_step_detail(
             },
             replace_fields={"id": "detail_id"}
         )
+        await AUTOTEST_API_DETAIL_CRUD.reconstruct_variables([data])
+        await AUTOTEST_API_DETAIL_CRUD.inflate_payloads([data])
         LOGGER.info(f"按id或code查询明细成功, 结果明细: {data}")
         return SuccessResponse(message="查询成功", data=data, total=1)
     except (NotFoundException, ParameterException) as e:
@@ -180,26 +185,34 @@ async def search_step_details(
         if detail_in.updated_user:
             q &= Q(updated_user__iexact=detail_in.updated_user)
         q &= Q(state=detail_in.state)
-        total, instances = await AUTOTEST_API_DETAIL_CRUD.select_details(
+        total, instances, next_cursor = await AUTOTEST_API_DETAIL_CRUD.select_details(
             search=q,
             page=detail_in.page,
             page_size=detail_in.page_size,
-            order=detail_in.order
+            order=detail_in.order,
+            cursor_mode=detail_in.cursor_mode,
+            cursor=detail_in.cursor,
+            with_total=detail_in.with_total,
         )
-        detail_serializes: List[Dict[str, Any]] = []
-        for instance in instances:
-            serialize: Dict[str, Any] = await instance.to_dict(
-                exclude_fields={
-                    "state",
-                    "created_user", "updated_user",
-                    "created_time", "updated_time",
-                    "reserve_1", "reserve_2", "reserve_3"
-                },
-                replace_fields={"id": "detail_id"}
-            )
-            detail_serializes.append(serialize)
+        detail_serializes: List[Dict[str, Any]] = AUTOTEST_API_DETAIL_CRUD.model.serialize(
+            instances,
+            exclude_fields={
+                "state",
+                "created_user", "updated_user",
+                "created_time", "updated_time",
+                "reserve_1", "reserve_2", "reserve_3"
+            },
+            replace_fields={"id": "detail_id"}
+        )
+        await AUTOTEST_API_DETAIL_CRUD.reconstruct_variables(detail_serializes)
+        if detail_in.report_code:
+            # 限定单个报告时（报告明细抽屉）直接返回完整大字段，条数受单个报告的步骤数约束
+            await AUTOTEST_API_DETAIL_CRUD.inflate_payloads(detail_serializes)
+        else:
+            # 跨报告检索只返回大字段摘要，完整内容通过 /detail/get 按条查询还原
+            AUTOTEST_API_DETAIL_CRUD.strip_payloads(detail_serializes)
         LOGGER.info(f"按条件查询明细成功, 结果数量: {total}")
-        return SuccessResponse(message="查询成功", data=detail_serializes, total=total)
+        return SuccessResponse(message="查询成功", data=detail_serializes, total=total, next_cursor=next_cursor)
     except ParameterException as e:
         return ParameterResponse(message=str(e.message))
     except Exception as e:
@@ -6,7 +6,6 @@
 @Module  : autotest_env_config_view
 @DateTime: 2026/4/16 15:54
 """
-import asyncio
 import traceback
 from typing import Optional
 
@@ -204,14 +203,12 @@ async def search_env_info(config_in: AutoTestApiConfigSelect = Body(..., descrip
                     state__not=1
                 ).values_list("id", "env_name")
             )
-        # 并发执行所有 to_dict 操作（核心：用gather批量处理异步任务）
-        report_instances = await asyncio.gather(*[
-            obj.to_dict(
-                exclude_fields={"state", "reserve_1", "reserve_2", "reserve_3"},
-                replace_fields={"id": "config_id"}
-            )
-            for obj in instances
-        ])
+        # 按预计算的字段序列化计划批量转换
+        report_instances = AUTOTEST_API_ENV_CONFIG_CRUD.model.serialize(
+            instances,
+            exclude_fields={"state", "reserve_1", "reserve_2", "reserve_3"},
+            replace_fields={"id": "config_id"}
+        )
         # 用列表推导式填充 case_name 并生成最终数据
         data = [
             {
@@ -6,18 +6,20 @@
 @Module  : autotest_report_view
 @DateTime: 2025/11/27 09:33
 """
-import asyncio
 import traceback
-from typing import Optional
+from typing import Optional, Dict, Any
+from urllib.parse import quote
 
-from fastapi import APIRouter, Body, Query
+from fastapi import APIRouter, Body, Query, Request
 from tortoise.expressions import Q
 
+from backend.applications.aotutest.models.autotest_model import AutoTestApiReportInfo
 from backend.applications.aotutest.schemas.autotest_report_schema import (
     AutoTestApiReportCreate, AutoTestApiReportSelect, AutoTestApiReportUpdate
 )
 from backend.applications.aotutest.services.autotest_case_crud import AUTOTEST_API_CASE_CRUD
 from backend.applications.aotutest.services.autotest_report_crud import AUTOTEST_API_REPORT_CRUD
+from backend.applications.aotutest.services.autotest_report_export_service import AUTOTEST_REPORT_EXPORT_SERVICE
 from backend.configure import LOGGER
 from backend.core.exceptions import (
     DataAlreadyExistsException,
@@ -31,9 +33,14 @@ from backend.core.responses import (
     ParameterResponse,
     DataBaseStorageResponse,
 )
+from backend.services import BackgroundJob, submit_background_job
+from backend.services.file_transfer import FileTransfer
 
 autotest_report = APIRouter()
 
+# 报告列表不返回的字段
+REPORT_LIST_EXCLUDE_FIELDS = frozenset({"state", "created_time", "updated_time", "reserve_1", "reserve_2", "reserve_3"})
+
 
 @autotest_report.post("/create", summary="API自动化测试-新增报告")
 async def create_report(
@@ -140,55 +147,79 @@ async def get_report(
         return FailureResponse(message=f"查询测试报告失败，异常描述: {e}")
 
 
+def _build_report_search(report_in: AutoTestApiReportSelect) -> Q:
+    """
+    按查询条件构建报告检索的 Q 对象（查询与导出共用）。
+
+    :raises ParameterException: 执行时间范围格式错误时。
+    """
+    q = Q()
+    if report_in.case_id:
+        q &= Q(case_id=report_in.case_id)
+    if report_in.case_code:
+        q &= Q(case_code=report_in.case_code)
+    if report_in.report_id:
+        q &= Q(id=report_in.report_id)
+    if report_in.report_code:
+        q &= Q(report_code=report_in.report_code)
+    if report_in.report_type:
+        q &= Q(report_type=report_in.report_type.value)
+    if report_in.task_code:
+        q &= Q(task_code__contains=report_in.task_code)
+    if report_in.batch_code:
+        q &= Q(batch_code__contains=report_in.batch_code)
+    if report_in.case_state is not None:
+        q &= Q(case_state=report_in.case_state)
+    if report_in.created_user:
+        q &= Q(created_user__iexact=report_in.created_user)
+    if report_in.updated_user:
+        q &= Q(updated_user__iexact=report_in.updated_user)
+    if report_in.step_pass_ratio:
+        q &= Q(step_pass_ratio__gte=report_in.step_pass_ratio)
+    if report_in.project_id:
+        q &= Q(project_id=report_in.project_id)
+    # 执行时间范围：按原生时间列 case_st_at 做范围查询，仅日期时补全为当天起止
+    if report_in.date_from:
+        date_from = report_in.date_from.strip()
+        if len(date_from) == 10:  # YYYY-MM-DD
+            date_from = f"{date_from} 00:00:00"
+        date_from_at = AUTOTEST_API_REPORT_CRUD.parse_case_time(date_from)
+        if not date_from_at:
+            raise ParameterException(message=f"参数(date_from={report_in.date_from})格式错误, 仅支持 YYYY-MM-DD 或 YYYY-MM-DD HH:mm:ss")
+        q &= Q(case_st_at__gte=date_from_at)
+    if report_in.date_to:
+        date_to = report_in.date_to.strip()
+        if len(date_to) == 10:
+            date_to = f"{date_to} 23:59:59.999999"
+        date_to_at = AUTOTEST_API_REPORT_CRUD.parse_case_time(date_to)
+        if not date_to_at:
+            raise ParameterException(message=f"参数(date_to={report_in.date_to})格式错误, 仅支持 YYYY-MM-DD 或 YYYY-MM-DD HH:mm:ss")
+        q &= Q(case_st_at__lte=date_to_at)
+    q &= Q(state=report_in.state)
+    return q
+
+
 @autotest_report.post("/search", summary="API自动化测试-按条件查询报告")
 async def search_reports(
         report_in: AutoTestApiReportSelect = Body(..., description="查询条件")
 ):
     try:
-        q = Q()
-        if report_in.case_id:
-            q &= Q(case_id=report_in.case_id)
-        if report_in.case_code:
-            q &= Q(case_code=report_in.case_code)
-        if report_in.report_id:
-            q &= Q(id=report_in.report_id)
-        if report_in.report_code:
-            q &= Q(report_code=report_in.report_code)
-        if report_in.report_type:
-            q &= Q(report_type=report_in.report_type.value)
-        if report_in.task_code:
-            q &= Q(task_code__contains=report_in.task_code)
-        if report_in.batch_code:
-            q &= Q(batch_code__contains=report_in.batch_code)
-        if report_in.case_state is not None:
-            q &= Q(case_state=report_in.case_state)
-        if report_in.created_user:
-            q &= Q(created_user__iexact=report_in.created_user)
-        if report_in.updated_user:
-            q &= Q(updated_user__iexact=report_in.updated_user)
-        if report_in.step_pass_ratio:
-            q &= Q(step_pass_ratio__gte=report_in.step_pass_ratio)
-        # 执行时间范围：按 case_st_time 筛选，仅日期时补全为当天起止
-        if report_in.date_from:
-            date_from = report_in.date_from.strip()
-            if len(date_from) == 10:  # YYYY-MM-DD
-                date_from = f"{date_from} 00:00:00"
-            q &= Q(case_st_time__gte=date_from)
-        if report_in.date_to:
-            date_to = report_in.date_to.strip()
-            if len(date_to) == 10:
-                date_to = f"{date_to} 23:59:59"
-            q &= Q(case_st_time__lte=date_to)
-        q &= Q(state=report_in.state)
-        total, instances = await AUTOTEST_API_REPORT_CRUD.select_reports(
+        q = _build_report_search(report_in)
+        total, instances, next_cursor = await AUTOTEST_API_REPORT_CRUD.select_reports(
             search=q,
             page=report_in.page,
             page_size=report_in.page_size,
-            order=report_in.order
+            # 按执行开始时间排序时改用原生时间列，命中 (..., case_st_at) 复合索引
+            order=[item.replace("case_st_time", "case_st_at") for item in report_in.order],
+            cursor_mode=report_in.cursor_mode,
+            cursor=report_in.cursor,
+            with_total=report_in.with_total,
+            # 列表只投影需要返回的列，避免为每行构建完整模型实例
+            values_fields=AutoTestApiReportInfo.get_values_fields(exclude_fields=REPORT_LIST_EXCLUDE_FIELDS),
         )
         # 批量获取 case_id 并查询 case_name
         data = []
-        case_ids = [obj.case_id for obj in instances]
+        case_ids = [obj["case_id"] for obj in instances]
         unique_case_ids = list(set(case_ids))
         case_name_map = {}
         if unique_case_ids:
@@ -198,21 +229,65 @@ async def search_reports(
                     state__not=1
                 ).values_list("id", "case_name")
             )
-        # 并发执行所有 to_dict 操作（核心：用gather批量处理异步任务）
-        report_instances = await asyncio.gather(*[
-            obj.to_dict(
-                exclude_fields={"state", "created_time", "updated_time", "reserve_1", "reserve_2", "reserve_3"},
-                replace_fields={"id": "report_id"}
-            )
-            for obj in instances
-        ])
+        # 按预计算的字段序列化计划批量转换
+        report_instances = AutoTestApiReportInfo.serialize(
+            instances,
+            exclude_fields=REPORT_LIST_EXCLUDE_FIELDS,
+            replace_fields={"id": "report_id"}
+        )
         # 用列表推导式填充 case_name 并生成最终数据
         data = [
             {**item, "case_name": case_name_map.get(item["case_id"], "")}
             for item in report_instances
         ]
         LOGGER.info(f"按条件查询报告成功, 结果数量: {total}")
-        return SuccessResponse(message="查询成功", data=data, total=total)
+        return SuccessResponse(message="查询成功", data=data, total=total, next_cursor=next_cursor)
+    except ParameterException as e:
+        return ParameterResponse(message=str(e.message))
     except Exception as e:
         LOGGER.error(f"按条件查询报告失败，异常描述: {e}\n{traceback.format_exc()}")
         return FailureResponse(message=f"查询失败, 异常描述: {str(e)}")
+
+
+@autotest_report.post("/export", summary="API自动化测试-按条件导出报告xlsx")
+async def export_reports(
+        request: Request,
+        report_in: AutoTestApiReportSelect = Body(..., description="查询条件(分页参数忽略, 导出全部匹配记录)"),
+        with_details: bool = Query(True, description="是否同时导出步骤明细"),
+        background: bool = Query(False, description="是否后台导出(为 True 时立即返回后台任务ID, 通过 /base/job/get 查询进度, 完成后按 download_path 下载)"),
+):
+    try:
+        q = _build_report_search(report_in)
+    except ParameterException as e:
+        return ParameterResponse(message=str(e.message))
+    order = [item.replace("case_st_time", "case_st_at") for item in report_in.order]
+
+    if background:
+        async def runner(job: BackgroundJob) -> Dict[str, Any]:
+            result = await AUTOTEST_REPORT_EXPORT_SERVICE.export_reports(
+                search=q, order=order, with_details=with_details, job=job
+            )
+            result.pop("file_path", None)
+            return result
+
+        job = await submit_background_job(job_type="report_export", runner=runner)
+        return SuccessResponse(message="报告导出任务已提交", data=job.to_dict(), total=1)
+
+    try:
+        result = await AUTOTEST_REPORT_EXPORT_SERVICE.export_reports(search=q, order=order, with_details=with_details)
+    except ParameterException as e:
+        return ParameterResponse(message=str(e.message))
+    except Exception as e:
+        LOGGER.error(f"导出报告失败，异常描述: {e}\n{traceback.format_exc()}")
+        return FailureResponse(message=f"导出失败, 异常描述: {e}")
+    file_name = quote(result["file_name"])
+    # 导出文件不在发送后立即删除（断点续传/协商缓存请求仍需读取），统一由导出服务按保留时长清理
+    return FileTransfer.download_file_response(
+        request=request,
+        download_file=result["file_path"],
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "fileName": file_name,
+            "Content-Disposition": f"attachment; filename*=utf-8''{file_name}"
+        },
+    )
@@ -37,6 +37,7 @@ from backend.applications.aotutest.schemas.autotest_step_schema import (
     StepAssertValidatorItem,
     StepsExecuteConfigBase,
 )
+from backend.applications.aotutest.services.autotest_analytics_crud import AUTOTEST_API_ANALYTICS_CRUD
 from backend.applications.aotutest.services.autotest_case_crud import AUTOTEST_API_CASE_CRUD
 from backend.applications.aotutest.services.autotest_detail_crud import AUTOTEST_API_DETAIL_CRUD
 from backend.applications.aotutest.services.autotest_env_config_crud import AUTOTEST_API_ENV_CONFIG_CRUD
@@ -64,6 +65,7 @@ from backend.core.responses import (
     DataAlreadyExistsResponse,
 )
 from backend.enums import AutoTestReportType, AutoTestReqArgsType, AutoTestStepType, AutoTestConfigNodeType
+from backend.services import invalidate_step_tree_cache
 
 autotest_step = APIRouter()
 
@@ -391,6 +393,9 @@ async def batch_update_steps_tree(
                 f"错误回溯: {traceback.format_exc()}"
             )
             raise
+        finally:
+            # 事务提交/回滚后再次失效步骤树缓存，避免事务期间并发读取回填旧数据
+            await invalidate_step_tree_cache()
     except NotFoundException as e:
         return NotFoundResponse(message=str(e.message))
     except ParameterException as e:
@@ -446,20 +451,16 @@ async def debug_http_request(
         # 处理请求主机域名
         if request_url and not request_url.lower().startswith("http"):
             try:
-                env_config_instance = await AUTOTEST_API_ENV_CONFIG_CRUD.get_by_conditions(
-                    only_one=True,
-                    on_error=False,
-                    conditions={
-                        "env_id": env_id,
-                        "project_id": request_project_id,
-                        "config_name": request_config_name,
-                        "config_type": AutoTestConfigNodeType.API
-                    }
+                env_config: Optional[Dict[str, Any]] = await AUTOTEST_API_ENV_CONFIG_CRUD.resolve_config(
+                    env_id=env_id,
+                    project_id=request_project_id,
+                    config_name=request_config_name,
+                    config_type=AutoTestConfigNodeType.API.value,
                 )
-                if not env_config_instance:
+                if not env_config:
                     return NotFoundResponse(message=f"HTTP请求调试失败, 环境配置[{request_config_name}]不存在")
-                execute_env_host: str = env_config_instance.config_host.strip().rstrip("/").rstrip(":")
-                execute_env_port: str = env_config_instance.config_port
+                execute_env_host: str = (env_config.get("config_host") or "").strip().rstrip("/").rstrip(":")
+                execute_env_port: str = env_config.get("config_port")
                 if not execute_env_host or not execute_env_port:
                     return NotFoundResponse(message=f"HTTP请求调试失败, 环境配置[{request_config_name}]正确")
                 if not execute_env_port:
@@ -784,22 +785,18 @@ async def debug_tcp_request(
         host: str = ""
         port: Optional[str] = None
         try:
-            env_config_instance = await AUTOTEST_API_ENV_CONFIG_CRUD.get_by_conditions(
-                only_one=True,
-                on_error=False,
-                conditions={
-                    "env_id": env_id,
-                    "project_id": request_project_id,
-                    "config_name": request_config_name,
-                    "config_type": AutoTestConfigNodeType.API
-                },
+            env_config: Optional[Dict[str, Any]] = await AUTOTEST_API_ENV_CONFIG_CRUD.resolve_config(
+                env_id=env_id,
+                project_id=request_project_id,
+                config_name=request_config_name,
+                config_type=AutoTestConfigNodeType.API.value,
             )
-            if not env_config_instance:
+            if not env_config:
                 msg = f"TCP请求调试失败, 环境配置[{request_config_name}]不存在"
                 append_debugging_log(message=msg)
                 return NotFoundResponse(message=msg)
-            host: str = (env_config_instance.config_host or "").strip().replace("http://", "").replace("https://", "")
-            port: str = (env_config_instance.config_port or "").strip()
+            host: str = (env_config.get("config_host") or "").strip().replace("http://", "").replace("https://", "")
+            port: str = (env_config.get("config_port") or "").strip()
             append_debugging_log(message=f"解析请求信息(host={host}, port={port})成功")
         except Exception as e:
             error_message: str = f"解析请求信息失败, 终止调试: {e}"
@@ -1193,7 +1190,7 @@ async def execute_step_tree(
             if defer_create_report is not None:
                 try:
                     async with in_transaction():
-                        report_instance = await AUTOTEST_API_REPORT_CRUD.create_report(report_in=defer_create_report)
+                        report_instance = await AUTOTEST_API_REPORT_CRUD.create_report(report_in=defer_create_report, accumulate=False)
                         for detail_create in (pending_create_details or []):
                             detail_schema = detail_create.model_copy(update={"report_code": report_instance.report_code})
                             await AUTOTEST_API_DETAIL_CRUD.create_detail(detail_in=detail_schema)
@@ -1204,6 +1201,8 @@ async def execute_step_tree(
                             case_state=case_state,
                             case_last_time=case_last_time,
                         ))
+                    # 事务提交后再累加日汇总，汇总行锁不跨明细写入持有
+                    await AUTOTEST_API_ANALYTICS_CRUD.accumulate_report(report_instance)
                 except Exception as e:
                     LOGGER.error(f"执行或调试步骤树(调试模式)时发生未知异常，错误描述: {e}\n{traceback.format_exc()}")
 
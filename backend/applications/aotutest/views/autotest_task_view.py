@@ -268,7 +268,7 @@ async def stop_task_info(task_in: dict = Body(..., description="任务ID")):
 async def search_task_records(record_in: AutoTestApiRecordSelect = Body(..., description="查询条件")):
     """按条件分页查询任务执行记录（Celery 调度任务ID、任务信息ID、任务名称、状态、调度方式、开始/结束时间等）。"""
     try:
-        total, instances = await AUTOTEST_API_RECORD_CRUD.select_records(record_in=record_in)
+        total, instances, next_cursor = await AUTOTEST_API_RECORD_CRUD.select_records(record_in=record_in)
         data = [
             await obj.to_dict(
                 exclude_fields={"created_time", "updated_time"},
@@ -277,7 +277,7 @@ async def search_task_records(record_in: AutoTestApiRecordSelect = Body(..., des
             for obj in instances
         ]
         LOGGER.info(f"按条件查询任务执行记录成功, 结果数量: {total}")
-        return SuccessResponse(message="查询成功", data=data, total=total)
+        return SuccessResponse(message="查询成功", data=data, total=total, next_cursor=next_cursor)
     except ParameterException as e:
         return ParameterResponse(message=str(e.message))
     except Exception as e:
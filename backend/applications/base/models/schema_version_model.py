@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : schema_version_model.py
+@DateTime: 2026/5/12 10:20
+"""
+from tortoise import fields
+
+from backend.applications.base.services.scaffold import ScaffoldModel, TimestampMixin
+
+
+class SchemaVersion(ScaffoldModel, TimestampMixin):
+    app = fields.CharField(max_length=64, unique=True, description="模型应用标签")
+    version = fields.CharField(max_length=64, description="模型结构摘要(sha256)")
+    app_version = fields.CharField(max_length=32, null=True, description="引导时的项目版本")
+
+    class Meta:
+        table = "krun_schema_version"
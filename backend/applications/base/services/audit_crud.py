@@ -9,9 +9,14 @@
 from typing import List, Optional
 
 from backend.applications.base.models.audit_model import Audit
+from backend.applications.base.schemas.audit_schema import AuditCreate
+from backend.applications.base.services.scaffold import ScaffoldCrud
 
 
-class AuditCrud:
+class AuditCrud(ScaffoldCrud[Audit, AuditCreate, AuditCreate]):
+    def __init__(self):
+        super().__init__(model=Audit)
+
     @staticmethod
     async def delete_by_ids(audit_ids: Optional[List[int]]) -> int:
         """按主键列表批量物理删除，一条 SQL（filter + delete）。"""
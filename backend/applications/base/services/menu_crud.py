@@ -6,7 +6,7 @@
 @Module  : menu_crud.py
 @DateTime: 2025/2/19 12:48
 """
-from typing import Optional
+from typing import Optional, List, Dict, Any, Union
 
 from tortoise.exceptions import DoesNotExist
 
@@ -14,12 +14,57 @@ from backend.applications.base.models.menu_model import Menu
 from backend.applications.base.schemas.menu_schema import MenuCreate, MenuUpdate
 from backend.applications.base.services.scaffold import ScaffoldCrud
 from backend.core.exceptions import DataAlreadyExistsException, NotFoundException
+from backend.services import KRUN_CACHE, CacheNamespace, invalidate_menu_cache
 
 
 class MenuCrud(ScaffoldCrud[Menu, MenuCreate, MenuUpdate]):
     def __init__(self):
         super().__init__(model=Menu)
 
+    async def create(self, obj_in: Union[MenuCreate, Dict]) -> Menu:
+        instance = await super().create(obj_in)
+        await invalidate_menu_cache()
+        return instance
+
+    async def update(self, id: int, obj_in: Union[MenuUpdate, Dict[str, Any]]) -> Menu:
+        instance = await super().update(id=id, obj_in=obj_in)
+        await invalidate_menu_cache()
+        return instance
+
+    async def remove(self, id: int) -> Menu:
+        instance = await super().remove(id=id)
+        await invalidate_menu_cache()
+        return instance
+
+    @staticmethod
+    def build_menu_tree(menus: List[Dict[str, Any]], root_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        将菜单字典列表组装为树（按 parent_id 挂载，保持传入顺序），孤立节点（父菜单不存在）被丢弃。
+
+        :param menus: 已排序的菜单字典列表（需包含 id、parent_id）。
+        :param root_id: 根节点的 parent_id。
+        :returns: 根菜单列表，每个节点带 children。
+        """
+        children_map: Dict[int, List[Dict[str, Any]]] = {}
+        for menu in menus:
+            children_map.setdefault(menu["parent_id"], []).append(menu)
+        for menu in menus:
+            menu["children"] = children_map.get(menu["id"], [])
+        return children_map.get(root_id, [])
+
+    async def get_menu_tree(self) -> List[Dict[str, Any]]:
+        """
+        获取全量菜单树：一次查询全部菜单后在内存中组装，结果缓存，菜单增删改时失效。
+
+        :returns: 根菜单列表，每个节点带 children。
+        """
+
+        async def _load_menu_tree() -> List[Dict[str, Any]]:
+            menus: List[Menu] = await self.model.all().order_by("order", "id")
+            return self.build_menu_tree(self.model.serialize(menus))
+
+        return await KRUN_CACHE.get_or_load(CacheNamespace.MENU_TREE, "all", _load_menu_tree)
+
     async def get_by_id(self, menu_id: int) -> Optional[Menu]:
         return await self.model.filter(id=menu_id).first()
 
@@ -42,6 +87,7 @@ class MenuCrud(ScaffoldCrud[Menu, MenuCreate, MenuUpdate]):
             raise NotFoundException(message=f"菜单(id={menu_id})信息不存在")
 
         await instance.delete()
+        await invalidate_menu_cache()
         data = await instance.to_dict()
         return data
 
@@ -20,6 +20,7 @@ from backend.applications.base.schemas.role_schema import (
 from backend.applications.base.services.scaffold import ScaffoldCrud
 from backend.configure import LOGGER
 from backend.core.exceptions import DataAlreadyExistsException, ParameterException, NotFoundException
+from backend.services import invalidate_auth_cache
 
 
 class RoleCrud(ScaffoldCrud[Role, RoleCreate, RoleUpdate]):
@@ -98,6 +99,8 @@ class RoleCrud(ScaffoldCrud[Role, RoleCreate, RoleUpdate]):
         for item in router_infos:
             router_obj = await Router.filter(path=item.get("path"), method=item.get("method")).first()
             await role.routers.add(router_obj)
+        # 角色权限变更影响所有绑定该角色的用户，整体失效鉴权缓存
+        await invalidate_auth_cache()
 
     async def delete_roles(
             self,
@@ -122,6 +125,8 @@ class RoleCrud(ScaffoldCrud[Role, RoleCreate, RoleUpdate]):
                         n += 1
                     except Exception:
                         continue
+        if n:
+            await invalidate_auth_cache()
         return n
 
 
@@ -16,6 +16,7 @@ from backend.applications.base.models.router_model import Router
 from backend.applications.base.schemas.router_schema import RouterCreate, RouterUpdate
 from backend.applications.base.services.scaffold import ScaffoldCrud
 from backend.core.exceptions import DataAlreadyExistsException, NotFoundException
+from backend.services import invalidate_auth_cache
 
 
 class RouterCrud(ScaffoldCrud[Router, RouterCreate, RouterUpdate]):
@@ -53,6 +54,8 @@ class RouterCrud(ScaffoldCrud[Router, RouterCreate, RouterUpdate]):
             raise NotFoundException(message=f"接口(id={router_id})信息不存在")
 
         await instance.delete()
+        # 接口变更影响角色授权结果，整体失效鉴权缓存
+        await invalidate_auth_cache()
         data = await instance.to_dict()
         return data
 
@@ -67,6 +70,7 @@ class RouterCrud(ScaffoldCrud[Router, RouterCreate, RouterUpdate]):
         except DoesNotExist as e:
             raise NotFoundException(message=f"接口(id={router_id})信息不存在")
 
+        await invalidate_auth_cache()
         return instance
 
     async def refresh_router(self, app: FastAPI) -> Optional[List[Router]]:
@@ -98,6 +102,8 @@ class RouterCrud(ScaffoldCrud[Router, RouterCreate, RouterUpdate]):
                 else:
                     await self.model.create(**data)
 
+        # 路由增删会改变角色可访问的接口集合，刷新后整体失效鉴权缓存（主体与接口权限）
+        await invalidate_auth_cache()
         return await self.model.all()
 
 
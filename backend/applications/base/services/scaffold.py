@@ -7,8 +7,11 @@
 @DateTime: 2025/1/18 10:48
 """
 import asyncio
+import base64
+import json
 from datetime import datetime, date, time
 from decimal import Decimal
+from enum import Enum
 from typing import Any, Dict, Generic, List, Tuple, Type, TypeVar, Union, Optional, Set
 
 from pydantic import BaseModel, GetCoreSchemaHandler
@@ -18,11 +21,107 @@ from tortoise.expressions import Q
 from tortoise.models import Model
 
 from backend.configure import GLOBAL_CONFIG
+from backend.core.exceptions import ParameterException
+
+
+# 字段序列化计划缓存：(模型类, 引入字段, 排除字段, 别名映射) -> ((模型属性名, 输出键名), ...)
+_FIELD_PLAN_CACHE: Dict[tuple, Tuple[Tuple[str, str], ...]] = {}
 
 
 class ScaffoldModel(models.Model):
     id = fields.BigIntField(pk=True, description="主键")
 
+    @classmethod
+    def get_field_plan(
+            cls,
+            include_fields: Optional[Union[List[str], Set[str]]] = None,
+            exclude_fields: Optional[Union[List[str], Set[str]]] = None,
+            replace_fields: Optional[Dict[str, str]] = None,
+    ) -> Tuple[Tuple[str, str], ...]:
+        """
+        获取（并缓存）本表字段的序列化计划，同一组参数只计算一次。
+        :param include_fields: 需要引入的本表字段列表，默认为全部本表字段
+        :param exclude_fields: 需要排除的本表字段列表，默认为 None
+        :param replace_fields: 需要别名的本表字段列表，默认为 None
+        :return: ((模型属性名, 输出键名), ...)
+        """
+        key = (
+            cls,
+            tuple(include_fields) if include_fields else None,
+            frozenset(exclude_fields) if exclude_fields else None,
+            tuple(sorted(replace_fields.items())) if replace_fields else None,
+        )
+        plan = _FIELD_PLAN_CACHE.get(key)
+        if plan is None:
+            exclude_fields = exclude_fields or ()
+            replace_fields = replace_fields or {}
+            plan = tuple(
+                (field, replace_fields.get(field, field))
+                for field in (include_fields or cls._meta.db_fields)
+                if field not in exclude_fields
+            )
+            _FIELD_PLAN_CACHE[key] = plan
+        return plan
+
+    @classmethod
+    def get_values_fields(
+            cls,
+            include_fields: Optional[Union[List[str], Set[str]]] = None,
+            exclude_fields: Optional[Union[List[str], Set[str]]] = None,
+    ) -> List[str]:
+        """
+        获取 .values() 投影查询所需的字段列表，与 get_field_plan 的字段范围一致。
+        :param include_fields: 需要引入的本表字段列表，默认为全部本表字段
+        :param exclude_fields: 需要排除的本表字段列表，默认为 None
+        :return: 字段名列表
+        """
+        return [field for field, _ in cls.get_field_plan(include_fields, exclude_fields)]
+
+    def to_dict_sync(
+            self,
+            include_fields: Optional[Union[List[str], Set[str]]] = None,
+            exclude_fields: Optional[Union[List[str], Set[str]]] = None,
+            replace_fields: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        同步将模型实例转换为字典（仅本表字段，不处理外键与多对多关系）。
+        :param include_fields: 需要引入的本表字段列表，默认为 None
+        :param exclude_fields: 需要排除的本表字段列表，默认为 None
+        :param replace_fields: 需要别名的本表字段列表，默认为 None
+        :return:
+        """
+        format_value = self.format_value
+        return {
+            key: format_value(getattr(self, field))
+            for field, key in self.get_field_plan(include_fields, exclude_fields, replace_fields)
+        }
+
+    @classmethod
+    def serialize(
+            cls,
+            instances: List["ScaffoldModel"],
+            include_fields: Optional[Union[List[str], Set[str]]] = None,
+            exclude_fields: Optional[Union[List[str], Set[str]]] = None,
+            replace_fields: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        批量将模型实例（或 .values() 查询得到的字典）转换为字典列表，共用同一份字段序列化计划。
+        :param instances: 模型实例列表或 .values() 查询结果
+        :param include_fields: 需要引入的本表字段列表，默认为 None
+        :param exclude_fields: 需要排除的本表字段列表，默认为 None
+        :param replace_fields: 需要别名的本表字段列表，默认为 None
+        :return: 字典列表
+        """
+        plan = cls.get_field_plan(include_fields, exclude_fields, replace_fields)
+        format_value = cls.format_value
+        results: List[Dict[str, Any]] = []
+        for instance in instances:
+            if isinstance(instance, dict):
+                results.append({key: format_value(instance.get(field)) for field, key in plan})
+            else:
+                results.append({key: format_value(getattr(instance, field)) for field, key in plan})
+        return results
+
     async def to_dict(
             self,
             include_fields: Optional[Union[List[str], Set[str]]] = None,
@@ -48,26 +147,16 @@ class ScaffoldModel(models.Model):
         :param fk_exclude_fields: 需要排除的外键表字段列表，默认为 None
         :return:
         """
+        # 本表字段走同步序列化计划，无关联数据时直接返回
+        d = self.to_dict_sync(include_fields, exclude_fields, replace_fields)
+        if not fk and not m2m:
+            return d
+
         # 若未提供排除字段列表，则初始化为空列表
         exclude_fields = exclude_fields or []
         m2m_exclude_fields = m2m_exclude_fields or []
         fk_exclude_fields = fk_exclude_fields or []
 
-        d = {}
-        # 获取本表字段并根据 include_fields 参数确定要处理的字段列表
-        db_fields_process = self._meta.db_fields
-        if include_fields:
-            db_fields_process = include_fields
-
-        # 遍历字段列表，将字段值添加到字典中，并对特定类型的值进行预处理
-        for field in db_fields_process:
-            if field in exclude_fields:
-                continue
-            value = getattr(self, field)
-            if replace_fields:
-                field = replace_fields.get(field, field)
-            d[field] = await self.__format_value(value)
-
         # 如果 fk 为 True，异步获取外键字段关联的数据
         if fk:
             tasks = [
@@ -92,8 +181,10 @@ class ScaffoldModel(models.Model):
 
         return d
 
-    @classmethod
-    async def __format_value(cls, value: Any):
+    @staticmethod
+    def format_value(value: Any):
+        if value is None or isinstance(value, (str, int, float, bool, dict, list)):
+            return value
         if isinstance(value, datetime):
             value = value.strftime(GLOBAL_CONFIG.DATETIME_FORMAT2)
         elif isinstance(value, date):
@@ -184,6 +275,95 @@ class ReserveFields:
     reserve_3 = fields.CharField(max_length=255, default=None, null=True, description="备用字段3")
 
 
+def _encode_cursor_value(value: Any) -> Any:
+    """游标值编码：时间/小数等非 JSON 原生类型带类型标记，保证解码后可直接用于查询比较。"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, time):
+        return {"$t": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _decode_cursor_value(value: Any) -> Any:
+    """游标值解码，与 _encode_cursor_value 对应。"""
+    if isinstance(value, dict) and len(value) == 1:
+        tag, raw = next(iter(value.items()))
+        if tag == "$dt":
+            return datetime.fromisoformat(raw)
+        if tag == "$d":
+            return date.fromisoformat(raw)
+        if tag == "$t":
+            return time.fromisoformat(raw)
+        if tag == "$dec":
+            return Decimal(raw)
+    return value
+
+
+def encode_cursor(order: List[str], values: List[Any]) -> str:
+    """
+    将排序字段与最后一条记录的排序值编码为不透明游标（base64url JSON）。
+
+    :param order: 规范化后的排序字段列表（含 id 兜底）。
+    :param values: 最后一条记录对应的排序字段值。
+    :return: 游标字符串。
+    """
+    payload = json.dumps({"o": order, "v": [_encode_cursor_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: List[str]) -> List[Any]:
+    """
+    解码游标并校验其排序字段与当前查询一致。
+
+    :param cursor: 游标字符串。
+    :param order: 规范化后的排序字段列表。
+    :return: 排序字段值列表。
+    :raises ParameterException: 游标非法或与排序字段不一致时。
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = [_decode_cursor_value(v) for v in payload["v"]]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ParameterException(message=f"参数(cursor)非法, 无法解析分页游标: {e}") from e
+    if payload.get("o") != order or len(values) != len(order):
+        raise ParameterException(message="参数(cursor)与排序字段(order)不一致, 请从第一页重新查询")
+    return values
+
+
+def build_keyset_q(order: List[str], values: List[Any]) -> Q:
+    """
+    构造「位于游标之后」的查询条件：(f1 > v1) OR (f1 = v1 AND ((f2 > v2) OR ...))。
+    降序字段使用 <；空值按 MySQL 语义处理（升序 NULL 在前，降序 NULL 在后）。
+
+    :param order: 规范化后的排序字段列表，"-" 前缀表示降序。
+    :param values: 游标对应的排序字段值。
+    :return: Tortoise Q 条件。
+    """
+    field, value = order[0], values[0]
+    desc = field.startswith("-")
+    field = field.lstrip("-")
+    tail = build_keyset_q(order[1:], values[1:]) if len(order) > 1 else None
+
+    parts: List[Q] = []
+    if value is None:
+        if not desc:
+            parts.append(Q(**{f"{field}__isnull": False}))
+        equal = Q(**{f"{field}__isnull": True})
+    else:
+        after = Q(**{f"{field}__{'lt' if desc else 'gt'}": value})
+        parts.append(after | Q(**{f"{field}__isnull": True}) if desc else after)
+        equal = Q(**{field: value})
+    if tail is not None:
+        parts.append(equal & tail)
+    return Q(*parts, join_type="OR")
+
+
 # 类型变量 ModelType，限定为继承自 Model 的类型
 ModelType = TypeVar("ModelType", bound=Model)
 # 类型变量 CreateSchemaType，限定为继承自 BaseModel 的类型
@@ -234,20 +414,85 @@ class ScaffoldCrud(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return await self.model.filter(**kwargs).all()
 
     async def list(self, page: int, page_size: int, search: Q = Q(),
-                   order: Optional[list] = None, related: Optional[list] = None) -> Tuple[int, List[ModelType]]:
+                   order: Optional[list] = None, related: Optional[list] = None,
+                   values_fields: Optional[List[str]] = None) -> Tuple[int, List[ModelType]]:
         """
         :param page: 页码，从 1 开始。
         :param page_size: 每页的对象数量。
         :param search: 搜索条件，使用 tortoise.expressions.Q 对象。默认为 Q()，表示不进行额外搜索。
         :param order: 排序条件，为一个列表，列表元素为排序字段，默认为空列表，表示不进行排序。
         :param related: 关联字段，为一个列表，所有的外键字段所对应的信息，默认为None，表示没有关联字段或不查询关联字段。
+        :param values_fields: 投影字段列表，指定时按 .values() 只查询这些列并返回字典列表（忽略 related），默认为None。
         :return: 一个元组，包含总对象数和该页的对象列表。
         """
         order: list = order or []
         related: list = related or []
         query = self.model.filter(search)
-        return await query.count(), await query.offset((page - 1) * page_size).limit(page_size).order_by(
-            *order).prefetch_related(*related)
+        page_query = query.offset((page - 1) * page_size).limit(page_size).order_by(*order)
+        if values_fields:
+            return await query.count(), await page_query.values(*values_fields)
+        return await query.count(), await page_query.prefetch_related(*related)
+
+    def normalize_keyset_order(self, order: Optional[list] = None) -> List[str]:
+        """
+        规范化游标分页的排序字段：校验字段存在，截断到主键为止，并以主键兜底保证排序唯一。
+
+        :param order: 排序字段列表，"-" 前缀表示降序。
+        :return: 规范化后的排序字段列表。
+        :raises ParameterException: 排序字段不是本表字段时。
+        """
+        normalized: List[str] = []
+        for item in order or []:
+            field = item.lstrip("-")
+            if field == "pk":
+                item, field = item.replace("pk", "id"), "id"
+            if field not in self.model._meta.db_fields:
+                raise ParameterException(message=f"游标分页仅支持按本表字段排序, 字段({field})不存在")
+            if any(existing.lstrip("-") == field for existing in normalized):
+                continue
+            normalized.append(item)
+            if field == "id":
+                return normalized
+        normalized.append("-id" if normalized and normalized[-1].startswith("-") or not normalized else "id")
+        return normalized
+
+    async def list_by_cursor(self, page_size: int, search: Q = Q(), order: Optional[list] = None,
+                             cursor: Optional[str] = None, related: Optional[list] = None,
+                             with_count: bool = False,
+                             values_fields: Optional[List[str]] = None) -> Tuple[Optional[int], List[ModelType], Optional[str]]:
+        """
+        游标(keyset)分页：按排序字段值定位下一页，避免深分页扫描并丢弃前序记录，且默认不执行 COUNT(*)。
+
+        :param page_size: 每页的对象数量。
+        :param search: 搜索条件，使用 tortoise.expressions.Q 对象。
+        :param order: 排序条件，会自动追加主键兜底，默认为按主键倒序。
+        :param cursor: 上一页返回的游标，为空表示第一页。
+        :param related: 关联字段，为一个列表。
+        :param with_count: 是否统计总数，默认为 False。
+        :param values_fields: 投影字段列表，指定时按 .values() 只查询这些列（自动补充排序字段）并返回字典列表。
+        :return: 一个元组，包含总对象数（未统计时为 None）、该页的对象列表和下一页游标（无下一页时为 None）。
+        """
+        order: List[str] = self.normalize_keyset_order(order)
+        related: list = related or []
+        query = self.model.filter(search)
+        page_query = query
+        if cursor:
+            page_query = page_query.filter(build_keyset_q(order, decode_cursor(cursor, order)))
+        page_query = page_query.order_by(*order).limit(page_size + 1)
+        if values_fields:
+            order_fields: List[str] = [item.lstrip("-") for item in order]
+            instances = await page_query.values(*values_fields, *[f for f in order_fields if f not in values_fields])
+        else:
+            instances = await page_query.prefetch_related(*related)
+        next_cursor: Optional[str] = None
+        if len(instances) > page_size:
+            instances = instances[:page_size]
+            last = instances[-1]
+            next_cursor = encode_cursor(order, [
+                last[item.lstrip("-")] if values_fields else getattr(last, item.lstrip("-")) for item in order
+            ])
+        total: Optional[int] = await query.count() if with_count else None
+        return total, instances, next_cursor
 
     async def create(self, obj_in: Union[CreateSchemaType, Dict]) -> ModelType:
         """
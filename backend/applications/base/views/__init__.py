@@ -14,12 +14,15 @@ from .menu_view import menu
 from .role_view import role
 from .audit_view import audit
 from .file_transfer_view import file_transfer
+from .job_view import job
 
 base_public = APIRouter()
 base_secure = APIRouter()
 
 # 公共端点(无全局认证/ RBAC依赖)
 base_public.include_router(auth_public, prefix="/auth")
+# 后台任务进度只需登录，可见范围在接口内按提交人校验，不走角色接口授权
+base_public.include_router(job, prefix="/job")
 
 # 安全端点(要求认证+ RBAC依赖)
 base_secure.include_router(router, prefix="/router")
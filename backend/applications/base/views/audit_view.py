@@ -15,7 +15,8 @@ from backend.applications.base.models.audit_model import Audit
 from backend.applications.base.schemas.audit_schema import AuditBatchDelete
 from backend.applications.base.services.audit_crud import AUDIT_CRUD
 from backend.configure import LOGGER
-from backend.core.responses import FailureResponse, SuccessResponse
+from backend.core.exceptions import ParameterException
+from backend.core.responses import FailureResponse, SuccessResponse, ParameterResponse
 
 audit = APIRouter()
 
@@ -32,6 +33,9 @@ async def list_audit(
         response_code: str = Query(default="", description="响应代码"),
         start_time: str = Query(default="", description="开始时间"),
         end_time: str = Query(default="", description="结束时间"),
+        cursor_mode: bool = Query(default=False, description="是否使用游标分页(为 True 时忽略 page, 按 cursor 定位下一页)"),
+        cursor: str = Query(default="", description="游标分页的游标(上一页返回的 next_cursor), 为空表示第一页"),
+        with_total: bool = Query(default=False, description="游标分页时是否统计总数"),
 ):
     q = Q()
     if username:
@@ -53,9 +57,23 @@ async def list_audit(
     elif end_time:
         q &= Q(created_time__lte=end_time)
 
+    if cursor_mode or cursor:
+        try:
+            total, audit_log_objs, next_cursor = await AUDIT_CRUD.list_by_cursor(
+                page_size=page_size,
+                search=q,
+                order=["-created_time"],
+                cursor=cursor or None,
+                with_count=with_total,
+            )
+        except ParameterException as e:
+            return ParameterResponse(message=str(e.message))
+        data = Audit.serialize(audit_log_objs)
+        return SuccessResponse(data=data, total=total, next_cursor=next_cursor)
+
     audit_log_objs = await Audit.filter(q).offset((page - 1) * page_size).limit(page_size).order_by("-created_time")
     total = await Audit.filter(q).count()
-    data = [await audit_log.to_dict() for audit_log in audit_log_objs]
+    data = Audit.serialize(audit_log_objs)
     return SuccessResponse(data=data, total=total)
 
 
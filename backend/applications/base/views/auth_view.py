@@ -7,7 +7,7 @@
 @DateTime: 2025/1/18 10:03
 """
 from datetime import timedelta, datetime, timezone
-from typing import List
+from typing import List, Dict, Any
 
 from fastapi import APIRouter
 
@@ -65,26 +65,20 @@ async def get_login_access_token(credentials: CredentialsSchema):
 async def get_user_menu():
     user_id = CTX_USER_ID.get()
     user_obj = await User.filter(id=user_id).first()
-    menus: List[Menu] = []
+    # 一次查询用户可见的全部菜单（超级管理员为全部菜单，其余按角色关联去重）
     if user_obj.is_superuser:
-        menus = await Menu.all()
+        menus: List[Menu] = await Menu.all().order_by("order", "id")
     else:
-        role_objs: List[Role] = await user_obj.roles
-        for role_obj in role_objs:
-            menu = await role_obj.menus
-            menus.extend(menu)
-        menus = list(set(menus))
-    parent_menus: List[Menu] = []
-    for menu in menus:
-        if menu.parent_id == 0:
-            parent_menus.append(menu)
+        menus: List[Menu] = await Menu.filter(role_menus__user_roles__id=user_id).distinct().order_by("order", "id")
+    menu_dicts: List[Dict[str, Any]] = Menu.serialize(menus)
     res = []
-    for parent_menu in parent_menus:
-        parent_menu_dict = await parent_menu.to_dict()
-        parent_menu_dict["children"] = []
-        for menu in menus:
-            if menu.parent_id == parent_menu.id:
-                parent_menu_dict["children"].append(await menu.to_dict())
+    for parent_menu_dict in menu_dicts:
+        if parent_menu_dict["parent_id"] != 0:
+            continue
+        parent_menu_dict["children"] = [
+            menu_dict for menu_dict in menu_dicts
+            if menu_dict["parent_id"] == parent_menu_dict["id"]
+        ]
         res.append(parent_menu_dict)
     return SuccessResponse(data=res)
 
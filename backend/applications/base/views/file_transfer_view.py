@@ -12,7 +12,7 @@ from typing import Union
 from urllib.parse import quote
 
 from fastapi import APIRouter, UploadFile, File, Form
-from starlette.responses import StreamingResponse
+from starlette.requests import Request
 
 from backend.services.file_transfer import FileTransfer
 from backend.common import FileUtils
@@ -53,12 +53,12 @@ async def upload_file(
 
 
 @file_transfer.post("/download", summary="下载文件")
-async def download_file(path: Union[str, Path] = Form(..., title="文件下载路径")):
+async def download_file(request: Request, path: Union[str, Path] = Form(..., title="文件下载路径")):
     filepath: str = os.path.join(PROJECT_CONFIG.OUTPUT_DIR, path)
     filename: str = quote(os.path.basename(path).encode("utf-8"))
-    return StreamingResponse(
-        content=FileTransfer.iter_download_file_chunks(download_file=filepath),
-        media_type="application/octet-stream",
+    return FileTransfer.download_file_response(
+        request=request,
+        download_file=filepath,
         headers={
             "filename": filename,
             "Content-Disposition": f"attachment; filename*=utf-8''{filename}"
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : job_view.py
+@DateTime: 2026/5/13 14:50
+"""
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Query
+
+from backend.core.responses import NotFoundResponse, SuccessResponse
+from backend.services import AuthControl, get_background_job
+
+job = APIRouter()
+
+
+@job.get("/get", summary="查询后台任务进度")
+async def get_job(
+        job_id: str = Query(..., description="后台任务ID"),
+        principal: Dict[str, Any] = Depends(AuthControl.get_principal),
+):
+    job_info = await get_background_job(job_id=job_id)
+    # 任务只对提交人可见，系统任务(user_id=0)只对超级用户可见
+    owner_id = job_info.get("user_id") if job_info else None
+    visible: bool = owner_id == principal["user_id"] or (owner_id == 0 and principal["is_superuser"])
+    if not job_info or not visible:
+        return NotFoundResponse(message=f"后台任务(job_id={job_id})不存在或已过期")
+    return SuccessResponse(message="查询成功", data=job_info, total=1)
@@ -10,7 +10,7 @@ from fastapi import APIRouter, Query
 
 from backend.applications.base.schemas.menu_schema import MenuCreate, MenuUpdate
 from backend.applications.base.services.menu_crud import MENU_CRUD
-from backend.core.responses import NotFoundResponse, SuccessResponse, FailureResponse
+from backend.core.responses import SuccessResponse, FailureResponse
 
 menu = APIRouter()
 
@@ -53,19 +53,8 @@ async def list_menu(
         name: str = Query(default="", description="菜单名称（子串匹配）"),
         menu_type: str = Query(default="", description="菜单类型：catalog / menu"),
 ):
-    async def get_menu_with_children(menu_id: int):
-        menu = await MENU_CRUD.get_by_id(menu_id=menu_id)
-        if not menu:
-            return NotFoundResponse(message=f"菜单(id={menu_id})信息不存在")
-
-        menu_dict = await menu.to_dict()
-        child_menus = await MENU_CRUD.model.filter(parent_id=menu_id).order_by("order")
-        menu_dict["children"] = [await get_menu_with_children(child.id) for child in child_menus]
-        return menu_dict
-
-    parent_menus = await MENU_CRUD.model.filter(parent_id=0).order_by("order")
-    res_menu = [await get_menu_with_children(menu.id) for menu in parent_menus]
-    res_menu = [m for m in res_menu if isinstance(m, dict)]
+    # 一次查询全部菜单并在内存中组装为树（带缓存），不再逐节点查询子菜单
+    res_menu = await MENU_CRUD.get_menu_tree()
     nk = name.strip() if name else ""
     tk = menu_type.strip() if menu_type else ""
     if nk or tk:
@@ -22,7 +22,7 @@ from backend.applications.base.services.role_crud import ROLE_CRUD
 from backend.applications.user.models.user_model import User
 from backend.configure import LOGGER
 from backend.core.responses import SuccessResponse, DataAlreadyExistsResponse, FailureResponse
-from backend.services import DependAuth
+from backend.services import DependAuth, invalidate_auth_cache
 
 role = APIRouter()
 
@@ -45,6 +45,7 @@ async def delete_role_one(
         role_id: int = Query(..., description="角色ID"),
 ):
     instance = await ROLE_CRUD.remove(id=role_id)
+    await invalidate_auth_cache()
     data: dict = await instance.to_dict()
     return SuccessResponse(data=data)
 
@@ -7,7 +7,7 @@
 @DateTime: 2025/2/3 16:31
 """
 import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 from tortoise.exceptions import DoesNotExist
 from tortoise.expressions import Q
@@ -16,6 +16,13 @@ from backend.applications.base.services.scaffold import ScaffoldCrud
 from backend.applications.department.models.dept_model import Department, DeptStruct
 from backend.applications.department.schemas.department_schema import DepartmentCreate, DepartmentUpdate
 from backend.core.exceptions import DataAlreadyExistsException, NotFoundException
+from backend.services import KRUN_CACHE, CacheNamespace, invalidate_dept_cache
+
+# 部门树节点返回的字段
+DEPT_TREE_FIELDS = (
+    "id", "code", "name", "description", "order", "parent_id",
+    "created_time", "updated_time", "created_user", "updated_user",
+)
 
 
 class DepartmentCrud(ScaffoldCrud[Department, DepartmentCreate, DepartmentUpdate]):
@@ -47,6 +54,7 @@ class DepartmentCrud(ScaffoldCrud[Department, DepartmentCreate, DepartmentUpdate
             instance.created_user = created_user
             await instance.save(update_fields=["created_user"])
         await self.update_dept_closure(instance)
+        await invalidate_dept_cache()
         return instance
 
     async def delete_department(self, department_id: int) -> Optional[Department]:
@@ -58,6 +66,7 @@ class DepartmentCrud(ScaffoldCrud[Department, DepartmentCreate, DepartmentUpdate
         await instance.save()
         # 删除关系
         await DeptStruct.filter(descendant=department_id).delete()
+        await invalidate_dept_cache()
         return instance
 
     async def update_department(
@@ -79,42 +88,40 @@ class DepartmentCrud(ScaffoldCrud[Department, DepartmentCreate, DepartmentUpdate
                 update_dict["updated_user"] = updated_user
             await instance.update_from_dict(update_dict)
             await instance.save()
+            await invalidate_dept_cache()
             return instance
         except DoesNotExist as e:
             raise NotFoundException(message=f"部门(id={department_id})信息不存在")
 
     async def get_dept_tree(self, name):
-        q = Q()
-        # 获取所有未被软删除的部门
-        q &= Q(is_deleted=False)
-        if name:
-            q &= Q(name__contains=name)
-        all_dept = await self.model.filter(q).order_by("order")
-
-        # 辅助函数，用于递归构建部门树
-        def build_tree(parent_id):
-            fmt = lambda x: datetime.datetime.strftime(x, "%Y-%m-%d %H:%M:%S") if isinstance(x, datetime.datetime) else x
-            return [
-                {
-                    "id": dept.id,
-                    "code": dept.code,
-                    "name": dept.name,
-                    "description": dept.description,
-                    "order": dept.order,
-                    "parent_id": dept.parent_id,
-                    "created_time": fmt(dept.created_time),
-                    "updated_time": fmt(dept.updated_time),
-                    "created_user": dept.created_user,
-                    "updated_user": dept.updated_user,
-                    "children": build_tree(dept.id),  # 递归构建子部门
-                }
-                for dept in all_dept
-                if dept.parent_id == parent_id
-            ]
-
-        # 从顶级部门（parent_id=0）开始构建部门树
-        dept_tree = build_tree(0)
-        return dept_tree
+        """
+        获取部门树：一次查询全部（按名称过滤后的）未删除部门，在内存中按 parent_id 组装，结果按过滤条件缓存。
+
+        :param name: 部门名称（子串匹配），为空表示全部。
+        :returns: 顶级部门（parent_id=0）列表，每个节点带 children。
+        """
+
+        async def _load_dept_tree():
+            q = Q()
+            # 获取所有未被软删除的部门
+            q &= Q(is_deleted=False)
+            if name:
+                q &= Q(name__contains=name)
+            all_dept = await self.model.filter(q).order_by("order").values(*DEPT_TREE_FIELDS)
+
+            children_map: Dict[int, List[Dict[str, Any]]] = {}
+            for dept in all_dept:
+                for key in ("created_time", "updated_time"):
+                    if isinstance(dept[key], datetime.datetime):
+                        dept[key] = datetime.datetime.strftime(dept[key], "%Y-%m-%d %H:%M:%S")
+                children_map.setdefault(dept["parent_id"], []).append(dept)
+            for dept in all_dept:
+                dept["children"] = children_map.get(dept["id"], [])
+
+            # 从顶级部门（parent_id=0）开始构建部门树
+            return children_map.get(0, [])
+
+        return await KRUN_CACHE.get_or_load(CacheNamespace.DEPT_TREE, name or "", _load_dept_tree)
 
     @classmethod
     async def update_dept_closure(cls, obj: Department):
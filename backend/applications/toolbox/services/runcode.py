@@ -7,9 +7,14 @@
 @DateTime: 2025/2/23 12:04
 """
 import asyncio
+import json
+import os
+import signal
 import subprocess
-import traceback
+import sys
+from typing import Any, Dict, Optional, Set
 
+from backend.configure import LOGGER, PROJECT_CONFIG
 from backend.core.exceptions import (
     ImportedException,
     SyntaxException,
@@ -17,6 +22,9 @@ from backend.core.exceptions import (
     ReqInvalidException
 )
 
+RUNCODE_WORKER_SCRIPT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runcode_worker.py")
+RUNCODE_WORKER_GRACE: float = 5  # 工作进程结束超时子进程并回写结果的宽限时间（秒）
+
 
 def validate_python_code(code: str):
     """基础代码验证"""
@@ -33,33 +41,240 @@ def validate_python_code(code: str):
             raise ImportedException(message=msg)
 
 
-async def run_python_code(code: str, timeout: int = 60):
-    try:
-        # 执行前验证代码
-        validate_python_code(code)
-
-        proc = await asyncio.wait_for(
-            asyncio.create_subprocess_exec(
-                'python3', '-c', code,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            ),
-            timeout=timeout
+class RunCodeWorker:
+    """
+    代码执行进程：常驻的预热解释器（见 runcode_worker.py），通过标准输入输出按行收发 JSON，
+    每次执行由其 fork 出全新的子进程运行代码，一个进程同一时刻只处理一个请求，由 RunCodePool 负责分配与回收。
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.runs: int = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    @classmethod
+    async def spawn(cls, options: Dict[str, Any], timeout: float) -> "RunCodeWorker":
+        """
+        启动代码执行进程并等待预热完成（预导入模块）。
+
+        :param options: 进程启动参数：preload_modules、memory_limit。
+        :param timeout: 等待进程就绪的最长时间（秒）。
+        :returns: 就绪的代码执行进程。
+        """
+        # 输出按 JSON 转义后可能膨胀数倍，读缓冲按最大输出放大，避免超长行触发 LimitOverrunError
+        max_output: int = PROJECT_CONFIG.RUNCODE_MAX_OUTPUT
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-I", RUNCODE_WORKER_SCRIPT, json.dumps(options),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            limit=max(max_output * 12, 64 * 1024) + 64 * 1024,
         )
+        worker = cls(process)
+        try:
+            line: bytes = await asyncio.wait_for(process.stdout.readline(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await worker.kill()
+            raise
+        if not line:
+            await worker.kill()
+            raise ChildProcessError(process.returncode)
+        return worker
+
+    async def run(self, code: str, timeout: float, cpu_limit: int, max_output: int) -> Dict[str, Any]:
+        """
+        执行一段代码。
+
+        :param code: 代码文本。
+        :param timeout: 墙钟时间上限（秒），由工作进程结束超时的子进程；工作进程自身无响应时抛出 asyncio.TimeoutError，进程需由调用方回收。
+        :param cpu_limit: CPU 时间上限（秒），超出时子进程被系统结束。
+        :param max_output: 输出最大保留字符数。
+        :returns: {"result", "error", "syntax_error", "exit_code"}，超时为 {"timeout": True}，子进程异常退出为 {"returncode"}
+        """
+        self.runs += 1
+        request: Dict[str, Any] = {"code": code, "cpu_limit": cpu_limit, "max_output": max_output, "timeout": timeout}
+        self.process.stdin.write((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        line: bytes = await asyncio.wait_for(self.process.stdout.readline(), timeout=timeout + RUNCODE_WORKER_GRACE)
+        if not line:
+            await self.process.wait()
+            raise ChildProcessError(self.process.returncode)
+        return json.loads(line)
+
+    async def kill(self) -> None:
+        if self.alive:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+        await self.process.wait()
+
+
+class RunCodePool:
+    """
+    代码执行进程池：预先启动并复用解释器进程，避免每次执行都付出解释器启动与模块导入的开销，
+    同时限制同时存在的进程数量，突发请求超出容量时排队等待，而不是无限制地创建子进程。
+
+    用户代码只在每次 fork 出的子进程中运行，超时、超出资源限制的子进程由工作进程结束，工作进程本身可继续复用；
+    工作进程无响应、异常退出或累计处理达到上限时回收，并在后台补充新的进程保持池内预热。
+    """
+
+    def __init__(
+            self,
+            size: int = PROJECT_CONFIG.RUNCODE_POOL_SIZE,
+            max_runs: int = PROJECT_CONFIG.RUNCODE_WORKER_MAX_RUNS,
+            queue_timeout: float = PROJECT_CONFIG.RUNCODE_QUEUE_TIMEOUT,
+    ):
+        """
+        :param size: 进程数量上限。
+        :param max_runs: 单个进程最多处理的请求数。
+        :param queue_timeout: 等待空闲进程的最长时间（秒）。
+        """
+        self.size = max(size, 1)
+        self.max_runs = max(max_runs, 1)
+        self.queue_timeout = queue_timeout
+        self.options: Dict[str, Any] = {
+            "preload_modules": PROJECT_CONFIG.RUNCODE_PRELOAD_MODULES,
+            "memory_limit": PROJECT_CONFIG.RUNCODE_MEMORY_LIMIT,
+        }
+        self._idle: Optional[asyncio.Queue] = None
+        self._total: int = 0  # 已启动及正在启动的进程数量
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed: bool = False
+
+    @property
+    def idle(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        return self._idle
 
-        stdout, stderr = await proc.communicate()
-        output = stdout.decode().strip()
-        error = stderr.decode().strip()
+    async def _spawn_idle(self) -> None:
+        try:
+            worker = await RunCodeWorker.spawn(self.options, timeout=PROJECT_CONFIG.RUNCODE_TIMEOUT)
+        except Exception as e:
+            self._total -= 1
+            LOGGER.error(f"代码执行进程启动失败: {type(e).__name__}: {e}")
+            return
+        if self._closed:
+            await self._discard(worker)
+            return
+        self.idle.put_nowait(worker)
 
-        # 处理常见错误类型
-        if "SyntaxError" in error:
-            error_lines = error.split('\n')
-            simplified_error = '\n'.join(error_lines[-3:])
-            raise SyntaxException(message=f"语法错误: {simplified_error}")
+    def _replenish(self) -> None:
+        """后台补充一个进程，保持池内进程预热。"""
+        if self._closed or self._total >= self.size:
+            return
+        self._total += 1
+        task = asyncio.create_task(self._spawn_idle())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
 
-        return {"result": output, "error": error}
+    async def _discard(self, worker: RunCodeWorker) -> None:
+        self._total -= 1
+        await worker.kill()
+
+    async def _acquire(self) -> RunCodeWorker:
+        while True:
+            try:
+                worker: RunCodeWorker = self.idle.get_nowait()
+            except asyncio.QueueEmpty:
+                if self._total < self.size:
+                    self._total += 1
+                    try:
+                        return await RunCodeWorker.spawn(self.options, timeout=PROJECT_CONFIG.RUNCODE_TIMEOUT)
+                    except BaseException:
+                        self._total -= 1
+                        raise
+                try:
+                    worker = await asyncio.wait_for(self.idle.get(), timeout=self.queue_timeout)
+                except asyncio.TimeoutError:
+                    LOGGER.error(f"等待空闲代码执行进程超时({self.queue_timeout}秒), 进程数量: {self._total}")
+                    raise ReqInvalidException(message="代码执行繁忙, 请稍后重试")
+            if worker.alive:
+                return worker
+            await self._discard(worker)
+
+    async def _release(self, worker: RunCodeWorker, healthy: bool) -> None:
+        if self._closed or not healthy or not worker.alive or worker.runs >= self.max_runs:
+            await self._discard(worker)
+            self._replenish()
+        else:
+            self.idle.put_nowait(worker)
+
+    async def start(self) -> None:
+        """预热进程池：启动全部进程，启动失败只记录日志，执行时会再次尝试创建。"""
+        self._closed = False
+        while self._total < self.size:
+            self._replenish()
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        LOGGER.info(f"代码执行进程池预热完成, 进程数量: {self.idle.qsize()}")
+
+    async def close(self) -> None:
+        """关闭进程池：结束空闲进程，执行中的进程在执行结束后回收。"""
+        self._closed = True
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        while not self.idle.empty():
+            await self._discard(self.idle.get_nowait())
+
+    async def run(self, code: str, timeout: float) -> Dict[str, Any]:
+        """
+        分配一个进程执行代码，执行结束后归还或回收进程。
+
+        :param code: 代码文本。
+        :param timeout: 墙钟时间上限（秒）。
+        :returns: {"result", "error", "syntax_error", "exit_code"}
+        """
+        worker = await self._acquire()
+        healthy: bool = False
+        try:
+            result: Dict[str, Any] = await worker.run(
+                code,
+                timeout=timeout,
+                cpu_limit=PROJECT_CONFIG.RUNCODE_CPU_LIMIT,
+                max_output=PROJECT_CONFIG.RUNCODE_MAX_OUTPUT,
+            )
+            healthy = True
+        finally:
+            # 工作进程无响应、取消或异常退出时 healthy 为 False，进程被结束并在后台补充
+            await self._release(worker, healthy)
+        if result.get("timeout"):
+            raise asyncio.TimeoutError()
+        if "returncode" in result:
+            raise ChildProcessError(result["returncode"])
+        return result
+
+
+RUNCODE_POOL = RunCodePool()
+
+
+async def run_python_code(code: str, timeout: int = PROJECT_CONFIG.RUNCODE_TIMEOUT):
+    # 执行前验证代码
+    validate_python_code(code)
+
+    try:
+        execution_result = await RUNCODE_POOL.run(code, timeout=timeout)
     except asyncio.TimeoutError:
-        raise MaxTimeoutException(message="代码执行耗时不被允许（30秒限制）")
+        raise MaxTimeoutException(message=f"代码执行耗时不被允许（{timeout}秒限制）")
+    except ChildProcessError as e:
+        returncode: Optional[int] = e.args[0] if e.args else None
+        if hasattr(signal, "SIGXCPU") and returncode == -signal.SIGXCPU:
+            raise MaxTimeoutException(message=f"代码执行CPU时间不被允许（{PROJECT_CONFIG.RUNCODE_CPU_LIMIT}秒限制）")
+        LOGGER.error(f"代码执行进程异常退出, 退出码: {returncode}")
+        raise ReqInvalidException(message=f"代码执行进程异常退出（退出码: {returncode}）")
+    except ReqInvalidException:
+        raise
     except Exception as e:
-        traceback_str = traceback.format_exc()
-        raise ReqInvalidException(message=traceback_str)
+        LOGGER.error(f"代码执行失败: {type(e).__name__}: {e}")
+        raise ReqInvalidException(message=f"代码执行失败: {type(e).__name__}: {e}")
+
+    if execution_result.get("syntax_error"):
+        raise SyntaxException(message=f"语法错误: {execution_result['error']}")
+    # 退出状态与 python -c 一致：sys.exit(非0)、sys.exit("msg") 与未捕获异常均为非 0，由调用方按执行失败处理
+    return {
+        "result": execution_result["result"],
+        "error": execution_result["error"],
+        "exit_code": execution_result.get("exit_code") or 0,
+    }
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : runcode_worker.py
+@DateTime: 2026/5/14 15:10
+
+代码执行工作进程（fork-server）：由 runcode.RunCodePool 以独立脚本方式启动（python -I runcode_worker.py <options>），
+启动时预先导入常用模块，之后按行读取 JSON 请求，每次执行都从预热的父进程 fork 出全新的子进程：
+资源限制只在子进程内设置，子进程关闭协议管道后执行代码，结果经独立管道写回父进程，执行结束即退出，
+不同请求之间不共享解释器状态（builtins、sys.modules、资源限制、文件描述符）。父进程本身从不执行用户代码。
+不支持 fork 的平台（如 Windows 开发环境）退化为每次执行启动一个单次执行子进程（python -I runcode_worker.py --once），
+由 subprocess 按墙钟时间上限结束，失去预热收益但行为一致。
+本文件不导入项目内任何模块，避免工作进程加载应用代码。
+"""
+import contextlib
+import io
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows 不支持资源限制
+    resource = None
+
+
+def limit_memory(memory_limit: int) -> None:
+    """设置进程虚拟内存上限（字节），小于等于 0 表示不限制。"""
+    if resource is not None and memory_limit > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def limit_cpu_time(cpu_limit: int) -> None:
+    """设置子进程可用的 CPU 时间（秒），fork 出的子进程 CPU 用时从 0 开始计算，超出时子进程收到 SIGXCPU 退出。"""
+    if resource is None or cpu_limit <= 0:
+        return
+    hard: int = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    soft: int = cpu_limit if hard == resource.RLIM_INFINITY else min(cpu_limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def truncate(text: str, max_output: int) -> str:
+    text = text.strip()
+    if 0 < max_output < len(text):
+        return f"{text[:max_output]}\n...(输出超过 {max_output} 个字符, 已截断)"
+    return text
+
+
+def run_code(code: str, max_output: int) -> dict:
+    """
+    在全新的全局命名空间中执行代码，捕获标准输出与错误输出。
+
+    退出状态与 python -c 一致：sys.exit(n) 为 n，sys.exit("msg") 与未捕获异常为 1，正常结束为 0。
+    """
+    try:
+        compiled = compile(code, "<string>", "exec")
+    except (SyntaxError, ValueError) as e:
+        error = "".join(traceback.format_exception_only(type(e), e))
+        return {"result": "", "error": truncate(error, max_output), "syntax_error": True, "exit_code": 1}
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code: int = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            exec(compiled, {"__name__": "__main__", "__builtins__": __builtins__})
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = int(e.code or 0)
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException as e:
+            # 跳过本文件中 exec 所在的栈帧，与 python -c 的错误输出保持一致
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            exit_code = 1
+    return {
+        "result": truncate(stdout.getvalue(), max_output),
+        "error": truncate(stderr.getvalue(), max_output),
+        "syntax_error": False,
+        "exit_code": exit_code,
+    }
+
+
+def kill_child(pid: int) -> None:
+    """结束子进程及其创建的进程组。"""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def fork_run(request: dict, options: dict, protocol_fds: tuple) -> dict:
+    """
+    fork 子进程执行一次代码并收集结果。
+
+    :param request: {"code", "cpu_limit", "max_output", "timeout"}
+    :param options: 进程启动参数，取 memory_limit。
+    :param protocol_fds: 与进程池通信的文件描述符，子进程中关闭，用户代码无法通过 /proc/self/fd 访问。
+    :returns: 正常结束时为 run_code 结果；超时为 {"timeout": True}；子进程异常退出为 {"returncode": 退出码}。
+    """
+    read_fd, write_fd = os.pipe()
+    pid: int = os.fork()
+    if pid == 0:
+        exit_code: int = 1
+        try:
+            os.setpgid(0, 0)
+            os.close(read_fd)
+            for fd in protocol_fds:
+                os.close(fd)
+            limit_memory(int(options.get("memory_limit", 0)))
+            limit_cpu_time(int(request.get("cpu_limit", 0)))
+            response: dict = run_code(request.get("code", ""), int(request.get("max_output", 0)))
+            with os.fdopen(write_fd, "wb") as result_out:
+                result_out.write(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+            exit_code = 0
+        finally:
+            os._exit(exit_code)
+
+    try:
+        os.setpgid(pid, pid)
+    except OSError:  # 子进程已自行设置或已退出
+        pass
+    os.close(write_fd)
+    timeout: float = float(request.get("timeout", 0))
+    deadline: float = time.monotonic() + timeout if timeout > 0 else 0
+    chunks: list = []
+    timed_out: bool = False
+    with os.fdopen(read_fd, "rb", buffering=0) as result_in:
+        while True:
+            remaining = max(deadline - time.monotonic(), 0) if deadline else None
+            readable, _, _ = select.select([result_in], [], [], remaining)
+            if not readable:
+                timed_out = True
+                kill_child(pid)
+                break
+            chunk: bytes = result_in.read(64 * 1024)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    _, status = os.waitpid(pid, 0)
+    if timed_out:
+        return {"timeout": True}
+    returncode: int = os.waitstatus_to_exitcode(status)
+    if returncode != 0 or not chunks:
+        return {"returncode": returncode}
+    return json.loads(b"".join(chunks))
+
+
+def spawn_run(request: dict, options: dict) -> dict:
+    """
+    不支持 fork 时的执行方式：启动单次执行子进程运行一次代码，超过墙钟时间上限由 subprocess 结束子进程。
+
+    :param request: {"code", "cpu_limit", "max_output", "timeout"}
+    :param options: 进程启动参数，原样传给子进程。
+    :returns: 与 fork_run 相同。
+    """
+    timeout: float = float(request.get("timeout", 0))
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-I", os.path.abspath(__file__), "--once", json.dumps(options)],
+            input=json.dumps(request, ensure_ascii=False).encode("utf-8"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout if timeout > 0 else None,
+        )
+    except subprocess.TimeoutExpired:
+        return {"timeout": True}
+    if completed.returncode != 0 or not completed.stdout:
+        return {"returncode": completed.returncode}
+    return json.loads(completed.stdout)
+
+
+def redirect_protocol() -> tuple:
+    """协议使用复制出的文件描述符，原标准输入输出指向 /dev/null，避免用户代码读写破坏协议。"""
+    proto_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    proto_out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull: int = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = open(os.devnull, "r", encoding="utf-8")
+    return proto_in, proto_out
+
+
+def run_once(options: dict) -> None:
+    """单次执行模式（spawn_run 启动）：从标准输入读取一个请求，设置资源限制后执行，结果写回标准输出。"""
+    proto_in, proto_out = redirect_protocol()
+    request: dict = json.loads(proto_in.read())
+    proto_in.close()
+    limit_memory(int(options.get("memory_limit", 0)))
+    limit_cpu_time(int(request.get("cpu_limit", 0)))
+    response: dict = run_code(request.get("code", ""), int(request.get("max_output", 0)))
+    proto_out.write(json.dumps(response, ensure_ascii=False))
+    proto_out.flush()
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--once":
+        run_once(json.loads(sys.argv[2]) if len(sys.argv) > 2 else {})
+        return
+    options: dict = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    proto_in, proto_out = redirect_protocol()
+
+    for module_name in options.get("preload_modules", []):
+        try:
+            __import__(module_name)
+        except ImportError:
+            pass
+
+    proto_out.write(json.dumps({"ready": True}) + "\n")
+    proto_out.flush()
+    protocol_fds: tuple = (proto_in.fileno(), proto_out.fileno())
+    for line in proto_in:
+        request: dict = json.loads(line)
+        response: dict = fork_run(request, options, protocol_fds) if hasattr(os, "fork") else spawn_run(request, options)
+        proto_out.write(json.dumps(response, ensure_ascii=False) + "\n")
+        proto_out.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -11,12 +11,14 @@ from fastapi import APIRouter
 from backend.applications.toolbox.schemas.runcode_schema import CodeRequest
 from backend.applications.toolbox.services.runcode import run_python_code
 from backend.core.exceptions import (
+    ImportedException,
     SyntaxException,
     MaxTimeoutException,
     ReqInvalidException,
 )
 from backend.core.responses import (
     SuccessResponse,
+    FailureResponse,
     BadReqResponse,
     RequestTimeoutResponse,
     SyntaxErrorResponse,
@@ -30,12 +32,16 @@ runcode = APIRouter()
 async def run_code(request: CodeRequest):
     try:
         execution_result = await run_python_code(request.code)
-        return SuccessResponse(
-            data={
-                "result": execution_result["result"],
-                "error": execution_result["error"]
-            }
-        )
+        data = {
+            "result": execution_result["result"],
+            "error": execution_result["error"],
+            "exit_code": execution_result["exit_code"],
+        }
+        if execution_result["exit_code"] != 0:
+            return FailureResponse(message=f"代码执行失败（退出状态: {execution_result['exit_code']}）", data=data)
+        return SuccessResponse(data=data)
+    except ImportedException as ie:
+        return BadReqResponse(message=ie.message)
     except SyntaxException as ste:
         return SyntaxErrorResponse(message=ste.message)
     except MaxTimeoutException as mte:
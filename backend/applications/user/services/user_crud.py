@@ -19,7 +19,7 @@ from backend.applications.user.schemas.user_schema import UserCreate, UserUpdate
 from backend.configure import LOGGER
 from backend.core.exceptions import NotFoundException, BaseExceptions, DataAlreadyExistsException, ParameterException, NoPermissionException
 from backend.core.responses import ForbiddenResponse
-from backend.services import verify_password, get_password_hash
+from backend.services import verify_password, get_password_hash, invalidate_auth_cache
 
 
 class UserCrud(ScaffoldCrud[User, UserCreate, UserUpdate]):
@@ -107,12 +107,14 @@ class UserCrud(ScaffoldCrud[User, UserCreate, UserUpdate]):
         instance.state = 1
         instance.is_active = 0
         await instance.save()
+        await invalidate_auth_cache(user_id)
         return instance
 
     async def delete_users(self, user_in: UserBatchDelete) -> int:
         user_ids: Optional[List[int]] = user_in.user_ids
         if user_ids:
             count = await self.model.filter(id__in=user_ids).update(state=1)
+            await invalidate_auth_cache(*user_ids)
         else:
             count = 0
         return count
@@ -128,6 +130,7 @@ class UserCrud(ScaffoldCrud[User, UserCreate, UserUpdate]):
         except DoesNotExist as e:
             raise NotFoundException(message=f"用户(id={user_id})信息不存在")
 
+        await invalidate_auth_cache(user_id)
         data = await instance.to_dict()
         return data
 
@@ -137,6 +140,7 @@ class UserCrud(ScaffoldCrud[User, UserCreate, UserUpdate]):
         for role_id in role_ids:
             role_obj = await ROLE_CRUD.get(id=role_id)
             await user.roles.add(role_obj)
+        await invalidate_auth_cache(user.id)
 
     async def reset_password(self, user_id: int):
         instance = await self.get(id=user_id)
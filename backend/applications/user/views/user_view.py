@@ -11,6 +11,7 @@ import traceback
 from fastapi import APIRouter, Body, Query
 from tortoise.expressions import Q
 
+from backend.applications.base.models.role_model import Role
 from backend.applications.department.services.department_crud import DEPT_CRUD
 from backend.applications.user.schemas.user_schema import (
     UserCreate,
@@ -142,18 +143,23 @@ async def list_user(
     if dept_id is not None:
         q &= Q(dept_id=dept_id)
     q &= Q(state=0)
+    # 角色通过 prefetch_related 对当前页用户一次性批量查询
     total, user_objs = await USER_CRUD.list(
-        page=page, page_size=page_size, order=order, search=q
+        page=page, page_size=page_size, order=order, search=q, related=["roles"]
     )
-    data = [
-        await obj.to_dict(
-            m2m=True,
-            exclude_fields=["password"],
-        ) for obj in user_objs
-    ]
-    for item in data:
+    # 部门按当前页用户的部门ID一次性批量查询
+    dept_ids = {obj.dept_id for obj in user_objs if obj.dept_id}
+    dept_map = {}
+    if dept_ids:
+        dept_objs = await DEPT_CRUD.model.filter(id__in=dept_ids)
+        dept_map = {dept_obj.id: dept_obj.to_dict_sync() for dept_obj in dept_objs}
+    data = []
+    for obj in user_objs:
+        item = obj.to_dict_sync(exclude_fields=["password"])
+        item["roles"] = Role.serialize(list(obj.roles))
         dept_id = item.pop("dept_id", None)
-        item["dept"] = await (await DEPT_CRUD.get(id=dept_id)).to_dict() if dept_id else {}
+        item["dept"] = dept_map.get(dept_id, {}) if dept_id else {}
+        data.append(item)
 
     return SuccessResponse(data=data, total=total)
 
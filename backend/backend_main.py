@@ -13,14 +13,17 @@ from fastapi.routing import APIRoute
 from tortoise import Tortoise
 from tortoise.exceptions import DBConnectionError
 
+from backend.applications.toolbox.services.runcode import RUNCODE_POOL
+from backend.common import shutdown_process_pool
 from backend.core.initializations import (
     register_database,
     register_exceptions,
     register_middlewares,
     register_routers,
-    init_database_table,
+    check_schema_version,
+    bootstrap_database,
 )
-from backend.core.responses import SuccessResponse
+from backend.core.responses import SuccessResponse, ORJSONResponse
 
 try:
     from backend.configure import PROJECT_CONFIG, GLOBAL_CONFIG
@@ -36,15 +39,23 @@ async def lifespan(app: FastAPI):
         await register_database(app)
     except DBConnectionError as e:
         raise RuntimeError(f"数据库连接失败, 请检查主机地址是否可达: {e}")
-    await init_database_table(app)
+    # 迁移与初始化数据由一次性引导命令(python -m backend.bootstrap_main)执行，工作进程只连接并校验结构版本
+    if PROJECT_CONFIG.DATABASE_BOOTSTRAP_ON_STARTUP:
+        await bootstrap_database(app)
+    else:
+        await check_schema_version()
 
     for route in app.routes:
         if isinstance(route, APIRoute):
             GLOBAL_CONFIG.ROUTER_SUMMARY[route.path] = route.summary
             GLOBAL_CONFIG.ROUTER_TAGS[route.path] = route.tags
 
+    await RUNCODE_POOL.start()
+
     yield
 
+    await RUNCODE_POOL.close()
+    shutdown_process_pool(wait=False)
     await Tortoise.close_connections()
 
 
@@ -57,6 +68,7 @@ app = FastAPI(
     openapi_url=PROJECT_CONFIG.APP_OPENAPI_URL,
     debug=PROJECT_CONFIG.SERVER_DEBUG,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 register_exceptions(app)
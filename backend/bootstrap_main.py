@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : bootstrap_main.py
+@DateTime: 2026/5/12 10:40
+
+数据库一次性引导命令：执行 Aerich 迁移、初始化基础数据并记录结构版本。
+部署时在启动 Gunicorn/Celery 之前执行一次，各工作进程启动时只建立连接并校验结构版本：
+
+    python -m backend.bootstrap_main
+"""
+import asyncio
+
+from tortoise import Tortoise
+
+from backend.backend_main import app
+from backend.core.initializations import bootstrap_database
+
+
+async def main() -> None:
+    try:
+        await bootstrap_database(app)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -89,11 +89,15 @@ def _reset_async_pool_and_tortoise_after_fork(**kwargs):
     池单例和 _tortoise_orm_initialized，子进程内跑任务时会用「不存在的线程/错误的 loop」，
     导致 "attached to a different loop"。清空后子进程首次任务会重新建池、重新 init Tortoise。
     """
+    from backend.services import KRUN_CACHE
+
     global _async_event_loop_pool
     _async_event_loop_pool = None
     AsyncEventLoopContextIOPool.reset_process_state()
     reset_tortoise_orm_state()
-    LOGGER.debug("【Krun-Celery-Worker】worker_process_init: 已重置异步池与 Tortoise 状态")
+    # 缓存客户端与本地缓存同样绑定父进程的事件循环，子进程需重新创建
+    KRUN_CACHE.reset()
+    LOGGER.debug("【Krun-Celery-Worker】worker_process_init: 已重置异步池、Tortoise 与缓存状态")
 
 
 def get_async_event_loop_pool():
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : task_autotest_analytics.py
+@DateTime: 2026/5/11 16:00
+
+由 Beat 每日定时触发：按原始报告重建最近几天的报告日汇总。
+"""
+from datetime import date, timedelta
+
+from backend.applications.aotutest.services.autotest_analytics_crud import AUTOTEST_API_ANALYTICS_CRUD
+from backend.celery_scheduler.celery_base import run_async
+from backend.celery_scheduler.celery_worker import celery
+
+
+@celery.task(name="backend.celery_scheduler.tasks.task_autotest_analytics.rebuild_report_rollups_task")
+def rebuild_report_rollups_task(days: int = 2) -> int:
+    """Celery task：重建最近 days 天（含今天）的报告日汇总。"""
+    date_to: date = date.today()
+    date_from: date = date_to - timedelta(days=max(days, 1) - 1)
+    return run_async(AUTOTEST_API_ANALYTICS_CRUD.rebuild(date_from=date_from, date_to=date_to))
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : task_autotest_retention.py
+@DateTime: 2026/5/9 10:10
+
+由 Beat 每日定时触发：按应用保留天数归档并删除过期的报告与明细。
+"""
+from typing import Any, Dict, List
+
+from backend.applications.aotutest.services.autotest_retention_service import AUTOTEST_RETENTION_SERVICE
+from backend.celery_scheduler.celery_base import run_async
+from backend.celery_scheduler.celery_worker import celery
+from backend.configure import LOGGER, PROJECT_CONFIG
+
+
+@celery.task(name="backend.celery_scheduler.tasks.task_autotest_retention.purge_expired_reports_task")
+def purge_expired_reports_task() -> List[Dict[str, Any]]:
+    """Celery task：归档并删除超过保留天数的报告与明细。"""
+    if not PROJECT_CONFIG.RETENTION_ENABLED:
+        LOGGER.info("报告保留策略未启用, 跳过归档过期报告")
+        return []
+    return run_async(AUTOTEST_RETENTION_SERVICE.purge_expired())
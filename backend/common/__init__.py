@@ -7,7 +7,14 @@
 @DateTime: 2025/1/12 19:38
 """
 from .api_doc_convert import APIDocConvert
-from .async_or_sync_convert import sync_to_async, async_to_sync, AsyncEventLoopContextIOPool
+from .async_or_sync_convert import (
+    sync_to_async,
+    sync_to_process,
+    async_to_sync,
+    get_process_pool,
+    shutdown_process_pool,
+    AsyncEventLoopContextIOPool,
+)
 from .configparser_utils import ConfigparserUtils
 from .convert_utils import Convert
 from .file_utils import FileUtils
@@ -30,7 +37,10 @@ __all__ = (
     Convert,
     ConfigparserUtils,
     sync_to_async,
+    sync_to_process,
     async_to_sync,
+    get_process_pool,
+    shutdown_process_pool,
     AsyncEventLoopContextIOPool,
     APIDocConvert,
 
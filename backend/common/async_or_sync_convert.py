@@ -10,9 +10,14 @@ from __future__ import annotations
 
 import asyncio
 import asyncio as aio
+import functools
 import inspect
+import multiprocessing
+import os
 import sys
 import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Callable, Union, Coroutine, Any, Type, Awaitable, Optional
 
 AnyCallable = Callable[..., Any]
@@ -21,6 +26,11 @@ AnyCoroutine = Coroutine[Any, Any, Any]
 
 PY39_VERSION = sys.version_info[:2] >= (3, 9)
 
+# CPU 密集任务（Excel 解析/生成等）使用的进程池，惰性创建，按进程隔离
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+_PROCESS_POOL_PID: int = 0
+_PROCESS_POOL_LOCK = threading.Lock()
+
 
 async def sync_to_async(func, *args, **kwargs):
     """
@@ -42,6 +52,60 @@ async def sync_to_async(func, *args, **kwargs):
         )
 
 
+
+def get_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    获取进程内共享的进程池（惰性创建）。
+
+    使用 spawn 启动方式，避免在已有事件循环/数据库连接线程的工作进程中 fork 出状态不一致的子进程；
+    当前进程与创建进程池的进程不同（如 Gunicorn/Celery prefork 子进程）时重新创建。
+
+    :param max_workers: 子进程数量，仅首次创建时生效，为空时取 min(4, CPU 核数)。
+    :return: ProcessPoolExecutor 实例。
+    """
+    global _PROCESS_POOL, _PROCESS_POOL_PID
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is None or _PROCESS_POOL_PID != os.getpid():
+            _PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=max_workers or min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _PROCESS_POOL_PID = os.getpid()
+        return _PROCESS_POOL
+
+
+def shutdown_process_pool(wait: bool = False) -> None:
+    """
+    关闭进程池（应用关闭时调用）。
+
+    :param wait: 是否等待正在执行的任务完成。
+    """
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is not None and _PROCESS_POOL_PID == os.getpid():
+            _PROCESS_POOL.shutdown(wait=wait, cancel_futures=not wait)
+        _PROCESS_POOL = None
+
+
+async def sync_to_process(func, *args, max_workers: Optional[int] = None, **kwargs):
+    """
+    将 CPU 密集的同步函数投递到进程池执行，避免阻塞事件循环（GIL 下线程池无法并行计算）。
+
+    func 必须是模块级函数，参数与返回值需可被 pickle；子进程异常退出导致进程池损坏时重建进程池后抛出原异常。
+
+    :param func: 模块级同步函数
+    :param args: 位置参数
+    :param max_workers: 进程池子进程数量，仅首次创建进程池时生效
+    :param kwargs: 关键字参数
+    :return: 函数执行结果
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_process_pool(max_workers), functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        shutdown_process_pool(wait=False)
+        raise
+
 def async_to_sync(coroutine: Awaitable, *args, **kwargs):
     """
     将异步协程转换为同步执行
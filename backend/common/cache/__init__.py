@@ -6,11 +6,9 @@
 @Module  : __init__.py.py
 @DateTime: 2025/1/16 15:22
 """
+from .redis_async_cache import LocalTTLCache, RedisAsyncCache
 
-
-def print_hi(name):
-    print(f'Hi, {name}')
-
-
-if __name__ == '__main__':
-    print_hi('Python')
+__all__ = (
+    LocalTTLCache,
+    RedisAsyncCache,
+)
@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : redis_async_cache.py
+@DateTime: 2026/5/6 10:20
+"""
+import asyncio
+import json
+import os
+import time
+import traceback
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from loguru import logger
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+# 本地缓存未命中标识（区分“缓存了 None”与“没有缓存”）
+_MISSING = object()
+# 冷却期内单个命名空间最多暂存的待失效键数量，超过后改为整体失效命名空间
+_PENDING_KEYS_LIMIT = 1000
+
+
+class LocalTTLCache:
+    """
+    进程内 LRU + TTL 缓存，作为 Redis 之前的第一级缓存。
+    仅在当前进程（gunicorn worker / celery 子进程）内有效，由 pub/sub 广播保证跨进程失效。
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: int = 30) -> None:
+        """
+        :param maxsize: 最大缓存条目数，超过后淘汰最久未使用的条目。
+        :param ttl: 默认过期时间（秒）。
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        """
+        :param key: 完整缓存键。
+        :return: 缓存值；不存在或已过期时返回 _MISSING。
+        """
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        expire_at, value = item
+        if expire_at < time.monotonic():
+            self._data.pop(key, None)
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        :param key: 完整缓存键。
+        :param value: 缓存值。
+        :param ttl: 过期时间（秒），为空时使用默认值。
+        """
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisAsyncCache:
+    """
+    基于 redis.asyncio 的两级缓存服务：
+
+    - 命名空间键：{prefix}:{namespace}:v{version}:{key}，命名空间版本号存储于 Redis，递增即整体失效；
+    - TTL：Redis 与本地缓存分别设置过期时间（本地 TTL 不超过 Redis TTL）；
+    - 单飞加载：同一进程内同一键的并发未命中只会执行一次 loader，其余协程等待同一结果；
+    - 本地缓存：LocalTTLCache 作为第一级缓存，避免热点数据每次都访问 Redis；
+    - pub/sub 失效：删除键或递增命名空间版本时广播消息，各进程收到后清理本地缓存。
+
+    Redis 不可用时自动降级为仅本地缓存 + 直接加载，不影响业务流程；降级期间的失效操作会暂存，
+    Redis 恢复后先补发（删除键/递增版本号并广播）再处理后续读写，避免其他进程继续使用旧数据。
+    值以 JSON 序列化存储，调用方需保证缓存的数据可被 JSON 序列化（模型请先转换为字典）。
+    """
+
+    def __init__(
+            self,
+            url: str,
+            prefix: str = "krun:cache",
+            default_ttl: int = 300,
+            local_maxsize: int = 2048,
+            local_ttl: int = 30,
+            channel: Optional[str] = None,
+            enabled: bool = True,
+            logger=logger,
+    ) -> None:
+        """
+        :param url: Redis 连接地址，如 redis://:password@127.0.0.1:6379/4。
+        :param prefix: 缓存键统一前缀。
+        :param default_ttl: Redis 缓存默认过期时间（秒）。
+        :param local_maxsize: 本地缓存最大条目数。
+        :param local_ttl: 本地缓存默认过期时间（秒）。
+        :param channel: 失效广播频道名称，默认 {prefix}:invalidate。
+        :param enabled: 为 False 时不访问 Redis，仅使用本地缓存。
+        :param logger: 日志对象。
+        """
+        self.url = url
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.local_ttl = local_ttl
+        self.channel = channel or f"{prefix}:invalidate"
+        self.enabled = enabled
+        self.logger = logger
+        self.local = LocalTTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self._client: Optional[aioredis.Redis] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._versions: Dict[str, int] = {}
+        self._pid: int = os.getpid()
+        # Redis 连接失败后的冷却截止时间，避免每次调用都等待连接超时
+        self._retry_after: float = 0.0
+        # 冷却期内未能同步到 Redis 的失效操作：namespace -> 待删除的完整键集合，None 表示整体失效
+        self._pending_invalidations: Dict[str, Optional[Set[str]]] = {}
+
+    # ------------------------------------------------------------------
+    # 连接管理
+    # ------------------------------------------------------------------
+    def reset(self) -> None:
+        """
+        重置进程内状态（prefork 子进程初始化时调用），子进程不能复用父进程的连接与事件循环。
+        """
+        self._client = None
+        self._client_loop = None
+        self._listener = None
+        self._inflight = {}
+        self._versions = {}
+        self._pid = os.getpid()
+        self._retry_after = 0.0
+        self._pending_invalidations = {}
+        self.local.clear()
+
+    def _redis(self) -> Optional[aioredis.Redis]:
+        """
+        惰性创建 Redis 客户端；事件循环或进程变化时重新创建，冷却期内返回 None。
+        """
+        if not self.enabled or time.monotonic() < self._retry_after:
+            return None
+        if self._pid != os.getpid():
+            self.reset()
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = aioredis.from_url(
+                self.url,
+                decode_responses=True,
+                socket_timeout=2,
+                socket_connect_timeout=2,
+                health_check_interval=30,
+            )
+            self._client_loop = loop
+            self._listener = None
+            self._versions = {}
+        if self._listener is None or self._listener.done():
+            self._listener = loop.create_task(self._listen_invalidation())
+        return self._client
+
+    async def _available(self) -> Optional[aioredis.Redis]:
+        """
+        获取可用的 Redis 客户端：存在暂存的失效操作时先补发，补发失败视为 Redis 仍不可用。
+        """
+        client = self._redis()
+        if client is None or not self._pending_invalidations:
+            return client
+        pending, self._pending_invalidations = self._pending_invalidations, {}
+        try:
+            for namespace, full_keys in pending.items():
+                if full_keys is None:
+                    self._versions[namespace] = int(await client.incr(self._version_key(namespace)))
+                    await client.publish(self.channel, self._dumps({"pid": self._pid, "namespace": namespace}))
+                elif full_keys:
+                    await client.delete(*full_keys)
+                    await client.publish(self.channel, self._dumps({"pid": self._pid, "keys": list(full_keys)}))
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            for namespace, full_keys in pending.items():
+                self._defer_invalidation(namespace, full_keys)
+            self._on_redis_error("补发缓存失效", e)
+            return None
+        self.logger.info(f"【缓存服务】Redis 已恢复, 已补发冷却期内的缓存失效: {list(pending)}")
+        return client
+
+    def _defer_invalidation(self, namespace: str, full_keys: Optional[Set[str]] = None) -> None:
+        """
+        暂存未能同步到 Redis 的失效操作，Redis 恢复后由 _available 补发。
+
+        :param namespace: 命名空间。
+        :param full_keys: 待删除的完整键；为 None 表示整体失效命名空间。
+        """
+        if namespace in self._pending_invalidations and self._pending_invalidations[namespace] is None:
+            return
+        if full_keys is None:
+            self._pending_invalidations[namespace] = None
+            return
+        merged: Set[str] = (self._pending_invalidations.get(namespace) or set()) | set(full_keys)
+        self._pending_invalidations[namespace] = None if len(merged) > _PENDING_KEYS_LIMIT else merged
+
+    def _on_redis_error(self, action: str, error: Exception) -> None:
+        """Redis 异常时记录日志并进入 30 秒冷却期，期间仅使用本地缓存。"""
+        self._retry_after = time.monotonic() + 30
+        self.logger.warning(f"【缓存服务】{action}失败, 30秒内降级为本地缓存, 错误描述: {error}")
+
+    async def close(self) -> None:
+        """关闭 Redis 连接与失效监听任务。"""
+        if self._listener and not self._listener.done():
+            self._listener.cancel()
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except Exception:
+                pass
+        self._client = None
+        self._client_loop = None
+        self._listener = None
+
+    # ------------------------------------------------------------------
+    # 键与命名空间
+    # ------------------------------------------------------------------
+    def _namespace_prefix(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:"
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:__version__"
+
+    async def _namespace_version(self, namespace: str) -> int:
+        """读取命名空间版本号（进程内缓存，收到失效广播时刷新）。"""
+        if namespace in self._versions:
+            return self._versions[namespace]
+        client = await self._available()
+        version = 0
+        if client is None:
+            # 冷却期内不缓存版本号，Redis 恢复后重新读取，避免继续使用过期版本
+            return version
+        try:
+            version = int(await client.get(self._version_key(namespace)) or 0)
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            self._on_redis_error("读取命名空间版本", e)
+            return self._versions.get(namespace, 0)
+        self._versions[namespace] = version
+        return version
+
+    async def build_key(self, namespace: str, key: Any) -> str:
+        """
+        :param namespace: 命名空间，如 step_tree、env_config。
+        :param key: 命名空间内的业务键。
+        :return: 带前缀与版本号的完整缓存键。
+        """
+        version = await self._namespace_version(namespace)
+        return f"{self._namespace_prefix(namespace)}v{version}:{key}"
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, default=str)
+
+    @staticmethod
+    def _loads(value: str) -> Any:
+        return json.loads(value)
+
+    async def get(self, namespace: str, key: Any, default: Any = None, use_local: bool = True) -> Any:
+        """
+        依次查询本地缓存与 Redis，Redis 命中时回填本地缓存。
+
+        :param namespace: 命名空间。
+        :param key: 业务键。
+        :param default: 未命中时返回的默认值。
+        :param use_local: 为 False 时直接读取 Redis 且不回填本地缓存（适用于跨进程频繁变化的状态，如后台任务进度），
+                          Redis 不可用时仍降级读取本地缓存。
+        :return: 缓存值或 default。
+        """
+        value = await self._get(namespace, key, use_local=use_local)
+        return default if value is _MISSING else value
+
+    async def _get(self, namespace: str, key: Any, use_local: bool = True) -> Any:
+        full_key = await self.build_key(namespace, key)
+        if use_local:
+            value = self.local.get(full_key)
+            if value is not _MISSING:
+                return value
+        client = await self._available()
+        if client is None:
+            return _MISSING if use_local else self.local.get(full_key)
+        try:
+            raw = await client.get(full_key)
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            self._on_redis_error("读取缓存", e)
+            return _MISSING if use_local else self.local.get(full_key)
+        if raw is None:
+            return _MISSING
+        try:
+            value = self._loads(raw)
+        except (TypeError, ValueError):
+            return _MISSING
+        if use_local:
+            self.local.set(full_key, value)
+        return value
+
+    async def set(self, namespace: str, key: Any, value: Any, ttl: Optional[int] = None, local_ttl: Optional[int] = None) -> None:
+        """
+        写入本地缓存与 Redis。
+
+        :param namespace: 命名空间。
+        :param key: 业务键。
+        :param value: 可 JSON 序列化的缓存值。
+        :param ttl: Redis 过期时间（秒），为空时使用 default_ttl。
+        :param local_ttl: 本地缓存过期时间（秒），为空时取 min(local_ttl, ttl)。
+        """
+        ttl = ttl or self.default_ttl
+        full_key = await self.build_key(namespace, key)
+        self.local.set(full_key, value, ttl=min(local_ttl or self.local_ttl, ttl))
+        client = await self._available()
+        if client is None:
+            return
+        try:
+            await client.set(full_key, self._dumps(value), ex=ttl)
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            self._on_redis_error("写入缓存", e)
+
+    async def get_or_load(
+            self,
+            namespace: str,
+            key: Any,
+            loader: Callable[[], Awaitable[Any]],
+            ttl: Optional[int] = None,
+            local_ttl: Optional[int] = None,
+            cache_none: bool = False,
+    ) -> Any:
+        """
+        读取缓存，未命中时通过 loader 加载并写回；同一进程内同一键的并发加载只执行一次（单飞）。
+
+        :param namespace: 命名空间。
+        :param key: 业务键。
+        :param loader: 无参异步加载函数，返回值需可 JSON 序列化。
+        :param ttl: Redis 过期时间（秒）。
+        :param local_ttl: 本地缓存过期时间（秒）。
+        :param cache_none: 为 True 时 loader 返回 None 也写入缓存（防止穿透）。
+        :return: 缓存值或 loader 加载结果。
+        """
+        value = await self._get(namespace, key)
+        if value is not _MISSING:
+            return value
+
+        full_key = await self.build_key(namespace, key)
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await loader()
+            if value is not None or cache_none:
+                await self.set(namespace, key, value, ttl=ttl, local_ttl=local_ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "Future exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+
+    # ------------------------------------------------------------------
+    # 失效
+    # ------------------------------------------------------------------
+    async def delete(self, namespace: str, *keys: Any) -> None:
+        """
+        删除命名空间内的若干业务键，并广播给其他进程清理本地缓存。
+
+        :param namespace: 命名空间。
+        :param keys: 业务键列表。
+        """
+        if not keys:
+            return
+        full_keys = [await self.build_key(namespace, key) for key in keys]
+        for full_key in full_keys:
+            self.local.delete(full_key)
+        client = await self._available()
+        if client is None:
+            self._defer_invalidation(namespace, set(full_keys))
+            return
+        try:
+            await client.delete(*full_keys)
+            await client.publish(self.channel, self._dumps({"pid": self._pid, "keys": full_keys}))
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            self._defer_invalidation(namespace, set(full_keys))
+            self._on_redis_error("删除缓存", e)
+
+    async def invalidate_namespace(self, namespace: str) -> None:
+        """
+        通过递增命名空间版本号使整个命名空间失效（旧键随 TTL 自然过期），并广播给其他进程。
+
+        :param namespace: 命名空间。
+        """
+        self.local.delete_prefix(self._namespace_prefix(namespace))
+        self._versions.pop(namespace, None)
+        client = await self._available()
+        if client is None:
+            self._defer_invalidation(namespace)
+            return
+        try:
+            self._versions[namespace] = int(await client.incr(self._version_key(namespace)))
+            await client.publish(self.channel, self._dumps({"pid": self._pid, "namespace": namespace}))
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            self._defer_invalidation(namespace)
+            self._on_redis_error("失效命名空间", e)
+
+    def _apply_invalidation(self, message: Dict[str, Any]) -> None:
+        """处理失效广播：清理本地缓存键或命名空间。"""
+        namespace = message.get("namespace")
+        if namespace:
+            self._versions.pop(namespace, None)
+            self.local.delete_prefix(self._namespace_prefix(namespace))
+        for full_key in message.get("keys") or []:
+            self.local.delete(full_key)
+
+    async def _listen_invalidation(self) -> None:
+        """订阅失效频道，持续清理本地缓存；连接断开时延迟重连。"""
+        while True:
+            client = self._client
+            if client is None:
+                return
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                while True:
+                    message = await pubsub.get_message(timeout=5.0)
+                    if not message or message.get("type") != "message":
+                        continue
+                    try:
+                        self._apply_invalidation(self._loads(message.get("data")))
+                    except (TypeError, ValueError):
+                        continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"【缓存服务】失效广播订阅中断, 5秒后重连, 错误描述: {e}")
+                self.logger.debug(traceback.format_exc())
+                # 订阅中断期间可能错过失效广播，清空本地缓存保证一致性
+                self.local.clear()
+                self._versions = {}
+                await asyncio.sleep(5)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
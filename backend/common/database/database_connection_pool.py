@@ -11,7 +11,7 @@ import json
 import traceback
 from datetime import date, time, datetime
 from decimal import Decimal
-from typing import Dict, Optional, Any, Type, Set
+from typing import Dict, Optional, Any, Type, Set, Callable, Awaitable
 
 import aiomysql
 import cx_Oracle
@@ -28,9 +28,19 @@ class DBConnPoolFromConfig:
             cls.__private_instance = super().__new__(cls)
         return cls.__private_instance
 
-    def __init__(self, config_model: Optional[Type], logger=logger):
+    def __init__(
+            self,
+            config_model: Optional[Type],
+            logger=logger,
+            config_resolver: Optional[Callable[..., Awaitable[Optional[Dict[str, Any]]]]] = None,
+    ):
         """
         初始化，元数据库配置
+        :param config_model: 配置表 ORM 模型
+        :param logger: 日志对象
+        :param config_resolver: 可选的配置解析器（如带缓存的环境配置解析），签名与 _get_db_config_from_orm 一致，
+                                另接受 with_password 参数：为 False 时只返回密码指纹(password_fingerprint)用于比对；
+                                提供时优先使用，且获取已有连接池时会比对配置，配置变更后自动重建连接池
         """
         if self.__private_initialized:
             return
@@ -38,10 +48,17 @@ class DBConnPoolFromConfig:
         self.__private_initialized = True
         self.logger = logger
         self.config_model = config_model
+        self.config_resolver = config_resolver
 
         # 存储结构-
         self.pools: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
 
+        # 连接池创建时使用的配置（不含密码），key 与 pools 一致（app_id/env/config_name/db_name）
+        self.pool_configs: Dict[tuple, Dict[str, Any]] = {}
+
+        # 配置变更后等待借出连接归还再关闭的旧连接池任务
+        self._retiring: Set[asyncio.Task] = set()
+
         # 错误信息存储结构
         self.errors: Dict[str, Dict[str, Dict[str, Dict[str, str]]]] = {}
 
@@ -62,6 +79,8 @@ class DBConnPoolFromConfig:
            config_name、database_name、config_host、config_port、config_username、config_password、database_type；
            且 config_type 为 database。
         """
+        if self.config_resolver is not None:
+            return await self.config_resolver(app_id, env, config_name, db_name, with_password=True)
         if not self.config_model:
             raise ValueError("未提供ORM模型，请通过config_model参数传入")
 
@@ -274,6 +293,9 @@ class DBConnPoolFromConfig:
                     loop = asyncio.get_event_loop()
                     pool = await loop.run_in_executor(None, _create_oracle_pool)
                 self._set_pool(app_id_key, env_clean, config_clean, db_clean, pool)
+                self.pool_configs[(app_id_key, env_clean, config_clean, db_clean)] = {
+                    key: value for key, value in config.items() if key != "password"
+                }
                 self._clear_error(app_id_key, env_clean, config_clean, db_clean)
                 self.logger.info("数据库创建连接池成功")
 
@@ -390,6 +412,37 @@ class DBConnPoolFromConfig:
             loop = asyncio.get_event_loop()
             await loop.run_in_executor(None, pool.close)
 
+    async def _retire_pool(self, pool, pool_name: str, grace: float = 5.0, timeout: float = 600.0):
+        """
+        退役配置变更前的旧连接池：新连接池已替换，先等待宽限时间让已取得旧池引用的协程完成借用，
+        再等待借出的连接全部归还后关闭，避免中断正在执行的 SQL。
+
+        :param pool: 旧连接池。
+        :param pool_name: 连接池标识，用于日志。
+        :param grace: 关闭前的宽限时间（秒）。
+        :param timeout: 等待连接归还的最长时间（秒），超时后强制关闭。
+        """
+        await asyncio.sleep(grace)
+        try:
+            if hasattr(pool, 'close') and hasattr(pool, 'wait_closed'):
+                # aiomysql：close 后不再借出连接，wait_closed 等待借出的连接归还后关闭
+                pool.close()
+                try:
+                    await asyncio.wait_for(pool.wait_closed(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pool.terminate()
+                    await pool.wait_closed()
+            else:
+                waited: float = 0.0
+                while getattr(pool, 'busy', 0) and waited < timeout:
+                    await asyncio.sleep(1)
+                    waited += 1
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(None, lambda: pool.close(force=True))
+            self.logger.info(f"旧连接池已关闭[{pool_name}]")
+        except Exception as e:
+            self.logger.error(f"关闭旧连接池失败[{pool_name}], 错误描述: {e}")
+
     async def close(self, app_id: Optional[str] = None):
         """关闭连接池"""
         if app_id:
@@ -402,6 +455,8 @@ class DBConnPoolFromConfig:
                             self.logger.info(f"连接池已关闭，[{app_id_key}/{env}{config_name}/{db_name}]")
 
                 del self.pools[app_id_key]
+                for pool_key in [k for k in self.pool_configs if k[0] == app_id_key]:
+                    self.pool_configs.pop(pool_key, None)
         else:
             # 关闭全部
             for app_id_key in list(self.pools.keys()):
@@ -411,6 +466,7 @@ class DBConnPoolFromConfig:
                             await self._close_single_pool(pool)
 
             self.pools.clear()
+            self.pool_configs.clear()
 
     def get_status(self):
         """获取当前状态"""
@@ -427,10 +483,26 @@ class DBConnPoolFromConfig:
         env_clean = env.lower().strip()
         config_clean = config_name.lower().strip()
         db_clean = db_name.lower().strip()
-        # 1、尝试获取已有连接池
+        # 1、尝试获取已有连接池（有配置解析器时比对配置，配置已变更则重建新池，旧池在借出连接归还后关闭）
         pool = self._get_pool(app_id_key, env_clean, config_clean, db_clean)
         if pool:
-            return pool
+            if self.config_resolver is None:
+                return pool
+            pool_key = (app_id_key, env_clean, config_clean, db_clean)
+            current_config = await self.config_resolver(app_id_key, env_clean, config_clean, db_clean)
+            if current_config == self.pool_configs.get(pool_key):
+                return pool
+            pool_name: str = f"{app_id_key}/{env_clean}/{config_clean}/{db_clean}"
+            self.logger.info(f"数据库配置已变更, 重建连接池[{pool_name}]")
+            db_pools: Dict[str, Any] = self.pools.get(app_id_key, {}).get(env_clean, {}).get(config_clean, {})
+            # 并发请求可能已替换过旧池，只由摘下旧池的协程负责退役
+            if db_pools.get(db_clean) is pool:
+                db_pools.pop(db_clean)
+                self.pool_configs.pop(pool_key, None)
+                # 旧池可能仍有连接被其他协程借用，后台等待归还后再关闭
+                task = asyncio.create_task(self._retire_pool(pool, pool_name))
+                self._retiring.add(task)
+                task.add_done_callback(self._retiring.discard)
 
         # 2、没有连接池，不存在则自动创建
         create_success = await self.connection(app_id, env, config_name, db_name)
@@ -455,5 +527,9 @@ def get_app_database_pool() -> "DBConnPoolFromConfig":
     返回绑定自动化环境配置表的单例连接池管理器（首次调用时注入 Tortoise 模型）。
     """
     from backend.applications.aotutest.models.autotest_model import AutoTestApiEnvConfigInfo
+    from backend.applications.aotutest.services.autotest_env_config_crud import AUTOTEST_API_ENV_CONFIG_CRUD
 
-    return DBConnPoolFromConfig(config_model=AutoTestApiEnvConfigInfo)
+    return DBConnPoolFromConfig(
+        config_model=AutoTestApiEnvConfigInfo,
+        config_resolver=AUTOTEST_API_ENV_CONFIG_CRUD.resolve_db_config,
+    )
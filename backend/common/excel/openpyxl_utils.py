@@ -6,16 +6,18 @@
 @Module  : openpyxl_utils.py
 @DateTime: 2025/1/16 12:38
 """
+from __future__ import annotations
+
+import json
 import os
 import re
-from typing import Optional, List, Dict, Union, Any, Generator, Literal, Tuple, Pattern
+from typing import Optional, List, Dict, Union, Any, Generator, Literal, Tuple, Pattern, Iterable, TYPE_CHECKING
 
-import openpyxl
-from openpyxl.drawing.image import Image
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from openpyxl.utils import get_column_letter, column_index_from_string
-from openpyxl.workbook import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
+# openpyxl 仅在实际操作 Excel 时按需导入，避免应用/Celery 进程启动时加载
+if TYPE_CHECKING:
+    from openpyxl.workbook import Workbook
+    from openpyxl.worksheet.worksheet import Worksheet
+    from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
 
 class OpenpyxlUtils(object):
@@ -51,6 +53,9 @@ class OpenpyxlUtils(object):
     :func by_header_acquire_letter: 根据表头名称获取字母索引、数字索引
     :func check_cell_is_merged:     检查指定坐标的单元格是否为合并单元格
     :func check_sheet_exists:       检查指定的sheet页名称是否存在
+    :func create_stream_excel:      创建只写模式（流式）的excel文件操作对象，数据行逐行写入临时文件，内存占用与总行数无关
+    :func create_stream_sheet:      在只写模式的excel文件操作对象中新建sheet页并写入表头
+    :func append_stream_rows:       向只写模式的sheet页追加数据行
     :func save_excel:               保存文件
     """
 
@@ -76,6 +81,7 @@ class OpenpyxlUtils(object):
         :param sheet_data:  非必填项；列表类型；默认值：None；    需要写入sheet页的数据，每个子列表代表一行数据
         :return: 新建成功返回True，新建失败返回False
         """
+        from openpyxl.workbook import Workbook
         # 目标文件路径已存在，跳过新建，返回False
         if os.path.exists(path=self.file_path):
             return False
@@ -123,6 +129,7 @@ class OpenpyxlUtils(object):
         如果目标文件路径上的Excel文件存在，则获取该文件的操作对象
         :return: Workbook
         """
+        import openpyxl
         # 如果文件不存在，则抛出异常
         if not os.path.exists(path=self.file_path):
             raise FileNotFoundError(f"参数异常：文件路径不存在")
@@ -451,6 +458,7 @@ class OpenpyxlUtils(object):
         :param col_width:    非必填项；数值类型；设置指定列号宽度（默认30）
         :return:
         """
+        from openpyxl.utils import get_column_letter
 
         def count_chinese_char(string: str) -> int:
             # 预编译一个正则表达式，匹配所有中文
@@ -500,6 +508,7 @@ class OpenpyxlUtils(object):
         :param color_name:   必填参数；字符类型；预设的颜色名称
         :return:
         """
+        from openpyxl.styles import PatternFill
         if not row or not col:
             raise ValueError("参数异常：row和col必须大于等于1")
 
@@ -521,6 +530,7 @@ class OpenpyxlUtils(object):
         :param color_name:   非必填项；字符类型；预设的颜色名称
         :return:
         """
+        from openpyxl.styles import PatternFill
         max_row, max_col = sheet_object.max_row, sheet_object.max_column
         color = PatternFill(
             patternType=self.cell_style.get("实心填充"),
@@ -552,6 +562,7 @@ class OpenpyxlUtils(object):
         :param start_index:  非必填项；数值类型；表头所在行（是否作用到表头）
         :return:
         """
+        from openpyxl.styles import PatternFill
         max_row, max_col = sheet_object.max_row, sheet_object.max_column
         color = PatternFill(
             patternType=self.cell_style.get("实心填充"),
@@ -587,6 +598,7 @@ class OpenpyxlUtils(object):
         :param alignment_type:必填参数；字符类型；预设的对其方式名称
         :return:
        """
+        from openpyxl.styles import Font, Alignment, Border, Side
         side = Side(
             style=self.cell_style.get("细线"),
             color=self.cell_style.get("黑色")
@@ -631,6 +643,7 @@ class OpenpyxlUtils(object):
         :param alignment_type:必填参数；字符类型；预设的对其方式名称
         :return:
        """
+        from openpyxl.styles import Font, Alignment, Border, Side
         side = Side(
             style=self.cell_style.get("细线"),
             color=self.cell_style.get("黑色")
@@ -674,6 +687,7 @@ class OpenpyxlUtils(object):
         :param color_name:   非必填项；字符类型；预设的颜色名称
         :return:
        """
+        from openpyxl.styles import Font
         rows_len = len(rows)
         cols_len = len(cols)
         link_paths_len = len(link_paths)
@@ -705,6 +719,8 @@ class OpenpyxlUtils(object):
         :param col_width:    非必填项；数值类型；设置单元格的宽度（作用到图片）
         :return:
        """
+        from openpyxl.drawing.image import Image
+        from openpyxl.utils import get_column_letter
         rows_len = len(rows)
         cols_len = len(cols)
         image_paths_len = len(image_paths)
@@ -762,6 +778,7 @@ class OpenpyxlUtils(object):
         :param expected_value:非必填项；字符类型；预期值，如果上送该参数，则会判断是否与单元格上的内容一致
         :return:
         """
+        from openpyxl.styles import PatternFill
         if not row or not col:
             raise ValueError("参数异常：row和col必须大于等于1")
 
@@ -795,6 +812,7 @@ class OpenpyxlUtils(object):
         :param failed_color_name:非必填项；字符类型；预设的颜色名称作用于不匹配预期值
         :return:
         """
+        from openpyxl.styles import PatternFill
         if axis == 0 and not rows:
             raise ValueError("参数异常：axis为0时表示作用于数据行，rows不可为None值")
 
@@ -835,6 +853,7 @@ class OpenpyxlUtils(object):
         :param header_index: 必填参数；列表类型；表头内容所在行
         :return:
         """
+        from openpyxl.utils import column_index_from_string
         column_letters = []
         column_indexes = []
         sheet_header_cells: tuple = sheet_object[header_index]
@@ -876,6 +895,57 @@ class OpenpyxlUtils(object):
         """
         return sheet_name in self.acquire_sheet_names(excel_object=excel_object)
 
+    @staticmethod
+    def create_stream_excel() -> Workbook:
+        """
+        创建只写模式（流式）的excel文件操作对象，适用于大数据量导出：数据行逐行写入临时文件，不在内存中保留单元格对象
+        只写模式下不能读取、修改已写入的单元格，也不能设置样式，写入完成后通过 save_excel 保存且只能保存一次
+        :return: Workbook
+        """
+        from openpyxl.workbook import Workbook
+        return Workbook(write_only=True)
+
+    @staticmethod
+    def create_stream_sheet(excel_object: Workbook, sheet_name: str,
+                            header_name: Optional[list] = None) -> WriteOnlyWorksheet:
+        """
+        在只写模式的excel文件操作对象中新建sheet页
+        :param excel_object:    必填参数；对象类型；只写模式的excel文件操作对象
+        :param sheet_name:      必填参数；字符类型；目标新建sheet页名称
+        :param header_name:     非必填项；列表类型；目标写入sheet页的表头内容
+        :return:
+        """
+        if sheet_name in excel_object.sheetnames:
+            raise ValueError(f"参数异常：无法新建同名sheet页")
+        sheet_object: WriteOnlyWorksheet = excel_object.create_sheet(title=sheet_name)
+        if header_name is not None:
+            sheet_object.append(header_name)
+        return sheet_object
+
+    @staticmethod
+    def append_stream_rows(sheet_object: WriteOnlyWorksheet, rows: Iterable[list]) -> int:
+        """
+        向只写模式的sheet页追加数据行：字典、列表序列化为 JSON 字符串，移除 Excel 不允许的控制字符，超长文本按单元格上限截断
+        :param sheet_object:    必填参数；对象类型；只写模式的sheet页操作对象
+        :param rows:            必填参数；可迭代类型；数据行，每个子列表代表一行数据
+        :return: 写入的行数
+        """
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        def normalize(value: Any) -> Any:
+            if isinstance(value, (dict, list, tuple)):
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            if isinstance(value, str):
+                # 单元格最多 32767 个字符
+                value = ILLEGAL_CHARACTERS_RE.sub("", value)[:32767]
+            return value
+
+        count: int = 0
+        for row in rows:
+            sheet_object.append([normalize(value) for value in row])
+            count += 1
+        return count
+
     def save_excel(self, excel_object: Workbook):
         """
         检查指定的sheet页名称是否存在
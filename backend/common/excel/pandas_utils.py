@@ -6,12 +6,15 @@
 @Module  : pandas_utils.py
 @DateTime: 2025/1/16 12:40
 """
+from __future__ import annotations
 
 import os
+from typing import Literal, List, Optional, TYPE_CHECKING
 
-import pandas as pd
-from pandas import DataFrame
-from typing import Literal, List, Optional
+# pandas 仅在实际操作 Excel 时按需导入，避免应用/Celery 进程启动时加载
+if TYPE_CHECKING:
+    import pandas as pd
+    from pandas import DataFrame
 
 
 class PandasUtils(object):
@@ -45,6 +48,7 @@ class PandasUtils(object):
         :param sheet_data:  非必填项；列表类型；默认值：None；    需要写入sheet页的数据，每个子列表代表一行数据
         :return: 新建成功返回True，新建失败返回False
         """
+        import pandas as pd
         if os.path.exists(path=self.file_path):
             return False
 
@@ -72,6 +76,7 @@ class PandasUtils(object):
         :param header_columns: 表头内容
         :return:
         """
+        import pandas as pd
         if sheet_name in self.acquire_sheet_names():
             raise ValueError(f"sheet {sheet_name} 已经存在，无法新建同名sheet页")
 
@@ -93,6 +98,7 @@ class PandasUtils(object):
         :param header:     设置表头索引
         :return:
         """
+        import pandas as pd
         return pd.read_excel(io=self.file_path, sheet_name=sheet_name, index_col=index_col, header=header)
 
     def acquire_sheet_data(self, sheet_name: str, header_row_index: int = 0) -> List[dict]:
@@ -102,6 +108,7 @@ class PandasUtils(object):
         :param header_row_index: 表头行号
         :return:
         """
+        import pandas as pd
         data = pd.read_excel(self.file_path, sheet_name, header=header_row_index)
         return data.to_dict(orient='records')
 
@@ -144,6 +151,7 @@ class PandasUtils(object):
         获取excel文件中所有的sheet页名称
         :return:
         """
+        import pandas as pd
         if not os.path.exists(self.file_path):
             raise FileNotFoundError(f"文件路径异常或不存在：「{self.file_path}」")
         excel_object = pd.ExcelFile(self.file_path, engine="openpyxl")
@@ -168,6 +176,7 @@ class PandasUtils(object):
         :param axis:        axis=0（垂直拼接）作用于行；axis=1（水平拼接）作用于列；
         :return:
         """
+        import pandas as pd
         if not self.check_sheet_exists(sheet_name):
             raise KeyError(f"指定sheet名称「{sheet_name}」不存在")
 
@@ -211,6 +220,7 @@ class PandasUtils(object):
         :param axis:       作用于行或者作用于列
         :return:
         """
+        import pandas as pd
         with pd.ExcelWriter(self.file_path, engine='openpyxl', mode="r+", if_sheet_exists="overlay") as writer:
             df = pd.read_excel(self.file_path, sheet_name, engine="openpyxl")
             row_count, col_count = df.shape
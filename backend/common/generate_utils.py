@@ -11,11 +11,10 @@ import string
 import threading
 import uuid
 from datetime import datetime, timedelta
+from functools import cached_property
 from typing import Optional, Literal, Union
 
 from dateutil.relativedelta import relativedelta
-from faker import Faker
-from xpinyin import Pinyin
 
 
 class GenerateUtils:
@@ -47,16 +46,13 @@ class GenerateUtils:
 
     def __init__(self, *args, **kwargs):
         """
-        初始化 Faker(中英文)、Pinyin 实例及日期时间格式映射表
+        初始化日期时间格式映射表；Faker(中英文)、Pinyin 实例在首次使用时创建
 
         :param args: 非必填项，位置参数(未使用)
         :param kwargs: 非必填项，关键字参数(未使用)
         :return: 无返回值
         """
         super().__init__(*args, **kwargs)
-        self.faker_cn = Faker(locale="zh_CN")
-        self.faker_en = Faker(locale="en_US")
-        self.pinyin = Pinyin()
         self.formats: dict = {
             11: "%Y",
             12: "%m",
@@ -84,6 +80,24 @@ class GenerateUtils:
             54: "%Y{0}%m{1}%d{2} %H{3}%M{4}%S{5}%f{6}".format("年", "月", "日", "时", "分", "秒", "毫秒"),
         }
 
+    @cached_property
+    def faker_cn(self):
+        """中文 Faker 实例（按需导入 faker，避免应用/Celery 进程启动时加载）"""
+        from faker import Faker
+        return Faker(locale="zh_CN")
+
+    @cached_property
+    def faker_en(self):
+        """英文 Faker 实例"""
+        from faker import Faker
+        return Faker(locale="en_US")
+
+    @cached_property
+    def pinyin(self):
+        """Pinyin 实例（按需导入 xpinyin）"""
+        from xpinyin import Pinyin
+        return Pinyin()
+
     def generate_country(self):
         """生成随机国家名称"""
         return self.faker_cn.country()
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : __init__.py.py
+@DateTime: 2026/5/8 10:40
+"""
+from .payload_store import PayloadStore
+
+__all__ = (
+    PayloadStore,
+)
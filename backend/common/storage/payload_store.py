@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : payload_store.py
+@DateTime: 2026/5/8 10:40
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from typing import Any, Dict, Iterable, Optional, Set
+
+from loguru import logger
+
+# 压缩信封标识：JSON 字段直接存储信封字典，文本字段存储「前缀 + 信封 JSON」
+ENVELOPE_KEY = "__krun_payload__"
+TEXT_ENVELOPE_PREFIX = "krun-payload:"
+CODEC_ZLIB = "zlib"
+CODEC_BLOB = "blob"
+_MISSING = object()
+
+
+class PayloadStore:
+    """
+    大字段存储层：超过阈值的文本/JSON 压缩后以信封形式入库，超过卸载阈值的再写入本地内容寻址 blob 目录。
+    读取时按信封还原，未压缩的历史数据原样返回；blob 以 sha256 命名，相同内容只落盘一次。
+    """
+
+    def __init__(
+            self,
+            blob_dir: str,
+            compress_threshold: int = 8 * 1024,
+            offload_threshold: int = 256 * 1024,
+            level: int = 6,
+            enabled: bool = True,
+            logger=logger,
+    ) -> None:
+        """
+        :param blob_dir: blob 文件存储根目录。
+        :param compress_threshold: 序列化后字节数超过该值才压缩。
+        :param offload_threshold: 序列化后字节数超过该值写入 blob 文件，库中只保留引用；小于等于 0 表示不卸载。
+        :param level: zlib 压缩级别。
+        :param enabled: 为 False 时写入不做任何处理（读取仍可还原已有信封）。
+        :param logger: 日志对象。
+        """
+        self.blob_dir = blob_dir
+        self.compress_threshold = compress_threshold
+        self.offload_threshold = offload_threshold
+        self.level = level
+        self.enabled = enabled
+        self.logger = logger
+
+    def blob_path(self, digest: str) -> str:
+        """按 sha256 摘要计算 blob 文件路径（两级目录打散）。"""
+        return os.path.join(self.blob_dir, digest[:2], digest[2:4], f"{digest}.zz")
+
+    def _write_blob(self, digest: str, compressed: bytes) -> None:
+        """写入 blob 文件，已存在则跳过；先写临时文件再原子替换，避免并发写入产生半截文件。"""
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            # 刷新修改时间：回收时跳过清理开始后仍被写入引用的 blob
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        """读取 blob 文件（压缩态），不存在时返回 None。"""
+        try:
+            with open(self.blob_path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete_blob(self, digest: str, modified_before: Optional[float] = None) -> bool:
+        """
+        删除 blob 文件，调用方需先确认已无记录引用。
+
+        :param digest: sha256 摘要。
+        :param modified_before: 时间戳，文件修改时间不早于该值时跳过（清理期间被重新引用）。
+        :returns: 是否已删除。
+        """
+        path = self.blob_path(digest)
+        try:
+            if modified_before is not None and os.path.getmtime(path) >= modified_before:
+                return False
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            self.logger.warning(f"删除大字段 blob 失败: {path}, 错误描述: {e}")
+            return False
+
+    @staticmethod
+    def is_envelope(value: Any) -> bool:
+        """判断字段值是否为压缩信封（JSON 字段的字典或文本字段的前缀字符串）。"""
+        if isinstance(value, dict):
+            return ENVELOPE_KEY in value
+        return isinstance(value, str) and value.startswith(TEXT_ENVELOPE_PREFIX)
+
+    def encode(self, value: Any, is_text: bool = False) -> Any:
+        """
+        按大小压缩/卸载单个字段值。
+
+        :param value: 原始字段值（文本字段为 str，JSON 字段为任意可 JSON 序列化对象）。
+        :param is_text: 是否为文本字段(TextField)，决定信封的存储形态。
+        :returns: 原值（未超过阈值）或压缩信封。
+        """
+        if not self.enabled or value is None or self.is_envelope(value):
+            return value
+        if is_text:
+            if not isinstance(value, str):
+                return value
+            raw: bytes = value.encode("utf-8")
+        else:
+            raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        if len(raw) <= self.compress_threshold:
+            return value
+
+        compressed: bytes = zlib.compress(raw, self.level)
+        if len(compressed) >= len(raw):
+            return value
+        digest: str = hashlib.sha256(raw).hexdigest()
+        envelope: Dict[str, Any] = {
+            ENVELOPE_KEY: CODEC_ZLIB,
+            "type": "text" if is_text else "json",
+            "size": len(raw),
+            "sha256": digest,
+        }
+        if 0 < self.offload_threshold < len(raw):
+            try:
+                self._write_blob(digest, compressed)
+                envelope[ENVELOPE_KEY] = CODEC_BLOB
+            except OSError as e:
+                self.logger.warning(f"大字段写入 blob 失败, 回退为库内压缩存储, 错误描述: {e}")
+        if envelope[ENVELOPE_KEY] == CODEC_ZLIB:
+            envelope["data"] = base64.b64encode(compressed).decode("ascii")
+        if is_text:
+            return TEXT_ENVELOPE_PREFIX + json.dumps(envelope, separators=(",", ":"))
+        return envelope
+
+    def parse_envelope(self, value: Any) -> Optional[Dict[str, Any]]:
+        """解析字段值中的信封字典，非信封或文本信封无法解析时返回 None。"""
+        if not self.is_envelope(value):
+            return None
+        if isinstance(value, dict):
+            return value
+        try:
+            envelope = json.loads(value[len(TEXT_ENVELOPE_PREFIX):])
+        except ValueError:
+            return None
+        return envelope if isinstance(envelope, dict) else None
+
+    def blob_digests(self, data: Dict[str, Any], fields: Iterable[str]) -> Set[str]:
+        """
+        收集字典中指定字段引用的 blob 摘要。
+
+        :param data: 序列化后的记录字典（未还原）。
+        :param fields: 需要检查的字段名集合。
+        :returns: sha256 摘要集合。
+        """
+        digests: Set[str] = set()
+        for field_name in fields:
+            envelope = self.parse_envelope(data.get(field_name))
+            if envelope and envelope.get(ENVELOPE_KEY) == CODEC_BLOB and envelope.get("sha256"):
+                digests.add(envelope["sha256"])
+        return digests
+
+    def decode(self, value: Any) -> Any:
+        """
+        还原单个字段值，非信封原样返回；blob 丢失或数据损坏时返回 None 并记录日志。
+
+        :param value: 库中存储的字段值。
+        :returns: 原始字段值。
+        """
+        envelope: Optional[Dict[str, Any]] = self.parse_envelope(value)
+        if envelope is None:
+            return value
+        codec = envelope.get(ENVELOPE_KEY)
+        digest: str = envelope.get("sha256") or ""
+        try:
+            if codec == CODEC_BLOB:
+                compressed = self._read_blob(digest)
+                if compressed is None:
+                    self.logger.error(f"大字段 blob 文件不存在: {self.blob_path(digest)}")
+                    return None
+            elif codec == CODEC_ZLIB:
+                compressed = base64.b64decode(envelope.get("data") or "")
+            else:
+                return value
+            raw: bytes = zlib.decompress(compressed)
+        except (OSError, zlib.error, ValueError) as e:
+            self.logger.error(f"大字段解压失败(sha256={digest}), 错误描述: {e}")
+            return None
+        if envelope.get("type") == "text":
+            return raw.decode("utf-8")
+        return json.loads(raw)
+
+    def encode_fields(self, data: Dict[str, Any], json_fields: Iterable[str] = (), text_fields: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        就地压缩字典中的指定字段。
+
+        :param data: 待入库的字段字典。
+        :param json_fields: JSON 字段名集合。
+        :param text_fields: 文本字段名集合。
+        :returns: 原字典（已就地处理）。
+        """
+        for field_name in json_fields:
+            if data.get(field_name, _MISSING) is not _MISSING:
+                data[field_name] = self.encode(data[field_name], is_text=False)
+        for field_name in text_fields:
+            if data.get(field_name, _MISSING) is not _MISSING:
+                data[field_name] = self.encode(data[field_name], is_text=True)
+        return data
+
+    def decode_fields(self, data: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        就地还原字典中的指定字段。
+
+        :param data: 序列化后的记录字典。
+        :param fields: 需要还原的字段名集合。
+        :returns: 原字典（已就地还原）。
+        """
+        for field_name in fields:
+            value = data.get(field_name)
+            if self.is_envelope(value):
+                data[field_name] = self.decode(value)
+        return data
@@ -10,6 +10,7 @@ import os
 from functools import lru_cache
 from typing import Dict, Any
 
+from celery.schedules import crontab
 from pydantic_settings import BaseSettings
 
 from backend.common import FileUtils
@@ -97,13 +98,25 @@ class CeleryConfig(BaseSettings):
         "redbeat_lock_timeout": 600,  # Beat 锁超时（秒），建议大于 renewal_interval 的 1.5 倍
         "redbeat_lock_renewal_interval": 420,  # 续期间隔（秒），在超时前完成续期
 
-        # 定时任务：每分钟扫描 AutoTestApiTaskInfo，到期则下发执行
+        # 定时任务：每分钟扫描 AutoTestApiTaskInfo，到期则下发执行；每日重建报告日汇总、归档过期报告
         "beat_schedule": {
             "scan-autotest-tasks": {
                 "task": "backend.celery_scheduler.tasks.task_autotest_case.scan_and_dispatch_autotest_tasks",
                 "schedule": 60.0,  # 每 60 秒
                 "options": {"queue": "default"},
             },
+            # 每日凌晨重建最近几天的报告日汇总，修正增量累加的偏差（报告手工修改/软删除等）
+            "rebuild-report-rollups": {
+                "task": "backend.celery_scheduler.tasks.task_autotest_analytics.rebuild_report_rollups_task",
+                "schedule": crontab(hour=3, minute=0),
+                "options": {"queue": "default"},
+            },
+            # 每日凌晨归档并删除超过保留天数的报告与明细
+            "purge-expired-reports": {
+                "task": "backend.celery_scheduler.tasks.task_autotest_retention.purge_expired_reports_task",
+                "schedule": crontab(hour=3, minute=30),
+                "options": {"queue": "default"},
+            },
         },
 
         # 日志配置
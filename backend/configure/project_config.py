@@ -80,6 +80,7 @@ class ProjectConfig(BaseSettings):
     OUTPUT_DIR: str = os.path.abspath(os.path.join(PROJECT_ROOT, "output"))
     OUTPUT_LOGS_DIR: str = os.path.abspath(os.path.join(OUTPUT_DIR, "logs"))
     OUTPUT_UPLOAD_DIR: str = os.path.abspath(os.path.join(OUTPUT_DIR, "upload"))
+    OUTPUT_UPLOAD_OBJECT_DIR: str = os.path.abspath(os.path.join(OUTPUT_UPLOAD_DIR, "objects"))  # 按内容寻址存储的上传文件
     OUTPUT_DOWNLOAD_DIR: str = os.path.abspath(os.path.join(OUTPUT_DIR, "download"))
     OUTPUT_MEDIA_DIR: str = os.path.abspath(os.path.join(OUTPUT_DIR, "media"))
     OUTPUT_DATAGRAM_DIR: str = os.path.abspath(os.path.join(OUTPUT_DIR, "datagram"))
@@ -111,6 +112,9 @@ class ProjectConfig(BaseSettings):
     # 预检请求的缓存时间（秒）
     CORS_MAX_AGE: int = 600
 
+    # 审计日志设置（请求体/响应体只截取前 N 字节作为样本记录，大文件上传/下载不在内存中整体缓冲）
+    AUDIT_BODY_SAMPLE_SIZE: int = 64 * 1024
+
     # 文件上传设置
     UPLOAD_FILE_BASE_SIZE: int = 1024 * 1024  # 1MB
     UPLOAD_FILE_PEAK_SIZE: Dict[str, int] = {
@@ -224,7 +228,12 @@ class ProjectConfig(BaseSettings):
         }
     }
 
-    # Aerich：是否在应用启动时执行 init_db / migrate / upgrade 指令
+    # 数据库引导：迁移(Aerich)与初始化数据由一次性引导命令执行（python -m backend.bootstrap_main），
+    # 各工作进程启动时只建立连接并校验结构版本，避免多个 worker 并发迁移/初始化同一批表
+    DATABASE_BOOTSTRAP_ON_STARTUP: bool = False  # 单进程开发时可打开，在应用启动时顺带执行引导
+    DATABASE_SCHEMA_CHECK_STRICT: bool = not SERVER_DEBUG  # 结构版本与当前模型不一致时：True 拒绝启动，False 仅告警；开发环境默认仅告警
+
+    # Aerich：引导命令中是否执行 init_db / migrate / upgrade 指令
     # - 生产(Linux 且 SERVER_DEBUG=False)：始终执行迁移（不提供关闭选项）
     # - 开发(SERVER_DEBUG=True)：默认不迁移；需要时由开发者手动把 DATABASE_AUTO_MIGRATION 改为 True
     @property
@@ -242,6 +251,72 @@ class ProjectConfig(BaseSettings):
     REDIS_PORT: str = "6379"
     REDIS_URL: str = f"redis://{REDIS_USERNAME}:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/0"
 
+    # 缓存配置（Redis 二级缓存 + 进程内一级缓存，使用独立的 db 4，避免与 Celery broker/backend/redbeat 混用）
+    CACHE_ENABLED: bool = True
+    CACHE_REDIS_URL: str = f"redis://{REDIS_USERNAME}:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/4"
+    CACHE_KEY_PREFIX: str = "krun:cache"
+    CACHE_DEFAULT_TTL: int = 300  # Redis 缓存默认过期时间（秒）
+    CACHE_LOCAL_MAXSIZE: int = 4096  # 进程内缓存最大条目数
+    CACHE_LOCAL_TTL: int = 30  # 进程内缓存默认过期时间（秒）
+    CACHE_INVALIDATE_CHANNEL: str = "krun:cache:invalidate"  # 缓存失效广播频道
+
+    # 后台任务与进程池配置（Excel 解析/生成等 CPU 密集任务投递到进程池，不阻塞事件循环；任务进度写入缓存供轮询）
+    PROCESS_POOL_MAX_WORKERS: int = 2  # 每个工作进程内进程池的子进程数量
+    BACKGROUND_JOB_TTL: int = 24 * 3600  # 后台任务状态保留时间（秒）
+
+    # 数据驱动数据集缓存配置（解析结果按文件内容哈希缓存，重复上传相同文件不再解析；执行时按场景缓存）
+    DATASET_PARSED_CACHE_TTL: int = 7 * 24 * 3600  # 文件解析结果缓存时间（秒）
+    DATASET_SCENARIO_CACHE_TTL: int = 3600  # 单个场景数据缓存时间（秒），数据源变更时主动失效
+
+    # 明细大字段存储配置（响应体/请求体/执行日志超过阈值压缩入库，超过卸载阈值写入本地内容寻址 blob 目录）
+    PAYLOAD_COMPRESS_ENABLED: bool = True
+    PAYLOAD_COMPRESS_THRESHOLD: int = 8 * 1024  # 压缩阈值（字节）
+    PAYLOAD_OFFLOAD_THRESHOLD: int = 256 * 1024  # 卸载阈值（字节），小于等于 0 表示只压缩不卸载
+    PAYLOAD_COMPRESS_LEVEL: int = 6  # zlib 压缩级别
+    PAYLOAD_BLOB_DIR: str = os.path.abspath(os.path.join(OUTPUT_DIR, "blobs"))
+
+    # 报告/明细保留配置（超过保留天数的报告连同明细归档为 jsonl.gz 后从库中物理删除，应用可单独配置保留天数）
+    # 默认关闭，需显式开启；开启后仅清理配置了保留天数的应用
+    RETENTION_ENABLED: bool = False
+    RETENTION_DEFAULT_DAYS: int = 0  # 全局默认保留天数，0 表示永久保留
+    RETENTION_BATCH_SIZE: int = 100  # 每批归档/删除的报告数量
+    RETENTION_ARCHIVE_ENABLED: bool = True  # 删除前是否归档到文件
+    RETENTION_ARCHIVE_DIR: str = os.path.abspath(os.path.join(OUTPUT_DIR, "archive"))
+
+    # 报告导出配置（按游标分页读取报告/明细，逐页写入只写模式的 xlsx 文件）
+    REPORT_EXPORT_PAGE_SIZE: int = 1000  # 每页读取的报告/明细数量
+    REPORT_EXPORT_FILE_TTL_HOURS: int = 24  # 导出文件保留小时数，每次导出时清理过期文件
+
+    # HTTP 步骤响应配置（流式读取响应体；变量提取/断言不引用响应体时只读取预览，超过读取上限中断读取）
+    HTTP_RESPONSE_MAX_SIZE: int = 32 * 1024 * 1024  # 响应体最大读取字节数，步骤可通过 http_max_response_bytes 单独配置
+    HTTP_RESPONSE_PREVIEW_SIZE: int = 64 * 1024  # 明细中保存的响应预览最大字节数
+
+    # 步骤重试配置（HTTP/TCP/数据库步骤遇到瞬时故障时按指数退避加抖动重试，步骤可通过 retry_policy 单独配置）
+    # 幂等保护：未发出的请求（连接失败）总是可以重试；已发出的请求仅重试幂等方法（GET/HEAD/PUT/DELETE 等）与只读 SQL
+    STEP_RETRY_ATTEMPTS: int = 1  # 总尝试次数(含首次)，默认 1 表示不重试，需全局或按步骤 retry_policy 显式开启
+    STEP_RETRY_BACKOFF: float = 0.5  # 首次重试前的退避秒数
+    STEP_RETRY_BACKOFF_FACTOR: float = 2.0  # 退避倍数
+    STEP_RETRY_MAX_BACKOFF: float = 10.0  # 单次退避上限（秒）
+    STEP_RETRY_JITTER: float = 0.5  # 抖动比例
+    STEP_RETRY_STATUS_CODES: List[int] = [502, 503, 504]  # 可重试的 HTTP 状态码
+    STEP_RETRY_EXCEPTIONS: List[str] = [  # 可重试的异常类型名称（匹配异常链及其父类）
+        "ConnectionError",  # 连接拒绝/重置/中断，连接池创建失败
+        "TimeoutError",
+        "IncompleteReadError",
+        "TransportError",  # httpx 连接/读写/协议异常
+        "OperationalError",  # 数据库连接丢失、死锁等
+    ]
+
+    # 在线代码执行配置（预热的解释器工作进程池，每次执行由预热进程 fork 出全新子进程；按 CPU 时间/内存/墙钟时间限制子进程资源）
+    RUNCODE_POOL_SIZE: int = 2  # 每个工作进程内代码执行进程的最大数量
+    RUNCODE_WORKER_MAX_RUNS: int = 50  # 单个代码执行进程最多处理的请求数，超过后回收重建
+    RUNCODE_TIMEOUT: int = 30  # 单次执行墙钟时间上限（秒），超时强制结束子进程
+    RUNCODE_CPU_LIMIT: int = 10  # 单次执行 CPU 时间上限（秒）
+    RUNCODE_MEMORY_LIMIT: int = 512 * 1024 * 1024  # 代码执行子进程虚拟内存上限（字节），0 表示不限制
+    RUNCODE_MAX_OUTPUT: int = 64 * 1024  # 标准输出/错误输出最大保留字符数
+    RUNCODE_QUEUE_TIMEOUT: int = 10  # 等待空闲进程的最长时间（秒），超时视为繁忙
+    RUNCODE_PRELOAD_MODULES: List[str] = ["json", "re", "datetime", "time", "random", "math", "hashlib", "base64", "uuid", "collections"]
+
 
 @lru_cache(maxsize=1)
 def get_project_config():
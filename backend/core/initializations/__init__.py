@@ -8,6 +8,9 @@
 """
 from .app_initialization import (
     register_database,
+    migrate_database,
+    check_schema_version,
+    bootstrap_database,
     register_exceptions,
     register_middlewares,
     register_routers,
@@ -16,6 +19,9 @@ from .data_initialization import init_database_table
 
 __all__ = (
     register_database,
+    migrate_database,
+    check_schema_version,
+    bootstrap_database,
     register_exceptions,
     register_middlewares,
     register_routers,
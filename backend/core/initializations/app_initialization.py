@@ -6,11 +6,13 @@
 @Module  : app_initialization.py
 @DateTime: 2025/1/17 21:55
 """
+import hashlib
+import json
 import os
 import shutil
 import sys
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import tortoise.exceptions
 from aerich import Command
@@ -19,11 +21,14 @@ from fastapi.exceptions import RequestValidationError, ResponseValidationError
 from starlette.exceptions import HTTPException
 from starlette.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
+from tortoise import Tortoise
 from tortoise.contrib.fastapi import register_tortoise
-from tortoise.exceptions import DoesNotExist
+from tortoise.exceptions import DoesNotExist, OperationalError
 
+from backend.applications.base.models.schema_version_model import SchemaVersion
 from backend.configure import PROJECT_CONFIG, LOGGER
-from backend.core.middlewares.app_middleware import logging_middleware
+from backend.core.initializations.data_initialization import init_database_table
+from backend.core.middlewares.app_middleware import LoggingMiddleware
 from backend.core.middlewares.auth_middleware import auth_middleware
 from backend.core.exceptions.http_exceptions import (
     request_validation_exception_handler,
@@ -36,8 +41,8 @@ from backend.core.exceptions.http_exceptions import (
 from backend.services import DependPermission
 
 
-async def register_database(app: FastAPI) -> None:
-    config: Dict[str, Any] = {
+def get_tortoise_config() -> Dict[str, Any]:
+    return {
         "connections": PROJECT_CONFIG.DATABASE_CONNECTIONS,
         "apps": {
             "models": {
@@ -48,12 +53,23 @@ async def register_database(app: FastAPI) -> None:
         "use_tz": False,
         "timezone": "Asia/Shanghai",
     }
+
+
+async def register_database(app: FastAPI) -> None:
+    """工作进程启动时只注册并建立数据库连接，迁移与初始化数据由引导命令(bootstrap_main)执行。"""
+    config: Dict[str, Any] = get_tortoise_config()
     register_tortoise(
         app=app,
         config=config,
         generate_schemas=False,
         add_exception_handlers=PROJECT_CONFIG.SERVER_DEBUG,
     )
+    await Tortoise.init(config=config)
+
+
+async def migrate_database() -> None:
+    """执行 Aerich 迁移（init_db / migrate / upgrade），仅由引导命令调用。"""
+    config: Dict[str, Any] = get_tortoise_config()
 
     # 确保迁移目录存在
     if not os.path.exists(PROJECT_CONFIG.MIGRATION_DIR):
@@ -102,6 +118,62 @@ async def register_database(app: FastAPI) -> None:
     await command.upgrade(run_in_transaction=True)
 
 
+def get_schema_version() -> str:
+    """根据当前已注册的模型结构计算摘要，作为数据库结构版本号（需在 Tortoise.init 之后调用）。"""
+    describe: Dict[str, Any] = Tortoise.describe_models(serializable=True)
+    content: str = json.dumps(describe, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+async def save_schema_version() -> str:
+    """引导完成后记录当前模型结构版本。"""
+    version: str = get_schema_version()
+    await SchemaVersion.update_or_create(
+        defaults={"version": version, "app_version": PROJECT_CONFIG.APP_VERSION},
+        app="models",
+    )
+    return version
+
+
+async def check_schema_version() -> bool:
+    """
+    校验数据库结构版本与当前模型是否一致：不一致（或尚未执行引导）时按配置拒绝启动或仅告警。
+
+    :returns: 一致返回 True，否则 False（非严格模式）。
+    :raises RuntimeError: 严格模式下结构版本不一致时。
+    """
+    expected: str = get_schema_version()
+    try:
+        record: Optional[SchemaVersion] = await SchemaVersion.filter(app="models").first()
+    except OperationalError:
+        record = None
+    if record and record.version == expected:
+        return True
+    message: str = (
+        f"数据库结构版本与当前模型不一致(数据库: {record.version if record else '未引导'}, 当前: {expected}), "
+        f"请先执行引导命令: python -m backend.bootstrap_main"
+    )
+    if PROJECT_CONFIG.DATABASE_SCHEMA_CHECK_STRICT:
+        raise RuntimeError(message)
+    LOGGER.warning(message)
+    return False
+
+
+async def bootstrap_database(app: FastAPI) -> str:
+    """
+    一次性引导：执行迁移、初始化基础数据并记录结构版本。由 bootstrap_main 调用，
+    开发环境打开 DATABASE_BOOTSTRAP_ON_STARTUP 时也会在应用启动时调用。
+
+    :param app: FastAPI 应用（初始化路由数据需要读取已注册路由）。
+    :returns: 记录的结构版本号。
+    """
+    await migrate_database()
+    await init_database_table(app)
+    version: str = await save_schema_version()
+    LOGGER.info(f"数据库引导完成, 结构版本: {version}")
+    return version
+
+
 # 注册异常处理器
 def register_exceptions(app: FastAPI) -> None:
     # 当 FastAPI 在解析和验证请求数据时发现问题，会触发 RequestValidationError 异常
@@ -159,9 +231,9 @@ def register_middlewares(app: FastAPI):
     )
     # app.add_middleware(ReqResLoggerMiddleware)    # 文件上传下载偶现阻塞
     # 注册 HTTP 请求中间件
-    # 先做认证拦截，再做审计日志记录
+    # 先做认证拦截，再做审计日志记录（审计日志为纯 ASGI 中间件，后注册的位于外层）
     app.middleware('http')(auth_middleware)
-    app.middleware('http')(logging_middleware)
+    app.add_middleware(LoggingMiddleware)
 
 
 def register_routers(app: FastAPI) -> None:
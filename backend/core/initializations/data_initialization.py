@@ -17,6 +17,7 @@ from backend.applications.aotutest.schemas.autotest_step_schema import AutoTestA
 from backend.applications.aotutest.schemas.autotest_tag_schema import AutoTestApiTagCreate
 from backend.applications.aotutest.services.autotest_case_crud import AUTOTEST_API_CASE_CRUD
 from backend.applications.aotutest.services.autotest_project_crud import AUTOTEST_API_PROJECT_CRUD
+from backend.applications.aotutest.services.autotest_report_crud import AUTOTEST_API_REPORT_CRUD
 from backend.applications.aotutest.services.autotest_tag_crud import AUTOTEST_API_TAG_CRUD
 from backend.applications.base.models.menu_model import Menu
 from backend.applications.base.models.role_model import Role
@@ -872,6 +873,11 @@ async def init_database_step():
         await step.bulk_create(steps)
 
 
+async def init_database_report():
+    # 回填历史报告的原生时间列与应用ID，已回填的数据不会重复处理
+    await AUTOTEST_API_REPORT_CRUD.backfill_time_columns()
+
+
 async def init_database_table(app: FastAPI):
     await init_database_role()
     await init_database_dept()
@@ -881,3 +887,4 @@ async def init_database_table(app: FastAPI):
     await init_database_project()
     await init_database_tag()
     await init_database_case()
+    await init_database_report()
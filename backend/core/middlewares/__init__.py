@@ -6,10 +6,10 @@
 @Module  : __init__.py.py
 @DateTime: 2025/1/12 19:44
 """
-from .app_middleware import logging_middleware
+from .app_middleware import LoggingMiddleware
 from .auth_middleware import auth_middleware
 
 __all__ = (
-    logging_middleware,
+    LoggingMiddleware,
     auth_middleware,
 )
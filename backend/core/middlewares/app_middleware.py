@@ -7,193 +7,255 @@
 @DateTime: 2025/1/17 22:29
 """
 import json
+import re
 import time
-from io import BytesIO
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from urllib.parse import unquote
 
-from fastapi import Request, Response
-from starlette.datastructures import FormData
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
 
 from backend.applications.base.models.audit_model import Audit
-from backend.applications.user.models.user_model import User
 from backend.configure import PROJECT_CONFIG, GLOBAL_CONFIG, LOGGER
 from backend.services import AuthControl
 
+# multipart 分段头中的字段名与文件名（仅从请求体样本中提取，不解析完整表单）
+MULTIPART_DISPOSITION_PATTERN = re.compile(
+    rb'content-disposition:\s*form-data;\s*name="([^"]*)"(?:;\s*filename="([^"]*)")?',
+    re.IGNORECASE,
+)
+# 响应体样本被截断时，从 JSON 前缀中提取 code/message
+RESPONSE_CODE_PATTERN = re.compile(r'"code"\s*:\s*"?([^",}]*)"?')
+RESPONSE_MESSAGE_PATTERN = re.compile(r'"message"\s*:\s*"((?:[^"\\]|\\.)*)"')
 
-def is_upload_request(request: Request) -> bool:
+
+def is_upload_request(path: str, headers: Headers) -> bool:
     """判断当前请求是否为文件上传请求（multipart/form-data 或路径含 upload）。
 
-    :param request: FastAPI/Starlette 请求对象。
+    :param path: 请求路径。
+    :param headers: 请求头。
     :returns: 是上传请求返回 True，否则 False。
     """
-    path: str = request.url.path.lower()
-    content_type: str = request.headers.get("content-type", "")
+    path: str = path.lower()
+    content_type: str = headers.get("content-type", "")
     return "multipart/form-data" in content_type.lower() or path.startswith("upload") or path.endswith("upload")
 
 
-def is_html_response(response: Response) -> bool:
-    """判断响应是否为 HTML 或 XML 文本类型。
+def get_response_placeholder(headers: Headers) -> Optional[str]:
+    """根据响应头判断是否为下载/HTML/图片/流式响应，是则返回审计日志中的占位文本。
 
-    :param response: 响应对象。
-    :returns: Content-Type 含 text/html 或 application/xml 时返回 True。
+    :param headers: 响应头。
+    :returns: 占位文本；普通响应返回 None。
     """
-    content_type: str = response.headers.get("content-type", "")
-    return "text/html" in content_type.lower() or "application/xml" in content_type.lower()
-
-
-def is_image_response(response: Response) -> bool:
-    """判断响应是否为图片类型。
-
-    :param response: 响应对象。
-    :returns: Content-Type 含 image 时返回 True。
+    content_type: str = headers.get("content-type", "").lower()
+    content_disposition: str = headers.get("content-disposition", "").lower()
+    if "attachment" in content_disposition:
+        return "<FILE DOWNLOAD>"
+    if "text/html" in content_type or "application/xml" in content_type:
+        return "<HTML CONTENT>"
+    if "image" in content_type:
+        return "<IMAGE CONTENT>"
+    if "text/event-stream" in content_type or "application/octet-stream" in content_type:
+        return "<STREAM CONTENT>"
+    return None
+
+
+def is_excluded_router(path: str) -> bool:
+    """路由排除（静态文件&OpenApi文档&审计查询本身）。"""
+    return path.startswith("/static/") or path in (
+        '/',
+        '/base/audit/list',
+        PROJECT_CONFIG.APP_DOCS_URL,
+        PROJECT_CONFIG.APP_REDOC_URL,
+        PROJECT_CONFIG.APP_OPENAPI_URL,
+    )
+
+
+class BodySampler:
+    """消息体采样器：累计总字节数，只保留前 limit 字节。"""
+
+    __slots__ = ("limit", "size", "buffer")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.size = 0
+        self.buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        remain: int = self.limit - len(self.buffer)
+        if remain > 0 and chunk:
+            self.buffer.extend(chunk[:remain])
+
+    @property
+    def truncated(self) -> bool:
+        return self.size > len(self.buffer)
+
+    def text(self) -> str:
+        text: str = bytes(self.buffer).decode("utf-8", errors="ignore")
+        if self.truncated:
+            text += f"...<TRUNCATED, TOTAL {self.size} BYTES>"
+        return text
+
+
+class LoggingMiddleware:
     """
-    content_type: str = response.headers.get("content-type", "")
-    return "image" in content_type.lower()
-
-
-def is_download_response(response: Response) -> bool:
-    """判断响应是否为附件下载（Content-Disposition 含 attachment）。
+    纯 ASGI 审计日志中间件：记录请求与响应摘要、耗时，并写入审计表。
 
-    :param response: 响应对象。
-    :returns: 为附件下载时返回 True。
+    请求/响应消息在透传给下游/客户端的同时只截取前 sample_size 字节作为样本，
+    上传不解析表单、下载不缓冲响应体，内存占用与首字节时间不随报文大小增长。
     """
-    content_disposition: str = response.headers.get("content-disposition", "")
-    return "attachment" in content_disposition.lower()
-
-
-def is_longtext_response(response: Response) -> bool:
-    """判断响应体是否超过 102400 字节（用于决定是否截断审计日志中的响应体）。
-
-    :param response: 响应对象。
-    :returns: Content-Length 大于 5000 时返回 True。
-    """
-    content_length: int = response.headers.get("content-length", 0)
-    return int(content_length) > 102400
-
 
-async def logging_middleware(request: Request, call_next):
-    """记录请求与响应摘要、耗时，并写入审计表；对上传/下载/大响应体做特殊处理。
+    def __init__(self, app: ASGIApp, sample_size: int = PROJECT_CONFIG.AUDIT_BODY_SAMPLE_SIZE):
+        """
+        :param app: 下一层 ASGI 应用。
+        :param sample_size: 请求体/响应体样本的最大字节数。
+        """
+        self.app = app
+        self.sample_size = sample_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or is_excluded_router(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        # 接口服务时间
+        start_time = time.time()
+        request_headers = Headers(scope=scope)
+        is_upload: bool = is_upload_request(scope["path"], request_headers)
+        request_sampler = BodySampler(self.sample_size)
+        response_sampler = BodySampler(self.sample_size)
+        response_state: Dict[str, Any] = {"status": 500, "headers": None, "placeholder": None}
+
+        async def receive_wrapper() -> Message:
+            message: Message = await receive()
+            if message["type"] == "http.request":
+                request_sampler.feed(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_state["status"] = message["status"]
+                response_state["headers"] = Headers(raw=message.get("headers", []))
+                response_state["placeholder"] = get_response_placeholder(response_state["headers"])
+            elif message["type"] == "http.response.body" and response_state["placeholder"] is None:
+                response_sampler.feed(message.get("body", b""))
+            await send(message)
 
-    :param request: 当前请求。
-    :param call_next: 下一层 ASGI 可调用对象。
-    :returns: 下游返回的 Response。
-    """
-    # 接口服务时间
-    start_time = time.time()
-    request_time: str = time.strftime(GLOBAL_CONFIG.DATETIME_FORMAT2, time.localtime(start_time))
-
-    # 变量初始化
-    request_body, response_body = b'', b''
-
-    # 读取并保存原始请求体，重置请求流以便后续处理
-    original_request_body: bytes = await request.body()
-    request._body = original_request_body
-    request._stream = BytesIO(original_request_body)
-
-    # 判断是否为文件上传请求
-    is_upload: bool = is_upload_request(request)
-    if is_upload:
-        form_data: Dict[str, Any] = {}
-        original_form_data: FormData = await request.form()
-        # 提取字段和文件信息
-        for field_name, field_value in original_form_data.items():
-            if hasattr(field_value, 'file'):
-                form_data[field_name] = {
-                    "filename": field_value.filename,
-                    "content_type": field_value.content_type,
-                    "size": field_value.size
-                }
-            else:
-                form_data[field_name] = field_value
-
-        # 重置流的位置到开头，确保后续处理能正确读取
-        request_body = json.dumps(form_data, ensure_ascii=False).encode("utf-8")
-        request._stream.seek(0)
-
-    # 记录请求信息
-    request_method: str = request.method
-    request_router: str = request.url.path
-    request_header: dict = dict(request.headers)
-    if "referer" in request_header and request_header["referer"]:
         try:
-            request_header["referer"] = unquote(request_header["referer"])
-        except:
-            pass
-    request_client: str = request.client.host if request.client else "127.0.0.1"
-    request_tags: str = GLOBAL_CONFIG.ROUTER_TAGS.get(request_router or "未定义", "未定义")
-    request_summary: str = GLOBAL_CONFIG.ROUTER_SUMMARY.get(request_router or "未定义", "未定义")
-    request_body: bytes = request_body if is_upload else original_request_body.decode("utf-8", errors="ignore")
-    request_params: str = unquote(request.query_params.__str__())
-
-    # 请求流传递并获取响应
-    response = await call_next(request)
-
-    # 判断是否管控响应
-    is_download: bool = is_download_response(response)
-    is_html: bool = is_html_response(response)
-    is_image: bool = is_image_response(response)
-    is_longtext: bool = is_longtext_response(response)
-
-    response_header: dict = dict(response.headers)
-
-    # 路由排除（静态文件&OpenApi文档）
-    if not request_router.startswith("/static/") and request_router not in (
-            '/',
-            '/base/audit/list',
-            PROJECT_CONFIG.APP_DOCS_URL,
-            PROJECT_CONFIG.APP_REDOC_URL,
-            PROJECT_CONFIG.APP_OPENAPI_URL,
-    ):
-        # 消费响应体
-        if is_download:
-            response_body: bytes = b"<FILE DOWNLOAD>"
-        elif is_html:
-            response_body: bytes = b"<HTML CONTENT>"
-        elif is_image:
-            response_body: bytes = b"<IMAGE CONTENT>"
-        elif is_longtext:
-            response_body: bytes = b"<LONGTEXT CONTENT>"
-        else:
-            body_chunks = []
-            async for chunk in response.body_iterator:
-                body_chunks.append(chunk)
-
-            response_body: str = b"".join(body_chunks).decode("utf-8", errors="ignore")
-
-            # 重置响应体
-            response = Response(
-                content=response_body,
-                status_code=response.status_code,
-                headers=response_header,
-                media_type=response.media_type
-            )
-
-        # 接口服务结束时间
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            try:
+                await self.write_audit(
+                    scope=scope,
+                    start_time=start_time,
+                    request_headers=request_headers,
+                    is_upload=is_upload,
+                    request_sampler=request_sampler,
+                    response_sampler=response_sampler,
+                    response_state=response_state,
+                )
+            except Exception as e:
+                LOGGER.error(f"审计日志记录失败, 请求路由: {scope['path']}, 错误描述: {e}")
+
+    @staticmethod
+    def summarize_upload(request_headers: Headers, request_sampler: BodySampler) -> str:
+        """上传请求只记录内容类型、总大小以及样本中出现的字段名/文件名，不解析完整表单。"""
+        parts: List[Dict[str, Any]] = []
+        for name, filename in MULTIPART_DISPOSITION_PATTERN.findall(bytes(request_sampler.buffer)):
+            part: Dict[str, Any] = {"name": name.decode("utf-8", errors="ignore")}
+            if filename:
+                part["filename"] = filename.decode("utf-8", errors="ignore")
+            parts.append(part)
+        summary: Dict[str, Any] = {
+            "content_type": request_headers.get("content-type", "").split(";")[0],
+            "size": request_sampler.size,
+            "parts": parts,
+        }
+        return json.dumps(summary, ensure_ascii=False)
+
+    @staticmethod
+    def parse_response_summary(response_sampler: BodySampler) -> Dict[str, Any]:
+        """从响应体样本中提取 code/message：完整样本直接解析 JSON，截断样本使用正则提取前缀中的字段。"""
+        text: str = bytes(response_sampler.buffer).decode("utf-8", errors="ignore")
+        if not text:
+            return {}
+        if not response_sampler.truncated:
+            try:
+                _response = json.loads(text)
+            except ValueError:
+                return {}
+            if not isinstance(_response, dict):
+                return {}
+            return {"code": _response.get("code", ""), "message": str(_response.get("message", ""))}
+        summary: Dict[str, Any] = {}
+        code_match = RESPONSE_CODE_PATTERN.search(text)
+        if code_match:
+            summary["code"] = code_match.group(1)
+        message_match = RESPONSE_MESSAGE_PATTERN.search(text)
+        if message_match:
+            try:
+                summary["message"] = json.loads(f'"{message_match.group(1)}"')
+            except ValueError:
+                summary["message"] = message_match.group(1)
+        return summary
+
+    async def write_audit(
+            self,
+            scope: Scope,
+            start_time: float,
+            request_headers: Headers,
+            is_upload: bool,
+            request_sampler: BodySampler,
+            response_sampler: BodySampler,
+            response_state: Dict[str, Any],
+    ) -> None:
+        """响应发送完毕后记录日志并写入审计表。"""
+        request_time: str = time.strftime(GLOBAL_CONFIG.DATETIME_FORMAT2, time.localtime(start_time))
         end_time = time.time()
         response_time: str = time.strftime(GLOBAL_CONFIG.DATETIME_FORMAT2, time.localtime(end_time))
         response_elapsed = f"{end_time - start_time:.4f}s"
 
-        # 记录日志
+        # 记录请求信息
+        request_router: str = scope["path"]
+        request_header: dict = dict(request_headers)
+        if "referer" in request_header and request_header["referer"]:
+            try:
+                request_header["referer"] = unquote(request_header["referer"])
+            except:
+                pass
+        client = scope.get("client")
+        request_client: str = client[0] if client else "127.0.0.1"
+        request_params: str = unquote(scope.get("query_string", b"").decode("latin-1"))
+        if is_upload:
+            request_body: str = self.summarize_upload(request_headers, request_sampler)
+        else:
+            request_body: str = request_sampler.text()
+
+        response_headers: Optional[Headers] = response_state["headers"]
         audit_log: Dict[str, Any] = {
             "request_time": request_time,
-            "request_tags": request_tags,
-            "request_summary": request_summary,
-            "request_method": request_method,
+            "request_tags": GLOBAL_CONFIG.ROUTER_TAGS.get(request_router or "未定义", "未定义"),
+            "request_summary": GLOBAL_CONFIG.ROUTER_SUMMARY.get(request_router or "未定义", "未定义"),
+            "request_method": scope["method"],
             "request_router": request_router,
             "request_client": request_client,
             "request_header": request_header,
             "request_params": request_body or request_params,
             "response_time": response_time,
-            "response_header": response_header,
+            "response_header": dict(response_headers) if response_headers is not None else {},
             "response_elapsed": response_elapsed
         }
-        if isinstance(response_body, str):
-            _response = json.loads(response_body)
-            audit_log["response_code"] = _response.get("code", "")
-            audit_log["response_message"] = _response.get("message", "")[:512]
-            audit_log["response_params"] = response_body
-            del _response
+        if response_state["placeholder"]:
+            audit_log["response_params"] = response_state["placeholder"]
+        elif response_headers is None:
+            audit_log["response_code"] = str(response_state["status"])
+            audit_log["response_message"] = "<NO RESPONSE>"
+        else:
+            summary: Dict[str, Any] = self.parse_response_summary(response_sampler)
+            audit_log["response_code"] = str(summary.get("code", ""))[:16]
+            audit_log["response_message"] = summary.get("message", "")[:512]
+            audit_log["response_params"] = response_sampler.text()
 
         request_message: str = f"\n> > > > > > > > > > > > > > > > > > > >\n" \
                                f"请求时间：{audit_log.get('request_time')}\n" \
@@ -216,17 +278,15 @@ async def logging_middleware(request: Request, call_next):
 
         try:
             # 获取用户信息
-            user_obj: Optional[User] = None
-            token = request.headers.get("token")
+            principal: Optional[Dict[str, Any]] = None
+            token = request_headers.get("token")
             if token:
-                user_obj: User = await AuthControl.is_authed(token)
-            audit_log["user_id"] = user_obj.id if user_obj else 0
-            audit_log["username"] = user_obj.username if user_obj else ""
+                principal = await AuthControl.get_principal(token)
+            audit_log["user_id"] = principal["user_id"] if principal else 0
+            audit_log["username"] = principal["username"] if principal else ""
         except Exception as e:
             audit_log["user_id"] = 0
             audit_log["username"] = ""
 
         # 审计落库
         await Audit.create(**audit_log)
-
-    return response
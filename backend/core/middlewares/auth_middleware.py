@@ -97,7 +97,7 @@ async def auth_middleware(request: Request, call_next):
 
     # 对( RBAC发生在依赖权限中)进行认证
     try:
-        await AuthControl.is_authed(token)
+        await AuthControl.get_principal(token)
     except Exception as e:
         # 统一以未认证返回，避免调试模式下泄露异常细节
         return UnauthorizedResponse(message="请求服务鉴权已过期, 请重新登录获取有效 Token 后进行访问")
@@ -6,7 +6,7 @@
 @Module  : __init__.py.py
 @DateTime: 2025/1/12 19:44
 """
-from .base_response import BaseResponse
+from .base_response import BaseResponse, ORJSONResponse, orjson_dumps
 from .http_response import (
     SuccessResponse,
     FailureResponse,
@@ -29,6 +29,9 @@ from .http_response import (
 )
 
 __all__ = (
+    BaseResponse,
+    ORJSONResponse,
+    orjson_dumps,
     SuccessResponse,
     FailureResponse,
     BadReqResponse,
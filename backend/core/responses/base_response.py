@@ -7,15 +7,71 @@
 @DateTime: 2025/1/16 16:14
 """
 import json
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import PurePath
 from typing import Optional, Union, List, Any, Dict
 
+import orjson
 from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
 from starlette.responses import JSONResponse
 
 from backend.enums import Code, Status, Message
 
+# datetime/date/time/UUID/Enum/dataclass 由 orjson 原生序列化，非字符串字典键按字符串输出
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
 
-class BaseResponse(JSONResponse):
+
+def orjson_default(value: Any) -> Any:
+    """
+    orjson 无法原生处理的类型兜底转换，转换规则与 fastapi.encoders.jsonable_encoder 保持一致。
+
+    :param value: 待序列化对象。
+    :returns: 可被 orjson 序列化的对象。
+    :raises TypeError: 无法转换时抛出，由调用方回退到 jsonable_encoder。
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="ignore")
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, PurePath):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def orjson_dumps(content: Any) -> bytes:
+    """
+    使用 orjson 序列化响应内容；遇到超出 64 位的整数等 orjson 不支持的内容时回退到 jsonable_encoder + 标准库 json。
+
+    :param content: 响应内容。
+    :returns: UTF-8 编码的 JSON 字节串。
+    """
+    try:
+        return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+    except TypeError:
+        return json.dumps(
+            jsonable_encoder(content),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class ORJSONResponse(JSONResponse):
+    """基于 orjson 的 JSON 响应，同时作为 FastAPI 的默认响应类使用。"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson_dumps(content)
+
+
+class BaseResponse(ORJSONResponse):
     http_status_code = 200
     code: Code = Code.CODE200
     status: Status = Status.SUCCESS
@@ -29,7 +85,8 @@ class BaseResponse(JSONResponse):
                  status: Optional[Status] = None,
                  message: Optional[str] = None,
                  data: Optional[dict] = None,
-                 total: Optional[int] = None, **kwargs):
+                 total: Optional[int] = None,
+                 next_cursor: Optional[str] = None, **kwargs):
 
         if http_status_code and isinstance(http_status_code, int):
             self.http_status_code = http_status_code
@@ -59,9 +116,12 @@ class BaseResponse(JSONResponse):
             data=data,
             total=total
         )
+        # 游标分页且存在下一页时返回 next_cursor，缺少该字段表示已到最后一页
+        if next_cursor:
+            resp["next_cursor"] = next_cursor
 
         super(BaseResponse, self).__init__(
             status_code=self.http_status_code,
-            content=jsonable_encoder(resp),
+            content=resp,
             **kwargs
         )
@@ -21,8 +21,9 @@ class SuccessResponse(BaseResponse):
     data = {}
     total = None
 
-    def __init__(self, message: Optional[str] = None, data: DataType = None, total: Optional[int] = None):
-        super(SuccessResponse, self).__init__(message=message, data=data, total=total)
+    def __init__(self, message: Optional[str] = None, data: DataType = None, total: Optional[int] = None,
+                 next_cursor: Optional[str] = None):
+        super(SuccessResponse, self).__init__(message=message, data=data, total=total, next_cursor=next_cursor)
 
 
 class FailureResponse(BaseResponse):
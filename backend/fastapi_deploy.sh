@@ -230,6 +230,18 @@ start_celery_beat() {
     fi
 }
 
+# 数据库引导(迁移+初始化数据), 每次部署只执行一次, 各工作进程启动时不再迁移
+bootstrap_database() {
+    print_step "数据库引导: 迁移并初始化数据"
+
+    check_command "python"
+
+    (cd "${PROJECT_ROOT}/.." && python -m backend.bootstrap_main) || {
+        handle_error "数据库引导失败, 请检查迁移与初始化日志"
+    }
+    print_info "数据库引导完成"
+}
+
 # 步骤3: 启动Celery
 start_celery() {
     print_step "步骤3: 启动Celery服务"
@@ -333,6 +345,7 @@ full_deploy() {
 
     stop_services
     pull_code
+    bootstrap_database
     start_celery
     start_fastapi
     check_status
@@ -344,6 +357,7 @@ restart_services() {
 
     stop_services
     sleep 2
+    bootstrap_database
     start_celery
     start_fastapi
     check_status
@@ -383,7 +397,7 @@ main() {
         *)
             echo "==================== ToolBox 项目部署脚本 ===================="
             echo "命令说明:"
-            echo "  start         # 完整部署(停止服务 -> 拉取master分支代码 -> 启动Celery服务 -> 启动FastAPI服务)"
+            echo "  start         # 完整部署(停止服务 -> 拉取master分支代码 -> 数据库引导 -> 启动Celery服务 -> 启动FastAPI服务)"
             echo "  restart       # 仅重启服务(不拉取代码)"
             echo "  stop          # 停止所有服务"
             echo "  status        # 查看服务运行状态"
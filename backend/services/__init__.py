@@ -8,11 +8,36 @@
 """
 
 from .ctx import CTX_USER_ID
+from .cache import (
+    KRUN_CACHE,
+    CacheNamespace,
+    invalidate_auth_cache,
+    invalidate_step_tree_cache,
+    invalidate_env_config_cache,
+    invalidate_menu_cache,
+    invalidate_dept_cache,
+    invalidate_dataset_scenario_cache,
+)
+from .storage import PAYLOAD_STORE
+from .jobs import JobStatus, BackgroundJob, submit_background_job, get_background_job
 from .dependency import AuthControl, DependAuth, DependPermission
 from .password import verify_password, get_password_hash, generate_password, create_access_token
 
 __all__ = (
     CTX_USER_ID,
+    KRUN_CACHE,
+    CacheNamespace,
+    invalidate_auth_cache,
+    invalidate_step_tree_cache,
+    invalidate_env_config_cache,
+    invalidate_menu_cache,
+    invalidate_dept_cache,
+    invalidate_dataset_scenario_cache,
+    PAYLOAD_STORE,
+    JobStatus,
+    BackgroundJob,
+    submit_background_job,
+    get_background_job,
     AuthControl,
     DependAuth,
     DependPermission,
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : cache.py
+@DateTime: 2026/5/6 11:05
+"""
+from backend.common.cache import RedisAsyncCache
+from backend.configure import PROJECT_CONFIG, LOGGER
+
+
+class CacheNamespace:
+    """缓存命名空间，统一管理避免各模块自行拼写字符串。"""
+    STEP_TREE = "step_tree"  # 用例步骤树：case_id -> 步骤树
+    ENV_CONFIG = "env_config"  # 环境配置：(project_id, env_name, config_type, config_name) -> 配置
+    PROJECT = "project"  # 应用信息：project_name -> project_id
+    AUTH_PRINCIPAL = "auth_principal"  # 鉴权主体：user_id -> 用户基础信息
+    AUTH_PERMISSION = "auth_permission"  # 接口权限：user_id -> [(method, path), ...]
+    MENU_TREE = "menu_tree"  # 菜单树：固定键 -> 全量菜单树
+    DEPT_TREE = "dept_tree"  # 部门树：部门名称过滤条件 -> 部门树
+    BACKGROUND_JOB = "background_job"  # 后台任务：job_id -> 任务状态与进度
+    DATASET_PARSED = "dataset_parsed"  # 数据驱动文件解析结果：(解析方式, file_hash) -> 解析结果
+    DATASET_SCENARIO = "dataset_scenario"  # 数据源场景：(cache_key, dataset_name) -> 场景数据
+
+
+KRUN_CACHE = RedisAsyncCache(
+    url=PROJECT_CONFIG.CACHE_REDIS_URL,
+    prefix=PROJECT_CONFIG.CACHE_KEY_PREFIX,
+    default_ttl=PROJECT_CONFIG.CACHE_DEFAULT_TTL,
+    local_maxsize=PROJECT_CONFIG.CACHE_LOCAL_MAXSIZE,
+    local_ttl=PROJECT_CONFIG.CACHE_LOCAL_TTL,
+    channel=PROJECT_CONFIG.CACHE_INVALIDATE_CHANNEL,
+    enabled=PROJECT_CONFIG.CACHE_ENABLED,
+    logger=LOGGER,
+)
+
+
+async def invalidate_auth_cache(*user_ids: int) -> None:
+    """
+    用户/角色/权限变更后清理鉴权缓存。
+
+    :param user_ids: 受影响的用户ID；为空时整体失效（如角色权限变更会影响所有绑定用户）。
+    """
+    if user_ids:
+        await KRUN_CACHE.delete(CacheNamespace.AUTH_PRINCIPAL, *user_ids)
+        await KRUN_CACHE.delete(CacheNamespace.AUTH_PERMISSION, *user_ids)
+    else:
+        await KRUN_CACHE.invalidate_namespace(CacheNamespace.AUTH_PRINCIPAL)
+        await KRUN_CACHE.invalidate_namespace(CacheNamespace.AUTH_PERMISSION)
+
+
+async def invalidate_step_tree_cache() -> None:
+    """
+    用例/步骤变更后整体失效步骤树缓存。
+    步骤树中内嵌了用例信息与引用的公共脚本步骤，单条变更可能影响多个用例，因此按命名空间整体失效。
+    """
+    await KRUN_CACHE.invalidate_namespace(CacheNamespace.STEP_TREE)
+
+
+async def invalidate_env_config_cache() -> None:
+    """
+    环境枚举/环境配置变更后整体失效环境配置缓存。
+    环境配置变更频率很低，整体失效即可；数据库连接池在下次获取时会比对配置并按需重建。
+    """
+    await KRUN_CACHE.invalidate_namespace(CacheNamespace.ENV_CONFIG)
+
+
+async def invalidate_menu_cache() -> None:
+    """菜单新增/更新/删除后整体失效菜单树缓存。"""
+    await KRUN_CACHE.invalidate_namespace(CacheNamespace.MENU_TREE)
+
+
+async def invalidate_dept_cache() -> None:
+    """
+    部门新增/更新/删除后整体失效部门树缓存。
+    部门树按名称过滤条件分别缓存，任意变更都可能影响多个过滤结果，因此按命名空间整体失效。
+    """
+    await KRUN_CACHE.invalidate_namespace(CacheNamespace.DEPT_TREE)
+
+
+async def invalidate_dataset_scenario_cache() -> None:
+    """
+    数据源删除后整体失效场景缓存。
+    删除时不逐一查询场景名称，删除操作频率很低，按命名空间整体失效即可；场景内容变更由同步逻辑按键精确失效。
+    """
+    await KRUN_CACHE.invalidate_namespace(CacheNamespace.DATASET_SCENARIO)
@@ -6,7 +6,7 @@
 @Module  : dependency.py
 @DateTime: 2025/2/19 13:03
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 import jwt
 from fastapi import Depends, Header, HTTPException, Request
@@ -15,7 +15,7 @@ from backend.applications.base.models.role_model import Role
 from backend.applications.user.models.user_model import User
 from backend.configure import PROJECT_CONFIG
 from backend.enums import HTTPMethod
-from backend.services import CTX_USER_ID
+from backend.services import CTX_USER_ID, KRUN_CACHE, CacheNamespace
 
 
 class AuthControl:
@@ -40,24 +40,73 @@ class AuthControl:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"{repr(e)}")
 
+    @classmethod
+    async def get_principal(cls, token: str = Header(..., description="token验证")) -> Dict[str, Any]:
+        """
+        解析 Token 并返回鉴权主体（user_id/username/is_superuser），主体信息走缓存，
+        供中间件与权限校验使用，避免每个请求都查询用户表；需要 User 模型实例时请使用 is_authed。
+        """
+        try:
+            decode_data = jwt.decode(
+                jwt=token,
+                key=PROJECT_CONFIG.AUTH_SECRET_KEY,
+                algorithms=PROJECT_CONFIG.AUTH_JWT_ALGORITHM
+            )
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="请求服务鉴权已过期, 请重新登录获取有效 Token 后进行访问")
+        except jwt.PyJWTError:
+            raise HTTPException(status_code=401, detail="请求服务鉴权失败, 请携带有效 Token 进行访问")
+
+        user_id = decode_data.get("user_id")
+        if not user_id:
+            raise HTTPException(status_code=401, detail="请求服务鉴权失败")
+
+        async def _load_principal() -> Optional[Dict[str, Any]]:
+            user = await User.filter(id=user_id).first().values("id", "username", "is_superuser")
+            if not user:
+                return None
+            return {"user_id": user["id"], "username": user["username"], "is_superuser": user["is_superuser"]}
+
+        principal = await KRUN_CACHE.get_or_load(CacheNamespace.AUTH_PRINCIPAL, user_id, _load_principal)
+        if not principal:
+            raise HTTPException(status_code=401, detail="请求服务鉴权失败")
+        CTX_USER_ID.set(int(user_id))
+        return principal
+
 
 class PermissionControl:
     @classmethod
-    async def has_permission(cls, request: Request, current_user: User = Depends(AuthControl.is_authed)) -> None:
-        if current_user.is_superuser:
+    async def get_permission_apis(cls, user_id: int) -> List[List[str]]:
+        """
+        查询用户可访问的接口集合（method + path），结果走缓存，角色/权限变更时失效。
+        """
+
+        async def _load_permission_apis() -> List[List[str]]:
+            user = await User.filter(id=user_id).first()
+            if not user:
+                return []
+            roles: List[Role] = await user.roles.all().prefetch_related("routers")
+            return sorted(
+                [list(item) for item in set(
+                    (str(router.method), router.path) for role in roles for router in role.routers
+                )]
+            )
+
+        return await KRUN_CACHE.get_or_load(CacheNamespace.AUTH_PERMISSION, user_id, _load_permission_apis)
+
+    @classmethod
+    async def has_permission(cls, request: Request, principal: Dict[str, Any] = Depends(AuthControl.get_principal)) -> None:
+        if principal["is_superuser"]:
             return
         method = str(HTTPMethod(request.method))
         # 对结尾‘/’符号进行统一化，使白名单/路径匹配稳定。
         path = request.url.path
         if path != "/" and path.endswith("/"):
             path = path.rstrip("/")
-        roles: List[Role] = await current_user.roles
-        if not roles:
-            raise HTTPException(status_code=403, detail="请求服务不被接受, 暂无任何角色策略")
         # role.routers 保存了该角色可访问的接口（method + path）
-        routers = [await role.routers for role in roles]
-        permission_apis = list(set((str(router.method), router.path) for router in sum(routers, [])))
-        # method = "GET"
+        permission_apis = set(tuple(item) for item in await cls.get_permission_apis(principal["user_id"]))
+        if not permission_apis:
+            raise HTTPException(status_code=403, detail="请求服务不被接受, 暂无任何角色策略")
         if (method, path) not in permission_apis:
             raise HTTPException(status_code=403, detail=f"请求服务不被接受, Method:{method} Path:{path}")
 
@@ -7,19 +7,30 @@
 @DateTime: 2025/4/7 09:13
 """
 import base64
+import hashlib
 import mimetypes
 import os
 import re
 import traceback
+import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple, Union, Literal, Iterable
+from typing import Tuple, Union, Literal, Iterable, Optional, Dict
 
 import aiofiles
 from fastapi import UploadFile
+from starlette.requests import Request
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse, Response
 
 from backend.configure import LOGGER, PROJECT_CONFIG, GLOBAL_CONFIG
-from backend.core.exceptions import UploadFileException, FileExtensionException, FileTooManyException, NoPermissionException
+from backend.core.exceptions import (
+    UploadFileException,
+    FileExtensionException,
+    FileTooManyException,
+    NoPermissionException,
+    NotFoundException,
+)
 
 
 class FileTransfer:
@@ -54,32 +65,16 @@ class FileTransfer:
             raise ValueError(f"处理base64文件数据失败: {str(e)}")
 
     @staticmethod
-    async def save_upload_file_chunks(
-            *,
+    async def _check_upload_file(
             upload_file: UploadFile,
-            destination: Union[str, Path],
-            add_timestamp: bool = True,
-            check_filename: bool = True,
-            check_filetype: bool = True,
-            check_filesize: bool = True,
-            add_left_identifier: str = None,
-            add_right_identifier: str = None,
-            chunk_size: int = 1024 * 1024 * 10,
-            upload_file_size: Literal["tiny", "micro", "small", "medium", "large", "huge"] = 'tiny',
-    ) -> Tuple[bool, str]:
+            check_filename: bool,
+            check_filetype: bool,
+            check_filesize: bool,
+            upload_file_size: str,
+    ) -> str:
         """
-        将上传的文件以分块的方式保存到指定的目标路径
-        :param upload_file: 上传的文件对象
-        :param destination: 文件保存地址
-        :param add_timestamp: 是否为上传的文件添加时间戳
-        :param check_filename: 是否检查文件名称是否符合规范
-        :param check_filetype: 是否检查文件后缀是否符合规范
-        :param check_filesize: 是否检查文件体积是否符合规范
-        :param add_left_identifier: 是否为上传的文件添加标识符(左边)
-        :param add_right_identifier: 是否为上传的文件添加标识符(左边)
-        :param chunk_size: 异步分块的大小
-        :param upload_file_size: 文件的体积限制
-        :return:
+        校验上传文件的名称、类型与体积
+        :return: 清理后的文件名称
         """
         # 处理不同类型的文件上传
         if isinstance(upload_file, dict):
@@ -115,6 +110,67 @@ class FileTransfer:
         if check_filesize and (upload_file.size > PROJECT_CONFIG.UPLOAD_FILE_PEAK_SIZE[upload_file_size]):
             raise FileTooManyException(message="文件体积不被允许")
 
+        return filename
+
+    @staticmethod
+    async def _write_upload_chunks(upload_file: UploadFile, destination_path: str, chunk_size: int) -> str:
+        """
+        将上传文件分块写入目标路径，写入的同时计算 sha256，避免写完后再读一遍文件
+        :return: 文件内容的 sha256 摘要
+        """
+        sha256 = hashlib.sha256()
+        async with aiofiles.open(file=destination_path, mode="wb") as in_file:
+            try:
+                # 循环读取上传文件的内容并写入目标文件
+                while chunk := await upload_file.read(chunk_size):
+                    sha256.update(chunk)
+                    await in_file.write(chunk)
+            finally:
+                # 确保上传文件资源被正确释放
+                await upload_file.close()
+        return sha256.hexdigest()
+
+    @staticmethod
+    def object_path(digest: str, suffix: str = "") -> str:
+        """按 sha256 摘要计算内容寻址的存储路径（两级目录打散）"""
+        return os.path.join(PROJECT_CONFIG.OUTPUT_UPLOAD_OBJECT_DIR, digest[:2], digest[2:4], f"{digest}{suffix}")
+
+    @staticmethod
+    async def save_upload_file_chunks(
+            *,
+            upload_file: UploadFile,
+            destination: Union[str, Path],
+            add_timestamp: bool = True,
+            check_filename: bool = True,
+            check_filetype: bool = True,
+            check_filesize: bool = True,
+            add_left_identifier: str = None,
+            add_right_identifier: str = None,
+            chunk_size: int = 1024 * 1024 * 10,
+            upload_file_size: Literal["tiny", "micro", "small", "medium", "large", "huge"] = 'tiny',
+    ) -> Tuple[bool, str]:
+        """
+        将上传的文件以分块的方式保存到指定的目标路径
+        :param upload_file: 上传的文件对象
+        :param destination: 文件保存地址
+        :param add_timestamp: 是否为上传的文件添加时间戳
+        :param check_filename: 是否检查文件名称是否符合规范
+        :param check_filetype: 是否检查文件后缀是否符合规范
+        :param check_filesize: 是否检查文件体积是否符合规范
+        :param add_left_identifier: 是否为上传的文件添加标识符(左边)
+        :param add_right_identifier: 是否为上传的文件添加标识符(左边)
+        :param chunk_size: 异步分块的大小
+        :param upload_file_size: 文件的体积限制
+        :return:
+        """
+        filename: str = await FileTransfer._check_upload_file(
+            upload_file=upload_file,
+            check_filename=check_filename,
+            check_filetype=check_filetype,
+            check_filesize=check_filesize,
+            upload_file_size=upload_file_size,
+        )
+
         # 检查文件存放目录
         destination_dir: str = os.path.join(PROJECT_CONFIG.OUTPUT_UPLOAD_DIR, destination)
         if not os.path.exists(destination_dir):
@@ -140,20 +196,104 @@ class FileTransfer:
             destination_path: str = os.path.normpath(os.path.join(destination_dir, filename))
             if not destination_path.startswith(PROJECT_CONFIG.OUTPUT_UPLOAD_DIR):
                 raise UploadFileException(message="上传路径不被允许")
-            async with aiofiles.open(file=destination_path, mode="wb") as in_file:
-                try:
-                    # 循环读取上传文件的内容并写入目标文件
-                    while chunk := await upload_file.read(chunk_size):
-                        await in_file.write(chunk)
-                finally:
-                    # 确保上传文件资源被正确释放
-                    await upload_file.close()
+            await FileTransfer._write_upload_chunks(upload_file, destination_path, chunk_size)
             return True, destination_path
         except Exception as e:
             error_msg = f"上传或更新数据文件发生错误: {str(e)}"
             LOGGER.error(traceback.format_exc())
             return False, error_msg
 
+    @staticmethod
+    async def save_upload_file_object(
+            *,
+            upload_file: UploadFile,
+            check_filename: bool = True,
+            check_filetype: bool = True,
+            check_filesize: bool = True,
+            chunk_size: int = 1024 * 1024 * 10,
+            upload_file_size: Literal["tiny", "micro", "small", "medium", "large", "huge"] = 'tiny',
+    ) -> Tuple[bool, str, str]:
+        """
+        按内容寻址的方式分块保存上传文件：写入临时文件的同时计算 sha256，写完后移动到以摘要命名的路径，
+        内容相同的文件只保留一份（已存在时丢弃本次临时文件）
+        :param upload_file: 上传的文件对象
+        :param check_filename: 是否检查文件名称是否符合规范
+        :param check_filetype: 是否检查文件后缀是否符合规范
+        :param check_filesize: 是否检查文件体积是否符合规范
+        :param chunk_size: 异步分块的大小
+        :param upload_file_size: 文件的体积限制
+        :return: (是否成功, 存储路径或错误描述, 文件内容的 sha256 摘要)
+        """
+        filename: str = await FileTransfer._check_upload_file(
+            upload_file=upload_file,
+            check_filename=check_filename,
+            check_filetype=check_filetype,
+            check_filesize=check_filesize,
+            upload_file_size=upload_file_size,
+        )
+        temp_dir: str = os.path.join(PROJECT_CONFIG.OUTPUT_UPLOAD_OBJECT_DIR, "tmp")
+        temp_path: str = os.path.join(temp_dir, f"{uuid.uuid4().hex}.part")
+        try:
+            os.makedirs(temp_dir, exist_ok=True)
+            digest: str = await FileTransfer._write_upload_chunks(upload_file, temp_path, chunk_size)
+            object_path: str = FileTransfer.object_path(digest, os.path.splitext(filename)[1].lower())
+            if os.path.exists(object_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                os.replace(temp_path, object_path)
+            return True, object_path, digest
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            error_msg = f"上传或更新数据文件发生错误: {str(e)}"
+            LOGGER.error(traceback.format_exc())
+            return False, error_msg, ""
+
+    @staticmethod
+    def download_file_response(
+            request: Request,
+            download_file: str,
+            media_type: str = "application/octet-stream",
+            headers: Optional[Dict[str, str]] = None,
+            background: Optional[BackgroundTask] = None,
+    ) -> Response:
+        """
+        以文件响应的方式下载文件：由 FileResponse 直接发送文件（ASGI 服务器支持 pathsend 扩展时由服务器发送），
+        支持 Range 断点续传，并通过 ETag/If-None-Match 协商缓存，未变化的文件返回 304 而不重复传输
+        :param request: 当前请求对象，用于读取 If-None-Match 请求头
+        :param download_file: 下载的文件路径（必须位于 OUTPUT_DIR 下）
+        :param media_type: 响应的媒体类型
+        :param headers: 额外的响应头，如 Content-Disposition
+        :param background: 响应发送完成后执行的后台任务，如删除临时导出文件
+        :return: 文件响应或 304 响应
+        """
+        download_file: str = os.path.normpath(download_file)
+        if not download_file.startswith(PROJECT_CONFIG.OUTPUT_DIR):
+            raise NoPermissionException(message="请求路径不被允许")
+        try:
+            stat_result: os.stat_result = os.stat(download_file)
+        except OSError:
+            raise NotFoundException(message="请求文件不存在")
+        if not os.path.isfile(download_file):
+            raise NotFoundException(message="请求文件不存在")
+
+        # 与 FileResponse 默认算法一致（修改时间 + 文件大小），文件被覆盖写入后 ETag 随之变化
+        etag: str = f'"{hashlib.md5(f"{stat_result.st_mtime}-{stat_result.st_size}".encode()).hexdigest()}"'
+        response_headers: Dict[str, str] = {**(headers or {}), "etag": etag, "cache-control": "no-cache"}
+        if_none_match: str = request.headers.get("if-none-match", "")
+        if if_none_match:
+            candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in candidates or etag in candidates:
+                return Response(status_code=304, headers={"etag": etag, "cache-control": "no-cache"})
+        return FileResponse(
+            path=download_file,
+            media_type=media_type,
+            headers=response_headers,
+            stat_result=stat_result,
+            background=background,
+        )
+
     @staticmethod
     async def iter_download_file_chunks(download_file: str, chunk_size: int = 1024 * 1024, add_bom: bool = False) -> Iterable[bytes]:
         """
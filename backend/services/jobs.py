@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : jobs.py
+@DateTime: 2026/5/13 14:20
+"""
+import asyncio
+import time
+import traceback
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from backend.configure import PROJECT_CONFIG, LOGGER
+from backend.core.exceptions import BaseExceptions
+from backend.services.cache import KRUN_CACHE, CacheNamespace
+from backend.services.ctx import CTX_USER_ID
+
+
+class JobStatus:
+    """后台任务状态。"""
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILURE = "failure"
+
+
+class BackgroundJob:
+    """
+    后台任务句柄：在当前进程的事件循环中执行耗时任务，任务状态与进度写入缓存(Redis)，
+    前端按 job_id 轮询即可，无论轮询请求落到哪个工作进程。
+    """
+
+    def __init__(self, job_type: str, job_id: Optional[str] = None):
+        """
+        :param job_type: 任务类型，如 dataset_upload、api_data_generate。
+        :param job_id: 任务ID，为空时自动生成。
+        """
+        self.job_id: str = job_id or uuid.uuid4().hex
+        self.job_type: str = job_type
+        self.user_id: int = CTX_USER_ID.get(0)
+        self.status: str = JobStatus.PENDING
+        self.progress: int = 0
+        self.message: str = "任务已提交"
+        self.result: Any = None
+        self.created_time: float = time.time()
+        self.updated_time: float = self.created_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "user_id": self.user_id,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "created_time": self.created_time,
+            "updated_time": self.updated_time,
+        }
+
+    async def save(self) -> None:
+        """写入缓存；本地缓存与 Redis 使用相同过期时间，Redis 不可用时同进程内仍可查询。"""
+        self.updated_time = time.time()
+        ttl: int = PROJECT_CONFIG.BACKGROUND_JOB_TTL
+        await KRUN_CACHE.set(CacheNamespace.BACKGROUND_JOB, self.job_id, self.to_dict(), ttl=ttl, local_ttl=ttl)
+
+    async def update(self, progress: int, message: str = "") -> None:
+        """
+        更新任务进度。
+
+        :param progress: 进度百分比(0-100)。
+        :param message: 当前阶段描述。
+        """
+        self.status = JobStatus.RUNNING
+        self.progress = max(0, min(int(progress), 100))
+        if message:
+            self.message = message
+        await self.save()
+
+    async def succeed(self, result: Any = None, message: str = "任务执行完成") -> None:
+        self.status = JobStatus.SUCCESS
+        self.progress = 100
+        self.message = message
+        self.result = result
+        await self.save()
+
+    async def fail(self, message: str) -> None:
+        self.status = JobStatus.FAILURE
+        self.message = message
+        await self.save()
+
+
+# 持有运行中任务的强引用，避免任务在执行完成前被垃圾回收
+_RUNNING_JOBS: Set[asyncio.Task] = set()
+
+
+async def _run_background_job(job: BackgroundJob, runner: Callable[[BackgroundJob], Awaitable[Any]]) -> None:
+    try:
+        await job.update(job.progress, "任务执行中")
+        result = await runner(job)
+        await job.succeed(result=result)
+    except BaseExceptions as e:
+        LOGGER.error(f"后台任务执行失败, 任务类型: {job.job_type}, 任务ID: {job.job_id}, 错误描述: {e.message}")
+        await job.fail(str(e.message))
+    except Exception as e:
+        LOGGER.error(f"后台任务执行失败, 任务类型: {job.job_type}, 任务ID: {job.job_id}, 错误描述: {e}\n{traceback.format_exc()}")
+        await job.fail(str(e))
+
+
+async def submit_background_job(job_type: str, runner: Callable[[BackgroundJob], Awaitable[Any]]) -> BackgroundJob:
+    """
+    提交后台任务并立即返回任务句柄。
+
+    :param job_type: 任务类型。
+    :param runner: 接收任务句柄的异步函数，执行过程中通过 job.update 上报进度，返回值作为任务结果（需可 JSON 序列化）。
+    :return: 任务句柄。
+    """
+    job = BackgroundJob(job_type=job_type)
+    await job.save()
+    task = asyncio.create_task(_run_background_job(job, runner))
+    _RUNNING_JOBS.add(task)
+    task.add_done_callback(_RUNNING_JOBS.discard)
+    return job
+
+
+async def get_background_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    查询后台任务状态（绕过本地缓存直接读取 Redis，保证读取到执行进程最新写入的进度）。
+
+    :param job_id: 任务ID。
+    :return: 任务状态字典；不存在或已过期时返回 None。
+    """
+    return await KRUN_CACHE.get(CacheNamespace.BACKGROUND_JOB, job_id, use_local=False)
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+@Author  : yangkai
+@Email   : 807440781@qq.com
+@Project : Krun
+@Module  : storage.py
+@DateTime: 2026/5/8 11:10
+"""
+from backend.common.storage import PayloadStore
+from backend.configure import PROJECT_CONFIG, LOGGER
+
+PAYLOAD_STORE = PayloadStore(
+    blob_dir=PROJECT_CONFIG.PAYLOAD_BLOB_DIR,
+    compress_threshold=PROJECT_CONFIG.PAYLOAD_COMPRESS_THRESHOLD,
+    offload_threshold=PROJECT_CONFIG.PAYLOAD_OFFLOAD_THRESHOLD,
+    level=PROJECT_CONFIG.PAYLOAD_COMPRESS_LEVEL,
+    enabled=PROJECT_CONFIG.PAYLOAD_COMPRESS_ENABLED,
+    logger=LOGGER,
+)